@@ -0,0 +1,33 @@
+"""Add run queue lease columns to jobs
+
+Revision ID: 4f2c8a1d6b3e
+Revises: 9e3b4a5c2d1f
+Create Date: 2025-06-30 09:41:18.207351
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4f2c8a1d6b3e"
+down_revision: Union[str, None] = "9e3b4a5c2d1f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("lease_owner", sa.String(), nullable=True))
+    op.add_column("jobs", sa.Column("lease_expires_at", sa.DateTime(), nullable=True))
+    op.add_column("jobs", sa.Column("attempts", sa.Integer(), server_default="0", nullable=False))
+    op.create_index("ix_jobs_status_lease_expires_at", "jobs", ["status", "lease_expires_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_status_lease_expires_at", table_name="jobs")
+    op.drop_column("jobs", "attempts")
+    op.drop_column("jobs", "lease_expires_at")
+    op.drop_column("jobs", "lease_owner")
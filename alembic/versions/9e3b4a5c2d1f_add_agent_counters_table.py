@@ -0,0 +1,35 @@
+"""Add agent counters table
+
+Revision ID: 9e3b4a5c2d1f
+Revises: c7ac45f69849
+Create Date: 2025-06-27 10:12:40.512318
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9e3b4a5c2d1f"
+down_revision: Union[str, None] = "c7ac45f69849"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows are created lazily on first read, so there is nothing to backfill
+    op.create_table(
+        "agent_counters",
+        sa.Column("agent_id", sa.String(), nullable=False),
+        sa.Column("message_count", sa.Integer(), nullable=True),
+        sa.Column("archival_passage_count", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["agent_id"], ["agents.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("agent_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("agent_counters")
@@ -0,0 +1,27 @@
+"""Add token counts to messages
+
+Revision ID: b7d41e9a2c05
+Revises: 4f2c8a1d6b3e
+Create Date: 2025-07-01 14:12:53.631028
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7d41e9a2c05"
+down_revision: Union[str, None] = "4f2c8a1d6b3e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("messages", sa.Column("token_counts", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("messages", "token_counts")
@@ -0,0 +1,50 @@
+"""Add full-text search to messages
+
+Revision ID: c3e8f05a71d4
+Revises: b7d41e9a2c05
+Create Date: 2025-07-02 10:27:41.915204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c3e8f05a71d4"
+down_revision: Union[str, None] = "b7d41e9a2c05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("messages", sa.Column("search_text", sa.Text(), nullable=True))
+
+    # Backfill from the text parts of the content, falling back to the legacy text column
+    op.execute(
+        """
+        UPDATE messages SET search_text = coalesce(
+            (
+                SELECT string_agg(part->>'text', E'\\n')
+                FROM json_array_elements(messages.content::json) AS part
+                WHERE part->>'type' = 'text'
+            ),
+            messages.text
+        )
+        WHERE json_typeof(messages.content::json) = 'array' OR messages.text IS NOT NULL
+        """
+    )
+
+    op.execute(
+        "ALTER TABLE messages ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', coalesce(search_text, ''))) STORED"
+    )
+    op.create_index("ix_messages_search_vector", "messages", ["search_vector"], unique=False, postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_messages_search_vector", table_name="messages", postgresql_using="gin")
+    op.drop_column("messages", "search_vector")
+    op.drop_column("messages", "search_text")
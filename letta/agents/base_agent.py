@@ -1,5 +1,7 @@
+import logging
 from abc import ABC, abstractmethod
-from typing import Any, AsyncGenerator, List, Optional, Union
+from collections import OrderedDict
+from typing import Any, AsyncGenerator, Hashable, List, Optional, Tuple, Union
 
 import openai
 
@@ -24,6 +26,10 @@ from letta.utils import united_diff
 
 logger = get_logger(__name__)
 
+# System message id -> (hash of its text, fingerprint of the memory rendered into it), shared by the agents of this process
+_RENDERED_MEMORY_CACHE_SIZE = 4096
+_rendered_memory_fingerprints: "OrderedDict[str, Tuple[int, Hashable]]" = OrderedDict()
+
 
 class BaseAgent(ABC):
     """
@@ -97,11 +103,14 @@ class BaseAgent(ABC):
             # [DB Call] loading blocks (modifies: agent_state.memory.blocks)
             await self.agent_manager.refresh_memory_async(agent_state=agent_state, actor=self.actor)
 
-            # TODO: This is a pretty brittle pattern established all over our code, need to get rid of this
+            # Skip the rebuild if the system message still holds the memory it was last rendered with
             curr_system_message = in_context_messages[0]
-            curr_memory_str = agent_state.memory.compile()
             curr_system_message_text = curr_system_message.content[0].text
-            if curr_memory_str in curr_system_message_text:
+            tool_usage_rules = tool_rules_solver.compile_tool_rule_prompts() if tool_rules_solver is not None else None
+            memory_fingerprint = agent_state.memory.fingerprint(tool_usage_rules=tool_usage_rules)
+            rendered = _rendered_memory_fingerprints.get(curr_system_message.id)
+            if memory_fingerprint is not None and rendered == (hash(curr_system_message_text), memory_fingerprint):
+                _rendered_memory_fingerprints.move_to_end(curr_system_message.id)
                 logger.debug(
                     f"Memory hasn't changed for agent id={agent_state.id} and actor=({self.actor.id}, {self.actor.name}), skipping system prompt rebuild"
                 )
@@ -126,22 +135,35 @@ class BaseAgent(ABC):
                 tool_rules_solver=tool_rules_solver,
             )
 
-            diff = united_diff(curr_system_message_text, new_system_message_str)
-            if len(diff) > 0:
-                logger.debug(f"Rebuilding system with new memory...\nDiff:\n{diff}")
+            if new_system_message_str != curr_system_message_text:
+                if logger.isEnabledFor(logging.DEBUG):
+                    diff = united_diff(curr_system_message_text, new_system_message_str)
+                    logger.debug(f"Rebuilding system with new memory...\nDiff:\n{diff}")
 
                 # [DB Call] Update Messages
                 new_system_message = await self.message_manager.update_message_by_id_async(
                     curr_system_message.id, message_update=MessageUpdate(content=new_system_message_str), actor=self.actor
                 )
+                self._record_rendered_memory(new_system_message.id, new_system_message_str, memory_fingerprint)
                 return [new_system_message] + in_context_messages[1:]
 
             else:
+                self._record_rendered_memory(curr_system_message.id, curr_system_message_text, memory_fingerprint)
                 return in_context_messages
         except:
             logger.exception(f"Failed to rebuild memory for agent id={agent_state.id} and actor=({self.actor.id}, {self.actor.name})")
             raise
 
+    @staticmethod
+    def _record_rendered_memory(system_message_id: str, system_message_text: str, memory_fingerprint: Optional[Hashable]) -> None:
+        if memory_fingerprint is None:
+            _rendered_memory_fingerprints.pop(system_message_id, None)
+            return
+        _rendered_memory_fingerprints[system_message_id] = (hash(system_message_text), memory_fingerprint)
+        _rendered_memory_fingerprints.move_to_end(system_message_id)
+        if len(_rendered_memory_fingerprints) > _RENDERED_MEMORY_CACHE_SIZE:
+            _rendered_memory_fingerprints.popitem(last=False)
+
     def get_finish_chunks_for_stream(self, usage: LettaUsageStatistics, stop_reason: Optional[LettaStopReason] = None):
         if stop_reason is None:
             stop_reason = LettaStopReason(stop_reason=StopReasonType.end_turn.value)
@@ -1,6 +1,7 @@
 import asyncio
 import json
 import uuid
+from dataclasses import dataclass
 from datetime import datetime
 from typing import AsyncGenerator, Dict, List, Optional, Tuple, Union
 
@@ -18,10 +19,11 @@ from letta.agents.helpers import (
     _safe_load_dict,
     generate_step_id,
 )
-from letta.constants import DEFAULT_MAX_STEPS, NON_USER_MSG_PREFIX
+from letta.constants import DEFAULT_MAX_STEPS, FUNCTION_RETURN_CHAR_LIMIT, NON_USER_MSG_PREFIX
 from letta.errors import ContextWindowExceededError
 from letta.helpers import ToolRulesSolver
 from letta.helpers.datetime_helpers import AsyncTimer, get_utc_time, get_utc_timestamp_ns, ns_to_ms
+from letta.helpers.fan_out import gather_fan_out
 from letta.helpers.tool_execution_helper import enable_strict_mode
 from letta.interfaces.anthropic_streaming_interface import AnthropicStreamingInterface
 from letta.interfaces.openai_streaming_interface import OpenAIStreamingInterface
@@ -46,23 +48,57 @@ from letta.schemas.provider_trace import ProviderTraceCreate
 from letta.schemas.tool_execution_result import ToolExecutionResult
 from letta.schemas.usage import LettaUsageStatistics
 from letta.schemas.user import User
-from letta.server.rest_api.utils import create_letta_messages_from_llm_response
+from letta.server.rest_api.utils import (
+    ToolCallResult,
+    create_letta_messages_from_llm_response,
+    create_letta_messages_from_parallel_llm_response,
+)
 from letta.services.agent_manager import AgentManager
 from letta.services.block_manager import BlockManager
-from letta.services.helpers.tool_parser_helper import runtime_override_tool_json_schema
+from letta.services.context_window_calculator.message_token_counts import (
+    count_tool_schema_tokens_async,
+    ensure_token_counts_async,
+    get_message_tokens,
+    retain_count_for_budget,
+    try_tokenizer_family,
+)
+from letta.services.helpers.tool_parser_helper import parse_function_arguments, runtime_override_tool_json_schema
 from letta.services.job_manager import JobManager
 from letta.services.message_manager import MessageManager
 from letta.services.passage_manager import PassageManager
+from letta.services.step_commit import StepCommit
 from letta.services.step_manager import NoopStepManager, StepManager
 from letta.services.summarizer.enums import SummarizationMode
 from letta.services.summarizer.summarizer import Summarizer
 from letta.services.telemetry_manager import NoopTelemetryManager, TelemetryManager
 from letta.services.tool_executor.tool_execution_manager import ToolExecutionManager
-from letta.settings import model_settings
+from letta.settings import model_settings, settings
 from letta.system import package_function_response
 from letta.types import JsonDict
 from letta.utils import log_telemetry, validate_function_response
 
+# Relationships the agent loop needs; callers that prefetch the agent state should load at least these
+AGENT_LOOP_RELATIONSHIPS = ["tools", "memory", "tool_exec_environment_variables"]
+
+# Tools of these types edit the agent's memory, so parallel tool calls to them run one at a time
+MEMORY_EDITING_TOOL_TYPES = {
+    ToolType.LETTA_MEMORY_CORE,
+    ToolType.LETTA_SLEEPTIME_CORE,
+    ToolType.LETTA_VOICE_SLEEPTIME_CORE,
+    ToolType.LETTA_FILES_CORE,
+}
+
+
+@dataclass
+class _ParsedToolCall:
+    name: str
+    id: str
+    args: dict
+    request_heartbeat: bool
+    rule_violated: bool
+    # The tools that could have been called in its place
+    valid_tool_names: List[str]
+
 
 class LettaAgent(BaseAgent):
 
@@ -82,9 +118,13 @@ class LettaAgent(BaseAgent):
         message_buffer_min: int = 15,  # TODO: Make this configurable
         enable_summarization: bool = True,  # TODO: Make this configurable
         max_summarization_retries: int = 3,  # TODO: Make this configurable
+        agent_state: Optional[AgentState] = None,
     ):
         super().__init__(agent_id=agent_id, openai_client=None, message_manager=message_manager, agent_manager=agent_manager, actor=actor)
 
+        # Agent state already loaded by the caller for this request (consumed by the first step)
+        self._prefetched_agent_state = agent_state
+
         # TODO: Make this more general, factorable
         # Summarizer settings
         self.block_manager = block_manager
@@ -124,6 +164,15 @@ class LettaAgent(BaseAgent):
             message_buffer_min=message_buffer_min,
         )
 
+    async def _get_agent_state_async(self) -> AgentState:
+        """Return the agent state handed over by the caller if there is one, otherwise load it."""
+        if self._prefetched_agent_state is not None:
+            agent_state, self._prefetched_agent_state = self._prefetched_agent_state, None
+            return agent_state
+        return await self.agent_manager.get_agent_by_id_async(
+            agent_id=self.agent_id, include_relationships=AGENT_LOOP_RELATIONSHIPS, actor=self.actor
+        )
+
     @trace_method
     async def step(
         self,
@@ -134,9 +183,7 @@ class LettaAgent(BaseAgent):
         request_start_timestamp_ns: Optional[int] = None,
         include_return_message_types: Optional[List[MessageType]] = None,
     ) -> LettaResponse:
-        agent_state = await self.agent_manager.get_agent_by_id_async(
-            agent_id=self.agent_id, include_relationships=["tools", "memory", "tool_exec_environment_variables"], actor=self.actor
-        )
+        agent_state = await self._get_agent_state_async()
         _, new_in_context_messages, stop_reason, usage = await self._step(
             agent_state=agent_state,
             input_messages=input_messages,
@@ -161,9 +208,7 @@ class LettaAgent(BaseAgent):
         request_start_timestamp_ns: Optional[int] = None,
         include_return_message_types: Optional[List[MessageType]] = None,
     ):
-        agent_state = await self.agent_manager.get_agent_by_id_async(
-            agent_id=self.agent_id, include_relationships=["tools", "memory", "tool_exec_environment_variables"], actor=self.actor
-        )
+        agent_state = await self._get_agent_state_async()
         current_in_context_messages, new_in_context_messages = await _prepare_in_context_messages_no_persist_async(
             input_messages, agent_state, self.message_manager, self.actor
         )
@@ -215,7 +260,9 @@ class LettaAgent(BaseAgent):
             if not response.choices[0].message.tool_calls:
                 # TODO: make into a real error
                 raise ValueError("No tool calls found in response, model must make a tool call")
-            tool_call = response.choices[0].message.tool_calls[0]
+            tool_calls = response.choices[0].message.tool_calls
+            if not agent_state.llm_config.parallel_tool_calls:
+                tool_calls = tool_calls[:1]
             if response.choices[0].message.reasoning_content:
                 reasoning = [
                     ReasoningContent(
@@ -233,15 +280,22 @@ class LettaAgent(BaseAgent):
                 reasoning = None
 
             persisted_messages, should_continue, stop_reason = await self._handle_ai_response(
-                tool_call,
+                tool_calls,
                 valid_tool_names,
                 agent_state,
                 tool_rules_solver,
                 response.usage,
                 reasoning_content=reasoning,
+                step_id=step_id,
                 initial_messages=initial_messages,
                 agent_step_span=agent_step_span,
                 is_final_step=(i == max_steps - 1),
+                provider_trace_create=ProviderTraceCreate(
+                    request_json=request_data,
+                    response_json=response_data,
+                    step_id=step_id,
+                    organization_id=self.actor.organization_id,
+                ),
             )
 
             # TODO (cliandy): handle message contexts with larger refactor and dedupe logic
@@ -257,17 +311,6 @@ class LettaAgent(BaseAgent):
             agent_step_span.add_event(name="step_ms", attributes={"duration_ms": ns_to_ms(step_ns)})
             agent_step_span.end()
 
-            # Log LLM Trace
-            await self.telemetry_manager.create_provider_trace_async(
-                actor=self.actor,
-                provider_trace_create=ProviderTraceCreate(
-                    request_json=request_data,
-                    response_json=response_data,
-                    step_id=step_id,
-                    organization_id=self.actor.organization_id,
-                ),
-            )
-
             # stream step
             # TODO: improve TTFT
             filter_user_messages = [m for m in persisted_messages if m.role != "user"]
@@ -284,7 +327,15 @@ class LettaAgent(BaseAgent):
             if not should_continue:
                 break
 
-        # Extend the in context message ids
+        # log request time
+        run_metrics = None
+        if request_start_timestamp_ns:
+            now = get_utc_timestamp_ns()
+            duration_ms = ns_to_ms(now - request_start_timestamp_ns)
+            request_span.add_event(name="letta_request_ms", attributes={"duration_ms": duration_ms})
+            run_metrics = (get_utc_time(), duration_ms)
+
+        # Extend the in context message ids, and update agent's last run metrics with them
         if not agent_state.message_buffer_autoclear:
             await self._rebuild_context_window(
                 in_context_messages=current_in_context_messages,
@@ -292,17 +343,10 @@ class LettaAgent(BaseAgent):
                 llm_config=agent_state.llm_config,
                 total_tokens=usage.total_tokens,
                 force=False,
+                run_metrics=run_metrics,
             )
-
-        # log request time
-        if request_start_timestamp_ns:
-            now = get_utc_timestamp_ns()
-            duration_ms = ns_to_ms(now - request_start_timestamp_ns)
-            request_span.add_event(name="letta_request_ms", attributes={"duration_ms": duration_ms})
-
-            # update agent's last run metrics
-            now_datetime = get_utc_time()
-            await self._update_agent_last_run_metrics(now_datetime, duration_ms)
+        elif run_metrics:
+            await self._update_agent_last_run_metrics(*run_metrics)
 
         request_span.end()
 
@@ -371,7 +415,9 @@ class LettaAgent(BaseAgent):
             if not response.choices[0].message.tool_calls:
                 # TODO: make into a real error
                 raise ValueError("No tool calls found in response, model must make a tool call")
-            tool_call = response.choices[0].message.tool_calls[0]
+            tool_calls = response.choices[0].message.tool_calls
+            if not agent_state.llm_config.parallel_tool_calls:
+                tool_calls = tool_calls[:1]
             if response.choices[0].message.reasoning_content:
                 reasoning = [
                     ReasoningContent(
@@ -389,7 +435,7 @@ class LettaAgent(BaseAgent):
                 reasoning = None
 
             persisted_messages, should_continue, stop_reason = await self._handle_ai_response(
-                tool_call,
+                tool_calls,
                 valid_tool_names,
                 agent_state,
                 tool_rules_solver,
@@ -400,6 +446,12 @@ class LettaAgent(BaseAgent):
                 agent_step_span=agent_step_span,
                 is_final_step=(i == max_steps - 1),
                 run_id=run_id,
+                provider_trace_create=ProviderTraceCreate(
+                    request_json=request_data,
+                    response_json=response_data,
+                    step_id=step_id,
+                    organization_id=self.actor.organization_id,
+                ),
             )
             new_message_idx = len(initial_messages) if initial_messages else 0
             self.response_messages.extend(persisted_messages[new_message_idx:])
@@ -414,35 +466,20 @@ class LettaAgent(BaseAgent):
             agent_step_span.add_event(name="step_ms", attributes={"duration_ms": ns_to_ms(step_ns)})
             agent_step_span.end()
 
-            # Log LLM Trace
-            await self.telemetry_manager.create_provider_trace_async(
-                actor=self.actor,
-                provider_trace_create=ProviderTraceCreate(
-                    request_json=request_data,
-                    response_json=response_data,
-                    step_id=step_id,
-                    organization_id=self.actor.organization_id,
-                ),
-            )
-
             MetricRegistry().step_execution_time_ms_histogram.record(step_start - get_utc_timestamp_ns(), get_ctx_attributes())
 
             if not should_continue:
                 break
 
         # log request time
+        run_metrics = None
         if request_start_timestamp_ns:
             now = get_utc_timestamp_ns()
             duration_ms = ns_to_ms(now - request_start_timestamp_ns)
             request_span.add_event(name="request_ms", attributes={"duration_ms": duration_ms})
+            run_metrics = (get_utc_time(), duration_ms)
 
-            # update agent's last run metrics
-            now_datetime = get_utc_time()
-            await self._update_agent_last_run_metrics(now_datetime, duration_ms)
-
-        request_span.end()
-
-        # Extend the in context message ids
+        # Extend the in context message ids, and update agent's last run metrics with them
         if not agent_state.message_buffer_autoclear:
             await self._rebuild_context_window(
                 in_context_messages=current_in_context_messages,
@@ -450,7 +487,12 @@ class LettaAgent(BaseAgent):
                 llm_config=agent_state.llm_config,
                 total_tokens=usage.total_tokens,
                 force=False,
+                run_metrics=run_metrics,
             )
+        elif run_metrics:
+            await self._update_agent_last_run_metrics(*run_metrics)
+
+        request_span.end()
 
         return current_in_context_messages, new_in_context_messages, stop_reason, usage
 
@@ -481,9 +523,7 @@ class LettaAgent(BaseAgent):
             3. Fetches a response from the LLM
             4. Processes the response
         """
-        agent_state = await self.agent_manager.get_agent_by_id_async(
-            agent_id=self.agent_id, include_relationships=["tools", "memory", "tool_exec_environment_variables"], actor=self.actor
-        )
+        agent_state = await self._get_agent_state_async()
         current_in_context_messages, new_in_context_messages = await _prepare_in_context_messages_no_persist_async(
             input_messages, agent_state, self.message_manager, self.actor
         )
@@ -590,8 +630,29 @@ class LettaAgent(BaseAgent):
                 yield f"data: {stop_reason.model_dump_json()}\n\n"
                 raise e
             reasoning_content = interface.get_reasoning_content()
+
+            # LLM trace, logged with the step
+            # TODO (cliandy): we are piecing together the streamed response here. Content here does not match the actual response schema.
+            provider_trace_create = ProviderTraceCreate(
+                request_json=request_data,
+                response_json={
+                    "content": {
+                        "tool_call": tool_call.model_dump_json(),
+                        "reasoning": [content.model_dump_json() for content in reasoning_content],
+                    },
+                    "id": interface.message_id,
+                    "model": interface.model,
+                    "role": "assistant",
+                    # "stop_reason": "",
+                    # "stop_sequence": None,
+                    "type": "message",
+                    "usage": {"input_tokens": interface.input_tokens, "output_tokens": interface.output_tokens},
+                },
+                step_id=step_id,
+                organization_id=self.actor.organization_id,
+            )
             persisted_messages, should_continue, stop_reason = await self._handle_ai_response(
-                tool_call,
+                [tool_call],
                 valid_tool_names,
                 agent_state,
                 tool_rules_solver,
@@ -606,6 +667,7 @@ class LettaAgent(BaseAgent):
                 initial_messages=initial_messages,
                 agent_step_span=agent_step_span,
                 is_final_step=(i == max_steps - 1),
+                provider_trace_create=provider_trace_create,
             )
             new_message_idx = len(initial_messages) if initial_messages else 0
             self.response_messages.extend(persisted_messages[new_message_idx:])
@@ -622,30 +684,6 @@ class LettaAgent(BaseAgent):
             # TODO (cliandy): the stream POST request span has ended at this point, we should tie this to the stream
             # log_event("agent.stream.llm_response.processed") # [4^]
 
-            # Log LLM Trace
-            # TODO (cliandy): we are piecing together the streamed response here. Content here does not match the actual response schema.
-            await self.telemetry_manager.create_provider_trace_async(
-                actor=self.actor,
-                provider_trace_create=ProviderTraceCreate(
-                    request_json=request_data,
-                    response_json={
-                        "content": {
-                            "tool_call": tool_call.model_dump_json(),
-                            "reasoning": [content.model_dump_json() for content in reasoning_content],
-                        },
-                        "id": interface.message_id,
-                        "model": interface.model,
-                        "role": "assistant",
-                        # "stop_reason": "",
-                        # "stop_sequence": None,
-                        "type": "message",
-                        "usage": {"input_tokens": interface.input_tokens, "output_tokens": interface.output_tokens},
-                    },
-                    step_id=step_id,
-                    organization_id=self.actor.organization_id,
-                ),
-            )
-
             tool_return = [msg for msg in persisted_messages if msg.role == "tool"][-1].to_letta_messages()[0]
             if not (use_assistant_message and tool_return.name == "send_message"):
                 # Apply message type filtering if specified
@@ -658,7 +696,15 @@ class LettaAgent(BaseAgent):
             if not should_continue:
                 break
 
-        # Extend the in context message ids
+        # log time of entire request
+        run_metrics = None
+        if request_start_timestamp_ns:
+            now = get_utc_timestamp_ns()
+            duration_ms = ns_to_ms(now - request_start_timestamp_ns)
+            request_span.add_event(name="letta_request_ms", attributes={"duration_ms": duration_ms})
+            run_metrics = (get_utc_time(), duration_ms)
+
+        # Extend the in context message ids, and update agent's last run metrics with them
         if not agent_state.message_buffer_autoclear:
             await self._rebuild_context_window(
                 in_context_messages=current_in_context_messages,
@@ -666,17 +712,10 @@ class LettaAgent(BaseAgent):
                 llm_config=agent_state.llm_config,
                 total_tokens=usage.total_tokens,
                 force=False,
+                run_metrics=run_metrics,
             )
-
-        # log time of entire request
-        if request_start_timestamp_ns:
-            now = get_utc_timestamp_ns()
-            duration_ms = ns_to_ms(now - request_start_timestamp_ns)
-            request_span.add_event(name="letta_request_ms", attributes={"duration_ms": duration_ms})
-
-            # update agent's last run metrics
-            completion_time = get_utc_time()
-            await self._update_agent_last_run_metrics(completion_time, duration_ms)
+        elif run_metrics:
+            await self._update_agent_last_run_metrics(*run_metrics)
 
         request_span.end()
 
@@ -693,6 +732,9 @@ class LettaAgent(BaseAgent):
         tool_rules_solver: ToolRulesSolver,
         agent_step_span: "Span",
     ) -> Tuple[Dict, Dict, List[Message], List[Message], List[str]] | None:
+        current_in_context_messages = await self._fit_context_to_token_budget(
+            current_in_context_messages, new_in_context_messages, agent_state
+        )
         for attempt in range(self.max_summarization_retries + 1):
             try:
                 log_event("agent.stream_no_tokens.messages.refreshed")
@@ -744,6 +786,9 @@ class LettaAgent(BaseAgent):
         llm_client: LLMClientBase,
         tool_rules_solver: ToolRulesSolver,
     ) -> Tuple[Dict, AsyncStream[ChatCompletionChunk], List[Message], List[Message], List[str], int] | None:
+        current_in_context_messages = await self._fit_context_to_token_budget(
+            current_in_context_messages, new_in_context_messages, agent_state
+        )
         for attempt in range(self.max_summarization_retries + 1):
             try:
                 log_event("agent.stream_no_tokens.messages.refreshed")
@@ -753,6 +798,8 @@ class LettaAgent(BaseAgent):
                     in_context_messages=current_in_context_messages + new_in_context_messages,
                     agent_state=agent_state,
                     tool_rules_solver=tool_rules_solver,
+                    # The streaming interfaces put together a single tool call per response
+                    allow_parallel_tool_calls=False,
                 )
                 log_event("agent.stream.llm_request.created")  # [2^]
 
@@ -790,6 +837,50 @@ class LettaAgent(BaseAgent):
                 new_in_context_messages: list[Message] = []
                 log_event(f"agent.stream_no_tokens.retry_attempt.{attempt + 1}")
 
+    @trace_method
+    async def _fit_context_to_token_budget(
+        self, current_in_context_messages: List[Message], new_in_context_messages: List[Message], agent_state: AgentState
+    ) -> List[Message]:
+        """
+        Evict the oldest in-context messages if the prompt would not fit into the model's context window, so we don't
+        have to wait for the provider to reject the request. Token counts are cached on the messages, so this only
+        tokenizes messages that have never been counted for this model's tokenizer.
+        """
+        llm_config = agent_state.llm_config
+        family = try_tokenizer_family(llm_config)
+        if family is None:
+            # e.g. the encoding can't be downloaded while offline: an oversized prompt is then caught by the
+            # ContextWindowExceededError retry instead
+            return current_in_context_messages
+        newly_counted = await ensure_token_counts_async(current_in_context_messages, family)
+        if newly_counted:
+            await self.message_manager.update_token_counts_async(newly_counted, actor=self.actor)
+        await ensure_token_counts_async(new_in_context_messages, family)
+
+        system_message, history = current_in_context_messages[0], current_in_context_messages[1:]
+        budget = (
+            llm_config.context_window
+            - (llm_config.max_tokens or 0)
+            - await count_tool_schema_tokens_async([t.json_schema for t in agent_state.tools], llm_config)
+            - get_message_tokens(system_message, family)
+            - sum(get_message_tokens(m, family) for m in new_in_context_messages)
+        )
+        retain_count = retain_count_for_budget(history, family, max(budget, 0))
+        if retain_count is None:
+            return current_in_context_messages
+
+        self.logger.info(
+            f"In-context messages exceed the {llm_config.context_window} token context window, keeping the last {retain_count} of them."
+        )
+        current_in_context_messages, updated = self.summarizer.summarize(
+            in_context_messages=current_in_context_messages, new_letta_messages=[], force=True, retain_count=retain_count
+        )
+        if updated:
+            await self.agent_manager.set_in_context_messages_async(
+                agent_id=self.agent_id, message_ids=[m.id for m in current_in_context_messages], actor=self.actor
+            )
+        return current_in_context_messages
+
     @trace_method
     async def _handle_llm_error(
         self,
@@ -815,6 +906,7 @@ class LettaAgent(BaseAgent):
         llm_config: LLMConfig,
         total_tokens: Optional[int] = None,
         force: bool = False,
+        run_metrics: Optional[Tuple[datetime, float]] = None,
     ) -> List[Message]:
         # If total tokens is reached, we truncate down
         # TODO: This can be broken by bad configs, e.g. lower bound too high, initial messages too fat, etc.
@@ -829,8 +921,16 @@ class LettaAgent(BaseAgent):
             new_in_context_messages, updated = self.summarizer.summarize(
                 in_context_messages=in_context_messages, new_letta_messages=new_letta_messages
             )
-        await self.agent_manager.set_in_context_messages_async(
-            agent_id=self.agent_id, message_ids=[m.id for m in new_in_context_messages], actor=self.actor
+        # The last run's (completion time, duration in ms) go out in the same update as the message ids
+        last_run_completion, last_run_duration_ms = run_metrics or (None, None)
+        await self.agent_manager.update_agent_async(
+            agent_id=self.agent_id,
+            agent_update=UpdateAgent(
+                message_ids=[m.id for m in new_in_context_messages],
+                last_run_completion=last_run_completion,
+                last_run_duration_ms=last_run_duration_ms,
+            ),
+            actor=self.actor,
         )
 
         return new_in_context_messages
@@ -854,6 +954,7 @@ class LettaAgent(BaseAgent):
         in_context_messages: List[Message],
         agent_state: AgentState,
         tool_rules_solver: ToolRulesSolver,
+        allow_parallel_tool_calls: bool = True,
     ) -> Tuple[dict, List[str]]:
         self.num_messages, self.num_archival_memories = await asyncio.gather(
             (
@@ -911,10 +1012,14 @@ class LettaAgent(BaseAgent):
             tool_list=allowed_tools, response_format=agent_state.response_format, request_heartbeat=True
         )
 
+        llm_config = agent_state.llm_config
+        if llm_config.parallel_tool_calls and not allow_parallel_tool_calls:
+            llm_config = llm_config.model_copy(update={"parallel_tool_calls": False})
+
         return (
             llm_client.build_request_data(
                 in_context_messages,
-                agent_state.llm_config,
+                llm_config,
                 allowed_tools,
                 force_tool_call,
             ),
@@ -924,7 +1029,7 @@ class LettaAgent(BaseAgent):
     @trace_method
     async def _handle_ai_response(
         self,
-        tool_call: ToolCall,
+        tool_calls: List[ToolCall],
         valid_tool_names: List[str],
         agent_state: AgentState,
         tool_rules_solver: ToolRulesSolver,
@@ -936,73 +1041,104 @@ class LettaAgent(BaseAgent):
         agent_step_span: Optional["Span"] = None,
         is_final_step: Optional[bool] = None,
         run_id: Optional[str] = None,
+        provider_trace_create: Optional[ProviderTraceCreate] = None,
     ) -> Tuple[List[Message], bool, Optional[LettaStopReason]]:
         """
         Handle the final AI response once streaming completes, execute / validate the
-        tool call, decide whether we should keep stepping, and persist state.
-        """
-        # 1.  Parse and validate the tool-call envelope
-        tool_call_name: str = tool_call.function.name
-        tool_call_id: str = tool_call.id or f"call_{uuid.uuid4().hex[:8]}"
-        tool_args = _safe_load_dict(tool_call.function.arguments)
-        request_heartbeat: bool = _pop_heartbeat(tool_args)
-        tool_args.pop(INNER_THOUGHTS_KWARG, None)
-
-        log_telemetry(
-            self.logger,
-            "_handle_ai_response execute tool start",
-            tool_name=tool_call_name,
-            tool_args=tool_args,
-            tool_call_id=tool_call_id,
-            request_heartbeat=request_heartbeat,
-        )
+        tool calls, decide whether we should keep stepping, and persist state.
 
-        # 2.  Execute the tool (or synthesize an error result if disallowed)
-        tool_rule_violated = tool_call_name not in valid_tool_names
-        if tool_rule_violated:
-            tool_execution_result = _build_rule_violation_result(tool_call_name, valid_tool_names, tool_rules_solver)
-        else:
-            tool_execution_result = await self._execute_tool(
-                tool_name=tool_call_name,
+        Several tool calls (with `parallel_tool_calls` in the LLM config) are executed concurrently, and their returns
+        are persisted in call order so that the next step sees all of them.
+        """
+        # 1.  Parse the tool-call envelopes and validate them against the tool rules in call order, as if they had been
+        #     made one after another: each valid call is registered with the solver before the next one is checked
+        available_tool_names = {t.name for t in agent_state.tools} | set(valid_tool_names)
+        parsed_tool_calls = []
+        for tool_call in tool_calls:
+            tool_args = _safe_load_dict(tool_call.function.arguments)
+            parsed_tool_call = _ParsedToolCall(
+                name=tool_call.function.name,
+                id=tool_call.id or f"call_{uuid.uuid4().hex[:8]}",
+                args=tool_args,
+                request_heartbeat=_pop_heartbeat(tool_args),
+                rule_violated=tool_call.function.name not in valid_tool_names,
+                valid_tool_names=valid_tool_names,
+            )
+            tool_args.pop(INNER_THOUGHTS_KWARG, None)
+            parsed_tool_calls.append(parsed_tool_call)
+
+            if not parsed_tool_call.rule_violated:
+                tool_rules_solver.register_tool_call(parsed_tool_call.name)
+                if tool_rules_solver.is_terminal_tool(parsed_tool_call.name) or tool_rules_solver.is_conditional_tool(
+                    parsed_tool_call.name
+                ):
+                    # Nothing may run after a terminal tool, and what may run after a conditional one depends on its output
+                    valid_tool_names = []
+                else:
+                    valid_tool_names = tool_rules_solver.get_allowed_tool_names(
+                        available_tools=available_tool_names, last_function_response=self.last_function_response
+                    ) or list(available_tool_names)
+
+            log_telemetry(
+                self.logger,
+                "_handle_ai_response execute tool start",
+                tool_name=parsed_tool_call.name,
                 tool_args=tool_args,
-                agent_state=agent_state,
-                agent_step_span=agent_step_span,
-                step_id=step_id,
+                tool_call_id=parsed_tool_call.id,
+                request_heartbeat=parsed_tool_call.request_heartbeat,
             )
 
-        log_telemetry(
-            self.logger, "_handle_ai_response execute tool finish", tool_execution_result=tool_execution_result, tool_call_id=tool_call_id
-        )
+        # 2.  Execute the tools (or synthesize an error result if disallowed)
+        tool_execution_results = await self._execute_tool_calls(parsed_tool_calls, agent_state, tool_rules_solver, agent_step_span, step_id)
+
+        # 3.  Prepare the function-response payloads
+        tool_call_results = []
+        for parsed_tool_call, tool_execution_result in zip(parsed_tool_calls, tool_execution_results):
+            log_telemetry(
+                self.logger,
+                "_handle_ai_response execute tool finish",
+                tool_execution_result=tool_execution_result,
+                tool_call_id=parsed_tool_call.id,
+            )
 
-        # 3.  Prepare the function-response payload
-        truncate = tool_call_name not in {"conversation_search", "conversation_search_date", "archival_memory_search"}
-        return_char_limit = next(
-            (t.return_char_limit for t in agent_state.tools if t.name == tool_call_name),
-            None,
-        )
-        function_response_string = validate_function_response(
-            tool_execution_result.func_return,
-            return_char_limit=return_char_limit,
-            truncate=truncate,
-        )
+            truncate = parsed_tool_call.name not in {"conversation_search", "conversation_search_date", "archival_memory_search"}
+            # Calls to tools the agent doesn't have (e.g. hallucinated names) get the default limit
+            return_char_limit = next(
+                (t.return_char_limit for t in agent_state.tools if t.name == parsed_tool_call.name),
+                FUNCTION_RETURN_CHAR_LIMIT,
+            )
+            function_response_string = validate_function_response(
+                tool_execution_result.func_return,
+                return_char_limit=return_char_limit,
+                truncate=truncate,
+            )
+            tool_call_results.append(
+                ToolCallResult(
+                    tool_call_id=parsed_tool_call.id,
+                    function_name=parsed_tool_call.name,
+                    function_arguments=parsed_tool_call.args,
+                    tool_execution_result=tool_execution_result,
+                    function_response=function_response_string,
+                )
+            )
         self.last_function_response = package_function_response(
-            was_success=tool_execution_result.success_flag,
-            response_string=function_response_string,
+            was_success=tool_call_results[-1].tool_execution_result.success_flag,
+            response_string=tool_call_results[-1].function_response,
             timezone=agent_state.timezone,
         )
 
         # 4.  Decide whether to keep stepping  (<<< focal section simplified)
         continue_stepping, heartbeat_reason, stop_reason = self._decide_continuation(
-            request_heartbeat=request_heartbeat,
-            tool_call_name=tool_call_name,
-            tool_rule_violated=tool_rule_violated,
+            request_heartbeat=any(c.request_heartbeat for c in parsed_tool_calls),
+            tool_call_names=[c.name for c in parsed_tool_calls if not c.rule_violated],
+            tool_rule_violated=any(c.rule_violated for c in parsed_tool_calls),
             tool_rules_solver=tool_rules_solver,
             is_final_step=is_final_step,
         )
 
-        # 5.  Persist step + messages and propagate to jobs
-        logged_step = await self.step_manager.log_step_async(
-            actor=self.actor,
+        # 5.  Persist step + messages, propagate to jobs and log the LLM trace, all in one transaction
+        step_commit = StepCommit(self.actor, self.step_manager, self.message_manager, self.telemetry_manager)
+        logged_step_id = step_commit.log_step(
             agent_id=agent_state.id,
             provider_name=agent_state.llm_config.model_endpoint_type,
             provider_category=agent_state.llm_config.provider_category or "base",
@@ -1015,45 +1151,58 @@ class LettaAgent(BaseAgent):
             step_id=step_id,
         )
 
-        tool_call_messages = create_letta_messages_from_llm_response(
-            agent_id=agent_state.id,
-            model=agent_state.llm_config.model,
-            function_name=tool_call_name,
-            function_arguments=tool_args,
-            tool_execution_result=tool_execution_result,
-            tool_call_id=tool_call_id,
-            function_call_success=tool_execution_result.success_flag,
-            function_response=function_response_string,
-            timezone=agent_state.timezone,
-            actor=self.actor,
-            continue_stepping=continue_stepping,
-            heartbeat_reason=heartbeat_reason,
-            reasoning_content=reasoning_content,
-            pre_computed_assistant_message_id=pre_computed_assistant_message_id,
-            step_id=logged_step.id if logged_step else None,
-        )
-
-        persisted_messages = await self.message_manager.create_many_messages_async(
-            (initial_messages or []) + tool_call_messages, actor=self.actor
-        )
-
-        if run_id:
-            await self.job_manager.add_messages_to_job_async(
-                job_id=run_id,
-                message_ids=[m.id for m in persisted_messages if m.role != "user"],
+        if len(tool_call_results) == 1:
+            tool_call_result = tool_call_results[0]
+            tool_call_messages = create_letta_messages_from_llm_response(
+                agent_id=agent_state.id,
+                model=agent_state.llm_config.model,
+                function_name=tool_call_result.function_name,
+                function_arguments=tool_call_result.function_arguments,
+                tool_execution_result=tool_call_result.tool_execution_result,
+                tool_call_id=tool_call_result.tool_call_id,
+                function_call_success=tool_call_result.tool_execution_result.success_flag,
+                function_response=tool_call_result.function_response,
+                timezone=agent_state.timezone,
                 actor=self.actor,
+                continue_stepping=continue_stepping,
+                heartbeat_reason=heartbeat_reason,
+                reasoning_content=reasoning_content,
+                pre_computed_assistant_message_id=pre_computed_assistant_message_id,
+                step_id=logged_step_id,
+            )
+        else:
+            tool_call_messages = create_letta_messages_from_parallel_llm_response(
+                agent_id=agent_state.id,
+                model=agent_state.llm_config.model,
+                tool_call_results=tool_call_results,
+                timezone=agent_state.timezone,
+                actor=self.actor,
+                continue_stepping=continue_stepping,
+                heartbeat_reason=heartbeat_reason,
+                reasoning_content=reasoning_content,
+                step_id=logged_step_id,
             )
 
+        new_messages = (initial_messages or []) + tool_call_messages
+        family = try_tokenizer_family(agent_state.llm_config)
+        if family is not None:
+            await ensure_token_counts_async(new_messages, family)
+        step_commit.add_messages(new_messages, job_id=run_id)
+        if provider_trace_create:
+            step_commit.add_provider_trace(provider_trace_create)
+        persisted_messages = await step_commit.commit_async()
+
         return persisted_messages, continue_stepping, stop_reason
 
     def _decide_continuation(
         self,
         request_heartbeat: bool,
-        tool_call_name: str,
+        tool_call_names: List[str],
         tool_rule_violated: bool,
         tool_rules_solver: ToolRulesSolver,
         is_final_step: bool | None,
     ) -> tuple[bool, str | None, LettaStopReason | None]:
+        """`tool_call_names` are the turn's calls that passed validation (and were registered with the solver), in call order."""
 
         continue_stepping = request_heartbeat
         heartbeat_reason: str | None = None
@@ -1063,18 +1212,16 @@ class LettaAgent(BaseAgent):
             continue_stepping = True
             heartbeat_reason = f"{NON_USER_MSG_PREFIX}Continuing: tool rule violation."
         else:
-            tool_rules_solver.register_tool_call(tool_call_name)
-
-            if tool_rules_solver.is_terminal_tool(tool_call_name):
+            if any(tool_rules_solver.is_terminal_tool(name) for name in tool_call_names):
                 if continue_stepping:
                     stop_reason = LettaStopReason(stop_reason=StopReasonType.tool_rule.value)
                 continue_stepping = False
 
-            elif tool_rules_solver.has_children_tools(tool_call_name):
+            elif any(tool_rules_solver.has_children_tools(name) for name in tool_call_names):
                 continue_stepping = True
                 heartbeat_reason = f"{NON_USER_MSG_PREFIX}Continuing: child tool rule."
 
-            elif tool_rules_solver.is_continue_tool(tool_call_name):
+            elif any(tool_rules_solver.is_continue_tool(name) for name in tool_call_names):
                 continue_stepping = True
                 heartbeat_reason = f"{NON_USER_MSG_PREFIX}Continuing: continue tool rule."
 
@@ -1092,6 +1239,70 @@ class LettaAgent(BaseAgent):
 
         return continue_stepping, heartbeat_reason, stop_reason
 
+    async def _execute_tool_calls(
+        self,
+        tool_calls: List["_ParsedToolCall"],
+        agent_state: AgentState,
+        tool_rules_solver: ToolRulesSolver,
+        agent_step_span: Optional["Span"] = None,
+        step_id: str | None = None,
+    ) -> List[ToolExecutionResult]:
+        """
+        Executes a turn's tool calls and returns their results in call order. Calls that broke the tool rules get a rule
+        violation result instead.
+
+        Several calls run concurrently, at most `parallel_tool_calls_max_concurrency` at once, except for calls to tools
+        that edit the agent's memory, which run one at a time in call order.
+        """
+
+        async def execute(tool_call: _ParsedToolCall) -> ToolExecutionResult:
+            if tool_call.rule_violated:
+                return _build_rule_violation_result(tool_call.name, tool_call.valid_tool_names, tool_rules_solver)
+            return await self._execute_tool(
+                tool_name=tool_call.name,
+                tool_args=tool_call.args,
+                agent_state=agent_state,
+                agent_step_span=agent_step_span,
+                step_id=step_id,
+            )
+
+        if len(tool_calls) == 1:
+            return [await execute(tool_calls[0])]
+
+        memory_lock = asyncio.Lock()
+
+        async def execute_concurrently(tool_call: _ParsedToolCall) -> ToolExecutionResult:
+            if not tool_call.rule_violated and self._edits_memory(tool_call.name, agent_state):
+                async with memory_lock:
+                    return await execute(tool_call)
+            return await execute(tool_call)
+
+        results = await gather_fan_out(tool_calls, execute_concurrently, concurrency=settings.parallel_tool_calls_max_concurrency)
+        return [
+            (
+                result.value
+                if result.ok
+                else ToolExecutionResult(status="error", func_return=f"Error executing tool {result.item.name}: {result.error}")
+            )
+            for result in results
+        ]
+
+    @staticmethod
+    def _edits_memory(tool_name: str, agent_state: AgentState) -> bool:
+        """Whether the tool may change the agent's memory, so that it can't run concurrently with a tool that does too."""
+        target_tool = next((x for x in agent_state.tools if x.name == tool_name), None)
+        if not target_tool:
+            return False
+        if target_tool.tool_type in MEMORY_EDITING_TOOL_TYPES:
+            return True
+        # Custom tools taking the agent state can edit the agent's memory through it
+        if target_tool.tool_type == ToolType.CUSTOM and target_tool.source_code:
+            try:
+                return "agent_state" in parse_function_arguments(target_tool.source_code, target_tool.name)
+            except SyntaxError:
+                return True
+        return False
+
     @trace_method
     async def _execute_tool(
         self,
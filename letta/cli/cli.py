@@ -43,6 +43,23 @@ def server(
         raise NotImplementedError("WS suppport deprecated")
 
 
+def worker(
+    concurrency: Annotated[
+        Optional[int], typer.Option(help="Number of runs to execute at once (default: LETTA_RUN_WORKER_CONCURRENCY)")
+    ] = None,
+):
+    """Launch a worker process that executes queued async agent runs"""
+    import asyncio
+
+    from letta.jobs.run_worker import start_worker
+
+    try:
+        asyncio.run(start_worker(concurrency=concurrency))
+    except ValueError as e:
+        typer.secho(str(e), fg=typer.colors.RED)
+        sys.exit(1)
+
+
 def version() -> str:
     import letta
 
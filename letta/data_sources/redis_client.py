@@ -1,6 +1,6 @@
 import asyncio
 from functools import wraps
-from typing import Any, Optional, Set, Union
+from typing import Any, List, Optional, Set, Union
 
 from letta.constants import REDIS_EXCLUDE, REDIS_INCLUDE, REDIS_SET_DEFAULT_VAL
 from letta.log import get_logger
@@ -164,6 +164,15 @@ class AsyncRedisClient:
         client = await self.get_client()
         return await client.set(key, value, ex=ex, px=px, nx=nx, xx=xx)
 
+    @with_retry()
+    async def mget(self, *keys: str) -> Optional[List[Any]]:
+        """Get the values of several keys in one round trip (None if Redis is unavailable)."""
+        try:
+            client = await self.get_client()
+            return await client.mget(keys)
+        except:
+            return None
+
     @with_retry()
     async def delete(self, *keys: str) -> int:
         """Delete one or more keys."""
@@ -262,6 +271,9 @@ class NoopAsyncRedisClient(AsyncRedisClient):
     async def get(self, key: str, default: Any = None) -> Any:
         return default
 
+    async def mget(self, *keys: str) -> Optional[List[Any]]:
+        return [None] * len(keys)
+
     async def exists(self, *keys: str) -> int:
         return 0
 
@@ -10,6 +10,7 @@ from pydantic import BaseModel, Field, create_model
 
 from letta.constants import DEFAULT_MESSAGE_TOOL, DEFAULT_MESSAGE_TOOL_KWARG
 from letta.functions.interface import MultiAgentMessagingInterface
+from letta.helpers.fan_out import gather_fan_out
 from letta.orm.errors import NoResultFound
 from letta.schemas.enums import MessageRole
 from letta.schemas.letta_message import AssistantMessage
@@ -448,16 +449,8 @@ async def _send_message_to_agents_matching_tags_async(
             timeout=settings.multi_agent_send_message_timeout,
         )
 
-    tasks = [asyncio.create_task(_send_single(agent_state)) for agent_state in matching_agents]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    final = []
-    for r in results:
-        if isinstance(r, Exception):
-            final.append(str(r))
-        else:
-            final.append(r)
-
-    return final
+    results = await gather_fan_out(matching_agents, _send_single, concurrency=settings.multi_agent_concurrent_sends)
+    return [r.value if r.ok else str(r.error) for r in results]
 
 
 async def _send_message_to_all_agents_in_group_async(sender_agent: "Agent", message: str) -> List[str]:
@@ -1,4 +1,3 @@
-import asyncio
 from datetime import datetime, timezone
 from typing import AsyncGenerator, List, Optional
 
@@ -7,7 +6,8 @@ from letta.agents.letta_agent import LettaAgent
 from letta.constants import DEFAULT_MAX_STEPS
 from letta.groups.helpers import stringify_message
 from letta.otel.tracing import trace_method
-from letta.schemas.enums import JobStatus
+from letta.schemas.agent import AgentState
+from letta.schemas.enums import JobStatus, MessageStreamStatus
 from letta.schemas.group import Group, ManagerType
 from letta.schemas.job import JobUpdate
 from letta.schemas.letta_message import MessageType
@@ -15,6 +15,7 @@ from letta.schemas.letta_message_content import TextContent
 from letta.schemas.letta_response import LettaResponse
 from letta.schemas.message import Message, MessageCreate
 from letta.schemas.run import Run
+from letta.schemas.usage import LettaUsageStatistics
 from letta.schemas.user import User
 from letta.services.agent_manager import AgentManager
 from letta.services.block_manager import BlockManager
@@ -22,6 +23,7 @@ from letta.services.group_manager import GroupManager
 from letta.services.job_manager import JobManager
 from letta.services.message_manager import MessageManager
 from letta.services.passage_manager import PassageManager
+from letta.services.sleeptime_scheduler import SleeptimeScheduler, SleeptimeTrigger
 from letta.services.step_manager import NoopStepManager, StepManager
 from letta.services.telemetry_manager import NoopTelemetryManager, TelemetryManager
 
@@ -40,6 +42,7 @@ class SleeptimeMultiAgentV2(BaseAgent):
         step_manager: StepManager = NoopStepManager(),
         telemetry_manager: TelemetryManager = NoopTelemetryManager(),
         group: Optional[Group] = None,
+        agent_state: Optional[AgentState] = None,
     ):
         super().__init__(
             agent_id=agent_id,
@@ -57,6 +60,12 @@ class SleeptimeMultiAgentV2(BaseAgent):
         # Group settings
         assert group.manager_type == ManagerType.sleeptime, f"Expected group manager type to be 'sleeptime', got {group.manager_type}"
         self.group = group
+        # Foreground agent state already loaded by the caller for this request (consumed by the first step)
+        self._prefetched_agent_state = agent_state
+
+    def _take_prefetched_agent_state(self) -> Optional[AgentState]:
+        agent_state, self._prefetched_agent_state = self._prefetched_agent_state, None
+        return agent_state
 
     @trace_method
     async def step(
@@ -68,67 +77,18 @@ class SleeptimeMultiAgentV2(BaseAgent):
         request_start_timestamp_ns: Optional[int] = None,
         include_return_message_types: Optional[List[MessageType]] = None,
     ) -> LettaResponse:
-        run_ids = []
-
-        # Prepare new messages
-        new_messages = []
-        for message in input_messages:
-            if isinstance(message.content, str):
-                message.content = [TextContent(text=message.content)]
-            message.group_id = self.group.id
-            new_messages.append(message)
-
-        # Load foreground agent
-        foreground_agent = LettaAgent(
-            agent_id=self.agent_id,
-            message_manager=self.message_manager,
-            agent_manager=self.agent_manager,
-            block_manager=self.block_manager,
-            job_manager=self.job_manager,
-            passage_manager=self.passage_manager,
-            actor=self.actor,
-            step_manager=self.step_manager,
-            telemetry_manager=self.telemetry_manager,
-        )
         # Perform foreground agent step
+        foreground_agent = self._load_foreground_agent()
         response = await foreground_agent.step(
-            input_messages=new_messages,
+            input_messages=self._prepare_input_messages(input_messages),
             max_steps=max_steps,
             run_id=run_id,
             use_assistant_message=use_assistant_message,
             include_return_message_types=include_return_message_types,
         )
 
-        # Get last response messages
-        last_response_messages = foreground_agent.response_messages
-
-        # Update turns counter
-        if self.group.sleeptime_agent_frequency is not None and self.group.sleeptime_agent_frequency > 0:
-            turns_counter = await self.group_manager.bump_turns_counter_async(group_id=self.group.id, actor=self.actor)
-
         # Perform participant steps
-        if self.group.sleeptime_agent_frequency is None or (
-            turns_counter is not None and turns_counter % self.group.sleeptime_agent_frequency == 0
-        ):
-            last_processed_message_id = await self.group_manager.get_last_processed_message_id_and_update_async(
-                group_id=self.group.id, last_processed_message_id=last_response_messages[-1].id, actor=self.actor
-            )
-            for participant_agent_id in self.group.agent_ids:
-                try:
-                    run_id = await self._issue_background_task(
-                        participant_agent_id,
-                        last_response_messages,
-                        last_processed_message_id,
-                        use_assistant_message,
-                    )
-                    run_ids.append(run_id)
-
-                except Exception as e:
-                    # Individual task failures
-                    print(f"Agent processing failed: {str(e)}")
-                    raise e
-
-        response.usage.run_ids = run_ids
+        response.usage.run_ids = await self._dispatch_sleeptime_agents(foreground_agent.response_messages, use_assistant_message)
         return response
 
     @trace_method
@@ -139,16 +99,18 @@ class SleeptimeMultiAgentV2(BaseAgent):
         use_assistant_message: bool = True,
         request_start_timestamp_ns: Optional[int] = None,
         include_return_message_types: Optional[List[MessageType]] = None,
-    ):
-        response = await self.step(
-            input_messages, max_steps, use_assistant_message, request_start_timestamp_ns, include_return_message_types
+    ) -> AsyncGenerator[str, None]:
+        # Perform foreground agent step, streaming the messages of each step as it completes
+        foreground_agent = self._load_foreground_agent()
+        foreground_stream = foreground_agent.step_stream_no_tokens(
+            input_messages=self._prepare_input_messages(input_messages),
+            max_steps=max_steps,
+            use_assistant_message=use_assistant_message,
+            request_start_timestamp_ns=request_start_timestamp_ns,
+            include_return_message_types=include_return_message_types,
         )
-
-        for message in response.messages:
-            yield f"data: {message.model_dump_json()}\n\n"
-
-        for finish_chunk in self.get_finish_chunks_for_stream(response.usage):
-            yield f"data: {finish_chunk}\n\n"
+        async for chunk in self._stream_with_sleeptime_run_ids(foreground_stream, foreground_agent, use_assistant_message):
+            yield chunk
 
     @trace_method
     async def step_stream(
@@ -159,16 +121,52 @@ class SleeptimeMultiAgentV2(BaseAgent):
         request_start_timestamp_ns: Optional[int] = None,
         include_return_message_types: Optional[List[MessageType]] = None,
     ) -> AsyncGenerator[str, None]:
-        # Prepare new messages
+        # Perform foreground agent step
+        foreground_agent = self._load_foreground_agent()
+        foreground_stream = foreground_agent.step_stream(
+            input_messages=self._prepare_input_messages(input_messages),
+            max_steps=max_steps,
+            use_assistant_message=use_assistant_message,
+            request_start_timestamp_ns=request_start_timestamp_ns,
+            include_return_message_types=include_return_message_types,
+        )
+        async for chunk in self._stream_with_sleeptime_run_ids(foreground_stream, foreground_agent, use_assistant_message):
+            yield chunk
+
+    async def _stream_with_sleeptime_run_ids(
+        self, foreground_stream: AsyncGenerator[str, None], foreground_agent: LettaAgent, use_assistant_message: bool
+    ) -> AsyncGenerator[str, None]:
+        """Relay the foreground stream, holding back its usage and [DONE] chunks until the sleeptime agents are dispatched."""
+        usage = None
+        done = False
+        async for chunk in foreground_stream:
+            if chunk == f"data: {MessageStreamStatus.done.value}\n\n":
+                done = True
+                continue
+            if usage is None and chunk.startswith('data: {"message_type":"usage_statistics"'):
+                usage = LettaUsageStatistics.model_validate_json(chunk[len("data: ") :])
+                continue
+            yield chunk
+
+        # Perform participant steps once the foreground stream is complete, and report their runs in the usage
+        run_ids = await self._dispatch_sleeptime_agents(foreground_agent.response_messages, use_assistant_message)
+        if usage is not None:
+            usage.run_ids = run_ids
+            yield f"data: {usage.model_dump_json()}\n\n"
+        if done:
+            yield f"data: {MessageStreamStatus.done.value}\n\n"
+
+    def _prepare_input_messages(self, input_messages: List[MessageCreate]) -> List[MessageCreate]:
         new_messages = []
         for message in input_messages:
             if isinstance(message.content, str):
                 message.content = [TextContent(text=message.content)]
             message.group_id = self.group.id
             new_messages.append(message)
+        return new_messages
 
-        # Load foreground agent
-        foreground_agent = LettaAgent(
+    def _load_foreground_agent(self) -> LettaAgent:
+        return LettaAgent(
             agent_id=self.agent_id,
             message_manager=self.message_manager,
             agent_manager=self.agent_manager,
@@ -178,25 +176,20 @@ class SleeptimeMultiAgentV2(BaseAgent):
             actor=self.actor,
             step_manager=self.step_manager,
             telemetry_manager=self.telemetry_manager,
+            agent_state=self._take_prefetched_agent_state(),
         )
-        # Perform foreground agent step
-        async for chunk in foreground_agent.step_stream(
-            input_messages=new_messages,
-            max_steps=max_steps,
-            use_assistant_message=use_assistant_message,
-            request_start_timestamp_ns=request_start_timestamp_ns,
-            include_return_message_types=include_return_message_types,
-        ):
-            yield chunk
 
-        # Get response messages
-        last_response_messages = foreground_agent.response_messages
+    async def _dispatch_sleeptime_agents(self, last_response_messages: List[Message], use_assistant_message: bool = True) -> List[str]:
+        """Count the foreground turn and, on every `sleeptime_agent_frequency`-th turn, start the sleeptime agents in the background."""
+        run_ids = []
+        if not last_response_messages:
+            return run_ids
 
         # Update turns counter
+        turns_counter = None
         if self.group.sleeptime_agent_frequency is not None and self.group.sleeptime_agent_frequency > 0:
             turns_counter = await self.group_manager.bump_turns_counter_async(group_id=self.group.id, actor=self.actor)
 
-        # Perform participant steps
         if self.group.sleeptime_agent_frequency is None or (
             turns_counter is not None and turns_counter % self.group.sleeptime_agent_frequency == 0
         ):
@@ -210,6 +203,8 @@ class SleeptimeMultiAgentV2(BaseAgent):
                     last_processed_message_id,
                     use_assistant_message,
                 )
+                run_ids.append(run_id)
+        return run_ids
 
     async def _issue_background_task(
         self,
@@ -218,27 +213,36 @@ class SleeptimeMultiAgentV2(BaseAgent):
         last_processed_message_id: str,
         use_assistant_message: bool = True,
     ) -> str:
-        run = Run(
-            user_id=self.actor.id,
-            status=JobStatus.created,
-            metadata={
-                "job_type": "sleeptime_agent_send_message_async",  # is this right?
-                "agent_id": sleeptime_agent_id,
-            },
-        )
-        run = await self.job_manager.create_job_async(pydantic_job=run, actor=self.actor)
+        async def create_run() -> str:
+            run = Run(
+                user_id=self.actor.id,
+                status=JobStatus.created,
+                metadata={
+                    "job_type": "sleeptime_agent_send_message_async",  # is this right?
+                    "agent_id": sleeptime_agent_id,
+                },
+            )
+            run = await self.job_manager.create_job_async(pydantic_job=run, actor=self.actor)
+            return run.id
 
-        asyncio.create_task(
-            self._participant_agent_step(
+        async def execute(run_id: str, trigger: SleeptimeTrigger) -> None:
+            await self._participant_agent_step(
                 foreground_agent_id=self.agent_id,
                 sleeptime_agent_id=sleeptime_agent_id,
-                response_messages=response_messages,
-                last_processed_message_id=last_processed_message_id,
-                run_id=run.id,
+                response_messages=trigger.response_messages,
+                last_processed_message_id=trigger.last_processed_message_id,
+                run_id=run_id,
                 use_assistant_message=True,
+                num_turns=trigger.num_turns,
             )
+
+        # Turns arriving while the sleeptime agent is busy are coalesced into one pending run
+        return await SleeptimeScheduler().submit(
+            sleeptime_agent_id,
+            SleeptimeTrigger(last_processed_message_id=last_processed_message_id, response_messages=response_messages),
+            create_run=create_run,
+            execute=execute,
         )
-        return run.id
 
     async def _participant_agent_step(
         self,
@@ -248,6 +252,7 @@ class SleeptimeMultiAgentV2(BaseAgent):
         last_processed_message_id: str,
         run_id: str,
         use_assistant_message: bool = True,
+        num_turns: int = 1,
     ) -> str:
         try:
             # Update job status
@@ -256,7 +261,8 @@ class SleeptimeMultiAgentV2(BaseAgent):
 
             # Create conversation transcript
             prior_messages = []
-            if self.group.sleeptime_agent_frequency:
+            # Runs coalesced from several turns also cover the turns before the latest one
+            if self.group.sleeptime_agent_frequency or num_turns > 1:
                 try:
                     prior_messages = await self.message_manager.list_messages_for_agent_async(
                         agent_id=foreground_agent_id,
@@ -1,4 +1,3 @@
-import base64
 from typing import Any, Dict, List, Optional, Union
 
 import numpy as np
@@ -8,6 +7,7 @@ from openai.types.chat.chat_completion_message_tool_call import Function as Open
 from sqlalchemy import Dialect
 
 from letta.functions.mcp_client.types import StdioServerConfig
+from letta.orm.sqlite_functions import decode_vector, encode_vector
 from letta.schemas.embedding_config import EmbeddingConfig
 from letta.schemas.enums import ProviderType, ToolRuleType
 from letta.schemas.letta_message_content import (
@@ -272,22 +272,22 @@ def deserialize_message_content(data: Optional[List[Dict]]) -> List[MessageConte
 
 
 def serialize_vector(vector: Optional[Union[List[float], np.ndarray]]) -> Optional[bytes]:
-    """Convert a NumPy array or list into a base64-encoded byte string."""
+    """Convert a NumPy array or list into the compact binary vector format (see `encode_vector`)."""
     if vector is None:
         return None
-    if isinstance(vector, list):
-        vector = np.array(vector, dtype=np.float32)
 
-    return base64.b64encode(vector.tobytes())
+    from letta.settings import settings
+
+    return encode_vector(vector, storage_dtype=settings.sqlite_embedding_storage_dtype)
 
 
 def deserialize_vector(data: Optional[bytes], dialect: Dialect) -> Optional[np.ndarray]:
-    """Convert a base64-encoded byte string back into a NumPy array."""
+    """Convert a stored vector (compact or legacy base64-encoded) back into a NumPy array."""
     if not data:
         return None
 
     if dialect.name == "sqlite":
-        data = base64.b64decode(data)
+        return decode_vector(data)
 
     return np.frombuffer(data, dtype=np.float32)
 
@@ -0,0 +1,96 @@
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Generic, Hashable, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+ItemT = TypeVar("ItemT")
+
+
+@dataclass
+class FanOutResult(Generic[ItemT, T]):
+    """Outcome of one fanned-out call; `index` is the position of `item` in the input."""
+
+    index: int
+    item: ItemT
+    value: Optional[T] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class SharedConcurrencyLimit:
+    """
+    Named concurrency budgets shared by every fan-out in the process, e.g. one per LLM provider so that concurrent
+    broadcasts together stay within the provider's rate limits. Budgets are kept per event loop, since asyncio
+    semaphores are bound to the loop they are first used on.
+    """
+
+    def __init__(self, get_limit: Callable[[], int]):
+        self._get_limit = get_limit
+        self._budgets: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Semaphore]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable) -> AsyncIterator[None]:
+        budgets = self._budgets.setdefault(asyncio.get_running_loop(), {})
+        if key not in budgets:
+            budgets[key] = asyncio.Semaphore(self._get_limit())
+        async with budgets[key]:
+            yield
+
+
+async def fan_out(
+    items: Sequence[ItemT],
+    fn: Callable[[ItemT], Awaitable[T]],
+    concurrency: int,
+    timeout: Optional[float] = None,
+    shared_limit: Optional[SharedConcurrencyLimit] = None,
+    shared_key: Optional[Callable[[ItemT], Hashable]] = None,
+    stop_after: Optional[int] = None,
+) -> AsyncIterator[FanOutResult[ItemT, T]]:
+    """
+    Run `fn` over `items` with at most `concurrency` calls in flight, yielding results in completion order.
+
+    Each call is bounded by `timeout` seconds and, with `shared_limit`, also holds the budget named by
+    `shared_key(item)` while it runs. Errors and timeouts are yielded as results rather than raised. Once `stop_after`
+    calls have succeeded, the remaining ones are cancelled and iteration ends; the same happens when the consumer closes
+    the iterator early (e.g. through `contextlib.aclosing`).
+    """
+    local_limit = asyncio.Semaphore(concurrency)
+
+    async def run(index: int, item: ItemT) -> FanOutResult[ItemT, T]:
+        async with local_limit:
+            try:
+                if shared_limit is not None:
+                    async with shared_limit.hold(shared_key(item) if shared_key else None):
+                        value = await asyncio.wait_for(fn(item), timeout=timeout)
+                else:
+                    value = await asyncio.wait_for(fn(item), timeout=timeout)
+            except Exception as e:
+                return FanOutResult(index=index, item=item, error=e)
+            return FanOutResult(index=index, item=item, value=value)
+
+    tasks = [asyncio.create_task(run(index, item)) for index, item in enumerate(items)]
+    succeeded = 0
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            result = await next_result
+            yield result
+            succeeded += result.ok
+            if stop_after is not None and succeeded >= stop_after:
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def gather_fan_out(items: Sequence[ItemT], fn: Callable[[ItemT], Awaitable[T]], **kwargs: Any) -> list:
+    """Collect `fan_out` results, restored to input order."""
+    results = [result async for result in fan_out(items, fn, **kwargs)]
+    return sorted(results, key=lambda result: result.index)
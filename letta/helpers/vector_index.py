@@ -0,0 +1,260 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows so cosine similarity reduces to a dot product."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class VectorIndex(ABC):
+    """
+    In-process cosine-distance index over a set of string-keyed vectors.
+
+    Implementations are thread-safe: every public method takes the instance lock, so callers
+    can run searches and updates from worker threads (e.g. via `asyncio.to_thread`).
+    """
+
+    kind: str = ""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        # Opaque tag for the data the index was last synced with, persisted along with it
+        self.version: Optional[str] = None
+        self._lock = threading.RLock()
+        self._ids: List[str] = []
+        self._id_to_row: Dict[str, int] = {}
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, item: str) -> bool:
+        return item in self._id_to_row
+
+    @property
+    def ids(self) -> List[str]:
+        return list(self._ids)
+
+    def add(self, ids: Sequence[str], vectors: Union[np.ndarray, Sequence[Sequence[float]]]) -> None:
+        """Insert or replace the vectors for `ids`. Vectors longer than `dim` (zero-padded) are truncated."""
+        if not ids:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[0] != len(ids):
+            raise ValueError(f"Expected {len(ids)} vectors, got array of shape {vectors.shape}")
+        if vectors.shape[1] < self.dim:
+            raise ValueError(f"Vector dimension {vectors.shape[1]} is smaller than index dimension {self.dim}")
+        vectors = _normalize(vectors[:, : self.dim])
+
+        with self._lock:
+            existing = [i for i in ids if i in self._id_to_row]
+            if existing:
+                self._remove_rows(existing)
+            self._append_rows(list(ids), vectors)
+
+    def remove(self, ids: Sequence[str]) -> None:
+        """Remove `ids` from the index. Unknown ids are ignored."""
+        with self._lock:
+            self._remove_rows([i for i in ids if i in self._id_to_row])
+
+    def search(self, query: Union[np.ndarray, Sequence[float]], k: int) -> List[Tuple[str, float]]:
+        """Return up to `k` `(id, cosine_distance)` pairs, closest first."""
+        query = np.asarray(query, dtype=np.float32)[: self.dim]
+        query = _normalize(query)
+        with self._lock:
+            if not self._ids or k <= 0:
+                return []
+            rows, similarities = self._search_rows(query, k)
+            return [(self._ids[row], float(1.0 - sim)) for row, sim in zip(rows, similarities)]
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Atomically persist the index to `path` (an `.npz` file)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with self._lock:
+            arrays = self._state()
+            ids = np.array(self._ids, dtype=str)
+        with open(tmp_path, "wb") as f:
+            if self.version is not None:
+                arrays["version"] = np.array(self.version)
+            np.savez(f, kind=np.array(self.kind), dim=np.array(self.dim), ids=ids, **arrays)
+        os.replace(tmp_path, path)
+
+    # ------------------------------------------------------------------
+    # storage helpers shared by implementations
+    # ------------------------------------------------------------------
+    def _append_rows(self, ids: List[str], vectors: np.ndarray) -> None:
+        start = len(self._ids)
+        self._ids.extend(ids)
+        for offset, _id in enumerate(ids):
+            self._id_to_row[_id] = start + offset
+        self._vectors = np.concatenate([self._vectors, vectors]) if start else vectors
+        self._on_rows_appended(start, vectors)
+
+    def _remove_rows(self, ids: List[str]) -> None:
+        if not ids:
+            return
+        drop = np.array(sorted(self._id_to_row.pop(i) for i in ids))
+        keep = np.ones(len(self._ids), dtype=bool)
+        keep[drop] = False
+        self._ids = [_id for _id, k in zip(self._ids, keep) if k]
+        self._id_to_row = {_id: row for row, _id in enumerate(self._ids)}
+        self._vectors = self._vectors[keep]
+        self._on_rows_removed(keep)
+
+    def _on_rows_appended(self, start: int, vectors: np.ndarray) -> None:
+        pass
+
+    def _on_rows_removed(self, keep: np.ndarray) -> None:
+        pass
+
+    def _state(self) -> Dict[str, np.ndarray]:
+        return {"vectors": self._vectors}
+
+    def _restore(self, ids: List[str], arrays: Dict[str, np.ndarray]) -> None:
+        self._ids = ids
+        self._id_to_row = {_id: row for row, _id in enumerate(ids)}
+        self._vectors = arrays["vectors"].astype(np.float32, copy=False)
+
+    @staticmethod
+    def _top_k(similarities: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the `k` largest similarities, sorted descending."""
+        if k >= similarities.shape[0]:
+            return np.argsort(-similarities, kind="stable")
+        top = np.argpartition(-similarities, k - 1)[:k]
+        return top[np.argsort(-similarities[top], kind="stable")]
+
+    @abstractmethod
+    def _search_rows(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return `(rows, similarities)` for the best `k` matches of the normalized query."""
+
+
+class FlatVectorIndex(VectorIndex):
+    """Exact search: a single matrix-vector product over every stored vector."""
+
+    kind = "flat"
+
+    def _search_rows(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        similarities = self._vectors @ query
+        rows = self._top_k(similarities, k)
+        return rows, similarities[rows]
+
+
+class IVFVectorIndex(VectorIndex):
+    """
+    Inverted-file index: vectors are bucketed by their nearest k-means centroid, and a search
+    only scores the vectors in the `nprobe` buckets closest to the query.
+
+    Below `min_train_size` vectors the index behaves like a flat index. Centroids are retrained
+    whenever the index has doubled in size since the last training run, so incremental inserts
+    keep the buckets balanced without retraining on every write.
+    """
+
+    kind = "ivf"
+
+    def __init__(self, dim: int, nprobe: int = 8, min_train_size: int = 2048, max_lists: int = 256, seed: int = 0):
+        super().__init__(dim)
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self.max_lists = max_lists
+        self._rng = np.random.default_rng(seed)
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._trained_size = 0
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    def train(self, iterations: int = 10) -> None:
+        """(Re)compute centroids with spherical k-means over a sample of the stored vectors."""
+        with self._lock:
+            n = len(self._ids)
+            if n == 0:
+                return
+            nlist = int(min(self.max_lists, max(1, np.sqrt(n))))
+            sample_size = min(n, nlist * 32)
+            sample = self._vectors[self._rng.choice(n, size=sample_size, replace=False)]
+            centroids = sample[self._rng.choice(sample_size, size=nlist, replace=False)].copy()
+            for _ in range(iterations):
+                labels = np.argmax(sample @ centroids.T, axis=1)
+                for c in range(nlist):
+                    members = sample[labels == c]
+                    if len(members):
+                        centroids[c] = members.sum(axis=0)
+                centroids = _normalize(centroids)
+            self._centroids = centroids
+            self._assignments = self._assign(self._vectors)
+            self._trained_size = n
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        if self._centroids is None or len(vectors) == 0:
+            return np.zeros(len(vectors), dtype=np.int32)
+        return np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+
+    def _on_rows_appended(self, start: int, vectors: np.ndarray) -> None:
+        self._assignments = np.concatenate([self._assignments[:start], self._assign(vectors)])
+        n = len(self._ids)
+        if n >= self.min_train_size and (not self.is_trained or n >= 2 * self._trained_size):
+            self.train()
+
+    def _on_rows_removed(self, keep: np.ndarray) -> None:
+        self._assignments = self._assignments[keep]
+
+    def _search_rows(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if not self.is_trained:
+            similarities = self._vectors @ query
+            rows = self._top_k(similarities, k)
+            return rows, similarities[rows]
+
+        probe = self._top_k(self._centroids @ query, self.nprobe)
+        candidates = np.flatnonzero(np.isin(self._assignments, probe))
+        similarities = self._vectors[candidates] @ query
+        order = self._top_k(similarities, k)
+        return candidates[order], similarities[order]
+
+    def _state(self) -> Dict[str, np.ndarray]:
+        state = super()._state()
+        state["assignments"] = self._assignments
+        state["trained_size"] = np.array(self._trained_size)
+        if self._centroids is not None:
+            state["centroids"] = self._centroids
+        return state
+
+    def _restore(self, ids: List[str], arrays: Dict[str, np.ndarray]) -> None:
+        super()._restore(ids, arrays)
+        self._assignments = arrays["assignments"].astype(np.int32, copy=False)
+        self._trained_size = int(arrays["trained_size"])
+        self._centroids = arrays["centroids"] if "centroids" in arrays else None
+
+
+VECTOR_INDEX_TYPES = {cls.kind: cls for cls in (FlatVectorIndex, IVFVectorIndex)}
+
+
+def create_vector_index(kind: str, dim: int, **kwargs) -> VectorIndex:
+    """Instantiate an empty index of the registered `kind` (`flat` or `ivf`)."""
+    if kind not in VECTOR_INDEX_TYPES:
+        raise ValueError(f"Unknown vector index type '{kind}', expected one of {list(VECTOR_INDEX_TYPES)}")
+    if kind == FlatVectorIndex.kind:
+        return FlatVectorIndex(dim)
+    return VECTOR_INDEX_TYPES[kind](dim, **kwargs)
+
+
+def load_vector_index(path: Union[str, Path], **kwargs) -> VectorIndex:
+    """Load an index previously written with `VectorIndex.save`."""
+    with np.load(path) as data:
+        arrays = {key: data[key] for key in data.files}
+    index = create_vector_index(str(arrays.pop("kind")), int(arrays.pop("dim")), **kwargs)
+    if "version" in arrays:
+        index.version = str(arrays.pop("version"))
+    index._restore([str(i) for i in arrays.pop("ids")], arrays)
+    return index
@@ -15,7 +15,7 @@ from letta.schemas.letta_message_content import OmittedReasoningContent, TextCon
 from letta.schemas.letta_stop_reason import LettaStopReason, StopReasonType
 from letta.schemas.message import Message
 from letta.schemas.openai.chat_completion_response import FunctionCall, ToolCall
-from letta.server.rest_api.json_parser import OptimisticJSONParser
+from letta.server.rest_api.json_parser import IncrementalJSONParser
 from letta.streaming_utils import JSONInnerThoughtsExtractor
 
 logger = get_logger(__name__)
@@ -33,7 +33,7 @@ class OpenAIStreamingInterface:
         self.assistant_message_tool_name = DEFAULT_MESSAGE_TOOL
         self.assistant_message_tool_kwarg = DEFAULT_MESSAGE_TOOL_KWARG
 
-        self.optimistic_json_parser: OptimisticJSONParser = OptimisticJSONParser()
+        self.function_args_parser = IncrementalJSONParser()
         self.function_args_reader = JSONInnerThoughtsExtractor(wait_for_first_key=True)  # TODO: pass in kwarg
         self.function_name_buffer = None
         self.function_args_buffer = None
@@ -43,7 +43,8 @@ class OpenAIStreamingInterface:
 
         # Buffer to hold function arguments until inner thoughts are complete
         self.current_function_arguments = ""
-        self.current_json_parse_result = {}
+        # Text of the assistant message argument that has been parsed but not yet streamed out
+        self.pending_assistant_message = ""
 
         # Premake IDs for database writes
         self.letta_message_id = Message.generate_id()
@@ -145,6 +146,8 @@ class OpenAIStreamingInterface:
                             if tool_call.function.arguments:
                                 # updates_main_json, updates_inner_thoughts = self.function_args_reader.process_fragment(tool_call.function.arguments)
                                 self.current_function_arguments += tool_call.function.arguments
+                                args_update = self.function_args_parser.feed(tool_call.function.arguments)
+                                self.pending_assistant_message += args_update.string_deltas.get(self.assistant_message_tool_kwarg, "")
                                 updates_main_json, updates_inner_thoughts = self.function_args_reader.process_fragment(
                                     tool_call.function.arguments
                                 )
@@ -276,19 +279,9 @@ class OpenAIStreamingInterface:
 
                                             else:
                                                 # If there's no buffer to clear, just output a new chunk with new data
-                                                # TODO: THIS IS HORRIBLE
-                                                # TODO: WE USE THE OLD JSON PARSER EARLIER (WHICH DOES NOTHING) AND NOW THE NEW JSON PARSER
-                                                # TODO: THIS IS TOTALLY WRONG AND BAD, BUT SAVING FOR A LARGER REWRITE IN THE NEAR FUTURE
-                                                parsed_args = self.optimistic_json_parser.parse(self.current_function_arguments)
-
-                                                if parsed_args.get(self.assistant_message_tool_kwarg) and parsed_args.get(
-                                                    self.assistant_message_tool_kwarg
-                                                ) != self.current_json_parse_result.get(self.assistant_message_tool_kwarg):
-                                                    new_content = parsed_args.get(self.assistant_message_tool_kwarg)
-                                                    prev_content = self.current_json_parse_result.get(self.assistant_message_tool_kwarg, "")
-                                                    # TODO: Assumes consistent state and that prev_content is subset of new_content
-                                                    diff = new_content.replace(prev_content, "", 1)
-                                                    self.current_json_parse_result = parsed_args
+                                                if self.pending_assistant_message:
+                                                    diff = self.pending_assistant_message
+                                                    self.pending_assistant_message = ""
                                                     if prev_message_type and prev_message_type != "assistant_message":
                                                         message_index += 1
                                                     assistant_message = AssistantMessage(
@@ -0,0 +1,105 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+from letta.data_sources.redis_client import NoopAsyncRedisClient, get_redis_client
+from letta.log import get_logger
+from letta.schemas.run import Run as PydanticRun
+from letta.services.job_manager import JobManager
+from letta.settings import settings
+
+logger = get_logger(__name__)
+
+# Key in a queued run's metadata holding the request to execute
+RUN_REQUEST_METADATA_KEY = "run_request"
+
+
+class RunQueue(ABC):
+    """
+    Durable queue of async agent runs (`POST /v1/agents/{agent_id}/messages/async`), drained by `letta worker` processes.
+
+    A queued run is a `pending` row in the jobs table. Claiming it leases it to a worker, which must keep renewing the
+    lease while it executes the run; if the worker dies, the lease lapses and another worker picks the run up again.
+    """
+
+    def __init__(self, job_manager: Optional[JobManager] = None):
+        self.job_manager = job_manager or JobManager()
+
+    @abstractmethod
+    async def enqueue_async(self, run_id: str) -> None:
+        """Make a `pending` run available to workers."""
+
+    @abstractmethod
+    async def claim_async(self, worker_id: str, limit: int) -> List[PydanticRun]:
+        """Lease up to `limit` runs to `worker_id`."""
+
+    async def renew_async(self, worker_id: str, run_ids: List[str]) -> List[str]:
+        """Heartbeat for the runs `worker_id` is executing. Returns the ids whose lease was lost."""
+        return await self.job_manager.renew_run_leases_async(worker_id=worker_id, run_ids=run_ids, lease_seconds=settings.run_lease_seconds)
+
+    async def release_async(self, worker_id: str, run_id: str) -> None:
+        await self.job_manager.release_run_lease_async(worker_id=worker_id, run_id=run_id)
+
+    async def size_async(self) -> int:
+        """Number of runs waiting for a worker, used for backpressure."""
+        return await self.job_manager.count_queued_runs_async()
+
+    async def _claim_from_database(self, worker_id: str, limit: int, run_ids: Optional[List[str]] = None) -> List[PydanticRun]:
+        return await self.job_manager.claim_queued_runs_async(
+            worker_id=worker_id,
+            limit=limit,
+            lease_seconds=settings.run_lease_seconds,
+            max_attempts=settings.run_max_attempts,
+            run_ids=run_ids,
+        )
+
+
+class DatabaseRunQueue(RunQueue):
+    """Workers poll the jobs table directly, claiming with `SELECT ... FOR UPDATE SKIP LOCKED`."""
+
+    async def enqueue_async(self, run_id: str) -> None:
+        # The pending row is the queue entry
+        return None
+
+    async def claim_async(self, worker_id: str, limit: int) -> List[PydanticRun]:
+        return await self._claim_from_database(worker_id, limit)
+
+
+class RedisRunQueue(RunQueue):
+    """
+    Dispatches run ids through a Redis list, so workers claim new runs by primary key instead of all contending on the
+    ordered scan of pending rows.
+
+    Leases still live on the job rows, so crash recovery is the same as for `DatabaseRunQueue`: slots Redis can't fill
+    are claimed from the table, which also picks up expired leases and any id lost between the API committing a run
+    and pushing it.
+    """
+
+    QUEUE_KEY = "run_queue:pending"
+
+    def __init__(self, redis_client, job_manager: Optional[JobManager] = None):
+        super().__init__(job_manager=job_manager)
+        self.redis_client = redis_client
+
+    async def enqueue_async(self, run_id: str) -> None:
+        client = await self.redis_client.get_client()
+        await client.lpush(self.QUEUE_KEY, run_id)
+
+    async def claim_async(self, worker_id: str, limit: int) -> List[PydanticRun]:
+        client = await self.redis_client.get_client()
+        run_ids = await client.rpop(self.QUEUE_KEY, limit) or []
+        runs = await self._claim_from_database(worker_id, limit, run_ids=run_ids) if run_ids else []
+        if len(runs) < limit:
+            runs += await self._claim_from_database(worker_id, limit - len(runs))
+        return runs
+
+
+async def get_run_queue() -> Optional[RunQueue]:
+    """The configured run queue, or None when async runs execute inside the API process."""
+    if settings.run_queue_backend is None:
+        return None
+    if settings.run_queue_backend == "redis":
+        redis_client = await get_redis_client()
+        if not isinstance(redis_client, NoopAsyncRedisClient):
+            return RedisRunQueue(redis_client)
+        logger.warning("Redis run queue requested but Redis is not configured, falling back to the database run queue")
+    return DatabaseRunQueue()
@@ -0,0 +1,140 @@
+import asyncio
+import os
+import signal
+import socket
+import uuid
+from typing import Dict, List, Optional
+
+from letta.jobs.run_queue import RUN_REQUEST_METADATA_KEY, RunQueue, get_run_queue
+from letta.log import get_logger
+from letta.schemas.enums import JobStatus
+from letta.schemas.job import JobUpdate, LettaRequestConfig
+from letta.schemas.message import MessageCreate
+from letta.schemas.run import Run as PydanticRun
+from letta.server.server import SyncServer
+from letta.settings import settings
+
+logger = get_logger(__name__)
+
+
+class RunWorker:
+    """
+    Executes queued async agent runs, at most `concurrency` at a time.
+
+    The worker polls its queue for runs whenever it has a free slot and renews the leases of the runs it is executing
+    every third of the lease duration. On shutdown it stops claiming and gives in-flight runs a grace period; runs still
+    unfinished after that are abandoned and get retried by another worker once their lease expires, so a run may be
+    executed more than once.
+    """
+
+    def __init__(self, server: SyncServer, queue: RunQueue, concurrency: Optional[int] = None, worker_id: Optional[str] = None):
+        self.server = server
+        self.queue = queue
+        self.concurrency = concurrency or settings.run_worker_concurrency
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._active: Dict[str, asyncio.Task] = {}
+        self._stopping = asyncio.Event()
+
+    async def run_once(self) -> List[asyncio.Task]:
+        """Claim runs for every free slot and start executing them."""
+        free = self.concurrency - len(self._active)
+        if free <= 0:
+            return []
+        tasks = []
+        for run in await self.queue.claim_async(self.worker_id, free):
+            task = asyncio.create_task(self._execute(run))
+            self._active[run.id] = task
+            task.add_done_callback(lambda _, run_id=run.id: self._active.pop(run_id, None))
+            tasks.append(task)
+        return tasks
+
+    async def heartbeat(self) -> None:
+        lost = await self.queue.renew_async(self.worker_id, list(self._active))
+        for run_id in lost:
+            # Another worker has taken over; stop so the run isn't executed twice concurrently
+            logger.warning("Worker %s lost the lease on run %s, cancelling it", self.worker_id, run_id)
+            task = self._active.get(run_id)
+            if task is not None:
+                task.cancel()
+
+    async def run(self) -> None:
+        logger.info("Run worker %s started (concurrency=%d)", self.worker_id, self.concurrency)
+        heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        try:
+            while not self._stopping.is_set():
+                try:
+                    started = await self.run_once()
+                except Exception:
+                    logger.exception("Worker %s failed to claim runs", self.worker_id)
+                    started = []
+                if not started:
+                    try:
+                        await asyncio.wait_for(self._stopping.wait(), timeout=settings.run_worker_poll_interval_seconds)
+                    except asyncio.TimeoutError:
+                        pass
+            if self._active:
+                logger.info("Worker %s waiting for %d in-flight runs", self.worker_id, len(self._active))
+                await asyncio.wait(list(self._active.values()), timeout=settings.run_worker_shutdown_grace_seconds)
+        finally:
+            heartbeat_task.cancel()
+            for task in list(self._active.values()):
+                task.cancel()
+        logger.info("Run worker %s stopped", self.worker_id)
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.run_lease_seconds / 3)
+            try:
+                await self.heartbeat()
+            except Exception:
+                logger.exception("Worker %s failed to renew its leases", self.worker_id)
+
+    async def _execute(self, run: PydanticRun) -> None:
+        try:
+            await self._execute_run(run)
+        except Exception:
+            # Keep the lease: once it lapses the run is retried, up to `run_max_attempts` times
+            logger.exception("Worker %s failed to execute run %s", self.worker_id, run.id)
+            return
+        await self.queue.release_async(self.worker_id, run.id)
+
+    async def _execute_run(self, run: PydanticRun) -> None:
+        # Imported here: the router module pulls in the whole REST API
+        from letta.server.rest_api.routers.v1.agents import process_message_background
+
+        actor = await self.server.user_manager.get_actor_by_id_async(run.user_id)
+        request = (run.metadata or {}).get(RUN_REQUEST_METADATA_KEY)
+        if request is None:
+            job_update = JobUpdate(status=JobStatus.failed, metadata={"error": "Run has no request to execute"})
+            await self.server.job_manager.update_job_by_id_async(job_id=run.id, job_update=job_update, actor=actor)
+            return
+
+        request_config = run.request_config or LettaRequestConfig()
+        await process_message_background(
+            job_id=run.id,
+            server=self.server,
+            actor=actor,
+            agent_id=request["agent_id"],
+            messages=[MessageCreate.model_validate(message) for message in request["messages"]],
+            use_assistant_message=request_config.use_assistant_message,
+            assistant_message_tool_name=request_config.assistant_message_tool_name,
+            assistant_message_tool_kwarg=request_config.assistant_message_tool_kwarg,
+            max_steps=request["max_steps"],
+            include_return_message_types=request_config.include_return_message_types,
+        )
+
+
+async def start_worker(concurrency: Optional[int] = None) -> None:
+    """Entry point for `letta worker`: drain the run queue until SIGINT / SIGTERM."""
+    queue = await get_run_queue()
+    if queue is None:
+        raise ValueError("No run queue configured: set LETTA_RUN_QUEUE_BACKEND to 'database' or 'redis'")
+
+    worker = RunWorker(server=SyncServer(), queue=queue, concurrency=concurrency)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    await worker.run()
@@ -9,6 +9,7 @@ from letta.jobs.llm_batch_job_polling import poll_running_llm_batches
 from letta.log import get_logger
 from letta.server.db import db_context
 from letta.server.server import SyncServer
+from letta.services.agent_counter_manager import reconcile_agent_counters
 from letta.settings import settings
 
 # --- Global State ---
@@ -56,19 +57,29 @@ async def _try_acquire_lock_and_start_scheduler(server: SyncServer) -> bool:
         raw_conn = None  # Prevent closing in finally block
         cur = None  # Prevent closing in finally block
 
-        trigger = IntervalTrigger(
-            seconds=settings.poll_running_llm_batches_interval_seconds,
-            jitter=10,  # Jitter for the job execution
-        )
-        scheduler.add_job(
-            poll_running_llm_batches,
-            args=[server],
-            trigger=trigger,
-            id="poll_llm_batches",
-            name="Poll LLM API batch jobs",
-            replace_existing=True,
-            next_run_time=datetime.datetime.now(datetime.timezone.utc),
-        )
+        if settings.enable_batch_job_polling:
+            trigger = IntervalTrigger(
+                seconds=settings.poll_running_llm_batches_interval_seconds,
+                jitter=10,  # Jitter for the job execution
+            )
+            scheduler.add_job(
+                poll_running_llm_batches,
+                args=[server],
+                trigger=trigger,
+                id="poll_llm_batches",
+                name="Poll LLM API batch jobs",
+                replace_existing=True,
+                next_run_time=datetime.datetime.now(datetime.timezone.utc),
+            )
+
+        if settings.agent_counter_reconcile_interval_seconds:
+            scheduler.add_job(
+                reconcile_agent_counters,
+                trigger=IntervalTrigger(seconds=settings.agent_counter_reconcile_interval_seconds, jitter=10),
+                id="reconcile_agent_counters",
+                name="Reconcile agent message / archival counts",
+                replace_existing=True,
+            )
 
         if not scheduler.running:
             scheduler.start()
@@ -195,8 +206,8 @@ async def start_scheduler_with_leader_election(server: SyncServer):
     """
     global _lock_retry_task, _is_scheduler_leader
 
-    if not settings.enable_batch_job_polling:
-        logger.info("Batch job polling is disabled.")
+    if not settings.enable_batch_job_polling and not settings.agent_counter_reconcile_interval_seconds:
+        logger.info("Batch job polling and agent counter reconciliation are disabled.")
         return
 
     if _is_scheduler_leader:
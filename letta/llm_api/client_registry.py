@@ -0,0 +1,115 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+import anthropic
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+from letta.helpers.singleton import singleton
+from letta.settings import settings
+
+try:
+    import h2  # noqa: F401  (httpx only speaks HTTP/2 when this is installed)
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def api_key_fingerprint(api_key: Optional[str]) -> Optional[str]:
+    """Identifies an API key in cache keys without keeping the key itself around as a dict key."""
+    return hashlib.sha256(api_key.encode()).hexdigest() if api_key else None
+
+
+@singleton
+class LLMClientRegistry:
+    """
+    Process-wide pool of provider SDK clients, so requests reuse warm keep-alive connections instead of paying for a new
+    connection pool and TLS handshake on every call.
+
+    Clients are keyed by everything they were constructed with (provider, base url, api key fingerprint, retry
+    settings). Async clients are pooled per event loop, since an httpx pool is bound to the loop it first ran on. The pool
+    is an LRU bounded by `llm_client_cache_size`, and clients unused for `llm_client_idle_seconds` are dropped. Dropped
+    clients are not closed explicitly: the SDKs close their HTTP client when it is garbage collected, i.e. only once no
+    in-flight request or stream still holds it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._async_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, OrderedDict]" = weakref.WeakKeyDictionary()
+        self._sync_pool: OrderedDict = OrderedDict()
+
+    def get_or_create(self, key: Tuple, factory: Callable[[], Any], async_client: bool = True) -> Any:
+        if settings.llm_client_cache_size <= 0:
+            return factory()
+        if async_client:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # Constructed outside of any loop; nothing to tie a pool to
+                return factory()
+
+        with self._lock:
+            pool = self._get_pool(loop) if async_client else self._sync_pool
+            now = time.monotonic()
+            while pool:
+                _, (_, last_used) = next(iter(pool.items()))
+                if now - last_used <= settings.llm_client_idle_seconds:
+                    break
+                pool.popitem(last=False)
+
+            entry = pool.pop(key, None)
+            client = entry[0] if entry is not None else factory()
+            pool[key] = (client, now)
+            while len(pool) > settings.llm_client_cache_size:
+                pool.popitem(last=False)
+            return client
+
+    def clear(self) -> None:
+        with self._lock:
+            self._async_pools.clear()
+            self._sync_pool.clear()
+
+    def _get_pool(self, loop: asyncio.AbstractEventLoop) -> OrderedDict:
+        pool = self._async_pools.get(loop)
+        if pool is None:
+            pool = self._async_pools[loop] = OrderedDict()
+        return pool
+
+
+def _http_client_kwargs(default_client_cls) -> dict:
+    if HTTP2_AVAILABLE and settings.llm_client_http2:
+        return {"http_client": default_client_cls(http2=True)}
+    return {}
+
+
+def get_openai_client(api_key: str, base_url: Optional[str], async_client: bool = True, **kwargs) -> Any:
+    """A pooled `AsyncOpenAI` (or `OpenAI`) client; `kwargs` are passed through to the constructor."""
+    key = ("openai", async_client, base_url, api_key_fingerprint(api_key), tuple(sorted(kwargs.items())))
+
+    def factory():
+        if async_client:
+            return AsyncOpenAI(api_key=api_key, base_url=base_url, **_http_client_kwargs(DefaultAsyncHttpxClient), **kwargs)
+        return OpenAI(api_key=api_key, base_url=base_url, **_http_client_kwargs(DefaultHttpxClient), **kwargs)
+
+    return LLMClientRegistry().get_or_create(key, factory, async_client=async_client)
+
+
+def get_anthropic_client(api_key: Optional[str], async_client: bool = True, **kwargs) -> Any:
+    """A pooled `anthropic.AsyncAnthropic` (or `anthropic.Anthropic`) client; without an api key the SDK reads the environment."""
+    effective_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
+    key = ("anthropic", async_client, api_key_fingerprint(effective_key), tuple(sorted(kwargs.items())))
+    if api_key:
+        kwargs["api_key"] = api_key
+
+    def factory():
+        if async_client:
+            return anthropic.AsyncAnthropic(**_http_client_kwargs(anthropic.DefaultAsyncHttpxClient), **kwargs)
+        return anthropic.Anthropic(**_http_client_kwargs(anthropic.DefaultHttpxClient), **kwargs)
+
+    return LLMClientRegistry().get_or_create(key, factory, async_client=async_client)
@@ -89,7 +89,7 @@ class LLMClientBase:
         try:
             log_event(name="llm_request_sent", attributes=request_data)
             response_data = await self.request_async(request_data, llm_config)
-            await telemetry_manager.create_provider_trace_async(
+            await telemetry_manager.log_provider_trace_async(
                 actor=self.actor,
                 provider_trace_create=ProviderTraceCreate(
                     request_json=request_data,
@@ -3,7 +3,6 @@ import warnings
 from typing import List, Union
 
 import requests
-import tiktoken
 
 import letta.local_llm.llm_chat_completion_wrappers.airoboros as airoboros
 import letta.local_llm.llm_chat_completion_wrappers.chatml as chatml
@@ -71,13 +70,9 @@ def num_tokens_from_functions(functions: List[dict], model: str = "gpt-4"):
 
     Copied from https://community.openai.com/t/how-to-calculate-the-tokens-when-using-function-call/266573/11
     """
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        from letta.utils import printd
+    from letta.utils import get_tiktoken_encoding
 
-        printd(f"Warning: model not found. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
+    encoding = get_tiktoken_encoding(model)
 
     num_tokens = 0
     for function in functions:
@@ -152,11 +147,9 @@ def num_tokens_from_tool_calls(tool_calls: Union[List[dict], List[ToolCall]], mo
         }
     }]
     """
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        # print("Warning: model not found. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
+    from letta.utils import get_tiktoken_encoding
+
+    encoding = get_tiktoken_encoding(model)
 
     num_tokens = 0
     for tool_call in tool_calls:
@@ -198,12 +191,9 @@ def num_tokens_from_messages(messages: List[dict], model: str = "gpt-4") -> int:
     For counting tokens in function calling REQUESTS, see:
         https://community.openai.com/t/how-to-calculate-the-tokens-when-using-function-call/266573/11
     """
-    try:
-        # Attempt to search for the encoding based on the model string
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        # print("Warning: model not found. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
+    from letta.utils import get_tiktoken_encoding
+
+    encoding = get_tiktoken_encoding(model)
     if model in {
         "gpt-3.5-turbo-0613",
         "gpt-3.5-turbo-16k-0613",
@@ -1,4 +1,5 @@
 from letta.orm.agent import Agent
+from letta.orm.agent_counters import AgentCounters
 from letta.orm.agents_tags import AgentsTags
 from letta.orm.base import Base
 from letta.orm.block import Block
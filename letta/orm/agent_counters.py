@@ -0,0 +1,21 @@
+from typing import Optional
+
+from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from letta.orm.base import Base
+
+
+class AgentCounters(Base):
+    """
+    Denormalized per-agent row counts, so context window metadata doesn't need a COUNT(*) over tables that grow without bound.
+    A NULL count is unknown and gets recomputed on the next read.
+    """
+
+    __tablename__ = "agent_counters"
+
+    agent_id: Mapped[str] = mapped_column(String, ForeignKey("agents.id", ondelete="CASCADE"), primary_key=True)
+    message_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, doc="Number of messages belonging to the agent.")
+    archival_passage_count: Mapped[Optional[int]] = mapped_column(
+        Integer, nullable=True, doc="Number of archival memory passages belonging to the agent."
+    )
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import JSON, Index, String
+from sqlalchemy import JSON, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from letta.orm.mixins import UserMixin
@@ -24,7 +24,10 @@ class Job(SqlalchemyBase, UserMixin):
 
     __tablename__ = "jobs"
     __pydantic_model__ = PydanticJob
-    __table_args__ = (Index("ix_jobs_created_at", "created_at", "id"),)
+    __table_args__ = (
+        Index("ix_jobs_created_at", "created_at", "id"),
+        Index("ix_jobs_status_lease_expires_at", "status", "lease_expires_at"),
+    )
 
     status: Mapped[JobStatus] = mapped_column(String, default=JobStatus.created, doc="The current status of the job.")
     completed_at: Mapped[Optional[datetime]] = mapped_column(nullable=True, doc="The unix timestamp of when the job was completed.")
@@ -46,6 +49,13 @@ class Job(SqlalchemyBase, UserMixin):
         nullable=True, doc="Optional error message from attempting to POST the callback endpoint."
     )
 
+    # run queue related columns (see `letta.jobs.run_queue`)
+    lease_owner: Mapped[Optional[str]] = mapped_column(String, nullable=True, doc="The worker currently executing the run.")
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(
+        nullable=True, doc="When the worker's lease lapses; an expired lease makes the run claimable again."
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0", doc="How many times a worker has claimed the run.")
+
     # relationships
     user: Mapped["User"] = relationship("User", back_populates="jobs")
     job_messages: Mapped[List["JobMessage"]] = relationship("JobMessage", back_populates="job", cascade="all, delete-orphan")
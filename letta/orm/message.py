@@ -1,13 +1,13 @@
 from typing import List, Optional
 
 from openai.types.chat.chat_completion_message_tool_call import ChatCompletionMessageToolCall as OpenAIToolCall
-from sqlalchemy import BigInteger, FetchedValue, ForeignKey, Index, event, text
+from sqlalchemy import DDL, JSON, BigInteger, FetchedValue, ForeignKey, Index, Text, event, text
 from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
 
 from letta.orm.custom_columns import MessageContentColumn, ToolCallColumn, ToolReturnColumn
 from letta.orm.mixins import AgentMixin, OrganizationMixin
 from letta.orm.sqlalchemy_base import SqlalchemyBase
-from letta.schemas.letta_message_content import MessageContent
+from letta.schemas.letta_message_content import MessageContent, MessageContentType
 from letta.schemas.letta_message_content import TextContent as PydanticTextContent
 from letta.schemas.message import Message as PydanticMessage
 from letta.schemas.message import ToolReturn
@@ -50,6 +50,13 @@ class Message(SqlalchemyBase, OrganizationMixin, AgentMixin):
         doc="The id of the LLMBatchItem that this message is associated with",
     )
 
+    search_text: Mapped[Optional[str]] = mapped_column(
+        Text, nullable=True, doc="Concatenated text content, indexed for full-text search (see `message_search`)"
+    )
+    token_counts: Mapped[Optional[dict]] = mapped_column(
+        JSON, nullable=True, doc="Cached prompt token count of the message, keyed by tokenizer family"
+    )
+
     # Monotonically increasing sequence for efficient/correct listing
     sequence_id: Mapped[int] = mapped_column(
         BigInteger,
@@ -78,7 +85,7 @@ class Message(SqlalchemyBase, OrganizationMixin, AgentMixin):
         if self.text and not model.content:
             model.content = [PydanticTextContent(text=self.text)]
         # If there are no tool calls, set tool_calls to None
-        if len(self.tool_calls) == 0:
+        if not self.tool_calls:
             model.tool_calls = None
         return model
 
@@ -99,3 +106,49 @@ def set_sequence_id_for_sqlite(mapper, connection, target):
 
         session._sequence_id_counter += 1
         target.sequence_id = session._sequence_id_counter
+
+
+def extract_search_text(content: Optional[List[MessageContent]], legacy_text: Optional[str] = None) -> Optional[str]:
+    """The text parts of a message's content, as indexed for full-text search."""
+    parts = []
+    for part in content or []:
+        part_type = part.get("type") if isinstance(part, dict) else getattr(part, "type", None)
+        if part_type == MessageContentType.text:
+            parts.append(part["text"] if isinstance(part, dict) else part.text)
+    if not parts and legacy_text:
+        parts.append(legacy_text)
+    return "\n".join(parts) if parts else None
+
+
+@event.listens_for(Message, "before_insert")
+@event.listens_for(Message, "before_update")
+def set_search_text(mapper, connection, target):
+    target.search_text = extract_search_text(target.content, target.text)
+
+
+# Full-text search: Postgres indexes a generated tsvector column with GIN, SQLite keeps an FTS5 table in sync with
+# triggers. Both are created alongside the messages table; existing Postgres databases get them from the migration.
+event.listen(
+    Message.__table__,
+    "after_create",
+    DDL(
+        "ALTER TABLE messages ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', coalesce(search_text, ''))) STORED"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    Message.__table__,
+    "after_create",
+    DDL("CREATE INDEX IF NOT EXISTS ix_messages_search_vector ON messages USING gin (search_vector)").execute_if(dialect="postgresql"),
+)
+for statement in (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(search_text, content='messages', content_rowid='sequence_id')",
+    "CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN "
+    "INSERT INTO messages_fts(rowid, search_text) VALUES (new.sequence_id, new.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN "
+    "INSERT INTO messages_fts(messages_fts, rowid, search_text) VALUES ('delete', old.sequence_id, old.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF search_text ON messages BEGIN "
+    "INSERT INTO messages_fts(messages_fts, rowid, search_text) VALUES ('delete', old.sequence_id, old.search_text); "
+    "INSERT INTO messages_fts(rowid, search_text) VALUES (new.sequence_id, new.search_text); END",
+):
+    event.listen(Message.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
@@ -1,9 +1,9 @@
 import inspect
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 from functools import wraps
 from pprint import pformat
-from typing import TYPE_CHECKING, List, Literal, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Literal, Optional, Tuple, Union
 
 from sqlalchemy import Sequence, String, and_, delete, func, or_, select, text
 from sqlalchemy.exc import DBAPIError, IntegrityError, TimeoutError
@@ -15,6 +15,7 @@ from letta.log import get_logger
 from letta.orm.base import Base, CommonSqlalchemyMetaMixins
 from letta.orm.errors import DatabaseTimeoutError, ForeignKeyConstraintViolationError, NoResultFound, UniqueConstraintViolationError
 from letta.orm.sqlite_functions import adapt_array
+from letta.settings import settings
 
 if TYPE_CHECKING:
     from pydantic import BaseModel
@@ -22,6 +23,16 @@ if TYPE_CHECKING:
 
 logger = get_logger(__name__)
 
+# Called as `listener(session, table_name, rows)` in the transaction of the rows `bulk_insert_async` writes with COPY,
+# which bypasses SQLAlchemy's execution events
+_bulk_copy_listeners: List[Callable[[Session, str, List[Dict[str, Any]]], None]] = []
+
+
+def on_bulk_copy(listener: Callable[[Session, str, List[Dict[str, Any]]], None]):
+    """Register a listener for rows written with COPY (see `SqlalchemyBase.bulk_insert_async`)."""
+    _bulk_copy_listeners.append(listener)
+    return listener
+
 
 def handle_db_timeout(func):
     """Decorator to handle SQLAlchemy TimeoutError and wrap it in a custom exception."""
@@ -748,6 +759,116 @@ class SqlalchemyBase(CommonSqlalchemyMetaMixins, Base):
         except (DBAPIError, IntegrityError) as e:
             cls._handle_dbapi_error(e)
 
+    @classmethod
+    @handle_db_timeout
+    async def bulk_insert_async(cls, rows: List[Dict[str, Any]], db_session: "AsyncSession", actor: Optional["User"] = None) -> List[str]:
+        """
+        Insert many records in a single transaction without building ORM instances or reading them back, for large
+        ingestion (file passages, archival memory). ORM events don't fire, so models relying on them can't use this.
+
+        On Postgres (asyncpg) the rows are streamed with binary COPY, vectors included; elsewhere they are inserted
+        with executemany. Either way they are sent in chunks of `bulk_insert_chunk_size` rows. COPY fires no execution
+        events, so listeners registered with `on_bulk_copy` (e.g. the agent counters) are called instead.
+        Args:
+            rows: Column values of each record, keyed by column name
+            db_session: AsyncSession session
+            actor: Optional user performing the action
+        Returns:
+            IDs of the inserted records, in order
+        """
+        logger.debug(f"Async bulk inserting {len(rows)} {cls.__name__} rows with actor={actor}")
+        if not rows:
+            return []
+
+        columns, rows = cls._prepare_bulk_rows(rows, actor)
+        try:
+            connection = await db_session.connection()
+            for start in range(0, len(rows), settings.bulk_insert_chunk_size):
+                chunk = rows[start : start + settings.bulk_insert_chunk_size]
+                if cls._use_copy(connection):
+                    await cls._copy_rows_async(connection, columns, chunk)
+                    for listener in _bulk_copy_listeners:
+                        await db_session.run_sync(listener, cls.__tablename__, chunk)
+                else:
+                    await db_session.execute(cls.__table__.insert(), chunk)
+            await db_session.commit()
+        except (DBAPIError, IntegrityError) as e:
+            cls._handle_dbapi_error(e)
+        return [row["id"] for row in rows]
+
+    @classmethod
+    def _prepare_bulk_rows(cls, rows: List[Dict[str, Any]], actor: Optional["User"]) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Give every row the same columns (as COPY and executemany need), filling in what the ORM would."""
+        table_columns = cls.__table__.c
+        columns = set().union(*rows)
+        unknown_columns = columns - set(table_columns.keys())
+        if unknown_columns:
+            raise ValueError(f"Unknown {cls.__name__} columns: {sorted(unknown_columns)}")
+        if any(not row.get("id") for row in rows):
+            raise ValueError(f"Every {cls.__name__} row needs an id")
+
+        # Server defaults only apply to columns left out of the insert altogether
+        defaulted_columns = [name for name in ("created_at", "updated_at", "is_deleted") if name in table_columns]
+        if actor:
+            defaulted_columns += ["_created_by_id", "_last_updated_by_id"]
+        columns = sorted(columns.union(defaulted_columns))
+
+        now = datetime.now(timezone.utc)
+        prepared = []
+        for row in rows:
+            row = {name: row.get(name) for name in columns}
+            if "created_at" in row and row["created_at"] is None:
+                row["created_at"] = now
+            if "updated_at" in row and row["updated_at"] is None:
+                row["updated_at"] = row.get("created_at") or now
+            if "is_deleted" in row and row["is_deleted"] is None:
+                row["is_deleted"] = False
+            if actor:
+                row["_created_by_id"] = row["_created_by_id"] or actor.id
+                row["_last_updated_by_id"] = actor.id
+            prepared.append(row)
+        return columns, prepared
+
+    @staticmethod
+    def _use_copy(connection) -> bool:
+        return connection.dialect.driver == "asyncpg"
+
+    @classmethod
+    async def _copy_rows_async(cls, connection, columns: List[str], rows: List[Dict[str, Any]]) -> None:
+        """Stream the rows into the table with asyncpg's binary COPY, within the session's transaction."""
+        from pgvector.asyncpg import register_vector
+        from pgvector.sqlalchemy import Vector
+
+        # The driver connection only begins the session's transaction with its first statement, and COPY must run in it
+        await connection.execute(text("SELECT 1"))
+        raw_connection = await connection.get_raw_connection()
+        asyncpg_connection = raw_connection.driver_connection
+        records = cls._copy_records(connection.dialect, columns, rows)
+
+        vector_columns = [name for name in columns if isinstance(cls.__table__.c[name].type, Vector)]
+        if vector_columns:
+            await register_vector(asyncpg_connection)
+        try:
+            await asyncpg_connection.copy_records_to_table(cls.__tablename__, records=records, columns=columns)
+        finally:
+            if vector_columns:
+                # The binary codec would break the text-encoded vectors that regular statements on this pooled connection bind
+                await asyncpg_connection.reset_type_codec("vector")
+
+    @classmethod
+    def _copy_records(cls, dialect, columns: List[str], rows: List[Dict[str, Any]]) -> List[tuple]:
+        """The rows as COPY records, with the values SQLAlchemy would have bound."""
+        from pgvector.sqlalchemy import Vector
+
+        # COPY bypasses SQLAlchemy's parameter processing, so apply the columns' bind processors (custom column
+        # types, JSON serialization) here; vectors go through pgvector's binary codec instead of its text form
+        processors = {}
+        for name in columns:
+            column_type = cls.__table__.c[name].type
+            if not isinstance(column_type, Vector):
+                processors[name] = column_type.dialect_impl(dialect).bind_processor(dialect)
+        return [tuple(processors[name](row[name]) if processors.get(name) else row[name] for name in columns) for row in rows]
+
     @handle_db_timeout
     def delete(self, db_session: "Session", actor: Optional["User"] = None) -> "SqlalchemyBase":
         logger.debug(f"Soft deleting {self.__class__.__name__} with ID: {self.id} with actor={actor}")
@@ -1,13 +1,74 @@
 import base64
 import sqlite3
+import struct
 from typing import Optional, Union
 
 import numpy as np
 from sqlalchemy import event
+from sqlalchemy.dialects.sqlite.aiosqlite import AsyncAdapt_aiosqlite_connection
 from sqlalchemy.engine import Engine
 
 from letta.constants import MAX_EMBEDDING_DIM
 
+# Compact vector format: a fixed header followed by the raw little-endian components, truncated to the
+# embedding's true dimension. Legacy blobs are base64 text, which never contains a NUL byte, so the
+# magic prefix unambiguously tells the two formats apart.
+VECTOR_MAGIC = b"\x00LV"
+VECTOR_FORMAT_VERSION = 1
+# magic, version, storage dtype code, (pad), dim, int8 scale
+_VECTOR_HEADER = struct.Struct("<3sBBxHf")
+VECTOR_STORAGE_DTYPES = {"float32": (0, np.dtype("<f4")), "float16": (1, np.dtype("<f2")), "int8": (2, np.dtype("i1"))}
+_VECTOR_DTYPE_CODES = {code: dtype for code, dtype in VECTOR_STORAGE_DTYPES.values()}
+
+
+def encode_vector(arr: Union[list, np.ndarray], storage_dtype: str = "float32") -> bytes:
+    """
+    Encode a vector in the compact format, dropping the zero padding up to `MAX_EMBEDDING_DIM`.
+
+    `storage_dtype` may be `float16` or `int8` (symmetric, per-vector scale) to trade precision for size.
+    """
+    if storage_dtype not in VECTOR_STORAGE_DTYPES:
+        raise ValueError(f"Unknown vector storage dtype '{storage_dtype}', expected one of {list(VECTOR_STORAGE_DTYPES)}")
+    code, dtype = VECTOR_STORAGE_DTYPES[storage_dtype]
+
+    arr = np.asarray(arr, dtype=np.float32).ravel()
+    nonzero = np.flatnonzero(arr)
+    dim = int(nonzero[-1]) + 1 if len(nonzero) else 0
+    arr = arr[:dim]
+
+    scale = 1.0
+    if storage_dtype == "int8":
+        max_abs = float(np.abs(arr).max()) if dim else 0.0
+        scale = max_abs / 127 if max_abs else 1.0
+        payload = np.round(arr / scale).astype(dtype)
+    else:
+        payload = arr.astype(dtype)
+    return _VECTOR_HEADER.pack(VECTOR_MAGIC, VECTOR_FORMAT_VERSION, code, dim, scale) + payload.tobytes()
+
+
+def decode_vector(data: bytes) -> np.ndarray:
+    """
+    Decode a stored vector (compact or legacy base64 format) to float32.
+
+    Compact float32 vectors are returned as a read-only, zero-copy view over `data`.
+    """
+    if data[: len(VECTOR_MAGIC)] != VECTOR_MAGIC:
+        return np.frombuffer(base64.b64decode(data), dtype=np.float32)
+
+    _, version, code, dim, scale = _VECTOR_HEADER.unpack_from(data)
+    if version != VECTOR_FORMAT_VERSION:
+        raise ValueError(f"Unsupported vector format version {version}")
+    vec = np.frombuffer(data, dtype=_VECTOR_DTYPE_CODES[code], count=dim, offset=_VECTOR_HEADER.size)
+    if vec.dtype == np.float32:
+        return vec
+    if vec.dtype == np.int8:
+        return vec.astype(np.float32) * np.float32(scale)
+    return vec.astype(np.float32)
+
+
+def is_legacy_vector(data: bytes) -> bool:
+    return bool(data) and data[: len(VECTOR_MAGIC)] != VECTOR_MAGIC
+
 
 def adapt_array(arr):
     """
@@ -21,10 +82,7 @@ def adapt_array(arr):
     elif not isinstance(arr, np.ndarray):
         raise ValueError(f"Unsupported type: {type(arr)}")
 
-    # Convert to bytes and then base64 encode
-    bytes_data = arr.tobytes()
-    base64_data = base64.b64encode(bytes_data)
-    return sqlite3.Binary(base64_data)
+    return sqlite3.Binary(encode_vector(arr))
 
 
 def convert_array(text):
@@ -42,10 +100,7 @@ def convert_array(text):
     binary_data = bytes(text) if isinstance(text, sqlite3.Binary) else text
 
     try:
-        # First decode base64
-        decoded_data = base64.b64decode(binary_data)
-        # Then convert to numpy array
-        return np.frombuffer(decoded_data, dtype=np.float32)
+        return decode_vector(binary_data)
     except Exception:
         return None
 
@@ -107,10 +162,13 @@ def cosine_distance(embedding1, embedding2, expected_dim=MAX_EMBEDDING_DIM):
     """
     Calculate cosine distance between two embeddings
 
+    Embeddings may be stored at their true dimension or zero-padded; since padding is all zeros,
+    comparing the common prefix gives the same result as comparing the padded vectors.
+
     Args:
         embedding1: First embedding
         embedding2: Second embedding
-        expected_dim: Expected embedding dimension (default 4096)
+        expected_dim: Maximum embedding dimension (default 4096)
 
     Returns:
         float: Cosine distance
@@ -119,22 +177,52 @@ def cosine_distance(embedding1, embedding2, expected_dim=MAX_EMBEDDING_DIM):
     if embedding1 is None or embedding2 is None:
         return 0.0  # Maximum distance if either embedding is None
 
-    try:
-        vec1 = validate_and_transform_embedding(embedding1, expected_dim)
-        vec2 = validate_and_transform_embedding(embedding2, expected_dim)
-    except ValueError:
+    vec1 = convert_array(embedding1)
+    vec2 = convert_array(embedding2)
+    if vec1 is None or vec2 is None or vec1.shape[0] > expected_dim or vec2.shape[0] > expected_dim:
         return 0.0
 
-    similarity = np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
+    dim = min(vec1.shape[0], vec2.shape[0])
+    similarity = np.dot(vec1[:dim], vec2[:dim]) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
     distance = float(1.0 - similarity)
 
     return distance
 
 
+def migrate_legacy_vectors(
+    connection: sqlite3.Connection, table: str, column: str = "embedding", storage_dtype: str = "float32", batch_size: int = 1000
+) -> int:
+    """
+    Rewrite legacy base64-encoded vectors in `table.column` into the compact format, in batches.
+
+    Reads transparently accept both formats, so this can run on a live database and be interrupted
+    and resumed. Returns the number of rows rewritten.
+    """
+    # Legacy blobs are base64 text and never start with the compact format's NUL byte
+    select_sql = f"SELECT id, {column} FROM {table} WHERE {column} IS NOT NULL AND substr({column}, 1, 1) != x'00' LIMIT ?"
+    update_sql = f"UPDATE {table} SET {column} = ? WHERE id = ?"
+
+    migrated = 0
+    while True:
+        rows = connection.execute(select_sql, (batch_size,)).fetchall()
+        if not rows:
+            return migrated
+        updates = []
+        for row_id, data in rows:
+            vec = convert_array(data)
+            if vec is None:
+                raise ValueError(f"Could not decode {table}.{column} for row {row_id}")
+            updates.append((sqlite3.Binary(encode_vector(vec, storage_dtype=storage_dtype)), row_id))
+        connection.executemany(update_sql, updates)
+        connection.commit()
+        migrated += len(updates)
+
+
 @event.listens_for(Engine, "connect")
 def register_functions(dbapi_connection, connection_record):
     """Register SQLite functions"""
-    if isinstance(dbapi_connection, sqlite3.Connection):
+    if isinstance(dbapi_connection, (sqlite3.Connection, AsyncAdapt_aiosqlite_connection)):
+        # the aiosqlite adapter forwards create_function to the underlying sqlite3 connection
         dbapi_connection.create_function("cosine_distance", 2, cosine_distance)
 
 
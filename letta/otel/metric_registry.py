@@ -2,7 +2,7 @@ from dataclasses import dataclass, field
 from functools import partial
 
 from opentelemetry import metrics
-from opentelemetry.metrics import Counter, Histogram
+from opentelemetry.metrics import Counter, Histogram, UpDownCounter
 
 from letta.helpers.singleton import singleton
 from letta.otel.metrics import get_letta_meter
@@ -27,7 +27,7 @@ class MetricRegistry:
         agent_id -1:N -> tool_name
     """
 
-    Instrument = Counter | Histogram
+    Instrument = Counter | Histogram | UpDownCounter
     _metrics: dict[str, Instrument] = field(default_factory=dict, init=False)
     _meter: metrics.Meter = field(init=False)
 
@@ -158,3 +158,63 @@ class MetricRegistry:
                 unit="1",
             ),
         )
+
+    @property
+    def sleeptime_pending_runs(self) -> UpDownCounter:
+        return self._get_or_create_metric(
+            "count_sleeptime_pending_runs",
+            partial(
+                self._meter.create_up_down_counter,
+                name="count_sleeptime_pending_runs",
+                description="Number of sleeptime agent runs waiting to start",
+                unit="1",
+            ),
+        )
+
+    @property
+    def sleeptime_run_lag_ms_histogram(self) -> Histogram:
+        return self._get_or_create_metric(
+            "hist_sleeptime_run_lag_ms",
+            partial(
+                self._meter.create_histogram,
+                name="hist_sleeptime_run_lag_ms",
+                description="Histogram for the time sleeptime agent runs wait before starting (ms)",
+                unit="ms",
+            ),
+        )
+
+    @property
+    def sleeptime_coalesced_turns_counter(self) -> Counter:
+        return self._get_or_create_metric(
+            "count_sleeptime_coalesced_turns",
+            partial(
+                self._meter.create_counter,
+                name="count_sleeptime_coalesced_turns",
+                description="Counts the turns merged into an already pending sleeptime agent run",
+                unit="1",
+            ),
+        )
+
+    @property
+    def provider_trace_queue_depth(self) -> UpDownCounter:
+        return self._get_or_create_metric(
+            "count_provider_trace_queue_depth",
+            partial(
+                self._meter.create_up_down_counter,
+                name="count_provider_trace_queue_depth",
+                description="Number of provider traces waiting to be written",
+                unit="1",
+            ),
+        )
+
+    @property
+    def provider_trace_dropped_counter(self) -> Counter:
+        return self._get_or_create_metric(
+            "count_provider_trace_dropped",
+            partial(
+                self._meter.create_counter,
+                name="count_provider_trace_dropped",
+                description="Counts the provider traces that were not written, by reason",
+                unit="1",
+            ),
+        )
@@ -0,0 +1,44 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Generator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class QueryCounter:
+    """Number of SQL statements executed within a request (or any other `count_queries` scope)."""
+
+    count: int = 0
+    statements: List[str] = field(default_factory=list)
+    record_statements: bool = False
+
+
+# The counter object is shared by reference, so tasks spawned within the scope (which copy the context) add to it too
+_query_counter: ContextVar[Optional[QueryCounter]] = ContextVar("query_counter", default=None)
+
+
+@contextmanager
+def count_queries(record_statements: bool = False) -> Generator[QueryCounter, None, None]:
+    """Count the SQL statements issued by the current context until the block exits."""
+    counter = QueryCounter(record_statements=record_statements)
+    token = _query_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _query_counter.reset(token)
+
+
+def get_query_counter() -> Optional[QueryCounter]:
+    return _query_counter.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _query_counter.get()
+    if counter is not None:
+        counter.count += 1
+        if counter.record_statements:
+            counter.statements.append(statement)
@@ -78,6 +78,10 @@ class LLMConfig(BaseModel):
         0,
         description="Configurable thinking budget for extended thinking. Used for enable_reasoner and also for Google Vertex models like Gemini 2.5 Flash. Minimum value is 1024 when used with enable_reasoner.",
     )
+    parallel_tool_calls: bool = Field(
+        False,
+        description="If set to True, the model may call several tools in one turn, which the agent then runs concurrently. Only used with OpenAI and Anthropic models.",
+    )
 
     # FIXME hack to silence pydantic protected namespace warning
     model_config = ConfigDict(protected_namespaces=())
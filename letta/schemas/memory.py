@@ -1,6 +1,8 @@
-from typing import TYPE_CHECKING, List, Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Hashable, List, Optional, Tuple
 
-from jinja2 import Template, TemplateSyntaxError
+from jinja2 import Environment, Template, TemplateSyntaxError, nodes
 from pydantic import BaseModel, Field
 
 # Forward referencing to avoid circular import with Agent -> Memory -> Agent
@@ -56,6 +58,42 @@ class ContextWindowOverview(BaseModel):
     messages: List[Message] = Field(..., description="The messages in the context window.")
 
 
+# Block fields that go into a compiled-memory fingerprint, plus the attributes templates may use on loops and values
+_FINGERPRINT_FIELDS = ("label", "value", "limit", "read_only", "description")
+_FINGERPRINT_SAFE_ATTRIBUTES = set(_FINGERPRINT_FIELDS) | {
+    "first",
+    "last",
+    "index",
+    "index0",
+    "revindex",
+    "revindex0",
+    "length",
+    "split",
+    "splitlines",
+    "strip",
+}
+_COMPILED_MEMORY_CACHE_SIZE = 1024
+_compiled_memory_cache: "OrderedDict[Hashable, str]" = OrderedDict()
+
+
+@lru_cache(maxsize=128)
+def _get_template(prompt_template: str) -> Template:
+    return Template(prompt_template)
+
+
+@lru_cache(maxsize=128)
+def _template_is_fingerprintable(prompt_template: str) -> bool:
+    """Whether the template only reads block attributes covered by the fingerprint (true for all built-in templates)."""
+    ast = Environment().parse(prompt_template)
+    if any(True for _ in ast.find_all(nodes.Getitem)):
+        return False
+    return all(node.attr in _FINGERPRINT_SAFE_ATTRIBUTES for node in ast.find_all(nodes.Getattr))
+
+
+def _blocks_fingerprint(blocks: List[Block]) -> Tuple:
+    return tuple(tuple(getattr(block, field) for field in _FINGERPRINT_FIELDS) for block in blocks)
+
+
 class Memory(BaseModel, validate_assignment=True):
     """
 
@@ -108,10 +146,31 @@ class Memory(BaseModel, validate_assignment=True):
         except Exception as e:
             raise ValueError(f"Prompt template is not compatible with current memory structure: {str(e)}")
 
+    def fingerprint(self, tool_usage_rules=None) -> Optional[Hashable]:
+        """
+        Cheap key identifying the output of `compile`: equal fingerprints compile to the same string, so callers can
+        tell whether memory changed without rendering it. None if the template reads fields the key doesn't cover.
+        """
+        if not _template_is_fingerprintable(self.prompt_template):
+            return None
+        rules = None if tool_usage_rules is None else _blocks_fingerprint([tool_usage_rules])
+        return self.prompt_template, _blocks_fingerprint(self.blocks), _blocks_fingerprint(self.file_blocks), rules
+
     def compile(self, tool_usage_rules=None) -> str:
         """Generate a string representation of the memory in-context using the Jinja2 template"""
-        template = Template(self.prompt_template)
-        return template.render(blocks=self.blocks, file_blocks=self.file_blocks, tool_usage_rules=tool_usage_rules)
+        key = self.fingerprint(tool_usage_rules=tool_usage_rules)
+        if key is not None and key in _compiled_memory_cache:
+            _compiled_memory_cache.move_to_end(key)
+            return _compiled_memory_cache[key]
+
+        compiled = _get_template(self.prompt_template).render(
+            blocks=self.blocks, file_blocks=self.file_blocks, tool_usage_rules=tool_usage_rules
+        )
+        if key is not None:
+            _compiled_memory_cache[key] = compiled
+            if len(_compiled_memory_cache) > _COMPILED_MEMORY_CACHE_SIZE:
+                _compiled_memory_cache.popitem(last=False)
+        return compiled
 
     def list_block_labels(self) -> List[str]:
         """Return a list of the block names held inside the memory object"""
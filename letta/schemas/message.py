@@ -172,6 +172,9 @@ class Message(BaseMessage):
     group_id: Optional[str] = Field(None, description="The multi-agent group that the message was sent in")
     sender_id: Optional[str] = Field(None, description="The id of the sender of the message, can be an identity id or agent id")
     batch_item_id: Optional[str] = Field(None, description="The id of the LLMBatchItem that this message is associated with")
+    token_counts: Optional[Dict[str, int]] = Field(
+        None, description="Cached prompt token count of the message, keyed by tokenizer family (tiktoken encoding name)."
+    )
     # This overrides the optional base orm schema, created_at MUST exist on all messages objects
     created_at: datetime = Field(default_factory=get_utc_time, description="The timestamp when the object was created.")
 
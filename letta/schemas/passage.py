@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Dict, List, Optional
 
-from pydantic import Field, field_validator
+from pydantic import BaseModel, Field, field_validator
 
 from letta.constants import MAX_EMBEDDING_DIM
 from letta.helpers.datetime_helpers import get_utc_time
@@ -81,3 +81,14 @@ class PassageUpdate(PassageCreate):
     # optionally provide embeddings
     embedding: Optional[List[float]] = Field(None, description="The embedding of the passage.")
     embedding_config: Optional[EmbeddingConfig] = Field(None, description="The embedding configuration used by the passage.")
+
+
+class PassageSearchResult(BaseModel):
+    """A ranked source passage, without its embedding or metadata."""
+
+    id: str = Field(..., description="The unique identifier of the passage.")
+    source_id: Optional[str] = Field(None, description="The data source of the passage.")
+    file_id: Optional[str] = Field(None, description="The unique identifier of the file associated with the passage.")
+    file_name: Optional[str] = Field(None, description="The name of the file the passage was derived from.")
+    text: str = Field(..., description="The text of the passage.")
+    score: float = Field(..., description="Cosine similarity between the passage and the query.")
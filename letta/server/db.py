@@ -13,6 +13,7 @@ from sqlalchemy.orm import sessionmaker
 
 from letta.config import LettaConfig
 from letta.log import get_logger
+from letta.otel.query_counter import count_queries  # noqa: F401 -- registers the per-request query counter
 from letta.otel.tracing import trace_method
 from letta.settings import settings
 
@@ -3,6 +3,7 @@ import json
 import logging
 import os
 import sys
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Optional
 
@@ -18,6 +19,7 @@ from letta.constants import ADMIN_PREFIX, API_PREFIX, OPENAI_API_PREFIX
 from letta.errors import BedrockPermissionError, LettaAgentNotFoundError, LettaUserNotFoundError
 from letta.log import get_logger
 from letta.orm.errors import DatabaseTimeoutError, ForeignKeyConstraintViolationError, NoResultFound, UniqueConstraintViolationError
+from letta.otel.query_counter import count_queries
 from letta.schemas.letta_message import create_letta_message_union_schema
 from letta.schemas.letta_message_content import (
     create_letta_assistant_message_content_union_schema,
@@ -37,6 +39,7 @@ from letta.server.rest_api.routers.v1.organizations import router as organizatio
 from letta.server.rest_api.routers.v1.users import router as users_router  # TODO: decide on admin
 from letta.server.rest_api.static_files import mount_static_files
 from letta.server.server import SyncServer
+from letta.services.provider_trace_sink import ProviderTraceSink
 from letta.settings import settings
 
 # TODO(ethan)
@@ -93,6 +96,18 @@ def generate_password():
 random_password = os.getenv("LETTA_SERVER_PASSWORD") or generate_password()
 
 
+class QueryCountMiddleware(BaseHTTPMiddleware):
+    """Counts the SQL statements issued while handling each request and reports them in a response header."""
+
+    async def dispatch(self, request, call_next):
+        with count_queries() as counter:
+            response = await call_next(request)
+            # For streaming responses this covers the work done before the first chunk
+            response.headers["X-Letta-Query-Count"] = str(counter.count)
+            logger.debug(f"{request.method} {request.url.path} issued {counter.count} SQL queries")
+            return response
+
+
 class CheckPasswordMiddleware(BaseHTTPMiddleware):
 
     async def dispatch(self, request, call_next):
@@ -113,6 +128,13 @@ class CheckPasswordMiddleware(BaseHTTPMiddleware):
         )
 
 
+@asynccontextmanager
+async def lifespan(app_: FastAPI):
+    yield
+    # Traces still queued in the background sink would be lost otherwise
+    await ProviderTraceSink().flush_async()
+
+
 def create_application() -> "FastAPI":
     """the application start routine"""
     # global server
@@ -138,6 +160,7 @@ def create_application() -> "FastAPI":
         summary="Create LLM agents with long-term memory and custom tools 📚🦙",
         version="1.0.0",  # TODO wire this up to the version in the package
         debug=debug_mode,  # if True, the stack trace will be printed in the response
+        lifespan=lifespan,
     )
 
     @app.exception_handler(IncompatibleAgentType)
@@ -242,6 +265,9 @@ def create_application() -> "FastAPI":
         print(f"▶ Using secure mode with password: {random_password}")
         app.add_middleware(CheckPasswordMiddleware)
 
+    if settings.track_db_queries:
+        app.add_middleware(QueryCountMiddleware)
+
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.cors_origins,
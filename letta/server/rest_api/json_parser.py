@@ -1,6 +1,8 @@
 import json
+import re
 from abc import ABC, abstractmethod
-from typing import Any
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
 
 from pydantic_core import from_json
 
@@ -226,6 +228,247 @@ class OptimisticJSONParser(JSONParser):
         raise decode_error
 
 
+@dataclass
+class JSONFragmentUpdate:
+    """What one fragment fed to an `IncrementalJSONParser` added to the object."""
+
+    # newly decoded text of top-level string values, by key
+    string_deltas: Dict[str, str] = field(default_factory=dict)
+    # top-level values that were completed by this fragment, by key
+    completed: Dict[str, Any] = field(default_factory=dict)
+
+
+class IncrementalJSONParser:
+    """
+    Resumable parser for a JSON object that arrives in fragments, e.g. streamed tool call arguments.
+
+    Re-running `OptimisticJSONParser` / `PydanticJSONParser` over the accumulated text on every fragment is quadratic in
+    the argument length. This parser keeps its state between fragments instead, so each character is looked at once:
+    top-level string values are decoded as they arrive and reported as deltas, and other values (numbers, literals,
+    nested objects and arrays) are buffered until they end and then parsed once. Input that isn't a JSON object stops
+    producing updates.
+    """
+
+    _BEFORE_OBJECT = "before_object"
+    _EXPECT_KEY = "expect_key"
+    _KEY = "key"
+    _EXPECT_COLON = "expect_colon"
+    _EXPECT_VALUE = "expect_value"
+    _STRING_VALUE = "string_value"
+    _RAW_VALUE = "raw_value"
+    _EXPECT_COMMA = "expect_comma"
+    _DONE = "done"
+    _INVALID = "invalid"
+
+    _WHITESPACE = " \t\r\n"
+    _STRING_SPECIAL = re.compile(r'["\\]')
+    _ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+    def __init__(self):
+        self._state = self._BEFORE_OBJECT
+        self._key: Optional[str] = None
+        self._key_chunks: List[str] = []
+        # escape sequence in progress inside a string: "" right after the backslash, then "u" plus the hex digits seen
+        self._escape: Optional[str] = None
+        self._high_surrogate: Optional[int] = None
+        # buffered text of a non-string value
+        self._raw: List[str] = []
+        self._raw_depth = 0
+        self._raw_in_string = False
+        self._raw_escaped = False
+
+        self._string_chunks: Dict[str, List[str]] = {}
+        self._values: Dict[str, Any] = {}
+        # keys whose value has started, in order
+        self.keys: List[str] = []
+
+    @property
+    def done(self) -> bool:
+        return self._state == self._DONE
+
+    @property
+    def current(self) -> Dict[str, Any]:
+        """The object parsed so far: partial strings are included as is, unfinished non-string values as None."""
+        result = {}
+        for key in self.keys:
+            if key in self._values:
+                result[key] = self._values[key]
+            elif key in self._string_chunks:
+                result[key] = "".join(self._string_chunks[key])
+            else:
+                result[key] = None
+        return result
+
+    def feed(self, fragment: str) -> JSONFragmentUpdate:
+        update = JSONFragmentUpdate()
+        i, n = 0, len(fragment)
+        while i < n:
+            state = self._state
+            if state in (self._KEY, self._STRING_VALUE):
+                i = self._consume_string(fragment, i, update)
+                continue
+            if state == self._RAW_VALUE:
+                i = self._consume_raw(fragment, i, update)
+                continue
+            if state in (self._DONE, self._INVALID):
+                break
+
+            c = fragment[i]
+            if c in self._WHITESPACE:
+                i += 1
+                continue
+            if state == self._BEFORE_OBJECT and c == "{":
+                self._state = self._EXPECT_KEY
+            elif state == self._EXPECT_KEY and c == '"':
+                self._key_chunks = []
+                self._state = self._KEY
+            elif state in (self._EXPECT_KEY, self._EXPECT_COMMA) and c == "}":
+                self._state = self._DONE
+            elif state == self._EXPECT_COLON and c == ":":
+                self._state = self._EXPECT_VALUE
+            elif state == self._EXPECT_COMMA and c == ",":
+                self._state = self._EXPECT_KEY
+            elif state == self._EXPECT_VALUE:
+                self._values.pop(self._key, None)
+                self._string_chunks.pop(self._key, None)
+                if self._key not in self.keys:
+                    self.keys.append(self._key)
+                if c == '"':
+                    self._string_chunks[self._key] = []
+                    self._state = self._STRING_VALUE
+                else:
+                    # Not consumed here: the raw scanner needs to see the opening character
+                    self._raw, self._raw_depth, self._raw_in_string, self._raw_escaped = [], 0, False, False
+                    self._state = self._RAW_VALUE
+                    continue
+            else:
+                logger.warning(f"IncrementalJSONParser: unexpected {c!r} in state {state}, ignoring the rest of the input")
+                self._state = self._INVALID
+            i += 1
+        return update
+
+    def _consume_string(self, fragment: str, i: int, update: JSONFragmentUpdate) -> int:
+        pieces: List[str] = []
+        closed = False
+        n = len(fragment)
+        while i < n:
+            if self._escape is not None:
+                i = self._consume_escape(fragment, i, pieces)
+                continue
+            match = self._STRING_SPECIAL.search(fragment, i)
+            end = match.start() if match else n
+            if end > i:
+                self._append(pieces, fragment[i:end])
+            i = end
+            if match is None:
+                break
+            i += 1
+            if fragment[end] == "\\":
+                self._escape = ""
+            else:
+                closed = True
+                break
+
+        if closed and self._high_surrogate is not None:
+            self._append(pieces, "")
+        text = "".join(pieces)
+        if self._state == self._KEY:
+            self._key_chunks.append(text)
+            if closed:
+                self._key = "".join(self._key_chunks)
+                self._state = self._EXPECT_COLON
+            return i
+
+        if text:
+            self._string_chunks[self._key].append(text)
+            update.string_deltas[self._key] = update.string_deltas.get(self._key, "") + text
+        if closed:
+            self._finish_value("".join(self._string_chunks.pop(self._key)), update)
+        return i
+
+    def _consume_escape(self, fragment: str, i: int, pieces: List[str]) -> int:
+        if self._escape == "":
+            c = fragment[i]
+            if c == "u":
+                self._escape = "u"
+            else:
+                self._escape = None
+                self._append(pieces, self._ESCAPES.get(c, c))
+            return i + 1
+
+        taken = fragment[i : i + 5 - len(self._escape)]
+        self._escape += taken
+        if len(self._escape) == 5:
+            sequence, self._escape = self._escape, None
+            try:
+                code = int(sequence[1:], 16)
+            except ValueError:
+                self._append(pieces, "\\" + sequence)
+                return i + len(taken)
+            if 0xD800 <= code < 0xDC00:
+                self._append(pieces, "")
+                self._high_surrogate = code
+            elif 0xDC00 <= code < 0xE000 and self._high_surrogate is not None:
+                pieces.append(chr(0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)))
+                self._high_surrogate = None
+            else:
+                self._append(pieces, chr(code))
+        return i + len(taken)
+
+    def _append(self, pieces: List[str], text: str) -> None:
+        if self._high_surrogate is not None:
+            # A high surrogate not followed by its low half; keep it as is
+            pieces.append(chr(self._high_surrogate))
+            self._high_surrogate = None
+        if text:
+            pieces.append(text)
+
+    def _consume_raw(self, fragment: str, i: int, update: JSONFragmentUpdate) -> int:
+        start, n = i, len(fragment)
+        while i < n:
+            c = fragment[i]
+            if self._raw_in_string:
+                if self._raw_escaped:
+                    self._raw_escaped = False
+                elif c == "\\":
+                    self._raw_escaped = True
+                elif c == '"':
+                    self._raw_in_string = False
+            elif c == '"':
+                self._raw_in_string = True
+            elif c in "{[":
+                self._raw_depth += 1
+            elif c in "}]":
+                if self._raw_depth == 0:
+                    # The end of the enclosing object terminates a scalar; leave it for the outer state
+                    break
+                self._raw_depth -= 1
+                if self._raw_depth == 0:
+                    i += 1
+                    break
+            elif self._raw_depth == 0 and (c == "," or c in self._WHITESPACE):
+                break
+            i += 1
+        else:
+            self._raw.append(fragment[start:])
+            return n
+
+        self._raw.append(fragment[start:i])
+        text = "".join(self._raw)
+        self._raw = []
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError:
+            value = text
+        self._finish_value(value, update)
+        return i
+
+    def _finish_value(self, value: Any, update: JSONFragmentUpdate) -> None:
+        self._values[self._key] = value
+        update.completed[self._key] = value
+        self._state = self._EXPECT_COMMA
+
+
 # TODO: Keeping this around for posterity
 # def main():
 #     test_string = '{"inner_thoughts":}'
@@ -12,10 +12,11 @@ from pydantic import Field
 from sqlalchemy.exc import IntegrityError, OperationalError
 from starlette.responses import Response, StreamingResponse
 
-from letta.agents.letta_agent import LettaAgent
+from letta.agents.letta_agent import AGENT_LOOP_RELATIONSHIPS, LettaAgent
 from letta.constants import DEFAULT_MAX_STEPS, DEFAULT_MESSAGE_TOOL, DEFAULT_MESSAGE_TOOL_KWARG, LETTA_MODEL_ENDPOINT
 from letta.groups.sleeptime_multi_agent_v2 import SleeptimeMultiAgentV2
 from letta.helpers.datetime_helpers import get_utc_timestamp_ns
+from letta.jobs.run_queue import RUN_REQUEST_METADATA_KEY, get_run_queue
 from letta.log import get_logger
 from letta.orm.errors import NoResultFound
 from letta.otel.context import get_ctx_attributes
@@ -673,8 +674,10 @@ async def send_message(
     MetricRegistry().user_message_counter.add(1, get_ctx_attributes())
 
     actor = await server.user_manager.get_actor_or_default_async(actor_id=actor_id)
-    # TODO: This is redundant, remove soon
-    agent = await server.agent_manager.get_agent_by_id_async(agent_id, actor, include_relationships=["multi_agent_group"])
+    # Load everything the agent loop needs up front and hand it over, so the agent is only hydrated once per request
+    agent = await server.agent_manager.get_agent_by_id_async(
+        agent_id, actor, include_relationships=["multi_agent_group", *AGENT_LOOP_RELATIONSHIPS]
+    )
     agent_eligible = agent.multi_agent_group is None or agent.multi_agent_group.manager_type in ["sleeptime", "voice_sleeptime"]
     model_compatible = agent.llm_config.model_endpoint_type in ["anthropic", "openai", "together", "google_ai", "google_vertex", "bedrock"]
 
@@ -690,6 +693,7 @@ async def send_message(
                 job_manager=server.job_manager,
                 actor=actor,
                 group=agent.multi_agent_group,
+                agent_state=agent,
             )
         else:
             agent_loop = LettaAgent(
@@ -702,6 +706,7 @@ async def send_message(
                 actor=actor,
                 step_manager=server.step_manager,
                 telemetry_manager=server.telemetry_manager if settings.llm_api_logging else NoopTelemetryManager(),
+                agent_state=agent,
             )
 
         result = await agent_loop.step(
@@ -756,8 +761,10 @@ async def send_message_streaming(
     MetricRegistry().user_message_counter.add(1, get_ctx_attributes())
 
     actor = await server.user_manager.get_actor_or_default_async(actor_id=actor_id)
-    # TODO: This is redundant, remove soon
-    agent = await server.agent_manager.get_agent_by_id_async(agent_id, actor, include_relationships=["multi_agent_group"])
+    # Load everything the agent loop needs up front and hand it over, so the agent is only hydrated once per request
+    agent = await server.agent_manager.get_agent_by_id_async(
+        agent_id, actor, include_relationships=["multi_agent_group", *AGENT_LOOP_RELATIONSHIPS]
+    )
     agent_eligible = agent.multi_agent_group is None or agent.multi_agent_group.manager_type in ["sleeptime", "voice_sleeptime"]
     model_compatible = agent.llm_config.model_endpoint_type in ["anthropic", "openai", "together", "google_ai", "google_vertex", "bedrock"]
     model_compatible_token_streaming = agent.llm_config.model_endpoint_type in ["anthropic", "openai", "bedrock"]
@@ -777,6 +784,7 @@ async def send_message_streaming(
                 step_manager=server.step_manager,
                 telemetry_manager=server.telemetry_manager if settings.llm_api_logging else NoopTelemetryManager(),
                 group=agent.multi_agent_group,
+                agent_state=agent,
             )
         else:
             agent_loop = LettaAgent(
@@ -789,6 +797,7 @@ async def send_message_streaming(
                 actor=actor,
                 step_manager=server.step_manager,
                 telemetry_manager=server.telemetry_manager if settings.llm_api_logging else NoopTelemetryManager(),
+                agent_state=agent,
             )
         from letta.server.rest_api.streaming_response import StreamingResponseWithStatusCode
 
@@ -847,7 +856,9 @@ async def process_message_background(
     """Background task to process the message and update job status."""
     request_start_timestamp_ns = get_utc_timestamp_ns()
     try:
-        agent = await server.agent_manager.get_agent_by_id_async(agent_id, actor, include_relationships=["multi_agent_group"])
+        agent = await server.agent_manager.get_agent_by_id_async(
+            agent_id, actor, include_relationships=["multi_agent_group", *AGENT_LOOP_RELATIONSHIPS]
+        )
         agent_eligible = agent.multi_agent_group is None or agent.multi_agent_group.manager_type in ["sleeptime", "voice_sleeptime"]
         model_compatible = agent.llm_config.model_endpoint_type in [
             "anthropic",
@@ -869,6 +880,7 @@ async def process_message_background(
                     job_manager=server.job_manager,
                     actor=actor,
                     group=agent.multi_agent_group,
+                    agent_state=agent,
                 )
             else:
                 agent_loop = LettaAgent(
@@ -881,6 +893,7 @@ async def process_message_background(
                     actor=actor,
                     step_manager=server.step_manager,
                     telemetry_manager=server.telemetry_manager if settings.llm_api_logging else NoopTelemetryManager(),
+                    agent_state=agent,
                 )
 
             result = await agent_loop.step(
@@ -941,15 +954,27 @@ async def send_message_async(
     MetricRegistry().user_message_counter.add(1, get_ctx_attributes())
     actor = await server.user_manager.get_actor_or_default_async(actor_id=actor_id)
 
+    run_queue = await get_run_queue()
+    metadata = {
+        "job_type": "send_message_async",
+        "agent_id": agent_id,
+    }
+    if run_queue is not None:
+        if settings.run_queue_max_pending is not None and await run_queue.size_async() >= settings.run_queue_max_pending:
+            raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Too many queued runs, please retry later.")
+        # Workers rebuild the request from the run itself
+        metadata[RUN_REQUEST_METADATA_KEY] = {
+            "agent_id": agent_id,
+            "messages": [message.model_dump(mode="json") for message in request.messages],
+            "max_steps": request.max_steps,
+        }
+
     # Create a new job
     run = Run(
         user_id=actor.id,
-        status=JobStatus.created,
+        status=JobStatus.created if run_queue is None else JobStatus.pending,
         callback_url=request.callback_url,
-        metadata={
-            "job_type": "send_message_async",
-            "agent_id": agent_id,
-        },
+        metadata=metadata,
         request_config=LettaRequestConfig(
             use_assistant_message=request.use_assistant_message,
             assistant_message_tool_name=request.assistant_message_tool_name,
@@ -959,6 +984,10 @@ async def send_message_async(
     )
     run = await server.job_manager.create_job_async(pydantic_job=run, actor=actor)
 
+    if run_queue is not None:
+        await run_queue.enqueue_async(run.id)
+        return run
+
     # Create asyncio task for background processing
     asyncio.create_task(
         process_message_background(
@@ -277,6 +277,95 @@ def create_letta_messages_from_llm_response(
     return messages
 
 
+class ToolCallResult(BaseModel):
+    """An executed tool call of an LLM turn, for `create_letta_messages_from_parallel_llm_response`."""
+
+    tool_call_id: str
+    function_name: str
+    function_arguments: Dict
+    tool_execution_result: ToolExecutionResult
+    function_response: Optional[str]
+
+
+def create_letta_messages_from_parallel_llm_response(
+    agent_id: str,
+    model: str,
+    tool_call_results: List[ToolCallResult],
+    timezone: str,
+    actor: User,
+    continue_stepping: bool = False,
+    heartbeat_reason: Optional[str] = None,
+    reasoning_content: Optional[List[Union[TextContent, ReasoningContent, RedactedReasoningContent, OmittedReasoningContent]]] = None,
+    step_id: str | None = None,
+) -> List[Message]:
+    """
+    Like `create_letta_messages_from_llm_response`, for a turn with several tool calls: one assistant message carrying
+    all of the calls, followed by one tool message per call in call order.
+    """
+    messages = []
+    tool_calls = []
+    for result in tool_call_results:
+        # Force set request_heartbeat in tool_args to calculated continue_stepping
+        result.function_arguments[REQUEST_HEARTBEAT_PARAM] = continue_stepping
+        tool_calls.append(
+            OpenAIToolCall(
+                id=result.tool_call_id,
+                function=OpenAIFunction(name=result.function_name, arguments=json.dumps(result.function_arguments)),
+                type="function",
+            )
+        )
+    assistant_message = Message(
+        role=MessageRole.assistant,
+        content=reasoning_content if reasoning_content else [],
+        organization_id=actor.organization_id,
+        agent_id=agent_id,
+        model=model,
+        tool_calls=tool_calls,
+        tool_call_id=tool_calls[0].id,
+        created_at=get_utc_time(),
+    )
+    messages.append(assistant_message)
+
+    for result in tool_call_results:
+        tool_message = Message(
+            role=MessageRole.tool,
+            content=[
+                TextContent(text=package_function_response(result.tool_execution_result.success_flag, result.function_response, timezone))
+            ],
+            organization_id=actor.organization_id,
+            agent_id=agent_id,
+            model=model,
+            tool_calls=[],
+            tool_call_id=result.tool_call_id,
+            created_at=get_utc_time(),
+            name=result.function_name,
+            tool_returns=[
+                ToolReturn(
+                    status=result.tool_execution_result.status,
+                    stderr=result.tool_execution_result.stderr,
+                    stdout=result.tool_execution_result.stdout,
+                )
+            ],
+        )
+        messages.append(tool_message)
+
+    if continue_stepping:
+        heartbeat_system_message = create_heartbeat_system_message(
+            agent_id=agent_id,
+            model=model,
+            function_call_success=all(result.tool_execution_result.success_flag for result in tool_call_results),
+            actor=actor,
+            timezone=timezone,
+            heartbeat_reason=heartbeat_reason,
+        )
+        messages.append(heartbeat_system_message)
+
+    for message in messages:
+        message.step_id = step_id
+
+    return messages
+
+
 def create_heartbeat_system_message(
     agent_id: str,
     model: str,
@@ -95,6 +95,7 @@ from letta.services.mcp.sse_client import MCP_CONFIG_TOPLEVEL_KEY, AsyncSSEMCPCl
 from letta.services.mcp.stdio_client import AsyncStdioMCPClient
 from letta.services.mcp_manager import MCPManager
 from letta.services.message_manager import MessageManager
+from letta.services.model_catalog import ModelCatalog
 from letta.services.organization_manager import OrganizationManager
 from letta.services.passage_manager import PassageManager
 from letta.services.provider_manager import ProviderManager
@@ -224,6 +225,7 @@ class SyncServer(Server):
         self.telemetry_manager = TelemetryManager()
         self.file_agent_manager = FileAgentManager()
         self.file_manager = FileManager()
+        self.model_catalog = ModelCatalog()
 
         # A resusable httpx client
         timeout = httpx.Timeout(connect=10.0, read=20.0, write=10.0, pool=10.0)
@@ -393,10 +395,6 @@ class SyncServer(Server):
         """Initialize the MCP clients (there may be multiple)"""
         self.mcp_clients: Dict[str, AsyncBaseMCPClient] = {}
 
-        # TODO: Remove these in memory caches
-        self._llm_config_cache = {}
-        self._embedding_config_cache = {}
-
         # TODO: Replace this with the Anthropic client we have in house
         self.anthropic_async_client = AsyncAnthropic()
 
@@ -750,31 +748,39 @@ class SyncServer(Server):
 
     @trace_method
     def get_cached_llm_config(self, actor: User, **kwargs):
-        key = make_key(**kwargs)
-        if key not in self._llm_config_cache:
-            self._llm_config_cache[key] = self.get_llm_config_from_handle(actor=actor, **kwargs)
-        return self._llm_config_cache[key]
+        key = ("llm", make_key(**kwargs))
+        llm_config = self.model_catalog.get_resolved(actor.organization_id, key)
+        if llm_config is None:
+            llm_config = self.get_llm_config_from_handle(actor=actor, **kwargs)
+            self.model_catalog.put_resolved(actor.organization_id, key, llm_config)
+        return llm_config
 
     @trace_method
     async def get_cached_llm_config_async(self, actor: User, **kwargs):
-        key = make_key(**kwargs)
-        if key not in self._llm_config_cache:
-            self._llm_config_cache[key] = await self.get_llm_config_from_handle_async(actor=actor, **kwargs)
-        return self._llm_config_cache[key]
+        key = ("llm", make_key(**kwargs))
+        llm_config = self.model_catalog.get_resolved(actor.organization_id, key)
+        if llm_config is None:
+            llm_config = await self.get_llm_config_from_handle_async(actor=actor, **kwargs)
+            self.model_catalog.put_resolved(actor.organization_id, key, llm_config)
+        return llm_config
 
     @trace_method
     def get_cached_embedding_config(self, actor: User, **kwargs):
-        key = make_key(**kwargs)
-        if key not in self._embedding_config_cache:
-            self._embedding_config_cache[key] = self.get_embedding_config_from_handle(actor=actor, **kwargs)
-        return self._embedding_config_cache[key]
+        key = ("embedding", make_key(**kwargs))
+        embedding_config = self.model_catalog.get_resolved(actor.organization_id, key)
+        if embedding_config is None:
+            embedding_config = self.get_embedding_config_from_handle(actor=actor, **kwargs)
+            self.model_catalog.put_resolved(actor.organization_id, key, embedding_config)
+        return embedding_config
 
     @trace_method
     async def get_cached_embedding_config_async(self, actor: User, **kwargs):
-        key = make_key(**kwargs)
-        if key not in self._embedding_config_cache:
-            self._embedding_config_cache[key] = await self.get_embedding_config_from_handle_async(actor=actor, **kwargs)
-        return self._embedding_config_cache[key]
+        key = ("embedding", make_key(**kwargs))
+        embedding_config = self.model_catalog.get_resolved(actor.organization_id, key)
+        if embedding_config is None:
+            embedding_config = await self.get_embedding_config_from_handle_async(actor=actor, **kwargs)
+            self.model_catalog.put_resolved(actor.organization_id, key, embedding_config)
+        return embedding_config
 
     @trace_method
     def create_agent(
@@ -1603,7 +1609,7 @@ class SyncServer(Server):
             actor=actor,
         ):
             try:
-                llm_models.extend(provider.list_llm_models())
+                llm_models.extend(self.model_catalog.list_llm_models(provider))
             except Exception as e:
                 import traceback
 
@@ -1634,7 +1640,7 @@ class SyncServer(Server):
 
         async def get_provider_models(provider: Provider) -> list[LLMConfig]:
             try:
-                return await provider.list_llm_models_async()
+                return await self.model_catalog.list_llm_models_async(provider)
             except Exception as e:
                 import traceback
 
@@ -1661,7 +1667,7 @@ class SyncServer(Server):
         embedding_models = []
         for provider in self.get_enabled_providers(actor):
             try:
-                embedding_models.extend(provider.list_embedding_models())
+                embedding_models.extend(self.model_catalog.list_embedding_models(provider))
             except Exception as e:
                 warnings.warn(f"An error occurred while listing embedding models for provider {provider}: {e}")
         return embedding_models
@@ -1677,7 +1683,7 @@ class SyncServer(Server):
         async def get_provider_embedding_models(provider):
             try:
                 # All providers now have list_embedding_models_async
-                return await provider.list_embedding_models_async()
+                return await self.model_catalog.list_embedding_models_async(provider)
             except Exception as e:
                 import traceback
 
@@ -1767,11 +1773,12 @@ class SyncServer(Server):
             provider_name, model_name = handle.split("/", 1)
             provider = self.get_provider_from_name(provider_name, actor)
 
-            llm_configs = [config for config in provider.list_llm_models() if config.handle == handle]
+            all_llm_configs = self.model_catalog.list_llm_models(provider)
+            llm_configs = [config for config in all_llm_configs if config.handle == handle]
             if not llm_configs:
-                llm_configs = [config for config in provider.list_llm_models() if config.model == model_name]
+                llm_configs = [config for config in all_llm_configs if config.model == model_name]
             if not llm_configs:
-                available_handles = [config.handle for config in provider.list_llm_models()]
+                available_handles = [config.handle for config in all_llm_configs]
                 raise HandleNotFoundError(handle, available_handles)
         except ValueError as e:
             llm_configs = [config for config in self.get_local_llm_configs() if config.handle == handle]
@@ -1821,7 +1828,7 @@ class SyncServer(Server):
             provider_name, model_name = handle.split("/", 1)
             provider = await self.get_provider_from_name_async(provider_name, actor)
 
-            all_llm_configs = await provider.list_llm_models_async()
+            all_llm_configs = await self.model_catalog.list_llm_models_async(provider)
             llm_configs = [config for config in all_llm_configs if config.handle == handle]
             if not llm_configs:
                 llm_configs = [config for config in all_llm_configs if config.model == model_name]
@@ -1870,7 +1877,7 @@ class SyncServer(Server):
             provider_name, model_name = handle.split("/", 1)
             provider = self.get_provider_from_name(provider_name, actor)
 
-            embedding_configs = [config for config in provider.list_embedding_models() if config.handle == handle]
+            embedding_configs = [config for config in self.model_catalog.list_embedding_models(provider) if config.handle == handle]
             if not embedding_configs:
                 raise ValueError(f"Embedding model {model_name} is not supported by {provider_name}")
         except ValueError as e:
@@ -1899,7 +1906,7 @@ class SyncServer(Server):
             provider_name, model_name = handle.split("/", 1)
             provider = await self.get_provider_from_name_async(provider_name, actor)
 
-            all_embedding_configs = await provider.list_embedding_models_async()
+            all_embedding_configs = await self.model_catalog.list_embedding_models_async(provider)
             embedding_configs = [config for config in all_embedding_configs if config.handle == handle]
             if not embedding_configs:
                 raise ValueError(f"Embedding model {model_name} is not supported by {provider_name}")
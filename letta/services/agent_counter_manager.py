@@ -0,0 +1,208 @@
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.sql.dml import Delete, Insert
+
+from letta.helpers.singleton import singleton
+from letta.log import get_logger
+from letta.orm.agent import Agent as AgentModel
+from letta.orm.agent_counters import AgentCounters
+from letta.orm.message import Message as MessageModel
+from letta.orm.passage import AgentPassage
+from letta.orm.sqlalchemy_base import on_bulk_copy
+from letta.otel.tracing import trace_method
+from letta.schemas.user import User as PydanticUser
+from letta.server.db import db_registry
+from letta.settings import settings
+
+logger = get_logger(__name__)
+
+# Counted table -> counter column
+_COUNTER_COLUMNS = {
+    MessageModel.__tablename__: AgentCounters.__table__.c.message_count,
+    AgentPassage.__tablename__: AgentCounters.__table__.c.archival_passage_count,
+}
+_COUNTED_MODELS = {
+    MessageModel.__tablename__: MessageModel,
+    AgentPassage.__tablename__: AgentPassage,
+}
+
+
+@singleton
+class AgentCounterManager:
+    """
+    Serves per-agent message and archival passage counts from the `agent_counters` table.
+
+    Counts are kept up to date by the session listeners below, inside the same transaction as the rows they count
+    (ORM inserts/deletes adjust them by the flushed delta, bulk INSERTs by the rows they write per agent, bulk DELETEs
+    by a grouped count of the rows they match).
+    A missing or NULL count is computed with COUNT(*) on first read, and `reconcile_async` periodically repairs any
+    drift left by concurrent first reads.
+    """
+
+    @trace_method
+    async def get_message_count_async(self, agent_id: str, actor: PydanticUser) -> int:
+        return await self._get_count_async(MessageModel.__tablename__, agent_id=agent_id, actor=actor)
+
+    @trace_method
+    async def get_archival_passage_count_async(self, agent_id: str, actor: PydanticUser) -> int:
+        return await self._get_count_async(AgentPassage.__tablename__, agent_id=agent_id, actor=actor)
+
+    async def _get_count_async(self, table_name: str, agent_id: str, actor: PydanticUser) -> int:
+        column = _COUNTER_COLUMNS[table_name]
+        model = _COUNTED_MODELS[table_name]
+        async with db_registry.async_session() as session:
+            query = (
+                select(column)
+                .join(AgentModel, AgentModel.id == AgentCounters.agent_id)
+                .where(AgentCounters.agent_id == agent_id, AgentModel.organization_id == actor.organization_id)
+            )
+            count = await session.scalar(query)
+            if count is not None:
+                return count
+
+            count = await model.size_async(db_session=session, actor=actor, agent_id=agent_id)
+            owned = select(AgentModel.id).where(AgentModel.id == agent_id, AgentModel.organization_id == actor.organization_id)
+            if await session.scalar(owned) is None:
+                return count
+
+            # Only fill in unknown counts: anything set meanwhile was maintained transactionally and wins
+            await session.execute(self._insert_ignore(session, {"agent_id": agent_id}))
+            await session.execute(
+                update(AgentCounters).where(AgentCounters.agent_id == agent_id, column.is_(None)).values({column.name: count})
+            )
+            await session.commit()
+            return count
+
+    @staticmethod
+    def _insert_ignore(session, row: dict):
+        if session.bind.dialect.name == "postgresql":
+            return pg_insert(AgentCounters).values(row).on_conflict_do_nothing()
+        return AgentCounters.__table__.insert().values(row).prefix_with("OR IGNORE")
+
+    @trace_method
+    async def reconcile_async(self, batch_size: int = 500) -> int:
+        """Recompute every stored count from the counted tables. Returns the number of counter rows visited."""
+        visited = 0
+        after: Optional[str] = None
+        while True:
+            async with db_registry.async_session() as session:
+                query = select(AgentCounters.agent_id).order_by(AgentCounters.agent_id).limit(batch_size)
+                if after is not None:
+                    query = query.where(AgentCounters.agent_id > after)
+                agent_ids = list((await session.execute(query)).scalars())
+                if not agent_ids:
+                    return visited
+
+                # A correlated subquery recounts and stores in one statement, so no increment can slip in between
+                values = {}
+                for table_name, column in _COUNTER_COLUMNS.items():
+                    model = _COUNTED_MODELS[table_name]
+                    values[column.name] = (
+                        select(func.count()).select_from(model).where(model.agent_id == AgentCounters.agent_id).scalar_subquery()
+                    )
+                await session.execute(update(AgentCounters).where(AgentCounters.agent_id.in_(agent_ids)).values(values))
+                await session.commit()
+
+            visited += len(agent_ids)
+            after = agent_ids[-1]
+
+
+async def reconcile_agent_counters() -> None:
+    """Scheduled job entry point (see `letta.jobs.scheduler`)."""
+    visited = await AgentCounterManager().reconcile_async(batch_size=settings.agent_counter_reconcile_batch_size)
+    logger.info("Reconciled %d agent counter rows", visited)
+
+
+# ======================================================================================================================
+# Session event listeners
+# ======================================================================================================================
+def _apply_deltas(session: Session, deltas: Dict[Tuple[str, str], int]) -> None:
+    connection = session.connection()
+    for (table_name, agent_id), delta in deltas.items():
+        if delta:
+            column = _COUNTER_COLUMNS[table_name]
+            connection.execute(update(AgentCounters).where(AgentCounters.agent_id == agent_id).values({column.name: column + delta}))
+
+
+@event.listens_for(Session, "after_flush")
+def _count_flushed_rows(session: Session, flush_context) -> None:
+    deltas: Dict[Tuple[str, str], int] = defaultdict(int)
+    new_agent_ids: List[str] = []
+    for sign, objects in ((1, session.new), (-1, session.deleted)):
+        for obj in objects:
+            table_name = getattr(getattr(obj, "__table__", None), "name", None)
+            if table_name in _COUNTER_COLUMNS and obj.agent_id is not None:
+                deltas[(table_name, obj.agent_id)] += sign
+            elif sign > 0 and isinstance(obj, AgentModel):
+                new_agent_ids.append(obj.id)
+
+    if new_agent_ids:
+        # Brand new agents start from known (zero) counts
+        session.connection().execute(
+            AgentCounters.__table__.insert(),
+            [{"agent_id": agent_id, "message_count": 0, "archival_passage_count": 0} for agent_id in new_agent_ids],
+        )
+    if deltas:
+        _apply_deltas(session, deltas)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _count_bulk_statements(state: ORMExecuteState) -> None:
+    statement = state.statement
+    if not isinstance(statement, (Insert, Delete)):
+        return
+    table_name = getattr(getattr(statement, "table", None), "name", None)
+    if table_name not in _COUNTER_COLUMNS:
+        return
+
+    column = _COUNTER_COLUMNS[table_name]
+    if isinstance(statement, Delete):
+        # Count what the DELETE is about to remove, within the same transaction
+        table = statement.table
+        query = select(table.c.agent_id, func.count()).group_by(table.c.agent_id)
+        if statement.whereclause is not None:
+            query = query.where(statement.whereclause)
+        rows = state.session.connection().execute(query, state.parameters or {}).all()
+        _apply_deltas(state.session, {(table_name, agent_id): -count for agent_id, count in rows if agent_id is not None})
+    else:
+        agent_ids = _inserted_agent_ids(statement, state.parameters)
+        if agent_ids is not None:
+            _count_inserted_rows(state.session, table_name, agent_ids)
+        else:
+            # The rows (e.g. of an INSERT ... SELECT) can't be attributed; forget the counts so they are recomputed on read
+            state.session.connection().execute(update(AgentCounters).values({column.name: None}))
+
+
+@on_bulk_copy
+def _count_copied_rows(session: Session, table_name: str, rows: List[dict]) -> None:
+    if table_name in _COUNTER_COLUMNS:
+        _count_inserted_rows(session, table_name, [row.get("agent_id") for row in rows])
+
+
+def _count_inserted_rows(session: Session, table_name: str, agent_ids: List[Optional[str]]) -> None:
+    deltas: Dict[Tuple[str, str], int] = defaultdict(int)
+    for agent_id in agent_ids:
+        if agent_id is not None:
+            deltas[(table_name, agent_id)] += 1
+    _apply_deltas(session, deltas)
+
+
+def _inserted_agent_ids(statement: Insert, parameters) -> Optional[List[Optional[str]]]:
+    """The agent_id of each row the INSERT writes, or None if the statement doesn't tell."""
+    if statement.select is not None:
+        return None
+    rows = parameters if isinstance(parameters, (list, tuple)) else [parameters or {}]
+    if all("agent_id" in row for row in rows):
+        return [row["agent_id"] for row in rows]
+
+    # Values given with `.values(...)`: one bind per row, suffixed with the row number for multi-row VALUES
+    bound = statement.compile().params
+    agent_ids = [value for key, value in bound.items() if key == "agent_id" or re.fullmatch(r"agent_id_m\d+", key)]
+    if len(agent_ids) == 1:
+        return agent_ids * len(rows)
+    return agent_ids or None
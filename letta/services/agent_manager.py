@@ -38,6 +38,7 @@ from letta.orm.errors import NoResultFound
 from letta.orm.sandbox_config import AgentEnvironmentVariable
 from letta.orm.sandbox_config import AgentEnvironmentVariable as AgentEnvironmentVariableModel
 from letta.orm.sqlalchemy_base import AccessType
+from letta.orm.sqlite_functions import adapt_array
 from letta.otel.tracing import trace_method
 from letta.schemas.agent import AgentState as PydanticAgentState
 from letta.schemas.agent import AgentType, CreateAgent, UpdateAgent, get_prompt_template_for_agent_type
@@ -53,6 +54,7 @@ from letta.schemas.message import Message
 from letta.schemas.message import Message as PydanticMessage
 from letta.schemas.message import MessageCreate, MessageUpdate
 from letta.schemas.passage import Passage as PydanticPassage
+from letta.schemas.passage import PassageSearchResult
 from letta.schemas.source import Source as PydanticSource
 from letta.schemas.tool import Tool as PydanticTool
 from letta.schemas.tool_rule import ContinueToolRule, TerminalToolRule
@@ -62,6 +64,7 @@ from letta.serialize_schemas.marshmallow_message import SerializedMessageSchema
 from letta.serialize_schemas.marshmallow_tool import SerializedToolSchema
 from letta.serialize_schemas.pydantic_agent_schema import AgentSchema
 from letta.server.db import db_registry
+from letta.services.agent_state_cache import AgentStateCache
 from letta.services.block_manager import BlockManager
 from letta.services.context_window_calculator.context_window_calculator import ContextWindowCalculator
 from letta.services.context_window_calculator.token_counter import AnthropicTokenCounter, TiktokenCounter
@@ -80,6 +83,7 @@ from letta.services.helpers.agent_manager_helper import (
     check_supports_structured_output,
     compile_system_message,
     derive_system_message,
+    embed_query_text_async,
     initialize_message_sequence,
     package_initial_message_sequence,
 )
@@ -88,6 +92,8 @@ from letta.services.message_manager import MessageManager
 from letta.services.passage_manager import PassageManager
 from letta.services.source_manager import SourceManager
 from letta.services.tool_manager import ToolManager
+from letta.services.vector_index_manager import VectorIndexManager
+from letta.settings import settings
 from letta.utils import enforce_types, united_diff
 
 logger = get_logger(__name__)
@@ -730,6 +736,9 @@ class AgentManager:
         new_idents = set(agent_update.identity_ids or [])
         new_tags = set(agent_update.tags or [])
 
+        cache = AgentStateCache()
+        since = cache.checkpoint()
+
         async with db_registry.async_session() as session, session.begin():
 
             agent: AgentModel = await AgentModel.read_async(db_session=session, identifier=agent_id, actor=actor)
@@ -833,7 +842,11 @@ class AgentManager:
             await session.flush()
             await session.refresh(agent)
 
-            return await agent.to_pydantic_async()
+            agent_state = await agent.to_pydantic_async()
+            if cache.enabled:
+                # Steps update message_ids every turn; keep the cached state warm instead of just invalidating it
+                cache.write_through(session, agent_state, agent.organization_id, since=since)
+            return agent_state
 
     # TODO: Make this general and think about how to roll this into sqlalchemybase
     @trace_method
@@ -1083,9 +1096,23 @@ class AgentManager:
         include_relationships: Optional[List[str]] = None,
     ) -> PydanticAgentState:
         """Fetch an agent by its ID."""
+        cache = AgentStateCache()
+        if cache.enabled:
+            agent_state = await cache.get_async(agent_id, actor=actor, include_relationships=include_relationships)
+            if agent_state is not None:
+                return agent_state
+            since = cache.checkpoint()
+
         async with db_registry.async_session() as session:
             agent = await AgentModel.read_async(db_session=session, identifier=agent_id, actor=actor)
-            return await agent.to_pydantic_async(include_relationships=include_relationships)
+            if not cache.enabled:
+                return await agent.to_pydantic_async(include_relationships=include_relationships)
+            # Relationships are eagerly loaded anyway, so cache the full state and serve any subset from it
+            agent_state = await agent.to_pydantic_async()
+            organization_id = agent.organization_id
+
+        await cache.put_async(agent_state, organization_id, since=since)
+        return cache.narrow(agent_state, include_relationships)
 
     @trace_method
     @enforce_types
@@ -1146,6 +1173,7 @@ class AgentManager:
                     sleeptime_agent_group = GroupModel.read(db_session=session, identifier=agent.multi_agent_group.id, actor=actor)
                     sleeptime_group_to_delete = sleeptime_agent_group
 
+            deleted_agent_ids = [agent.id for agent in agents_to_delete]
             try:
                 if sleeptime_group_to_delete is not None:
                     session.delete(sleeptime_group_to_delete)
@@ -1158,6 +1186,8 @@ class AgentManager:
                 logger.exception(f"Failed to hard delete Agent with ID {agent_id}")
                 raise ValueError(f"Failed to hard delete Agent with ID {agent_id}: {e}")
             else:
+                for deleted_agent_id in deleted_agent_ids:
+                    VectorIndexManager().drop("agent", deleted_agent_id)
                 logger.debug(f"Agent with ID {agent_id} successfully hard deleted")
 
     @trace_method
@@ -1196,6 +1226,7 @@ class AgentManager:
                     )
                     sleeptime_group_to_delete = sleeptime_agent_group
 
+            deleted_agent_ids = [agent.id for agent in agents_to_delete]
             try:
                 if sleeptime_group_to_delete is not None:
                     await session.delete(sleeptime_group_to_delete)
@@ -1208,6 +1239,8 @@ class AgentManager:
                 logger.exception(f"Failed to hard delete Agent with ID {agent_id}")
                 raise ValueError(f"Failed to hard delete Agent with ID {agent_id}: {e}")
             else:
+                for deleted_agent_id in deleted_agent_ids:
+                    VectorIndexManager().drop("agent", deleted_agent_id)
                 logger.debug(f"Agent with ID {agent_id} successfully hard deleted")
 
     @trace_method
@@ -1697,6 +1730,19 @@ class AgentManager:
         block_ids = [b.id for b in agent_state.memory.blocks]
         file_block_names = [b.label for b in agent_state.memory.file_blocks]
 
+        cache = AgentStateCache()
+        if cache.enabled:
+            # Any write to these blocks since they were cached would have evicted the entry
+            cached = await cache.get_async(agent_state.id, actor=actor, include_relationships=["memory"])
+            if (
+                cached is not None
+                and [b.id for b in cached.memory.blocks] == block_ids
+                and [b.label for b in cached.memory.file_blocks] == file_block_names
+            ):
+                agent_state.memory.blocks = cached.memory.blocks
+                agent_state.memory.file_blocks = cached.memory.file_blocks
+                return agent_state
+
         if block_ids:
             blocks = await self.block_manager.get_all_blocks_by_ids_async(block_ids=[b.id for b in agent_state.memory.blocks], actor=actor)
             agent_state.memory.blocks = [b for b in blocks if b is not None]
@@ -2154,6 +2200,101 @@ class AgentManager:
 
             return [p.to_pydantic() for p in passages]
 
+    @staticmethod
+    def _can_use_vector_index(*range_filters) -> bool:
+        """The ANN indexes rank by similarity only, so date ranges and cursors still go through SQL."""
+        return VectorIndexManager().enabled and not any(range_filters)
+
+    @staticmethod
+    async def _embed_query_async(query_text: Optional[str], embedding_config: Optional[EmbeddingConfig]) -> List[float]:
+        assert embedding_config is not None, "embedding_config must be specified for vector search"
+        assert query_text is not None, "query_text must be specified for vector search"
+        return await embed_query_text_async(embedding_config, query_text)
+
+    @staticmethod
+    async def _vector_index_scopes_async(
+        agent_id: Optional[str],
+        source_id: Optional[str],
+        file_id: Optional[str],
+        include_agent_passages: bool = True,
+        include_source_passages: bool = True,
+    ) -> Optional[List[Tuple[str, str]]]:
+        """The ANN indexes a search has to consult, or None if the search isn't partitioned into indexes."""
+        scopes = []
+        # Agent passages have no source/file, so any source or file filter excludes them
+        if include_agent_passages and agent_id and not source_id and not file_id:
+            scopes.append(("agent", agent_id))
+        if include_source_passages:
+            if agent_id:
+                async with db_registry.async_session() as session:
+                    result = await session.execute(select(SourcesAgents.source_id).where(SourcesAgents.agent_id == agent_id))
+                    source_ids = [sid for sid in result.scalars().all() if not source_id or sid == source_id]
+            elif source_id:
+                source_ids = [source_id]
+            else:
+                # org-wide search isn't partitioned into indexes
+                return None
+            scopes.extend(("source", sid) for sid in source_ids)
+        return scopes
+
+    async def _search_passages_with_vector_index_async(
+        self,
+        actor: PydanticUser,
+        query_embedding: List[float],
+        embedding_config: EmbeddingConfig,
+        limit: Optional[int],
+        agent_id: Optional[str] = None,
+        source_id: Optional[str] = None,
+        file_id: Optional[str] = None,
+        include_agent_passages: bool = True,
+        include_source_passages: bool = True,
+    ) -> Optional[List[PydanticPassage]]:
+        """
+        Serve a vector search from the per-agent / per-source ANN indexes instead of scanning the passages table.
+
+        Returns None when the indexes can't answer the query exactly, in which case the caller falls back to SQL.
+        """
+        scopes = await self._vector_index_scopes_async(
+            agent_id=agent_id,
+            source_id=source_id,
+            file_id=file_id,
+            include_agent_passages=include_agent_passages,
+            include_source_passages=include_source_passages,
+        )
+        if scopes is None:
+            return None
+        if not scopes:
+            return []
+
+        vector_index_manager = VectorIndexManager()
+        # Oversample when post-filtering by file so that the filter doesn't starve the result set
+        k = limit * 4 if limit and file_id else limit
+
+        for _ in range(2):
+            hits = await vector_index_manager.search_async(scopes, query_embedding, embedding_config.embedding_dim, k, actor)
+            passages_by_id = {}
+            async with db_registry.async_session() as session:
+                for scope, model in (("agent", AgentPassage), ("source", SourcePassage)):
+                    ids = [passage_id for hit_scope, _, passage_id, _ in hits if hit_scope == scope]
+                    for i in range(0, len(ids), 500):
+                        query = select(model).where(model.id.in_(ids[i : i + 500]), model.organization_id == actor.organization_id)
+                        passages_by_id.update({p.id: p for p in (await session.execute(query)).scalars().all()})
+
+            # Rows removed by cascading deletes (e.g. file deletion) linger in the index until seen here
+            stale = [(scope, scope_id, passage_id) for scope, scope_id, passage_id, _ in hits if passage_id not in passages_by_id]
+            for scope, scope_id, passage_id in stale:
+                vector_index_manager.discard(scope, scope_id, [passage_id])
+            if not stale or k is None:
+                break
+
+        passages = [passages_by_id[hit[2]] for hit in hits if hit[2] in passages_by_id]
+        if file_id:
+            passages = [p for p in passages if p.file_id == file_id]
+        if k is not None and len(hits) == k and len(passages) < limit:
+            # The index may hold more matches beyond the candidates we scored
+            return None
+        return [p.to_pydantic() for p in passages[:limit]]
+
     @trace_method
     @enforce_types
     async def list_passages_async(
@@ -2174,6 +2315,21 @@ class AgentManager:
         agent_only: bool = False,
     ) -> List[PydanticPassage]:
         """Lists all passages attached to an agent."""
+        query_embedding = await self._embed_query_async(query_text, embedding_config) if embed_query else None
+        if embed_query and self._can_use_vector_index(start_date, end_date, before, after):
+            passages = await self._search_passages_with_vector_index_async(
+                actor=actor,
+                query_embedding=query_embedding,
+                embedding_config=embedding_config,
+                limit=limit,
+                agent_id=agent_id,
+                source_id=source_id,
+                file_id=file_id,
+                include_source_passages=not agent_only,
+            )
+            if passages is not None:
+                return passages
+
         async with db_registry.async_session() as session:
             main_query = build_passage_query(
                 actor=actor,
@@ -2189,6 +2345,7 @@ class AgentManager:
                 ascending=ascending,
                 embedding_config=embedding_config,
                 agent_only=agent_only,
+                query_embedding=query_embedding,
             )
 
             # Add limit
@@ -2234,6 +2391,21 @@ class AgentManager:
         embedding_config: Optional[EmbeddingConfig] = None,
     ) -> List[PydanticPassage]:
         """Lists all passages attached to an agent."""
+        query_embedding = await self._embed_query_async(query_text, embedding_config) if embed_query else None
+        if embed_query and self._can_use_vector_index(start_date, end_date, before, after):
+            passages = await self._search_passages_with_vector_index_async(
+                actor=actor,
+                query_embedding=query_embedding,
+                embedding_config=embedding_config,
+                limit=limit,
+                agent_id=agent_id,
+                source_id=source_id,
+                file_id=file_id,
+                include_agent_passages=False,
+            )
+            if passages is not None:
+                return passages
+
         async with db_registry.async_session() as session:
             main_query = build_source_passage_query(
                 actor=actor,
@@ -2248,6 +2420,7 @@ class AgentManager:
                 embed_query=embed_query,
                 ascending=ascending,
                 embedding_config=embedding_config,
+                query_embedding=query_embedding,
             )
 
             # Add limit
@@ -2263,6 +2436,126 @@ class AgentManager:
             # Convert to Pydantic models
             return [p.to_pydantic() for p in passages]
 
+    @trace_method
+    @enforce_types
+    async def search_source_passages_async(
+        self,
+        actor: PydanticUser,
+        query_text: str,
+        embedding_config: EmbeddingConfig,
+        limit: int = 10,
+        offset: int = 0,
+        min_similarity: Optional[float] = None,
+        agent_id: Optional[str] = None,
+        source_id: Optional[str] = None,
+        file_id: Optional[str] = None,
+    ) -> List[PassageSearchResult]:
+        """
+        Semantic search over source passages, returning a page of the most similar as lightweight rows (no embeddings).
+
+        `limit`, `offset` and the `min_similarity` threshold are applied by the vector index or the database, so only
+        the returned passages are ever materialized.
+        """
+        query_embedding = await self._embed_query_async(query_text, embedding_config)
+        max_distance = 1 - min_similarity if min_similarity is not None else None
+        projection = (SourcePassage.id, SourcePassage.source_id, SourcePassage.file_id, SourcePassage.file_name, SourcePassage.text)
+
+        if VectorIndexManager().enabled:
+            results = await self._search_source_passage_rows_with_vector_index_async(
+                actor=actor,
+                query_embedding=query_embedding,
+                embedding_config=embedding_config,
+                limit=limit,
+                offset=offset,
+                max_distance=max_distance,
+                projection=projection,
+                agent_id=agent_id,
+                source_id=source_id,
+                file_id=file_id,
+            )
+            if results is not None:
+                return results
+
+        if settings.letta_pg_uri_no_default:
+            distance = SourcePassage.embedding.cosine_distance(query_embedding)
+        else:
+            distance = func.cosine_distance(SourcePassage.embedding, adapt_array(query_embedding))
+        query = select(*projection, distance.label("distance")).where(SourcePassage.organization_id == actor.organization_id)
+        if agent_id is not None:
+            query = query.join(SourcesAgents, SourcesAgents.source_id == SourcePassage.source_id).where(SourcesAgents.agent_id == agent_id)
+        if source_id:
+            query = query.where(SourcePassage.source_id == source_id)
+        if file_id:
+            query = query.where(SourcePassage.file_id == file_id)
+        if max_distance is not None:
+            query = query.where(distance <= max_distance)
+        query = query.order_by(distance.asc(), SourcePassage.id.asc()).offset(offset).limit(limit)
+
+        async with db_registry.async_session() as session:
+            rows = (await session.execute(query)).all()
+        return [
+            PassageSearchResult(
+                id=row.id, source_id=row.source_id, file_id=row.file_id, file_name=row.file_name, text=row.text, score=1 - row.distance
+            )
+            for row in rows
+        ]
+
+    async def _search_source_passage_rows_with_vector_index_async(
+        self,
+        actor: PydanticUser,
+        query_embedding: List[float],
+        embedding_config: EmbeddingConfig,
+        limit: int,
+        offset: int,
+        max_distance: Optional[float],
+        projection: Tuple,
+        agent_id: Optional[str] = None,
+        source_id: Optional[str] = None,
+        file_id: Optional[str] = None,
+    ) -> Optional[List[PassageSearchResult]]:
+        """`search_source_passages_async` served from the ANN indexes; None when SQL has to answer instead."""
+        scopes = await self._vector_index_scopes_async(
+            agent_id=agent_id, source_id=source_id, file_id=file_id, include_agent_passages=False
+        )
+        if scopes is None:
+            return None
+        if not scopes:
+            return []
+
+        vector_index_manager = VectorIndexManager()
+        # Oversample when post-filtering by file so that the filter doesn't starve the result set
+        k = (offset + limit) * 4 if file_id else offset + limit
+        hits = await vector_index_manager.search_async(scopes, query_embedding, embedding_config.embedding_dim, k, actor)
+        # Hits come back nearest first, so once one falls outside the threshold the index holds no further matches
+        exhausted = len(hits) < k or (max_distance is not None and any(hit[3] > max_distance for hit in hits))
+        if max_distance is not None:
+            hits = [hit for hit in hits if hit[3] <= max_distance]
+
+        async with db_registry.async_session() as session:
+            query = select(*projection).where(
+                SourcePassage.id.in_([hit[2] for hit in hits]), SourcePassage.organization_id == actor.organization_id
+            )
+            rows_by_id = {row.id: row for row in (await session.execute(query)).all()}
+
+        # Rows removed by cascading deletes (e.g. file deletion) linger in the index until seen here
+        stale = [(scope, scope_id, passage_id) for scope, scope_id, passage_id, _ in hits if passage_id not in rows_by_id]
+        for scope, scope_id, passage_id in stale:
+            vector_index_manager.discard(scope, scope_id, [passage_id])
+        if file_id:
+            rows_by_id = {passage_id: row for passage_id, row in rows_by_id.items() if row.file_id == file_id}
+
+        results = [
+            PassageSearchResult(
+                id=row.id, source_id=row.source_id, file_id=row.file_id, file_name=row.file_name, text=row.text, score=1 - distance
+            )
+            for _, _, passage_id, distance in hits
+            if (row := rows_by_id.get(passage_id)) is not None
+        ]
+        if len(results) < offset + limit and not exhausted:
+            # Filtered or stale candidates left us short, and the index may hold more matches beyond them
+            return None
+        return results[offset : offset + limit]
+
     @trace_method
     @enforce_types
     async def list_agent_passages_async(
@@ -2280,6 +2573,19 @@ class AgentManager:
         embedding_config: Optional[EmbeddingConfig] = None,
     ) -> List[PydanticPassage]:
         """Lists all passages attached to an agent."""
+        query_embedding = await self._embed_query_async(query_text, embedding_config) if embed_query else None
+        if embed_query and agent_id and self._can_use_vector_index(start_date, end_date, before, after):
+            passages = await self._search_passages_with_vector_index_async(
+                actor=actor,
+                query_embedding=query_embedding,
+                embedding_config=embedding_config,
+                limit=limit,
+                agent_id=agent_id,
+                include_source_passages=False,
+            )
+            if passages is not None:
+                return passages
+
         async with db_registry.async_session() as session:
             main_query = build_agent_passage_query(
                 actor=actor,
@@ -2292,6 +2598,7 @@ class AgentManager:
                 embed_query=embed_query,
                 ascending=ascending,
                 embedding_config=embedding_config,
+                query_embedding=query_embedding,
             )
 
             # Add limit
@@ -2364,6 +2671,7 @@ class AgentManager:
         embedding_config: Optional[EmbeddingConfig] = None,
         agent_only: bool = False,
     ) -> int:
+        query_embedding = await self._embed_query_async(query_text, embedding_config) if embed_query else None
         async with db_registry.async_session() as session:
             main_query = build_passage_query(
                 actor=actor,
@@ -2379,6 +2687,7 @@ class AgentManager:
                 ascending=ascending,
                 embedding_config=embedding_config,
                 agent_only=agent_only,
+                query_embedding=query_embedding,
             )
 
             # Convert to count query
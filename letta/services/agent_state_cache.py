@@ -0,0 +1,376 @@
+import asyncio
+import re
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Deque, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.dml import Insert, UpdateBase
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, ColumnClause
+
+from letta.data_sources.redis_client import NoopAsyncRedisClient, get_redis_client
+from letta.helpers.singleton import singleton
+from letta.log import get_logger
+from letta.otel.tracing import trace_method
+from letta.schemas.agent import AgentState as PydanticAgentState
+from letta.schemas.memory import Memory
+from letta.schemas.user import User as PydanticUser
+from letta.settings import settings
+
+logger = get_logger(__name__)
+
+REDIS_VERSION_PREFIX = "agent_state_cache:"
+
+# A token names something an AgentState is built from, e.g. ("block", "block-123"). ("*", "*") stands for everything.
+Token = Tuple[str, str]
+ALL = ("*", "*")
+
+# Tables whose rows are entities that end up inside an AgentState, keyed by their `id`
+_ENTITY_TABLES = {
+    "agents": "agent",
+    "block": "block",
+    "tools": "tool",
+    "sources": "source",
+    "identities": "identity",
+    "groups": "group",
+}
+# Columns that reference one of those entities (pivot tables, files, environment variables, ...)
+_REFERENCE_COLUMNS = {
+    "agent_id": "agent",
+    "block_id": "block",
+    "tool_id": "tool",
+    "source_id": "source",
+    "identity_id": "identity",
+    "group_id": "group",
+}
+_TRACKED_TABLES = set(_ENTITY_TABLES) | {
+    "agents_tags",
+    "blocks_agents",
+    "tools_agents",
+    "sources_agents",
+    "identities_agents",
+    "groups_agents",
+    "groups_blocks",
+    "agent_environment_variables",
+    "files",
+    "files_agents",
+    "organizations",
+}
+# Bind parameters of multi-row INSERT ... VALUES are suffixed with the row number
+_MULTI_VALUES_PARAM = re.compile(r"^(.*?)(?:_m\d+)?$")
+
+_PENDING_TOKENS = "agent_state_cache_tokens"
+_PENDING_WRITE_THROUGH = "agent_state_cache_write_through"
+
+
+@dataclass
+class _Entry:
+    state: PydanticAgentState
+    organization_id: str
+    dependencies: FrozenSet[Token]
+    remote_versions: Optional[Tuple[Optional[str], ...]] = None
+
+
+@singleton
+class AgentStateCache:
+    """
+    Bounded, process-local cache of hydrated `AgentState`s, so steady-state agent steps don't reload unchanged
+    tools, blocks and sources from the database.
+
+    Entries are invalidated from SQLAlchemy session events: every committed write to an agent, block, tool, source,
+    identity or group (or a pivot table between them) evicts the agents built from it, no matter which manager issued
+    it. When Redis is configured, commits also bump per-entity version counters there, and cached entries are validated
+    against those counters before being served, so writes made by other processes are picked up as well.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._dependents: Dict[Token, Set[str]] = {}
+        # Recent invalidations, used to reject loads that raced with a write
+        self._sequence = 0
+        self._invalidations: Deque[Tuple[int, Token]] = deque(maxlen=4096)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.agent_state_cache_size > 0
+
+    def checkpoint(self) -> int:
+        """Mark the start of a load; pass the result to `put_async` so the result is dropped if a write raced with it."""
+        return self._sequence
+
+    @trace_method
+    async def get_async(
+        self, agent_id: str, actor: PydanticUser, include_relationships: Optional[List[str]] = None
+    ) -> Optional[PydanticAgentState]:
+        """Return a private copy of the cached agent state, or None on a miss."""
+        self._loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._entries.get(agent_id)
+            if entry is None or entry.organization_id != actor.organization_id:
+                return None
+            self._entries.move_to_end(agent_id)
+
+        if await self._uses_redis():
+            if entry.remote_versions is None:
+                # Written through by a local commit whose remote versions are still being recorded
+                return None
+            if await self._get_remote_versions(entry.dependencies) != entry.remote_versions:
+                self._evict(agent_id)
+                return None
+
+        return self.narrow(entry.state, include_relationships).model_copy(deep=True)
+
+    @trace_method
+    async def put_async(
+        self,
+        agent_state: PydanticAgentState,
+        organization_id: str,
+        since: int,
+    ) -> None:
+        """
+        Cache a freshly loaded agent state (with all relationships included), unless something it depends on was
+        written since `since`.
+        """
+        self._loop = asyncio.get_running_loop()
+        dependencies = self._dependencies(agent_state)
+        remote_versions = await self._get_remote_versions(dependencies) if await self._uses_redis() else None
+        entry = _Entry(agent_state.model_copy(deep=True), organization_id, dependencies, remote_versions)
+        with self._lock:
+            if not self._changed_since(dependencies, since):
+                self._store(agent_state.id, entry)
+
+    def write_through(self, session, agent_state: PydanticAgentState, organization_id: str, since: int) -> None:
+        """Cache `agent_state` once the session's transaction commits (it is discarded on rollback)."""
+        session.info[_PENDING_WRITE_THROUGH] = (agent_state.model_copy(deep=True), organization_id, since)
+
+    @staticmethod
+    def narrow(agent_state: PydanticAgentState, include_relationships: Optional[List[str]]) -> PydanticAgentState:
+        """Drop the relationships that weren't asked for, as `Agent.to_pydantic_async` would have."""
+        if include_relationships is None:
+            return agent_state
+        update = {field: [] for field in ("tags", "tools", "sources", "identity_ids", "tool_exec_environment_variables")}
+        update["multi_agent_group"] = None
+        update["memory"] = Memory(blocks=[], file_blocks=agent_state.memory.file_blocks, prompt_template=agent_state.memory.prompt_template)
+        for field in include_relationships:
+            update.pop(field, None)
+        return agent_state.model_copy(update=update)
+
+    def invalidate(self, tokens: Iterable[Token]) -> None:
+        """Evict every entry built from any of `tokens`."""
+        with self._lock:
+            self._invalidate_locked(set(tokens))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._dependents.clear()
+
+    # ======================================================================================================================
+    # Bookkeeping (callers hold self._lock)
+    # ======================================================================================================================
+    @staticmethod
+    def _dependencies(agent_state: PydanticAgentState) -> FrozenSet[Token]:
+        tokens = {ALL, ("agent", agent_state.id)}
+        tokens.update(("block", block.id) for block in agent_state.memory.blocks)
+        tokens.update(("tool", tool.id) for tool in agent_state.tools)
+        tokens.update(("source", source.id) for source in agent_state.sources)
+        tokens.update(("identity", identity_id) for identity_id in agent_state.identity_ids or [])
+        if agent_state.multi_agent_group is not None:
+            tokens.add(("group", agent_state.multi_agent_group.id))
+        return frozenset(tokens)
+
+    def _changed_since(self, dependencies: FrozenSet[Token], since: int) -> bool:
+        if since < self._sequence and (not self._invalidations or self._invalidations[0][0] > since + 1):
+            # The log no longer reaches back to the checkpoint
+            return True
+        return any(sequence > since and token in dependencies for sequence, token in self._invalidations)
+
+    def _store(self, key: str, entry: _Entry) -> None:
+        self._evict_locked(key)
+        self._entries[key] = entry
+        for token in entry.dependencies:
+            self._dependents.setdefault(token, set()).add(key)
+        while len(self._entries) > settings.agent_state_cache_size:
+            self._evict_locked(next(iter(self._entries)))
+
+    def _evict(self, key: str) -> None:
+        with self._lock:
+            self._evict_locked(key)
+
+    def _evict_locked(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for token in entry.dependencies:
+            dependents = self._dependents.get(token)
+            if dependents is not None:
+                dependents.discard(key)
+                if not dependents:
+                    del self._dependents[token]
+
+    def _invalidate_locked(self, tokens: Set[Token]) -> None:
+        if not tokens:
+            return
+        self._sequence += 1
+        for token in tokens:
+            self._invalidations.append((self._sequence, token))
+            for key in list(self._dependents.get(token, ())):
+                self._evict_locked(key)
+
+    # ======================================================================================================================
+    # Commit hooks
+    # ======================================================================================================================
+    def _on_commit(self, tokens: Set[Token], write_through: Optional[Tuple[PydanticAgentState, str, int]]) -> None:
+        entry = None
+        with self._lock:
+            if write_through is not None:
+                agent_state, organization_id, since = write_through
+                dependencies = self._dependencies(agent_state)
+                # Check for concurrent writes before applying this transaction's own invalidations
+                if not self._changed_since(dependencies, since):
+                    entry = _Entry(agent_state, organization_id, dependencies)
+            self._invalidate_locked(tokens)
+            if entry is not None:
+                self._store(agent_state.id, entry)
+
+        if tokens and settings.redis_host is not None:
+            self._schedule(self._publish_async(tokens, entry))
+
+    def _schedule(self, coro) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            coro.close()
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            task = loop.create_task(coro)
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            # Commit from a sync session running in a worker thread
+            asyncio.run_coroutine_threadsafe(coro, loop)
+
+    # ======================================================================================================================
+    # Cross-process invalidation
+    # ======================================================================================================================
+    @staticmethod
+    async def _uses_redis() -> bool:
+        if settings.redis_host is None:
+            return False
+        return not isinstance(await get_redis_client(), NoopAsyncRedisClient)
+
+    @staticmethod
+    def _redis_key(token: Token) -> str:
+        kind, identifier = token
+        return f"{REDIS_VERSION_PREFIX}{kind}:{identifier}"
+
+    async def _get_remote_versions(self, dependencies: FrozenSet[Token]) -> Optional[Tuple[Optional[str], ...]]:
+        redis_client = await get_redis_client()
+        versions = await redis_client.mget(*[self._redis_key(token) for token in sorted(dependencies)])
+        return None if versions is None else tuple(versions)
+
+    async def _publish_async(self, tokens: Set[Token], write_through: Optional[_Entry]) -> None:
+        redis_client = await get_redis_client()
+        if isinstance(redis_client, NoopAsyncRedisClient):
+            return
+        try:
+            for token in tokens:
+                await redis_client.incr(self._redis_key(token))
+        except Exception as e:
+            logger.warning("Failed to publish agent state invalidation to Redis: %s", e)
+            return
+
+        if write_through is not None:
+            # Only servable once we know which remote versions it corresponds to
+            write_through.remote_versions = await self._get_remote_versions(write_through.dependencies)
+
+
+# ======================================================================================================================
+# Session event listeners
+# ======================================================================================================================
+def _values_to_ids(value) -> List[str]:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [str(v) for v in value if v is not None]
+    return [] if value is None else [str(value)]
+
+
+def _row_tokens(table_name: str, row: Dict[str, object]) -> Set[Token]:
+    tokens = set()
+    if table_name in _ENTITY_TABLES and "id" in row:
+        tokens.update((_ENTITY_TABLES[table_name], v) for v in _values_to_ids(row["id"]))
+    for column, kind in _REFERENCE_COLUMNS.items():
+        if column in row:
+            tokens.update((kind, v) for v in _values_to_ids(row[column]))
+    return tokens
+
+
+def _statement_tokens(state: ORMExecuteState) -> Set[Token]:
+    """Tokens touched by a Core / bulk INSERT, UPDATE or DELETE; falls back to everything when they can't be told."""
+    statement = state.statement
+    table_name = getattr(getattr(statement, "table", None), "name", None)
+    if table_name not in _TRACKED_TABLES:
+        return set()
+
+    row: Dict[str, List[object]] = {}
+    # executemany-style parameters, e.g. session.execute(insert(Model), [{...}, ...])
+    parameters = state.parameters if isinstance(state.parameters, list) else [state.parameters or {}]
+    for params in parameters:
+        for name, value in params.items():
+            row.setdefault(name, []).append(value)
+
+    if isinstance(statement, Insert):
+        compiled = statement.compile(dialect=state.session.get_bind().dialect)
+        for name, value in compiled.params.items():
+            row.setdefault(_MULTI_VALUES_PARAM.match(name).group(1), []).append(value)
+    elif statement.whereclause is not None:
+        for node in visitors.iterate(statement.whereclause):
+            if isinstance(node, BinaryExpression) and isinstance(node.left, ColumnClause) and isinstance(node.right, BindParameter):
+                row.setdefault(node.left.name, []).extend(_values_to_ids(node.right.effective_value))
+
+    tokens = _row_tokens(table_name, row)
+    return tokens or {ALL}
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement(state: ORMExecuteState) -> None:
+    if isinstance(state.statement, UpdateBase) and AgentStateCache().enabled:
+        state.session.info.setdefault(_PENDING_TOKENS, set()).update(_statement_tokens(state))
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    if not AgentStateCache().enabled:
+        return
+    tokens = session.info.setdefault(_PENDING_TOKENS, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table_name = getattr(getattr(obj, "__table__", None), "name", None)
+        if table_name not in _TRACKED_TABLES or (obj in session.dirty and not session.is_modified(obj)):
+            continue
+        if table_name == "organizations":
+            tokens.add(ALL)
+            continue
+        row = {column: getattr(obj, column, None) for column in ("id", *_REFERENCE_COLUMNS) if hasattr(obj, column)}
+        tokens.update(_row_tokens(table_name, row))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_on_commit(session: Session) -> None:
+    tokens = session.info.pop(_PENDING_TOKENS, set())
+    write_through = session.info.pop(_PENDING_WRITE_THROUGH, None)
+    if tokens or write_through is not None:
+        AgentStateCache()._on_commit(tokens, write_through)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_on_rollback(session: Session, previous_transaction) -> None:
+    # Keep pending tokens (over-invalidating is harmless), but never cache state from a rolled back transaction
+    session.info.pop(_PENDING_WRITE_THROUGH, None)
@@ -0,0 +1,101 @@
+import json
+from typing import Any, Dict, List, Optional
+
+import tiktoken
+
+from letta.log import get_logger
+from letta.schemas.llm_config import LLMConfig
+from letta.schemas.message import Message
+from letta.services.context_window_calculator.token_counting_service import TokenCountingService
+from letta.utils import get_tiktoken_encoding
+
+logger = get_logger(__name__)
+
+# Every message follows <|start|>{role/name}\n{content}<|end|>\n
+TOKENS_PER_MESSAGE = 3
+
+
+def tokenizer_family(llm_config: LLMConfig) -> str:
+    """
+    The tiktoken encoding used to estimate prompt sizes for `llm_config`. Models tiktoken doesn't know (e.g. Anthropic,
+    Gemini, local models) share the cl100k_base estimate.
+    """
+    return get_tiktoken_encoding(llm_config.model).name
+
+
+def try_tokenizer_family(llm_config: LLMConfig) -> Optional[str]:
+    """`tokenizer_family`, or None if its encoding can't be loaded (tiktoken downloads encodings on first use)."""
+    try:
+        return tokenizer_family(llm_config)
+    except Exception as e:
+        logger.warning(f"Failed to load the tokenizer for {llm_config.model}, skipping token counting: {e}")
+        return None
+
+
+def _count_value_tokens(encoding: tiktoken.Encoding, value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(encoding.encode(value))
+    if isinstance(value, list):
+        # Multi-part content: only text parts are counted, images are billed separately by the provider
+        return sum(_count_value_tokens(encoding, part.get("text")) for part in value if isinstance(part, dict))
+    return len(encoding.encode(json.dumps(value)))
+
+
+def count_message_tokens(message: Message, family: str) -> int:
+    """Token estimate of `message` as sent in a chat completion request."""
+    encoding = tiktoken.get_encoding(family)
+    num_tokens = TOKENS_PER_MESSAGE
+    for key, value in message.to_openai_dict().items():
+        if key == "tool_calls" and value:
+            for tool_call in value:
+                num_tokens += _count_value_tokens(encoding, tool_call["function"]["name"])
+                num_tokens += _count_value_tokens(encoding, tool_call["function"]["arguments"])
+        elif key != "role":
+            num_tokens += _count_value_tokens(encoding, value)
+    return num_tokens
+
+
+def ensure_token_counts(messages: List[Message], family: str) -> List[Message]:
+    """
+    Fill in the cached `family` token count on every message missing one. Returns the messages that were counted, so
+    the caller can persist the new counts.
+    """
+    counted = []
+    for message in messages:
+        if message.token_counts is None or family not in message.token_counts:
+            message.token_counts = {**(message.token_counts or {}), family: count_message_tokens(message, family)}
+            counted.append(message)
+    return counted
+
+
+async def ensure_token_counts_async(messages: List[Message], family: str) -> List[Message]:
+    """`ensure_token_counts`, tokenizing in the `TokenCountingService` pool when anything needs counting."""
+    if all(message.token_counts is not None and family in message.token_counts for message in messages):
+        return []
+    return await TokenCountingService().run_async(ensure_token_counts, messages, family)
+
+
+def get_message_tokens(message: Message, family: str) -> int:
+    if message.token_counts is not None and family in message.token_counts:
+        return message.token_counts[family]
+    return count_message_tokens(message, family)
+
+
+async def count_tool_schema_tokens_async(tool_schemas: List[Dict], llm_config: LLMConfig) -> int:
+    if not tool_schemas:
+        return 0
+    return await TokenCountingService().count_text_async(json.dumps(tool_schemas), model=llm_config.model)
+
+
+def retain_count_for_budget(messages: List[Message], family: str, budget: int) -> Optional[int]:
+    """
+    How many of the most recent `messages` fit into `budget` tokens, or None if they all do.
+    """
+    used = 0
+    for retained, message in enumerate(reversed(messages)):
+        used += get_message_tokens(message, family)
+        if used > budget:
+            return retained
+    return None
@@ -3,7 +3,7 @@ from typing import Any, Dict, List
 
 from letta.llm_api.anthropic_client import AnthropicClient
 from letta.schemas.openai.chat_completion_request import Tool as OpenAITool
-from letta.utils import count_tokens
+from letta.services.context_window_calculator.token_counting_service import TokenCountingService
 
 
 class TokenCounter(ABC):
@@ -53,31 +53,28 @@ class AnthropicTokenCounter(TokenCounter):
 
 
 class TiktokenCounter(TokenCounter):
-    """Token counter using tiktoken"""
+    """Token counter using tiktoken, offloaded to the shared `TokenCountingService` pool"""
 
     def __init__(self, model: str):
         self.model = model
+        self.service = TokenCountingService()
 
     async def count_text_tokens(self, text: str) -> int:
         if not text:
             return 0
-        return count_tokens(text)
+        return await self.service.count_text_async(text, model=self.model)
 
     async def count_message_tokens(self, messages: List[Dict[str, Any]]) -> int:
         if not messages:
             return 0
-        from letta.local_llm.utils import num_tokens_from_messages
-
-        return num_tokens_from_messages(messages=messages, model=self.model)
+        return await self.service.count_messages_async(messages, model=self.model)
 
     async def count_tool_tokens(self, tools: List[OpenAITool]) -> int:
         if not tools:
             return 0
-        from letta.local_llm.utils import num_tokens_from_functions
-
         # Extract function definitions from OpenAITool objects
         functions = [t.function.model_dump() for t in tools]
-        return num_tokens_from_functions(functions=functions, model=self.model)
+        return await self.service.count_functions_async(functions, model=self.model)
 
     def convert_messages(self, messages: List[Any]) -> List[Dict[str, Any]]:
         return [m.to_openai_dict() for m in messages]
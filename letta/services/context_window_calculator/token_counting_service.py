@@ -0,0 +1,144 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from letta.helpers.singleton import singleton
+from letta.settings import settings
+from letta.utils import get_tiktoken_encoding
+
+T = TypeVar("T")
+
+# Below this many characters, encoding inline is cheaper than handing the work to a thread
+INLINE_MAX_CHARS = 2048
+
+# Every reply is primed with <|start|>assistant<|message|> (see `num_tokens_from_messages`)
+REPLY_PRIMING_TOKENS = 3
+
+
+@singleton
+class TokenCountingService:
+    """
+    Counts tiktoken tokens without blocking the event loop.
+
+    tiktoken releases the GIL while encoding, so counting runs in a shared thread pool and concurrent counts (e.g. the
+    gathered counts of `ContextWindowCalculator`) spread across cores. At most `token_counting_max_pending` calls per
+    event loop are handed to the pool at once; further callers wait for a slot. Counts are memoized by encoding and
+    content hash, so unchanged system prompts, messages and tool schemas are only encoded once.
+    """
+
+    def __init__(self):
+        self._num_workers = settings.token_counting_workers or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(max_workers=self._num_workers, thread_name_prefix="token-counting")
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self._cache: "OrderedDict[Tuple[str, str, bytes], int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def run_async(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run a CPU-bound counting function in the pool."""
+        loop = asyncio.get_running_loop()
+        async with self._get_slots(loop):
+            return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def count_text_async(self, text: str, model: str = "gpt-4") -> int:
+        return (await self.count_texts_async([text], model=model))[0]
+
+    async def count_texts_async(self, texts: List[str], model: str = "gpt-4") -> List[int]:
+        """Token counts of `texts`, encoding only the texts that aren't memoized yet."""
+        encoding = get_tiktoken_encoding(model)
+        keys = [self._cache_key("text", encoding.name, text) for text in texts]
+        counts = self._cache_get_many(keys)
+        missing = {key: text for key, text, count in zip(keys, texts, counts) if count is None}
+        if missing:
+            computed = await self._maybe_offload(
+                lambda batch: [len(encoding.encode(text)) for text in batch], list(missing.values()), sum(map(len, missing.values()))
+            )
+            fresh = dict(zip(missing, computed))
+            self._cache_put_many(fresh)
+            counts = [fresh[key] if count is None else count for key, count in zip(keys, counts)]
+        return counts
+
+    async def count_messages_async(self, messages: List[Dict[str, Any]], model: str = "gpt-4") -> int:
+        """Same result as `num_tokens_from_messages`, memoized per message."""
+        from letta.local_llm.utils import num_tokens_from_messages
+
+        if not messages:
+            return 0
+        encoding = get_tiktoken_encoding(model)
+        serialized = [json.dumps(message, sort_keys=True, default=str) for message in messages]
+        keys = [self._cache_key(f"message:{model}", encoding.name, payload) for payload in serialized]
+        counts = self._cache_get_many(keys)
+        missing = {key: message for key, message, count in zip(keys, messages, counts) if count is None}
+        if missing:
+            computed = await self._maybe_offload(
+                lambda batch: [num_tokens_from_messages([message], model=model) - REPLY_PRIMING_TOKENS for message in batch],
+                list(missing.values()),
+                sum(len(payload) for payload, count in zip(serialized, counts) if count is None),
+            )
+            fresh = dict(zip(missing, computed))
+            self._cache_put_many(fresh)
+            counts = [fresh[key] if count is None else count for key, count in zip(keys, counts)]
+        return sum(counts) + REPLY_PRIMING_TOKENS
+
+    async def count_functions_async(self, functions: List[Dict[str, Any]], model: str = "gpt-4") -> int:
+        """Same result as `num_tokens_from_functions`, memoized per function list."""
+        from letta.local_llm.utils import num_tokens_from_functions
+
+        if not functions:
+            return 0
+        encoding = get_tiktoken_encoding(model)
+        payload = json.dumps(functions, sort_keys=True, default=str)
+        key = self._cache_key(f"functions:{model}", encoding.name, payload)
+        (count,) = self._cache_get_many([key])
+        if count is None:
+            (count,) = await self._maybe_offload(
+                lambda batch: [num_tokens_from_functions(functions=batch[0], model=model)], [functions], len(payload)
+            )
+            self._cache_put_many({key: count})
+        return count
+
+    async def _maybe_offload(self, fn: Callable[[List[Any]], List[T]], batch: List[Any], size: int) -> List[T]:
+        """Apply `fn` to `batch` inline if it is small, otherwise split it into one contiguous chunk per pool worker."""
+        if size <= INLINE_MAX_CHARS:
+            return fn(batch)
+        num_chunks = min(len(batch), self._num_workers)
+        chunk_size = -(-len(batch) // num_chunks)
+        chunks = [batch[i : i + chunk_size] for i in range(0, len(batch), chunk_size)]
+        results = await asyncio.gather(*(self.run_async(fn, chunk) for chunk in chunks))
+        return [count for chunk_counts in results for count in chunk_counts]
+
+    def _get_slots(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        # asyncio primitives are bound to the loop they are first used on
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots[loop] = asyncio.Semaphore(settings.token_counting_max_pending)
+        return slots
+
+    @staticmethod
+    def _cache_key(kind: str, encoding_name: str, payload: str) -> Tuple[str, str, bytes]:
+        return kind, encoding_name, hashlib.blake2b(payload.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def _cache_get_many(self, keys: List[Tuple[str, str, bytes]]) -> List[Optional[int]]:
+        with self._lock:
+            counts = []
+            for key in keys:
+                count = self._cache.get(key)
+                if count is not None:
+                    self._cache.move_to_end(key)
+                counts.append(count)
+            return counts
+
+    def _cache_put_many(self, counts: Dict[Tuple[str, str, bytes], int]) -> None:
+        if settings.token_count_cache_size <= 0:
+            return
+        with self._lock:
+            self._cache.update(counts)
+            for key in counts:
+                self._cache.move_to_end(key)
+            while len(self._cache) > settings.token_count_cache_size:
+                self._cache.popitem(last=False)
@@ -0,0 +1,175 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from letta.data_sources.redis_client import get_redis_client
+from letta.embeddings import embedding_model
+from letta.helpers.singleton import singleton
+from letta.log import get_logger
+from letta.otel.tracing import trace_method
+from letta.schemas.embedding_config import EmbeddingConfig
+from letta.schemas.enums import ProviderType
+from letta.settings import settings
+
+logger = get_logger(__name__)
+
+REDIS_EMBEDDING_PREFIX = "embedding:"
+
+
+@dataclass
+class _PendingBatch:
+    embedding_config: EmbeddingConfig
+    texts: Dict[str, str] = field(default_factory=dict)  # cache key -> text
+    futures: Dict[str, asyncio.Future] = field(default_factory=dict)  # cache key -> future
+    flush_handle: Optional[asyncio.TimerHandle] = None
+
+
+@singleton
+class EmbeddingManager:
+    """
+    Embeds search queries without blocking the event loop.
+
+    Concurrent requests for the same embedding model are coalesced into a single batched provider
+    call within a short window, identical texts are deduplicated (in flight and through a bounded
+    LRU/TTL cache), and results are optionally shared across processes through Redis.
+    """
+
+    def __init__(self):
+        self._cache: "OrderedDict[str, Tuple[float, List[float]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._batches: Dict[Tuple[str, str, Optional[str]], _PendingBatch] = {}
+
+    @staticmethod
+    def _batch_key(embedding_config: EmbeddingConfig) -> Tuple[str, str, Optional[str]]:
+        return embedding_config.embedding_endpoint_type, embedding_config.embedding_model, embedding_config.embedding_endpoint
+
+    @classmethod
+    def _cache_key(cls, embedding_config: EmbeddingConfig, text: str) -> str:
+        endpoint_type, model, endpoint = cls._batch_key(embedding_config)
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{endpoint_type}:{model}:{endpoint}:{text_hash}"
+
+    @trace_method
+    async def embed_query_async(self, embedding_config: EmbeddingConfig, text: str) -> List[float]:
+        """Return the (unpadded) embedding of `text` for `embedding_config`."""
+        cache_key = self._cache_key(embedding_config, text)
+
+        embedding = self._get_cached(cache_key)
+        if embedding is not None:
+            return embedding
+
+        # Someone is already embedding this exact text; share their result
+        if cache_key in self._inflight:
+            return await asyncio.shield(self._inflight[cache_key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            embedding = await self._get_redis_cached(cache_key)
+            if embedding is None:
+                self._enqueue(embedding_config, cache_key, text, future)
+                embedding = await asyncio.shield(future)
+                await self._set_redis_cached(cache_key, embedding)
+            elif not future.done():
+                future.set_result(embedding)
+            self._set_cached(cache_key, embedding)
+            return embedding
+        except BaseException as e:
+            if not future.done():
+                future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(cache_key, None)
+            if future.done() and not future.cancelled():
+                # Avoid "exception was never retrieved" warnings when nobody else was waiting
+                future.exception()
+
+    # ======================================================================================================================
+    # Batching
+    # ======================================================================================================================
+    def _enqueue(self, embedding_config: EmbeddingConfig, cache_key: str, text: str, future: asyncio.Future) -> None:
+        batch_key = self._batch_key(embedding_config)
+        batch = self._batches.get(batch_key)
+        if batch is None:
+            batch = _PendingBatch(embedding_config=embedding_config)
+            self._batches[batch_key] = batch
+            loop = asyncio.get_running_loop()
+            batch.flush_handle = loop.call_later(settings.embedding_batch_window_ms / 1000, self._flush, batch_key)
+
+        batch.texts[cache_key] = text
+        batch.futures[cache_key] = future
+        if len(batch.texts) >= settings.embedding_batch_max_size:
+            self._flush(batch_key)
+
+    def _flush(self, batch_key: Tuple[str, str, Optional[str]]) -> None:
+        batch = self._batches.pop(batch_key, None)
+        if batch is None:
+            return
+        if batch.flush_handle is not None:
+            batch.flush_handle.cancel()
+        asyncio.get_running_loop().create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: _PendingBatch) -> None:
+        cache_keys = list(batch.texts)
+        try:
+            embeddings = await self._request_embeddings(batch.embedding_config, [batch.texts[k] for k in cache_keys])
+        except Exception as e:
+            logger.warning("Embedding request for %d texts failed: %s", len(cache_keys), e)
+            for key in cache_keys:
+                if not batch.futures[key].done():
+                    batch.futures[key].set_exception(e)
+            return
+
+        for key, embedding in zip(cache_keys, embeddings):
+            if not batch.futures[key].done():
+                batch.futures[key].set_result(embedding)
+
+    @staticmethod
+    async def _request_embeddings(embedding_config: EmbeddingConfig, texts: List[str]) -> List[List[float]]:
+        if embedding_config.embedding_endpoint_type == ProviderType.openai:
+            from letta.llm_api.llm_client import LLMClient
+
+            client = LLMClient.create(provider_type=ProviderType.openai)
+            return await client.request_embeddings(texts, embedding_config)
+
+        # Other providers only expose a blocking single-text API; keep them off the event loop
+        embed_model = embedding_model(embedding_config)
+        return await asyncio.gather(*[asyncio.to_thread(embed_model.get_text_embedding, text) for text in texts])
+
+    # ======================================================================================================================
+    # Caching
+    # ======================================================================================================================
+    def _get_cached(self, cache_key: str) -> Optional[List[float]]:
+        entry = self._cache.get(cache_key)
+        if entry is None:
+            return None
+        expires_at, embedding = entry
+        if expires_at < time.monotonic():
+            del self._cache[cache_key]
+            return None
+        self._cache.move_to_end(cache_key)
+        return embedding
+
+    def _set_cached(self, cache_key: str, embedding: List[float]) -> None:
+        self._cache[cache_key] = (time.monotonic() + settings.embedding_cache_ttl_seconds, embedding)
+        self._cache.move_to_end(cache_key)
+        while len(self._cache) > settings.embedding_cache_size:
+            self._cache.popitem(last=False)
+
+    @staticmethod
+    async def _get_redis_cached(cache_key: str) -> Optional[List[float]]:
+        redis_client = await get_redis_client()
+        value = await redis_client.get(REDIS_EMBEDDING_PREFIX + cache_key)
+        return json.loads(value) if value else None
+
+    @staticmethod
+    async def _set_redis_cached(cache_key: str, embedding: List[float]) -> None:
+        redis_client = await get_redis_client()
+        try:
+            await redis_client.set(REDIS_EMBEDDING_PREFIX + cache_key, json.dumps(embedding), ex=settings.embedding_cache_ttl_seconds)
+        except Exception as e:
+            logger.warning("Failed to cache embedding in Redis: %s", e)
@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from sqlalchemy import select, update
+from sqlalchemy import func, select, update
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
@@ -101,6 +101,47 @@ class FileManager:
             except NoResultFound:
                 return None
 
+    @enforce_types
+    @trace_method
+    async def get_files_by_ids_async(
+        self, file_ids: List[str], actor: PydanticUser, *, include_content: bool = False
+    ) -> List[PydanticFileMetadata]:
+        """Retrieve several files in one query; ids that don't exist (or belong to another organization) are left out."""
+        if not file_ids:
+            return []
+        async with db_registry.async_session() as session:
+            query = select(FileMetadataModel).where(FileMetadataModel.id.in_(file_ids))
+            if include_content:
+                query = query.options(selectinload(FileMetadataModel.content))
+            query = FileMetadataModel.apply_access_predicate(query, actor, access=["read"], access_type=AccessType.ORGANIZATION)
+            result = await session.execute(query)
+            return [await file.to_pydantic_async(include_content=include_content) for file in result.scalars().all()]
+
+    @enforce_types
+    @trace_method
+    async def get_file_content_versions_async(self, file_ids: List[str], actor: PydanticUser) -> Dict[str, Tuple]:
+        """
+        Cheap fingerprints of the files' content (and the name / type that determine how it is chunked), for caches
+        keyed by content version. Files without content are left out.
+        """
+        if not file_ids:
+            return {}
+        async with db_registry.async_session() as session:
+            query = (
+                select(
+                    FileMetadataModel.id,
+                    FileMetadataModel.file_name,
+                    FileMetadataModel.file_type,
+                    FileContentModel.updated_at,
+                    func.length(FileContentModel.text),
+                )
+                .join(FileContentModel, FileContentModel.file_id == FileMetadataModel.id)
+                .where(FileMetadataModel.id.in_(file_ids))
+            )
+            query = FileMetadataModel.apply_access_predicate(query, actor, access=["read"], access_type=AccessType.ORGANIZATION)
+            result = await session.execute(query)
+            return {file_id: tuple(version) for file_id, *version in result.all()}
+
     @enforce_types
     @trace_method
     async def update_file_status(
@@ -168,7 +209,7 @@ class FileManager:
                     .values(file_id=file_id, text=text)
                     .on_conflict_do_update(
                         index_elements=[FileContentModel.file_id],
-                        set_={"text": text},
+                        set_={"text": text, "updated_at": datetime.utcnow()},
                     )
                 )
                 await session.execute(stmt)
@@ -179,7 +220,9 @@ class FileManager:
                 existing = result.scalar_one_or_none()
 
                 if existing:
-                    await session.execute(update(FileContentModel).where(FileContentModel.file_id == file_id).values(text=text))
+                    await session.execute(
+                        update(FileContentModel).where(FileContentModel.file_id == file_id).values(text=text, updated_at=datetime.utcnow())
+                    )
                 else:
                     session.add(FileContentModel(file_id=file_id, text=text))
 
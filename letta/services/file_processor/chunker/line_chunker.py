@@ -98,22 +98,27 @@ class LineChunker:
 
         return [line for line in lines if line.strip()]
 
-    def chunk_text(
-        self, file_metadata: FileMetadata, start: Optional[int] = None, end: Optional[int] = None, add_metadata: bool = True
-    ) -> List[str]:
-        """Content-aware text chunking based on file type"""
-        strategy = self._determine_chunking_strategy(file_metadata)
+    def chunk_lines(self, file_metadata: FileMetadata, strategy: Optional[ChunkingStrategy] = None) -> List[str]:
+        """Split the file content into chunks (without line numbers) using the strategy for its file type"""
+        strategy = strategy or self._determine_chunking_strategy(file_metadata)
         text = file_metadata.content
 
         # Apply the appropriate chunking strategy
         if strategy == ChunkingStrategy.DOCUMENTATION:
-            content_lines = self._chunk_by_sentences(text)
+            return self._chunk_by_sentences(text)
         elif strategy == ChunkingStrategy.PROSE:
-            content_lines = self._chunk_by_characters(text)
+            return self._chunk_by_characters(text)
         elif strategy == ChunkingStrategy.CODE:
-            content_lines = self._chunk_by_lines(text, preserve_indentation=True)
+            return self._chunk_by_lines(text, preserve_indentation=True)
         else:  # STRUCTURED_DATA or LINE_BASED
-            content_lines = self._chunk_by_lines(text, preserve_indentation=False)
+            return self._chunk_by_lines(text, preserve_indentation=False)
+
+    def chunk_text(
+        self, file_metadata: FileMetadata, start: Optional[int] = None, end: Optional[int] = None, add_metadata: bool = True
+    ) -> List[str]:
+        """Content-aware text chunking based on file type"""
+        strategy = self._determine_chunking_strategy(file_metadata)
+        content_lines = self.chunk_lines(file_metadata, strategy=strategy)
 
         total_chunks = len(content_lines)
 
@@ -0,0 +1,178 @@
+import asyncio
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from letta.helpers.singleton import singleton
+from letta.otel.tracing import trace_method
+from letta.schemas.file import FileMetadata as PydanticFileMetadata
+from letta.schemas.user import User as PydanticUser
+from letta.services.file_manager import FileManager
+from letta.services.file_processor.chunker.line_chunker import LineChunker
+from letta.settings import settings
+
+try:
+    import re._parser as sre_parse
+    from re._constants import BRANCH, LITERAL, MAX_REPEAT, MIN_REPEAT, SUBPATTERN
+except ImportError:  # Python < 3.11
+    import sre_parse
+    from sre_constants import BRANCH, LITERAL, MAX_REPEAT, MIN_REPEAT, SUBPATTERN
+
+# Below this many characters, chunking inline is cheaper than handing the work to a thread
+INLINE_MAX_CHARS = 64 * 1024
+
+
+def required_literals(pattern: str) -> List[str]:
+    """
+    Literal substrings that every match of `pattern` must contain, lowercased. Only the parts of the pattern that
+    always take part in a match are considered (no alternations or optional repeats), so the result may be empty.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return []
+
+    literals = []
+
+    def walk(items) -> None:
+        run = []
+        for op, av in items:
+            if op == LITERAL:
+                run.append(chr(av))
+                continue
+            if run:
+                literals.append("".join(run))
+                run = []
+            if op == SUBPATTERN:
+                walk(av[-1])
+            elif op in (MAX_REPEAT, MIN_REPEAT) and av[0] >= 1:
+                walk(av[2])
+            elif op == BRANCH:
+                # Each alternative has its own literals, none of which is required by the whole pattern
+                continue
+        if run:
+            literals.append("".join(run))
+
+    walk(parsed)
+    return [literal.lower() for literal in literals]
+
+
+class FileLines:
+    """The chunked lines of one version of a file, with an optional trigram index for prefiltering searches."""
+
+    def __init__(self, file_id: str, file_name: str, version: Tuple, lines: List[str], size_bytes: int):
+        self.file_id = file_id
+        self.file_name = file_name
+        self.version = version
+        self.lines = lines
+        self.size_bytes = size_bytes
+        self._trigrams: Optional[Dict[str, List[int]]] = None
+        # Non-ASCII lines aren't indexed: case-insensitive matching folds characters like "ſ" onto ASCII letters
+        self._unindexed: List[int] = []
+        self._index_lock = threading.Lock()
+
+    def formatted_line(self, index: int) -> str:
+        """The line at `index` as shown to the agent, with its 1-based line number."""
+        return f"{index + 1}: {self.lines[index]}"
+
+    def candidate_lines(self, literals: List[str]) -> Iterable[int]:
+        """
+        Indexes (in order) of the lines that may contain all of `literals` case-insensitively; every line when the
+        trigram index is disabled or the literals are too short to use it.
+        """
+        if not settings.file_grep_trigram_index or not all(literal.isascii() for literal in literals):
+            return range(len(self.lines))
+        trigrams = {literal[i : i + 3] for literal in literals for i in range(len(literal) - 2)}
+        if not trigrams:
+            return range(len(self.lines))
+
+        index = self._get_trigram_index()
+        postings = sorted((index.get(trigram, []) for trigram in trigrams), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                break
+        candidates.update(self._unindexed)
+        return sorted(candidates)
+
+    def _get_trigram_index(self) -> Dict[str, List[int]]:
+        if self._trigrams is None:
+            with self._index_lock:
+                if self._trigrams is None:
+                    trigrams = defaultdict(list)
+                    for i, line in enumerate(self.lines):
+                        if not line.isascii():
+                            self._unindexed.append(i)
+                            continue
+                        lowered = line.lower()
+                        for trigram in {lowered[j : j + 3] for j in range(len(lowered) - 2)}:
+                            trigrams[trigram].append(i)
+                    self._trigrams = dict(trigrams)
+        return self._trigrams
+
+
+def _build_file_lines(file: PydanticFileMetadata, version: Tuple) -> FileLines:
+    return FileLines(
+        file_id=file.id,
+        file_name=file.file_name,
+        version=version,
+        lines=LineChunker().chunk_lines(file),
+        size_bytes=len(file.content.encode("utf-8")),
+    )
+
+
+@singleton
+class FileLineCache:
+    """
+    Bounded, process-local cache of chunked file lines for `grep`, keyed by file id and content version.
+
+    Every lookup re-reads the content versions (a single cheap query), so content changed through any process is
+    reloaded; only files that are missing or stale are fetched, in one bulk query, and chunked concurrently.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, FileLines]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.file_manager = FileManager()
+
+    @trace_method
+    async def get_versions_async(self, file_ids: List[str], actor: PydanticUser) -> Dict[str, Tuple]:
+        """Current content versions of `file_ids`; files without content are left out."""
+        return await self.file_manager.get_file_content_versions_async(file_ids, actor)
+
+    @trace_method
+    async def get_many_async(self, versions: Dict[str, Tuple], actor: PydanticUser) -> Dict[str, FileLines]:
+        """The lines of the given file versions (from `get_versions_async`), loading the ones that aren't cached."""
+        found = {}
+        with self._lock:
+            for file_id, version in versions.items():
+                entry = self._entries.get(file_id)
+                if entry is not None and entry.version == version:
+                    self._entries.move_to_end(file_id)
+                    found[file_id] = entry
+
+        missing = [file_id for file_id in versions if file_id not in found]
+        if missing:
+            files = await self.file_manager.get_files_by_ids_async(missing, actor, include_content=True)
+            files = [file for file in files if file.content is not None]
+            loaded = await asyncio.gather(*(self._build_async(file, versions[file.id]) for file in files))
+            self._put_many(loaded)
+            found.update((entry.file_id, entry) for entry in loaded)
+        return found
+
+    @staticmethod
+    async def _build_async(file: PydanticFileMetadata, version: Tuple) -> FileLines:
+        if len(file.content) <= INLINE_MAX_CHARS:
+            return _build_file_lines(file, version)
+        return await asyncio.to_thread(_build_file_lines, file, version)
+
+    def _put_many(self, entries: List[FileLines]) -> None:
+        if settings.file_grep_cache_size <= 0:
+            return
+        with self._lock:
+            for entry in entries:
+                self._entries[entry.file_id] = entry
+                self._entries.move_to_end(entry.file_id)
+            while len(self._entries) > settings.file_grep_cache_size:
+                self._entries.popitem(last=False)
@@ -637,6 +637,21 @@ def _apply_filters(
     return query
 
 
+def embed_query_text(embedding_config: EmbeddingConfig, query_text: str) -> List[float]:
+    """Embed a search query, zero-padded to `MAX_EMBEDDING_DIM` to match stored passage embeddings."""
+    embedded_text = embedding_model(embedding_config).get_text_embedding(query_text)
+    embedded_text = np.array(embedded_text)
+    return np.pad(embedded_text, (0, MAX_EMBEDDING_DIM - embedded_text.shape[0]), mode="constant").tolist()
+
+
+async def embed_query_text_async(embedding_config: EmbeddingConfig, query_text: str) -> List[float]:
+    """Async variant of `embed_query_text`: batched with concurrent queries and served from the shared embedding cache."""
+    from letta.services.embedding_manager import EmbeddingManager
+
+    embedded_text = np.array(await EmbeddingManager().embed_query_async(embedding_config, query_text))
+    return np.pad(embedded_text, (0, MAX_EMBEDDING_DIM - embedded_text.shape[0]), mode="constant").tolist()
+
+
 def build_passage_query(
     actor: User,
     agent_id: Optional[str] = None,
@@ -651,19 +666,19 @@ def build_passage_query(
     ascending: bool = True,
     embedding_config: Optional[EmbeddingConfig] = None,
     agent_only: bool = False,
+    query_embedding: Optional[List[float]] = None,
 ) -> Select:
     """Helper function to build the base passage query with all filters applied.
     Supports both before and after pagination across merged source and agent passages.
 
-    Returns the query before any limit or count operations are applied.
+    Returns the query before any limit or count operations are applied. Pass a precomputed
+    `query_embedding` (e.g. from `embed_query_text_async`) to skip embedding `query_text` here.
     """
-    embedded_text = None
-    if embed_query:
+    embedded_text = query_embedding
+    if embed_query and embedded_text is None:
         assert embedding_config is not None, "embedding_config must be specified for vector search"
         assert query_text is not None, "query_text must be specified for vector search"
-        embedded_text = embedding_model(embedding_config).get_text_embedding(query_text)
-        embedded_text = np.array(embedded_text)
-        embedded_text = np.pad(embedded_text, (0, MAX_EMBEDDING_DIM - embedded_text.shape[0]), mode="constant").tolist()
+        embedded_text = embed_query_text(embedding_config, query_text)
 
     # Start with base query for source passages
     source_passages = None
@@ -860,17 +875,16 @@ def build_source_passage_query(
     embed_query: bool = False,
     ascending: bool = True,
     embedding_config: Optional[EmbeddingConfig] = None,
+    query_embedding: Optional[List[float]] = None,
 ) -> Select:
     """Build query for source passages with all filters applied."""
 
     # Handle embedding for vector search
-    embedded_text = None
-    if embed_query:
+    embedded_text = query_embedding
+    if embed_query and embedded_text is None:
         assert embedding_config is not None, "embedding_config must be specified for vector search"
         assert query_text is not None, "query_text must be specified for vector search"
-        embedded_text = embedding_model(embedding_config).get_text_embedding(query_text)
-        embedded_text = np.array(embedded_text)
-        embedded_text = np.pad(embedded_text, (0, MAX_EMBEDDING_DIM - embedded_text.shape[0]), mode="constant").tolist()
+        embedded_text = embed_query_text(embedding_config, query_text)
 
     # Base query for source passages
     query = select(SourcePassage).where(SourcePassage.organization_id == actor.organization_id)
@@ -956,17 +970,16 @@ def build_agent_passage_query(
     embed_query: bool = False,
     ascending: bool = True,
     embedding_config: Optional[EmbeddingConfig] = None,
+    query_embedding: Optional[List[float]] = None,
 ) -> Select:
     """Build query for agent passages with all filters applied."""
 
     # Handle embedding for vector search
-    embedded_text = None
-    if embed_query:
+    embedded_text = query_embedding
+    if embed_query and embedded_text is None:
         assert embedding_config is not None, "embedding_config must be specified for vector search"
         assert query_text is not None, "query_text must be specified for vector search"
-        embedded_text = embedding_model(embedding_config).get_text_embedding(query_text)
-        embedded_text = np.array(embedded_text)
-        embedded_text = np.pad(embedded_text, (0, MAX_EMBEDDING_DIM - embedded_text.shape[0]), mode="constant").tolist()
+        embedded_text = embed_query_text(embedding_config, query_text)
 
     # Base query for agent passages
     query = select(AgentPassage).where(AgentPassage.agent_id == agent_id, AgentPassage.organization_id == actor.organization_id)
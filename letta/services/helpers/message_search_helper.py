@@ -0,0 +1,45 @@
+import re
+from typing import List
+
+from sqlalchemy import column, func, literal_column, select, table
+
+from letta.orm.message import Message as MessageModel
+from letta.settings import settings
+
+_TERM_PATTERN = re.compile(r"\w+")
+
+# FTS5 table kept in sync with `messages` by triggers (SQLite only, see letta.orm.message); `rank` is the bm25 score
+_messages_fts = table("messages_fts", column("rowid"), column("rank"))
+
+
+def _search_terms(query_text: str) -> List[str]:
+    # Only word characters reach the search syntax, so user input can't inject FTS5 / tsquery operators
+    return _TERM_PATTERN.findall(query_text)
+
+
+def apply_text_search(query, query_text: str, rank: bool = False):
+    """
+    Restrict a messages query (a `Select` or ORM `Query`) to messages whose text matches every word of `query_text`
+    as a prefix, using the full-text index. With `rank`, the most relevant messages are ordered first.
+    """
+    terms = _search_terms(query_text)
+    if not terms:
+        # Nothing indexable (e.g. only punctuation): fall back to substring matching
+        return query.where(MessageModel.search_text.ilike(f"%{query_text}%"))
+
+    if settings.letta_pg_uri_no_default:
+        search_vector = literal_column("messages.search_vector")
+        ts_query = func.to_tsquery("english", " & ".join(f"{term}:*" for term in terms))
+        query = query.where(search_vector.op("@@")(ts_query))
+        if rank:
+            query = query.order_by(func.ts_rank(search_vector, ts_query).desc())
+        return query
+
+    match_expression = " ".join(f'"{term}"*' for term in terms)
+    matches = (
+        select(_messages_fts.c.rowid, _messages_fts.c.rank).where(literal_column("messages_fts").op("MATCH")(match_expression)).subquery()
+    )
+    query = query.join(matches, matches.c.rowid == MessageModel.sequence_id)
+    if rank:
+        query = query.order_by(matches.c.rank)
+    return query
@@ -1,6 +1,9 @@
+import hashlib
+import json
 import os
 import platform
 import subprocess
+import sys
 import venv
 from typing import TYPE_CHECKING, Dict, Optional
 
@@ -16,6 +19,9 @@ if TYPE_CHECKING:
 
 logger = get_logger(__name__)
 
+# Fingerprint of the full requirement set a venv was last installed with, stored inside the venv itself
+VENV_FINGERPRINT_FILE = ".letta_fingerprint"
+
 
 def find_python_executable(local_configs: LocalSandboxConfig) -> str:
     """
@@ -101,6 +107,7 @@ def install_pip_requirements_for_sandbox(
 
     # If using a virtual environment, upgrade pip before installing dependencies.
     if local_configs.use_venv:
+        clear_venv_fingerprint(os.path.join(sandbox_dir, local_configs.venv_name))
         ensure_pip_is_up_to_date(python_exec, env=env)
 
     # Collect all pip requirements
@@ -172,6 +179,7 @@ def create_venv_for_local_sandbox(sandbox_dir_path: str, venv_path: str, env: Di
         logger.info(f"Creating new virtual environment at {venv_path}")
         venv.create(venv_path, with_pip=True)
 
+    clear_venv_fingerprint(venv_path)
     pip_path = os.path.join(venv_path, "bin", "pip")
     try:
         # Step 2: Upgrade pip
@@ -192,6 +200,70 @@ def create_venv_for_local_sandbox(sandbox_dir_path: str, venv_path: str, env: Di
         raise RuntimeError(f"Failed to set up the virtual environment: {e}")
 
 
+def compute_venv_fingerprint(local_configs: LocalSandboxConfig, tool: Optional["Tool"] = None) -> str:
+    """
+    Fingerprint the full requirement set a sandbox venv is installed with: the sandbox-level and tool-level pip
+    requirements combined, the sandbox's requirements.txt, and the host Python version.
+    """
+    sandbox_dir = os.path.expanduser(local_configs.sandbox_dir)
+    requirements_txt_path = os.path.join(sandbox_dir, "requirements.txt")
+    requirements_txt = ""
+    if os.path.isfile(requirements_txt_path):
+        with open(requirements_txt_path, "r") as f:
+            requirements_txt = f.read()
+
+    payload = {
+        "python": sys.version,
+        "sandbox_requirements": sorted(str(req) for req in local_configs.pip_requirements or []),
+        "tool_requirements": sorted(str(req) for req in (tool.pip_requirements if tool and tool.pip_requirements else [])),
+        "requirements_txt": hashlib.sha256(requirements_txt.encode("utf-8")).hexdigest(),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def venv_name_for_tool(local_configs: LocalSandboxConfig, tool: Optional["Tool"] = None) -> str:
+    """
+    The venv a tool runs in. Tools with pip requirements of their own get a venv per requirement set (named after its
+    fingerprint), so tools with different requirements don't reinstall over each other's packages on every switch.
+    """
+    if tool and tool.pip_requirements:
+        return f"{local_configs.venv_name}-{compute_venv_fingerprint(local_configs, tool=tool)[:16]}"
+    return local_configs.venv_name
+
+
+def _read_venv_fingerprint(venv_path: str) -> Optional[str]:
+    try:
+        with open(os.path.join(venv_path, VENV_FINGERPRINT_FILE), "r") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def venv_has_fingerprint(venv_path: str, fingerprint: str) -> bool:
+    """Whether the venv was last installed with exactly the requirement set identified by `fingerprint`."""
+    return _read_venv_fingerprint(os.path.expanduser(venv_path)) == fingerprint
+
+
+def record_venv_fingerprint(venv_path: str, fingerprint: str) -> None:
+    """Mark the venv as installed with the requirement set identified by `fingerprint` (atomically)."""
+    venv_path = os.path.expanduser(venv_path)
+    tmp_path = os.path.join(venv_path, f"{VENV_FINGERPRINT_FILE}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        f.write(fingerprint)
+    os.replace(tmp_path, os.path.join(venv_path, VENV_FINGERPRINT_FILE))
+
+
+def clear_venv_fingerprint(venv_path: str) -> None:
+    """
+    Forget which requirement set the venv holds. Called before every install: installing one requirement set can
+    up- or downgrade packages another one depends on, so only the set installed last is known to be satisfied.
+    """
+    try:
+        os.remove(os.path.join(os.path.expanduser(venv_path), VENV_FINGERPRINT_FILE))
+    except FileNotFoundError:
+        pass
+
+
 def add_imports_and_pydantic_schemas_for_args(args_json_schema: dict) -> str:
     data_model_types = get_data_model_types(DataModelType.PydanticV2BaseModel, target_python_version=PythonVersion.PY_311)
     parser = JsonSchemaParser(
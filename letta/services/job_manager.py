@@ -1,8 +1,9 @@
+from datetime import timedelta
 from functools import reduce
 from operator import add
 from typing import List, Literal, Optional, Union
 
-from sqlalchemy import select
+from sqlalchemy import and_, func, or_, select, update
 from sqlalchemy.orm import Session
 
 from letta.helpers.datetime_helpers import get_utc_time
@@ -220,6 +221,127 @@ class JobManager:
             await job.hard_delete_async(db_session=session, actor=actor)
             return job.to_pydantic()
 
+    # ======================================================================================================================
+    # Run queue (see `letta.jobs.run_queue`)
+    # ======================================================================================================================
+    @staticmethod
+    def _claimable_run_clause(now):
+        # Queued runs, or runs whose worker stopped renewing its lease (runs executed in-process never hold a lease)
+        return and_(
+            JobModel.job_type == JobType.RUN,
+            or_(
+                JobModel.status == JobStatus.pending,
+                and_(JobModel.status == JobStatus.running, JobModel.lease_expires_at < now),
+            ),
+        )
+
+    @enforce_types
+    @trace_method
+    async def claim_queued_runs_async(
+        self,
+        worker_id: str,
+        limit: int,
+        lease_seconds: int,
+        max_attempts: int,
+        run_ids: Optional[List[str]] = None,
+    ) -> List[PydanticRun]:
+        """
+        Lease up to `limit` queued runs (oldest first) to `worker_id`, marking them running.
+
+        Candidates are selected with `FOR UPDATE SKIP LOCKED` on Postgres so concurrent workers don't contend for the
+        same rows, and each claim is a conditional UPDATE so a run is only ever handed to one worker. Runs whose lease
+        expired after `max_attempts` claims are marked failed instead of being retried again.
+        """
+        now = get_utc_time().replace(tzinfo=None)
+        claimable = self._claimable_run_clause(now)
+        async with db_registry.async_session() as session:
+            out_of_attempts = and_(claimable, JobModel.status == JobStatus.running, JobModel.attempts >= max_attempts)
+            abandoned = (await session.execute(select(JobModel.id, JobModel.metadata_).where(out_of_attempts))).all()
+            for run_id, metadata in abandoned:
+                # The error is added to the run's metadata, which also holds its agent and request
+                await session.execute(
+                    update(JobModel)
+                    .where(JobModel.id == run_id, out_of_attempts)
+                    .values(
+                        status=JobStatus.failed,
+                        completed_at=now,
+                        lease_owner=None,
+                        lease_expires_at=None,
+                        metadata_={**(metadata or {}), "error": f"Run was abandoned by its worker {max_attempts} times"},
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+
+            query = select(JobModel.id).where(claimable).order_by(JobModel.created_at, JobModel.id).limit(limit)
+            if run_ids is not None:
+                query = query.where(JobModel.id.in_(run_ids))
+            if session.bind.dialect.name == "postgresql":
+                query = query.with_for_update(skip_locked=True)
+            candidate_ids = list((await session.execute(query)).scalars())
+
+            claimed_ids = []
+            for run_id in candidate_ids:
+                result = await session.execute(
+                    update(JobModel)
+                    .where(JobModel.id == run_id, claimable)
+                    .values(
+                        status=JobStatus.running,
+                        lease_owner=worker_id,
+                        lease_expires_at=now + timedelta(seconds=lease_seconds),
+                        attempts=JobModel.attempts + 1,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount:
+                    claimed_ids.append(run_id)
+            await session.commit()
+
+            if not claimed_ids:
+                return []
+            runs = (await session.execute(select(JobModel).where(JobModel.id.in_(claimed_ids)).order_by(JobModel.created_at))).scalars()
+            return [PydanticRun.from_job(run.to_pydantic()) for run in runs]
+
+    @enforce_types
+    @trace_method
+    async def renew_run_leases_async(self, worker_id: str, run_ids: List[str], lease_seconds: int) -> List[str]:
+        """Extend the leases `worker_id` holds on `run_ids`. Returns the ids whose lease was lost to another worker."""
+        if not run_ids:
+            return []
+        now = get_utc_time().replace(tzinfo=None)
+        async with db_registry.async_session() as session:
+            await session.execute(
+                update(JobModel)
+                .where(JobModel.id.in_(run_ids), JobModel.lease_owner == worker_id, JobModel.status == JobStatus.running)
+                .values(lease_expires_at=now + timedelta(seconds=lease_seconds))
+                .execution_options(synchronize_session=False)
+            )
+            held = set(
+                (await session.execute(select(JobModel.id).where(JobModel.id.in_(run_ids), JobModel.lease_owner == worker_id))).scalars()
+            )
+            await session.commit()
+        return [run_id for run_id in run_ids if run_id not in held]
+
+    @enforce_types
+    @trace_method
+    async def release_run_lease_async(self, worker_id: str, run_id: str) -> None:
+        """Drop the lease `worker_id` holds on a run it finished executing."""
+        async with db_registry.async_session() as session:
+            await session.execute(
+                update(JobModel)
+                .where(JobModel.id == run_id, JobModel.lease_owner == worker_id)
+                .values(lease_owner=None, lease_expires_at=None)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+
+    @enforce_types
+    @trace_method
+    async def count_queued_runs_async(self) -> int:
+        """Number of runs waiting for a worker."""
+        async with db_registry.async_session() as session:
+            query = select(func.count()).select_from(JobModel).where(JobModel.job_type == JobType.RUN, JobModel.status == JobStatus.pending)
+            return await session.scalar(query)
+
     @enforce_types
     @trace_method
     def get_job_messages(
@@ -2,7 +2,7 @@ import json
 import uuid
 from typing import List, Optional, Sequence
 
-from sqlalchemy import delete, exists, func, select, text
+from sqlalchemy import bindparam, delete, select, update
 
 from letta.log import get_logger
 from letta.orm.agent import Agent as AgentModel
@@ -16,7 +16,9 @@ from letta.schemas.message import Message as PydanticMessage
 from letta.schemas.message import MessageUpdate
 from letta.schemas.user import User as PydanticUser
 from letta.server.db import db_registry
+from letta.services.agent_counter_manager import AgentCounterManager
 from letta.services.file_manager import FileManager
+from letta.services.helpers.message_search_helper import apply_text_search
 from letta.utils import enforce_types
 
 logger = get_logger(__name__)
@@ -28,6 +30,7 @@ class MessageManager:
     def __init__(self):
         """Initialize the MessageManager."""
         self.file_manager = FileManager()
+        self.agent_counter_manager = AgentCounterManager()
 
     @enforce_types
     @trace_method
@@ -102,6 +105,35 @@ class MessageManager:
             orm_messages.append(MessageModel(**msg_data))
         return orm_messages
 
+    def build_messages(self, pydantic_msgs: List[PydanticMessage], actor: PydanticUser) -> List[MessageModel]:
+        """Build the (unsaved) message rows, e.g. for a `StepCommit` that writes them together with their step."""
+        for message in pydantic_msgs:
+            if isinstance(message.content, list):
+                for content in message.content:
+                    if content.type == MessageContentType.image and content.source.type == ImageSourceType.base64:
+                        # TODO: actually persist image files in db
+                        # file = await self.file_manager.create_file( # TODO: use batch create to prevent multiple db round trips
+                        #     db_session=session,
+                        #     image_create=FileMetadata(
+                        #         user_id=actor.id, # TODO: add field
+                        #         source_id= '' # TODO: make optional
+                        #         organization_id=actor.organization_id,
+                        #         file_type=content.source.media_type,
+                        #         processing_status=FileProcessingStatus.COMPLETED,
+                        #         content= '' # TODO: should content be added here or in top level text field?
+                        #     ),
+                        #     actor=actor,
+                        #     text=content.source.data,
+                        # )
+                        file_id_placeholder = "file-" + str(uuid.uuid4())
+                        content.source = LettaImage(
+                            file_id=file_id_placeholder,
+                            data=content.source.data,
+                            media_type=content.source.media_type,
+                            detail=content.source.detail,
+                        )
+        return self._create_many_preprocess(pydantic_msgs, actor)
+
     @enforce_types
     @trace_method
     def create_many_messages(self, pydantic_msgs: List[PydanticMessage], actor: PydanticUser) -> List[PydanticMessage]:
@@ -138,32 +170,7 @@ class MessageManager:
         if not pydantic_msgs:
             return []
 
-        for message in pydantic_msgs:
-            if isinstance(message.content, list):
-                for content in message.content:
-                    if content.type == MessageContentType.image and content.source.type == ImageSourceType.base64:
-                        # TODO: actually persist image files in db
-                        # file = await self.file_manager.create_file( # TODO: use batch create to prevent multiple db round trips
-                        #     db_session=session,
-                        #     image_create=FileMetadata(
-                        #         user_id=actor.id, # TODO: add field
-                        #         source_id= '' # TODO: make optional
-                        #         organization_id=actor.organization_id,
-                        #         file_type=content.source.media_type,
-                        #         processing_status=FileProcessingStatus.COMPLETED,
-                        #         content= '' # TODO: should content be added here or in top level text field?
-                        #     ),
-                        #     actor=actor,
-                        #     text=content.source.data,
-                        # )
-                        file_id_placeholder = "file-" + str(uuid.uuid4())
-                        content.source = LettaImage(
-                            file_id=file_id_placeholder,
-                            data=content.source.data,
-                            media_type=content.source.media_type,
-                            detail=content.source.detail,
-                        )
-        orm_messages = self._create_many_preprocess(pydantic_msgs, actor)
+        orm_messages = self.build_messages(pydantic_msgs, actor)
         async with db_registry.async_session() as session:
             created_messages = await MessageModel.batch_create_async(orm_messages, session, actor=actor)
             return [msg.to_pydantic() for msg in created_messages]
@@ -306,8 +313,29 @@ class MessageManager:
 
         for key, value in update_data.items():
             setattr(message, key, value)
+        if update_data:
+            # Cached token counts describe the old content
+            message.token_counts = None
         return message
 
+    @enforce_types
+    @trace_method
+    async def update_token_counts_async(self, messages: List[PydanticMessage], actor: PydanticUser) -> None:
+        """Persist the cached token counts of already stored messages."""
+        if not messages:
+            return
+
+        table = MessageModel.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("message_id"), table.c.organization_id == actor.organization_id)
+            .values(token_counts=bindparam("counts"))
+        )
+        async with db_registry.async_session() as session:
+            # One executemany round trip for the whole batch
+            await session.execute(stmt, [{"message_id": m.id, "counts": m.token_counts} for m in messages])
+            await session.commit()
+
     @enforce_types
     @trace_method
     def delete_message_by_id(self, message_id: str, actor: PydanticUser) -> bool:
@@ -353,6 +381,8 @@ class MessageManager:
             actor: The user requesting the count
             role: The role of the message
         """
+        if agent_id is not None and role is None:
+            return await self.agent_counter_manager.get_message_count_async(agent_id=agent_id, actor=actor)
         async with db_registry.async_session() as session:
             return await MessageModel.size_async(db_session=session, actor=actor, role=role, agent_id=agent_id)
 
@@ -421,7 +451,7 @@ class MessageManager:
 
         This function filters by the agent_id (leveraging the index on messages.agent_id)
         and applies pagination using sequence_id as the cursor.
-        If query_text is provided, it will filter messages whose text content partially matches the query.
+        If query_text is provided, it will filter messages whose text content matches the query, using the full-text index.
         If role is provided, it will filter messages by the specified role.
 
         Args:
@@ -429,7 +459,7 @@ class MessageManager:
             actor: The user performing the action (used for permission checks).
             after: A message ID; if provided, only messages *after* this message (by sequence_id) are returned.
             before: A message ID; if provided, only messages *before* this message (by sequence_id) are returned.
-            query_text: Optional string to partially match the message text content.
+            query_text: Optional text to search for; matches messages containing every word of it (as a prefix).
             roles: Optional MessageRole to filter messages by role.
             limit: Maximum number of messages to return.
             ascending: If True, sort by sequence_id ascending; if False, sort descending.
@@ -453,17 +483,9 @@ class MessageManager:
             if group_id:
                 query = query.filter(MessageModel.group_id == group_id)
 
-            # If query_text is provided, filter messages using subquery + json_array_elements.
+            # If query_text is provided, filter messages using the full-text index.
             if query_text:
-                content_element = func.json_array_elements(MessageModel.content).alias("content_element")
-                query = query.filter(
-                    exists(
-                        select(1)
-                        .select_from(content_element)
-                        .where(text("content_element->>'type' = 'text' AND content_element->>'text' ILIKE :query_text"))
-                        .params(query_text=f"%{query_text}%")
-                    )
-                )
+                query = apply_text_search(query, query_text)
 
             # If role(s) are provided, filter messages by those roles.
             if roles:
@@ -518,7 +540,7 @@ class MessageManager:
 
         This function filters by the agent_id (leveraging the index on messages.agent_id)
         and applies pagination using sequence_id as the cursor.
-        If query_text is provided, it will filter messages whose text content partially matches the query.
+        If query_text is provided, it will filter messages whose text content matches the query, using the full-text index.
         If role is provided, it will filter messages by the specified role.
 
         Args:
@@ -526,7 +548,7 @@ class MessageManager:
             actor: The user performing the action (used for permission checks).
             after: A message ID; if provided, only messages *after* this message (by sequence_id) are returned.
             before: A message ID; if provided, only messages *before* this message (by sequence_id) are returned.
-            query_text: Optional string to partially match the message text content.
+            query_text: Optional text to search for; matches messages containing every word of it (as a prefix).
             roles: Optional MessageRole to filter messages by role.
             limit: Maximum number of messages to return.
             ascending: If True, sort by sequence_id ascending; if False, sort descending.
@@ -550,17 +572,9 @@ class MessageManager:
             if group_id:
                 query = query.where(MessageModel.group_id == group_id)
 
-            # If query_text is provided, filter messages using subquery + json_array_elements.
+            # If query_text is provided, filter messages using the full-text index.
             if query_text:
-                content_element = func.json_array_elements(MessageModel.content).alias("content_element")
-                query = query.where(
-                    exists(
-                        select(1)
-                        .select_from(content_element)
-                        .where(text("content_element->>'type' = 'text' AND content_element->>'text' ILIKE :query_text"))
-                        .params(query_text=f"%{query_text}%")
-                    )
-                )
+                query = apply_text_search(query, query_text)
 
             # If role(s) are provided, filter messages by those roles.
             if roles:
@@ -601,6 +615,43 @@ class MessageManager:
             results = result.scalars().all()
             return [msg.to_pydantic() for msg in results]
 
+    @enforce_types
+    @trace_method
+    async def search_messages_async(
+        self,
+        agent_id: str,
+        actor: PydanticUser,
+        query_text: str,
+        roles: Optional[Sequence[MessageRole]] = None,
+        limit: Optional[int] = 50,
+        offset: int = 0,
+    ) -> List[PydanticMessage]:
+        """
+        Full-text search over an agent's messages, most relevant first (ties broken by recency).
+
+        Args:
+            agent_id: The ID of the agent whose messages are searched.
+            actor: The user performing the action (used for permission checks).
+            query_text: Text to search for; matches messages containing every word of it (as a prefix).
+            roles: Optional MessageRole to filter messages by role.
+            limit: Maximum number of messages to return.
+            offset: Number of matches to skip, for paging through results.
+
+        Returns:
+            List[PydanticMessage]: The matching messages, ranked.
+        """
+        async with db_registry.async_session() as session:
+            await AgentModel.read_async(db_session=session, identifier=agent_id, actor=actor)
+
+            query = select(MessageModel).where(MessageModel.agent_id == agent_id)
+            if roles:
+                query = query.where(MessageModel.role.in_([r.value for r in roles]))
+            query = apply_text_search(query, query_text, rank=True)
+            query = query.order_by(MessageModel.sequence_id.desc()).offset(offset).limit(limit)
+
+            result = await session.execute(query)
+            return [msg.to_pydantic() for msg in result.scalars().all()]
+
     @enforce_types
     @trace_method
     async def delete_all_messages_for_agent_async(self, agent_id: str, actor: PydanticUser, exclude_ids: Optional[List[str]] = None) -> int:
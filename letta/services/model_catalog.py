@@ -0,0 +1,189 @@
+import asyncio
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple, TypeVar
+
+from letta.helpers.singleton import singleton
+from letta.log import get_logger
+from letta.otel.tracing import trace_method
+from letta.schemas.embedding_config import EmbeddingConfig
+from letta.schemas.llm_config import LLMConfig
+from letta.schemas.providers import Provider
+from letta.settings import settings
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Entry:
+    value: Any
+    organization_id: Optional[str]
+    fetched_at: float
+
+
+@singleton
+class ModelCatalog:
+    """
+    Process-local cache of the models each provider offers, so that resolving a handle or listing models doesn't wait
+    on provider APIs.
+
+    A provider's listing is served from memory for `model_catalog_ttl_seconds`. After that the stale listing is still
+    served while a background task refreshes it, up to `model_catalog_max_stale_seconds`, after which callers wait for
+    the refresh. If a refresh fails, the last listing is kept. BYOK listings are keyed by the provider's `updated_at`,
+    so provider edits made by other processes take effect right away too, and `ProviderManager` drops an organization's
+    listings whenever it writes one of its providers.
+
+    Configs resolved from handles (see `SyncServer.get_cached_llm_config_async`) are cached here as well, per
+    organization and with the same TTL. At most `model_catalog_size` entries of each kind are kept.
+    """
+
+    def __init__(self):
+        self._listings: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._resolved: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on invalidation, so that refreshes started before it don't store what they fetched
+        self._generation = 0
+        self._refreshes: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Task]]" = weakref.WeakKeyDictionary()
+
+    @trace_method
+    async def list_llm_models_async(self, provider: Provider) -> List[LLMConfig]:
+        return await self._get_listing_async(provider, "llm", provider.list_llm_models_async)
+
+    @trace_method
+    async def list_embedding_models_async(self, provider: Provider) -> List[EmbeddingConfig]:
+        return await self._get_listing_async(provider, "embedding", provider.list_embedding_models_async)
+
+    def list_llm_models(self, provider: Provider) -> List[LLMConfig]:
+        return self._get_listing(provider, "llm", provider.list_llm_models)
+
+    def list_embedding_models(self, provider: Provider) -> List[EmbeddingConfig]:
+        return self._get_listing(provider, "embedding", provider.list_embedding_models)
+
+    def get_resolved(self, organization_id: Optional[str], key: Hashable) -> Optional[Any]:
+        """A config cached with `put_resolved`, or None if there is none that is fresh."""
+        entry = self._lookup(self._resolved, (organization_id, key))
+        if entry is None or self._age(entry) > settings.model_catalog_ttl_seconds:
+            return None
+        return entry.value.model_copy(deep=True)
+
+    def put_resolved(self, organization_id: Optional[str], key: Hashable, value: Any) -> None:
+        self._store(self._resolved, (organization_id, key), organization_id, value.model_copy(deep=True), self._generation)
+
+    def invalidate_organization(self, organization_id: str) -> None:
+        """Drop the BYOK listings and resolved configs of an organization, e.g. after one of its providers changed."""
+        with self._lock:
+            self._generation += 1
+            for entries in (self._listings, self._resolved):
+                for key in [key for key, entry in entries.items() if entry.organization_id == organization_id]:
+                    del entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._listings.clear()
+            self._resolved.clear()
+
+    async def _get_listing_async(self, provider: Provider, kind: str, fetch: Callable[[], Awaitable[List[T]]]) -> List[T]:
+        if settings.model_catalog_ttl_seconds <= 0:
+            return await fetch()
+
+        key = self._listing_key(provider, kind)
+        entry = self._lookup(self._listings, key)
+        if entry is not None:
+            age = self._age(entry)
+            if age <= settings.model_catalog_ttl_seconds:
+                return self._copy(entry.value)
+            if age <= settings.model_catalog_max_stale_seconds:
+                self._get_refresh(key, provider, fetch)
+                return self._copy(entry.value)
+
+        try:
+            # Shielded: the refresh is shared with other callers, and is worth finishing if this one is cancelled
+            models = await asyncio.shield(self._get_refresh(key, provider, fetch))
+        except Exception as e:
+            if entry is None:
+                raise
+            logger.warning(f"Failed to refresh the {kind} models of provider {provider.name}, serving the last listing: {e}")
+            models = entry.value
+        return self._copy(models)
+
+    def _get_listing(self, provider: Provider, kind: str, fetch: Callable[[], List[T]]) -> List[T]:
+        if settings.model_catalog_ttl_seconds <= 0:
+            return fetch()
+
+        key = self._listing_key(provider, kind)
+        entry = self._lookup(self._listings, key)
+        if entry is not None and self._age(entry) <= settings.model_catalog_ttl_seconds:
+            return self._copy(entry.value)
+
+        generation = self._generation
+        try:
+            models = fetch()
+        except Exception as e:
+            if entry is None:
+                raise
+            logger.warning(f"Failed to refresh the {kind} models of provider {provider.name}, serving the last listing: {e}")
+            return self._copy(entry.value)
+        self._store(self._listings, key, provider.organization_id, models, generation)
+        return self._copy(models)
+
+    def _get_refresh(self, key: Hashable, provider: Provider, fetch: Callable[[], Awaitable[List[T]]]) -> asyncio.Task:
+        """The in-flight refresh of the listing at `key`, started if there is none."""
+        loop = asyncio.get_running_loop()
+        refreshes = self._refreshes.setdefault(loop, {})
+        task = refreshes.get(key)
+        # A finished task lingers until its done callback runs
+        if task is None or task.done():
+            task = refreshes[key] = loop.create_task(self._refresh_async(key, provider, fetch))
+            task.add_done_callback(lambda done: self._on_refresh_done(refreshes, key, provider, done))
+        return task
+
+    async def _refresh_async(self, key: Hashable, provider: Provider, fetch: Callable[[], Awaitable[List[T]]]) -> List[T]:
+        generation = self._generation
+        models = await fetch()
+        self._store(self._listings, key, provider.organization_id, models, generation)
+        return models
+
+    @staticmethod
+    def _on_refresh_done(refreshes: Dict[Hashable, asyncio.Task], key: Hashable, provider: Provider, task: asyncio.Task) -> None:
+        if refreshes.get(key) is task:
+            del refreshes[key]
+        # Background refreshes have no one awaiting them
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Failed to refresh the models of provider {provider.name}: {task.exception()}")
+
+    @staticmethod
+    def _listing_key(provider: Provider, kind: str) -> Tuple:
+        return (kind, provider.provider_category, provider.organization_id, provider.id or provider.name, provider.updated_at)
+
+    def _lookup(self, entries: "OrderedDict[Hashable, _Entry]", key: Hashable) -> Optional[_Entry]:
+        with self._lock:
+            entry = entries.get(key)
+            if entry is not None:
+                entries.move_to_end(key)
+            return entry
+
+    def _store(
+        self, entries: "OrderedDict[Hashable, _Entry]", key: Hashable, organization_id: Optional[str], value: Any, generation: int
+    ) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            entries[key] = _Entry(value=value, organization_id=organization_id, fetched_at=time.monotonic())
+            entries.move_to_end(key)
+            while len(entries) > settings.model_catalog_size:
+                entries.popitem(last=False)
+
+    @staticmethod
+    def _age(entry: _Entry) -> float:
+        return time.monotonic() - entry.fetched_at
+
+    @staticmethod
+    def _copy(models: List[T]) -> List[T]:
+        # Callers adjust the configs they get (context window, max tokens, ...)
+        return [model.model_copy(deep=True) for model in models]
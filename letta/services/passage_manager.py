@@ -17,6 +17,8 @@ from letta.schemas.file import FileMetadata as PydanticFileMetadata
 from letta.schemas.passage import Passage as PydanticPassage
 from letta.schemas.user import User as PydanticUser
 from letta.server.db import db_registry
+from letta.services.agent_counter_manager import AgentCounterManager
+from letta.services.vector_index_manager import VectorIndexManager
 from letta.utils import enforce_types
 
 
@@ -165,7 +167,9 @@ class PassageManager:
 
         with db_registry.session() as session:
             passage.create(session, actor=actor)
-            return passage.to_pydantic()
+            created = passage.to_pydantic()
+        VectorIndexManager().add_passages([created])
+        return created
 
     @enforce_types
     @trace_method
@@ -192,7 +196,9 @@ class PassageManager:
 
         async with db_registry.async_session() as session:
             passage = await passage.create_async(session, actor=actor)
-            return passage.to_pydantic()
+            created = passage.to_pydantic()
+        await VectorIndexManager().add_passages_async([created])
+        return created
 
     @enforce_types
     @trace_method
@@ -225,7 +231,9 @@ class PassageManager:
 
         with db_registry.session() as session:
             passage.create(session, actor=actor)
-            return passage.to_pydantic()
+            created = passage.to_pydantic()
+        VectorIndexManager().add_passages([created])
+        return created
 
     @enforce_types
     @trace_method
@@ -258,7 +266,9 @@ class PassageManager:
 
         async with db_registry.async_session() as session:
             passage = await passage.create_async(session, actor=actor)
-            return passage.to_pydantic()
+            created = passage.to_pydantic()
+        await VectorIndexManager().add_passages_async([created])
+        return created
 
     # DEPRECATED - Use specific methods above
     @enforce_types
@@ -275,7 +285,9 @@ class PassageManager:
 
         with db_registry.session() as session:
             passage.create(session, actor=actor)
-            return passage.to_pydantic()
+            created = passage.to_pydantic()
+        VectorIndexManager().add_passages([created])
+        return created
 
     @enforce_types
     @trace_method
@@ -293,7 +305,9 @@ class PassageManager:
         passage = self._preprocess_passage_for_creation(pydantic_passage=pydantic_passage)
         async with db_registry.async_session() as session:
             passage = await passage.create_async(session, actor=actor)
-            return passage.to_pydantic()
+            created = passage.to_pydantic()
+        await VectorIndexManager().add_passages_async([created])
+        return created
 
     @trace_method
     def _preprocess_passage_for_creation(self, pydantic_passage: PydanticPassage) -> "SqlAlchemyBase":
@@ -337,30 +351,18 @@ class PassageManager:
     @trace_method
     async def create_many_agent_passages_async(self, passages: List[PydanticPassage], actor: PydanticUser) -> List[PydanticPassage]:
         """Create multiple agent passages."""
-        agent_passages = []
         for p in passages:
             if not p.agent_id:
                 raise ValueError("Agent passage must have agent_id")
             if p.source_id:
                 raise ValueError("Agent passage cannot have source_id")
 
-            data = p.model_dump(to_orm=True)
-            common_fields = {
-                "id": data.get("id"),
-                "text": data["text"],
-                "embedding": data["embedding"],
-                "embedding_config": data["embedding_config"],
-                "organization_id": data["organization_id"],
-                "metadata_": data.get("metadata", {}),
-                "is_deleted": data.get("is_deleted", False),
-                "created_at": data.get("created_at", datetime.now(timezone.utc)),
-            }
-            agent_fields = {"agent_id": data["agent_id"]}
-            agent_passages.append(AgentPassage(**common_fields, **agent_fields))
-
+        created = [self._prepare_passage_for_bulk_insert(p, actor) for p in passages]
+        rows = [dict(self._bulk_passage_row(p), agent_id=p.agent_id) for p in created]
         async with db_registry.async_session() as session:
-            agent_created = await AgentPassage.batch_create_async(items=agent_passages, db_session=session, actor=actor)
-            return [p.to_pydantic() for p in agent_created]
+            await AgentPassage.bulk_insert_async(rows=rows, db_session=session, actor=actor)
+        await VectorIndexManager().add_passages_async(created)
+        return created
 
     @enforce_types
     @trace_method
@@ -376,34 +378,46 @@ class PassageManager:
         self, passages: List[PydanticPassage], file_metadata: PydanticFileMetadata, actor: PydanticUser
     ) -> List[PydanticPassage]:
         """Create multiple source passages."""
-        source_passages = []
         for p in passages:
             if not p.source_id:
                 raise ValueError("Source passage must have source_id")
             if p.agent_id:
                 raise ValueError("Source passage cannot have agent_id")
 
-            data = p.model_dump(to_orm=True)
-            common_fields = {
-                "id": data.get("id"),
-                "text": data["text"],
-                "embedding": data["embedding"],
-                "embedding_config": data["embedding_config"],
-                "organization_id": data["organization_id"],
-                "metadata_": data.get("metadata", {}),
-                "is_deleted": data.get("is_deleted", False),
-                "created_at": data.get("created_at", datetime.now(timezone.utc)),
-            }
-            source_fields = {
-                "source_id": data["source_id"],
-                "file_id": data.get("file_id"),
-                "file_name": file_metadata.file_name,
+        created = [self._prepare_passage_for_bulk_insert(p, actor, file_name=file_metadata.file_name) for p in passages]
+        rows = [dict(self._bulk_passage_row(p), source_id=p.source_id, file_id=p.file_id, file_name=p.file_name) for p in created]
+        async with db_registry.async_session() as session:
+            await SourcePassage.bulk_insert_async(rows=rows, db_session=session, actor=actor)
+        await VectorIndexManager().add_passages_async(created)
+        return created
+
+    @staticmethod
+    def _prepare_passage_for_bulk_insert(passage: PydanticPassage, actor: PydanticUser, **updates) -> PydanticPassage:
+        """The passage as it will be stored, so that bulk inserts don't have to read the rows back."""
+        return passage.model_copy(
+            update={
+                "created_by_id": passage.created_by_id or actor.id,
+                "last_updated_by_id": actor.id,
+                "updated_at": passage.created_at,
+                **updates,
             }
-            source_passages.append(SourcePassage(**common_fields, **source_fields))
+        )
 
-        async with db_registry.async_session() as session:
-            source_created = await SourcePassage.batch_create_async(items=source_passages, db_session=session, actor=actor)
-            return [p.to_pydantic() for p in source_created]
+    @staticmethod
+    def _bulk_passage_row(passage: PydanticPassage) -> dict:
+        """Columns shared by agent and source passages, for `bulk_insert_async`."""
+        return {
+            "id": passage.id,
+            "text": passage.text,
+            "embedding": passage.embedding,
+            "embedding_config": passage.embedding_config,
+            "organization_id": passage.organization_id,
+            "metadata_": passage.metadata or {},
+            "is_deleted": passage.is_deleted,
+            "created_at": passage.created_at,
+            "updated_at": passage.updated_at,
+            "_created_by_id": passage.created_by_id,
+        }
 
     # DEPRECATED - Use specific methods above
     @enforce_types
@@ -452,7 +466,9 @@ class PassageManager:
                 source_created = await SourcePassage.batch_create_async(items=source_passages, db_session=session, actor=actor)
                 results.extend(source_created)
 
-            return [p.to_pydantic() for p in results]
+            created = [p.to_pydantic() for p in results]
+        await VectorIndexManager().add_passages_async(created)
+        return created
 
     @enforce_types
     @trace_method
@@ -612,7 +628,10 @@ class PassageManager:
 
             # Commit changes
             curr_passage.update(session, actor=actor)
-            return curr_passage.to_pydantic()
+            updated = curr_passage.to_pydantic()
+        if "embedding" in update_data:
+            VectorIndexManager().add_passages([updated])
+        return updated
 
     @enforce_types
     @trace_method
@@ -640,7 +659,10 @@ class PassageManager:
 
             # Commit changes
             await curr_passage.update_async(session, actor=actor)
-            return curr_passage.to_pydantic()
+            updated = curr_passage.to_pydantic()
+        if "embedding" in update_data:
+            await VectorIndexManager().add_passages_async([updated])
+        return updated
 
     @enforce_types
     @trace_method
@@ -668,7 +690,10 @@ class PassageManager:
 
             # Commit changes
             curr_passage.update(session, actor=actor)
-            return curr_passage.to_pydantic()
+            updated = curr_passage.to_pydantic()
+        if "embedding" in update_data:
+            VectorIndexManager().add_passages([updated])
+        return updated
 
     @enforce_types
     @trace_method
@@ -696,7 +721,10 @@ class PassageManager:
 
             # Commit changes
             await curr_passage.update_async(session, actor=actor)
-            return curr_passage.to_pydantic()
+            updated = curr_passage.to_pydantic()
+        if "embedding" in update_data:
+            await VectorIndexManager().add_passages_async([updated])
+        return updated
 
     @enforce_types
     @trace_method
@@ -708,10 +736,12 @@ class PassageManager:
         with db_registry.session() as session:
             try:
                 passage = AgentPassage.read(db_session=session, identifier=passage_id, actor=actor)
+                deleted = passage.to_pydantic()
                 passage.hard_delete(session, actor=actor)
-                return True
             except NoResultFound:
                 raise NoResultFound(f"Agent passage with id {passage_id} not found.")
+        VectorIndexManager().remove_passages([deleted])
+        return True
 
     @enforce_types
     @trace_method
@@ -723,10 +753,12 @@ class PassageManager:
         async with db_registry.async_session() as session:
             try:
                 passage = await AgentPassage.read_async(db_session=session, identifier=passage_id, actor=actor)
+                deleted = passage.to_pydantic()
                 await passage.hard_delete_async(session, actor=actor)
-                return True
             except NoResultFound:
                 raise NoResultFound(f"Agent passage with id {passage_id} not found.")
+        await VectorIndexManager().remove_passages_async([deleted])
+        return True
 
     @enforce_types
     @trace_method
@@ -738,10 +770,12 @@ class PassageManager:
         with db_registry.session() as session:
             try:
                 passage = SourcePassage.read(db_session=session, identifier=passage_id, actor=actor)
+                deleted = passage.to_pydantic()
                 passage.hard_delete(session, actor=actor)
-                return True
             except NoResultFound:
                 raise NoResultFound(f"Source passage with id {passage_id} not found.")
+        VectorIndexManager().remove_passages([deleted])
+        return True
 
     @enforce_types
     @trace_method
@@ -753,10 +787,12 @@ class PassageManager:
         async with db_registry.async_session() as session:
             try:
                 passage = await SourcePassage.read_async(db_session=session, identifier=passage_id, actor=actor)
+                deleted = passage.to_pydantic()
                 await passage.hard_delete_async(session, actor=actor)
-                return True
             except NoResultFound:
                 raise NoResultFound(f"Source passage with id {passage_id} not found.")
+        await VectorIndexManager().remove_passages_async([deleted])
+        return True
 
     # DEPRECATED - Use specific methods above
     @enforce_types
@@ -800,7 +836,10 @@ class PassageManager:
 
             # Commit changes
             curr_passage.update(session, actor=actor)
-            return curr_passage.to_pydantic()
+            updated = curr_passage.to_pydantic()
+        if "embedding" in update_data:
+            VectorIndexManager().add_passages([updated])
+        return updated
 
     @enforce_types
     @trace_method
@@ -821,16 +860,16 @@ class PassageManager:
             # Try source passages first
             try:
                 passage = SourcePassage.read(db_session=session, identifier=passage_id, actor=actor)
-                passage.hard_delete(session, actor=actor)
-                return True
             except NoResultFound:
                 # Try archival passages
                 try:
                     passage = AgentPassage.read(db_session=session, identifier=passage_id, actor=actor)
-                    passage.hard_delete(session, actor=actor)
-                    return True
                 except NoResultFound:
                     raise NoResultFound(f"Passage with id {passage_id} not found.")
+            deleted = passage.to_pydantic()
+            passage.hard_delete(session, actor=actor)
+        VectorIndexManager().remove_passages([deleted])
+        return True
 
     @enforce_types
     @trace_method
@@ -851,16 +890,16 @@ class PassageManager:
             # Try source passages first
             try:
                 passage = await SourcePassage.read_async(db_session=session, identifier=passage_id, actor=actor)
-                await passage.hard_delete_async(session, actor=actor)
-                return True
             except NoResultFound:
                 # Try archival passages
                 try:
                     passage = await AgentPassage.read_async(db_session=session, identifier=passage_id, actor=actor)
-                    await passage.hard_delete_async(session, actor=actor)
-                    return True
                 except NoResultFound:
                     raise NoResultFound(f"Passage with id {passage_id} not found.")
+            deleted = passage.to_pydantic()
+            await passage.hard_delete_async(session, actor=actor)
+        await VectorIndexManager().remove_passages_async([deleted])
+        return True
 
     @enforce_types
     @trace_method
@@ -886,7 +925,8 @@ class PassageManager:
         """Delete multiple agent passages."""
         async with db_registry.async_session() as session:
             await AgentPassage.bulk_hard_delete_async(db_session=session, identifiers=[p.id for p in passages], actor=actor)
-            return True
+        await VectorIndexManager().remove_passages_async(passages)
+        return True
 
     @enforce_types
     @trace_method
@@ -911,7 +951,8 @@ class PassageManager:
     ) -> bool:
         async with db_registry.async_session() as session:
             await SourcePassage.bulk_hard_delete_async(db_session=session, identifiers=[p.id for p in passages], actor=actor)
-            return True
+        await VectorIndexManager().remove_passages_async(passages)
+        return True
 
     # DEPRECATED - Use specific methods above
     @enforce_types
@@ -978,6 +1019,8 @@ class PassageManager:
             actor: The user requesting the count
             agent_id: The agent ID of the messages
         """
+        if agent_id is not None:
+            return await AgentCounterManager().get_archival_passage_count_async(agent_id=agent_id, actor=actor)
         async with db_registry.async_session() as session:
             return await AgentPassage.size_async(db_session=session, actor=actor, agent_id=agent_id)
 
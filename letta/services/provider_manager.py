@@ -1,4 +1,5 @@
-from typing import List, Optional, Tuple, Union
+import time
+from typing import Dict, List, Optional, Tuple, Union
 
 from letta.orm.provider import Provider as ProviderModel
 from letta.otel.tracing import trace_method
@@ -7,8 +8,31 @@ from letta.schemas.providers import Provider as PydanticProvider
 from letta.schemas.providers import ProviderCheck, ProviderCreate, ProviderUpdate
 from letta.schemas.user import User as PydanticUser
 from letta.server.db import db_registry
+from letta.services.model_catalog import ModelCatalog
+from letta.settings import settings
 from letta.utils import enforce_types
 
+# BYOK api keys are resolved on every LLM request: (organization_id, provider_name) -> (expires_at, api_key)
+_override_key_cache: Dict[Tuple[str, Optional[str]], Tuple[float, Optional[str]]] = {}
+
+
+def _get_cached_override_key(actor: PydanticUser, provider_name: Optional[str]) -> Tuple[bool, Optional[str]]:
+    entry = _override_key_cache.get((actor.organization_id, provider_name))
+    if entry is None or entry[0] < time.monotonic():
+        return False, None
+    return True, entry[1]
+
+
+def _cache_override_key(actor: PydanticUser, provider_name: Optional[str], api_key: Optional[str]) -> None:
+    if settings.provider_key_cache_ttl_seconds > 0:
+        _override_key_cache[(actor.organization_id, provider_name)] = (time.monotonic() + settings.provider_key_cache_ttl_seconds, api_key)
+
+
+def _invalidate_provider_caches(actor: PydanticUser) -> None:
+    for key in [key for key in _override_key_cache if key[0] == actor.organization_id]:
+        _override_key_cache.pop(key, None)
+    ModelCatalog().invalidate_organization(actor.organization_id)
+
 
 class ProviderManager:
 
@@ -31,6 +55,7 @@ class ProviderManager:
 
             new_provider = ProviderModel(**provider.model_dump(to_orm=True, exclude_unset=True))
             new_provider.create(session, actor=actor)
+            _invalidate_provider_caches(actor)
             return new_provider.to_pydantic()
 
     @enforce_types
@@ -52,6 +77,7 @@ class ProviderManager:
 
             new_provider = ProviderModel(**provider.model_dump(to_orm=True, exclude_unset=True))
             await new_provider.create_async(session, actor=actor)
+            _invalidate_provider_caches(actor)
             return new_provider.to_pydantic()
 
     @enforce_types
@@ -69,6 +95,7 @@ class ProviderManager:
 
             # Commit the updated provider
             existing_provider.update(session, actor=actor)
+            _invalidate_provider_caches(actor)
             return existing_provider.to_pydantic()
 
     @enforce_types
@@ -88,6 +115,7 @@ class ProviderManager:
 
             # Commit the updated provider
             await existing_provider.update_async(session, actor=actor)
+            _invalidate_provider_caches(actor)
             return existing_provider.to_pydantic()
 
     @enforce_types
@@ -104,6 +132,7 @@ class ProviderManager:
             existing_provider.delete(session, actor=actor)
 
             session.commit()
+            _invalidate_provider_caches(actor)
 
     @enforce_types
     @trace_method
@@ -121,6 +150,7 @@ class ProviderManager:
             await existing_provider.delete_async(session, actor=actor)
 
             await session.commit()
+            _invalidate_provider_caches(actor)
 
     @enforce_types
     @trace_method
@@ -185,14 +215,24 @@ class ProviderManager:
     @enforce_types
     @trace_method
     def get_override_key(self, provider_name: Union[str, None], actor: PydanticUser) -> Optional[str]:
+        cached, api_key = _get_cached_override_key(actor, provider_name)
+        if cached:
+            return api_key
         providers = self.list_providers(name=provider_name, actor=actor)
-        return providers[0].api_key if providers else None
+        api_key = providers[0].api_key if providers else None
+        _cache_override_key(actor, provider_name, api_key)
+        return api_key
 
     @enforce_types
     @trace_method
     async def get_override_key_async(self, provider_name: Union[str, None], actor: PydanticUser) -> Optional[str]:
+        cached, api_key = _get_cached_override_key(actor, provider_name)
+        if cached:
+            return api_key
         providers = await self.list_providers_async(name=provider_name, actor=actor)
-        return providers[0].api_key if providers else None
+        api_key = providers[0].api_key if providers else None
+        _cache_override_key(actor, provider_name, api_key)
+        return api_key
 
     @enforce_types
     @trace_method
@@ -0,0 +1,177 @@
+import asyncio
+import random
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, List, Optional, Tuple
+
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+from letta.helpers.json_helpers import json_dumps, json_loads
+from letta.helpers.singleton import singleton
+from letta.log import get_logger
+from letta.orm.provider_trace import ProviderTrace as ProviderTraceModel
+from letta.otel.context import get_ctx_attributes
+from letta.otel.metric_registry import MetricRegistry
+from letta.schemas.provider_trace import ProviderTraceCreate
+from letta.schemas.user import User as PydanticUser
+from letta.server.db import db_registry
+from letta.settings import settings
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class ProviderTraceSinkStats:
+    queued: int = 0
+    written: int = 0
+    dropped: int = 0  # the queue was full
+    sampled_out: int = 0
+    failed: int = 0
+
+
+@dataclass
+class _PendingTrace:
+    actor_id: str
+    provider_trace_create: ProviderTraceCreate
+
+
+@dataclass
+class _LoopQueue:
+    traces: Deque[_PendingTrace] = field(default_factory=deque)
+    worker: Optional[asyncio.Task] = None
+
+
+@singleton
+class ProviderTraceSink:
+    """
+    Writes provider traces in the background, so that agent steps don't wait on them.
+
+    `submit` only queues the trace. A worker task per event loop writes the queue in batches of up to
+    `provider_trace_batch_size` traces, one multi-row INSERT per batch, normalizing the (large) request and response
+    payloads in a thread. At most `provider_trace_queue_size` traces wait per event loop; traces submitted while the
+    queue is full are dropped, as are all but a `provider_trace_sample_rate` fraction of traces.
+    """
+
+    def __init__(self):
+        self._queues: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopQueue]" = weakref.WeakKeyDictionary()
+        self._stats = ProviderTraceSinkStats()
+
+    def submit(self, actor: PydanticUser, provider_trace_create: ProviderTraceCreate) -> bool:
+        """Queue the trace to be written; returns False if it was dropped. The sink takes ownership of the payloads."""
+        if settings.provider_trace_sample_rate < 1 and random.random() >= settings.provider_trace_sample_rate:
+            self._stats.sampled_out += 1
+            MetricRegistry().provider_trace_dropped_counter.add(1, dict(get_ctx_attributes(), reason="sampled_out"))
+            return False
+
+        loop = asyncio.get_running_loop()
+        queue = self._queues.setdefault(loop, _LoopQueue())
+        if len(queue.traces) >= settings.provider_trace_queue_size:
+            self._stats.dropped += 1
+            MetricRegistry().provider_trace_dropped_counter.add(1, dict(get_ctx_attributes(), reason="queue_full"))
+            return False
+
+        queue.traces.append(_PendingTrace(actor_id=actor.id, provider_trace_create=provider_trace_create))
+        MetricRegistry().provider_trace_queue_depth.add(1, get_ctx_attributes())
+        if queue.worker is None:
+            queue.worker = loop.create_task(self._drain(queue))
+        return True
+
+    async def flush_async(self) -> None:
+        """Wait until every trace submitted so far, on any event loop, has been written (or given up on)."""
+        current_loop = asyncio.get_running_loop()
+        for loop, queue in list(self._queues.items()):
+            if queue.worker is None:
+                continue
+            if loop is current_loop:
+                await asyncio.shield(queue.worker)
+            elif loop.is_running():
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._wait_for_worker(queue), loop))
+
+    def stats(self) -> ProviderTraceSinkStats:
+        """Counts across event loops; `queued` is the number of traces currently waiting."""
+        queued = sum(len(queue.traces) for queue in list(self._queues.values()))
+        return ProviderTraceSinkStats(
+            queued=queued,
+            written=self._stats.written,
+            dropped=self._stats.dropped,
+            sampled_out=self._stats.sampled_out,
+            failed=self._stats.failed,
+        )
+
+    @staticmethod
+    async def _wait_for_worker(queue: _LoopQueue) -> None:
+        if queue.worker is not None:
+            await asyncio.shield(queue.worker)
+
+    async def _drain(self, queue: _LoopQueue) -> None:
+        """Write the queued traces batch by batch until none is left, then retire."""
+        while queue.traces:
+            if len(queue.traces) < settings.provider_trace_batch_size:
+                # Let the batch fill up a little
+                await asyncio.sleep(settings.provider_trace_flush_interval_seconds)
+
+            batch: List[_PendingTrace] = []
+            while queue.traces and len(batch) < settings.provider_trace_batch_size:
+                batch.append(queue.traces.popleft())
+            MetricRegistry().provider_trace_queue_depth.add(-len(batch), get_ctx_attributes())
+
+            try:
+                written = await self._write_batch_async(batch)
+            except Exception:
+                logger.exception(f"Failed to write {len(batch)} provider traces")
+                written = 0
+            self._stats.written += written
+            if written < len(batch):
+                self._stats.failed += len(batch) - written
+                MetricRegistry().provider_trace_dropped_counter.add(len(batch) - written, dict(get_ctx_attributes(), reason="write_failed"))
+        queue.worker = None
+
+    async def _write_batch_async(self, batch: List[_PendingTrace]) -> int:
+        """Write the batch, returning how many of its traces were written."""
+        # Round-tripping the payloads through JSON makes them storable (datetimes, pydantic models, ...), and is the
+        # expensive part for payloads holding whole context windows
+        payloads = await asyncio.to_thread(self._normalize_payloads, batch)
+        try:
+            async with db_registry.async_session() as session:
+                session.add_all([self._build_row(pending, payload) for pending, payload in zip(batch, payloads)])
+                await session.commit()
+            return len(batch)
+        except (DBAPIError, IntegrityError) as e:
+            if len(batch) == 1:
+                raise
+            logger.warning(f"Failed to write a batch of {len(batch)} provider traces, writing them one by one: {e}")
+
+        # Don't let one bad trace take the rest of its batch down with it
+        written = 0
+        for pending, payload in zip(batch, payloads):
+            try:
+                async with db_registry.async_session() as session:
+                    session.add(self._build_row(pending, payload))
+                    await session.commit()
+                written += 1
+            except (DBAPIError, IntegrityError):
+                logger.exception(f"Failed to write the provider trace of step {pending.provider_trace_create.step_id}")
+        return written
+
+    @staticmethod
+    def _normalize_payloads(batch: List[_PendingTrace]) -> List[Tuple[dict, dict]]:
+        def normalize(payload: dict) -> dict:
+            return json_loads(json_dumps(payload)) if payload else payload
+
+        return [
+            (normalize(pending.provider_trace_create.request_json), normalize(pending.provider_trace_create.response_json))
+            for pending in batch
+        ]
+
+    @staticmethod
+    def _build_row(pending: _PendingTrace, payload: Tuple[dict, dict]) -> ProviderTraceModel:
+        request_json, response_json = payload
+        provider_trace = ProviderTraceModel(
+            step_id=pending.provider_trace_create.step_id,
+            organization_id=pending.provider_trace_create.organization_id,
+            request_json=request_json,
+            response_json=response_json,
+        )
+        provider_trace._set_created_and_updated_by_fields(pending.actor_id)
+        return provider_trace
@@ -0,0 +1,124 @@
+import asyncio
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from letta.helpers.singleton import singleton
+from letta.log import get_logger
+from letta.otel.context import get_ctx_attributes
+from letta.otel.metric_registry import MetricRegistry
+from letta.schemas.message import Message
+from letta.settings import settings
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class SleeptimeTrigger:
+    """The foreground turns a sleeptime agent run covers: everything after `last_processed_message_id` up to `response_messages`."""
+
+    last_processed_message_id: Optional[str]
+    response_messages: List[Message]
+    num_turns: int = 1
+
+    def merge(self, later: "SleeptimeTrigger") -> "SleeptimeTrigger":
+        """The trigger covering this trigger's turns followed by `later`'s."""
+        return SleeptimeTrigger(
+            last_processed_message_id=self.last_processed_message_id,
+            response_messages=later.response_messages,
+            num_turns=self.num_turns + later.num_turns,
+        )
+
+
+@dataclass
+class _PendingRun:
+    run_id: str
+    trigger: SleeptimeTrigger
+    execute: Callable[[str, SleeptimeTrigger], Awaitable]
+    enqueued_at: float
+
+
+@dataclass
+class _AgentQueue:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    pending: Optional[_PendingRun] = None
+    worker: Optional[asyncio.Task] = None
+
+
+@singleton
+class SleeptimeScheduler:
+    """
+    Runs sleeptime agents in the background, at most one run per sleeptime agent at a time.
+
+    Turns that trigger a sleeptime agent while its previous run is still in progress are merged into a single pending
+    run over the combined transcript range, so a chatty conversation queues at most one run per agent. At most
+    `sleeptime_max_concurrent_runs` runs are in progress at once across all agents. State is kept per event loop,
+    since asyncio primitives are bound to the loop they are first used on.
+    """
+
+    def __init__(self):
+        self._queues: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, _AgentQueue]]" = weakref.WeakKeyDictionary()
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+    async def submit(
+        self,
+        sleeptime_agent_id: str,
+        trigger: SleeptimeTrigger,
+        create_run: Callable[[], Awaitable[str]],
+        execute: Callable[[str, SleeptimeTrigger], Awaitable],
+    ) -> str:
+        """
+        Schedule a run of the sleeptime agent for `trigger`. If one is already waiting to start, `trigger` is merged
+        into it and its run id is returned; otherwise a run is created with `create_run` and later started with
+        `execute(run_id, trigger)`.
+        """
+        loop = asyncio.get_running_loop()
+        queues = self._queues.setdefault(loop, {})
+        while True:
+            queue = queues.setdefault(sleeptime_agent_id, _AgentQueue())
+            async with queue.lock:
+                if queues.get(sleeptime_agent_id) is not queue:
+                    # Retired by its worker while we were waiting for the lock
+                    continue
+
+                if queue.pending is not None:
+                    queue.pending.trigger = queue.pending.trigger.merge(trigger)
+                    MetricRegistry().sleeptime_coalesced_turns_counter.add(trigger.num_turns, get_ctx_attributes())
+                    return queue.pending.run_id
+
+                run_id = await create_run()
+                queue.pending = _PendingRun(run_id=run_id, trigger=trigger, execute=execute, enqueued_at=time.monotonic())
+                MetricRegistry().sleeptime_pending_runs.add(1, get_ctx_attributes())
+                if queue.worker is None:
+                    queue.worker = loop.create_task(self._drain(sleeptime_agent_id, queue, queues))
+                return run_id
+
+    async def _drain(self, sleeptime_agent_id: str, queue: _AgentQueue, queues: Dict[str, _AgentQueue]) -> None:
+        """Start the agent's pending runs one after another until none is left, then retire the queue."""
+        while True:
+            async with queue.lock:
+                if queue.pending is None:
+                    queue.worker = None
+                    queues.pop(sleeptime_agent_id, None)
+                    return
+
+            async with self._get_slots(asyncio.get_running_loop()):
+                # Turns keep merging into the pending run until it actually starts
+                async with queue.lock:
+                    pending, queue.pending = queue.pending, None
+                MetricRegistry().sleeptime_pending_runs.add(-1, get_ctx_attributes())
+                MetricRegistry().sleeptime_run_lag_ms_histogram.record(
+                    (time.monotonic() - pending.enqueued_at) * 1000, dict(get_ctx_attributes(), **{"agent.id": sleeptime_agent_id})
+                )
+                try:
+                    await pending.execute(pending.run_id, pending.trigger)
+                except Exception:
+                    # The run records its own failure
+                    logger.exception(f"Sleeptime agent {sleeptime_agent_id} run {pending.run_id} failed")
+
+    def _get_slots(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots[loop] = asyncio.Semaphore(settings.sleeptime_max_concurrent_runs)
+        return slots
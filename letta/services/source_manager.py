@@ -9,6 +9,7 @@ from letta.schemas.source import Source as PydanticSource
 from letta.schemas.source import SourceUpdate
 from letta.schemas.user import User as PydanticUser
 from letta.server.db import db_registry
+from letta.services.vector_index_manager import VectorIndexManager
 from letta.utils import enforce_types, printd
 
 
@@ -61,6 +62,7 @@ class SourceManager:
         async with db_registry.async_session() as session:
             source = await SourceModel.read_async(db_session=session, identifier=source_id)
             await source.hard_delete_async(db_session=session, actor=actor)
+            VectorIndexManager().drop("source", source_id)
             return source.to_pydantic()
 
     @enforce_types
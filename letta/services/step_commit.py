@@ -0,0 +1,144 @@
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+from letta.agents.helpers import generate_step_id
+from letta.log import get_logger
+from letta.orm.errors import NoResultFound
+from letta.orm.job import Job as JobModel
+from letta.orm.job_messages import JobMessage
+from letta.orm.message import Message as MessageModel
+from letta.orm.provider_trace import ProviderTrace as ProviderTraceModel
+from letta.orm.sqlalchemy_base import AccessType
+from letta.orm.step import Step as StepModel
+from letta.otel.tracing import trace_method
+from letta.schemas.message import Message as PydanticMessage
+from letta.schemas.openai.chat_completion_response import UsageStatistics
+from letta.schemas.provider_trace import ProviderTraceCreate
+from letta.schemas.user import User as PydanticUser
+from letta.server.db import db_registry
+from letta.services.message_manager import MessageManager
+from letta.services.step_manager import StepManager
+from letta.services.telemetry_manager import TelemetryManager
+from letta.settings import settings
+
+logger = get_logger(__name__)
+
+
+class StepCommit:
+    """
+    Unit of work for the writes of one agent step: the step row, its messages and their job associations are collected
+    here and written by `commit_async` in a single transaction. The provider trace is handed to the background
+    `ProviderTraceSink` once the step is committed, unless the sink is disabled, in which case it is written in the
+    same transaction.
+
+    Each table is written with one multi-row INSERT ... RETURNING, and the returned messages are built from the
+    inserted rows instead of being selected again after the commit.
+    """
+
+    def __init__(
+        self,
+        actor: PydanticUser,
+        step_manager: StepManager,
+        message_manager: MessageManager,
+        telemetry_manager: TelemetryManager,
+    ):
+        self.actor = actor
+        self.step_manager = step_manager
+        self.message_manager = message_manager
+        self.telemetry_manager = telemetry_manager
+        self._step: Optional[StepModel] = None
+        self._messages: List[MessageModel] = []
+        self._job_id: Optional[str] = None
+        self._job_message_ids: List[str] = []
+        self._provider_trace: Optional[ProviderTraceModel] = None
+        self._provider_trace_create: Optional[ProviderTraceCreate] = None
+
+    def log_step(
+        self,
+        agent_id: str,
+        provider_name: str,
+        provider_category: str,
+        model: str,
+        model_endpoint: Optional[str],
+        context_window_limit: int,
+        usage: UsageStatistics,
+        provider_id: Optional[str] = None,
+        job_id: Optional[str] = None,
+        step_id: Optional[str] = None,
+    ) -> Optional[str]:
+        """Stage the step row; returns its id, or None if the step manager doesn't record steps."""
+        self._step = self.step_manager.build_step(
+            actor=self.actor,
+            agent_id=agent_id,
+            provider_name=provider_name,
+            provider_category=provider_category,
+            model=model,
+            model_endpoint=model_endpoint,
+            context_window_limit=context_window_limit,
+            usage=usage,
+            provider_id=provider_id,
+            job_id=job_id,
+            # Assigned up front so that the step's messages and trace can reference it
+            step_id=step_id or generate_step_id(),
+        )
+        if self._step is None:
+            return None
+        self._job_id = self._job_id or job_id
+        return self._step.id
+
+    def add_messages(self, messages: List[PydanticMessage], job_id: Optional[str] = None) -> None:
+        """Stage messages; with `job_id`, the non-user messages are also associated with the job."""
+        self._messages.extend(self.message_manager.build_messages(messages, self.actor))
+        if job_id:
+            self._job_id = job_id
+            self._job_message_ids.extend(m.id for m in messages if m.role != "user")
+
+    def add_provider_trace(self, provider_trace_create: ProviderTraceCreate) -> None:
+        if settings.provider_trace_queue_size > 0:
+            self._provider_trace_create = provider_trace_create
+        else:
+            self._provider_trace = self.telemetry_manager.build_provider_trace(provider_trace_create)
+
+    @trace_method
+    async def commit_async(self) -> List[PydanticMessage]:
+        """Write everything staged in one transaction and return the persisted messages."""
+        async with db_registry.async_session() as session:
+            if self._job_id:
+                await self._verify_job_access_async(session, self._job_id)
+
+            # Parents are flushed before the rows referencing them; each flush is one multi-row INSERT ... RETURNING
+            if self._step is not None:
+                await self._flush_async(session, StepModel, [self._step])
+            if self._messages:
+                await self._flush_async(session, MessageModel, self._messages)
+            if self._job_message_ids:
+                job_messages = [JobMessage(job_id=self._job_id, message_id=message_id) for message_id in self._job_message_ids]
+                await self._flush_async(session, JobMessage, job_messages)
+            if self._provider_trace is not None:
+                await self._flush_async(session, ProviderTraceModel, [self._provider_trace])
+
+            # The rows are fully loaded after the flushes (server defaults come back through RETURNING), and would
+            # be expired by the commit
+            persisted_messages = [message.to_pydantic() for message in self._messages]
+            await session.commit()
+
+        if self._provider_trace_create is not None:
+            await self.telemetry_manager.log_provider_trace_async(actor=self.actor, provider_trace_create=self._provider_trace_create)
+        return persisted_messages
+
+    async def _flush_async(self, session, model_cls, rows: list) -> None:
+        for row in rows:
+            row._set_created_and_updated_by_fields(self.actor.id)
+        session.add_all(rows)
+        try:
+            await session.flush()
+        except (DBAPIError, IntegrityError) as e:
+            model_cls._handle_dbapi_error(e)
+
+    async def _verify_job_access_async(self, session, job_id: str) -> None:
+        job_query = select(JobModel.id).where(JobModel.id == job_id)
+        job_query = JobModel.apply_access_predicate(job_query, self.actor, ["write"], AccessType.USER)
+        if (await session.execute(job_query)).scalar_one_or_none() is None:
+            raise NoResultFound(f"Job with id {job_id} does not exist or user does not have access")
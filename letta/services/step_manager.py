@@ -57,9 +57,7 @@ class StepManager:
             )
             return [step.to_pydantic() for step in steps]
 
-    @enforce_types
-    @trace_method
-    def log_step(
+    def build_step(
         self,
         actor: PydanticUser,
         agent_id: str,
@@ -72,7 +70,8 @@ class StepManager:
         provider_id: Optional[str] = None,
         job_id: Optional[str] = None,
         step_id: Optional[str] = None,
-    ) -> PydanticStep:
+    ) -> Optional[StepModel]:
+        """Build the (unsaved) step row, e.g. for a `StepCommit` that writes it together with the step's messages."""
         step_data = {
             "origin": None,
             "organization_id": actor.organization_id,
@@ -93,10 +92,40 @@ class StepManager:
         }
         if step_id:
             step_data["id"] = step_id
+        return StepModel(**step_data)
+
+    @enforce_types
+    @trace_method
+    def log_step(
+        self,
+        actor: PydanticUser,
+        agent_id: str,
+        provider_name: str,
+        provider_category: str,
+        model: str,
+        model_endpoint: Optional[str],
+        context_window_limit: int,
+        usage: UsageStatistics,
+        provider_id: Optional[str] = None,
+        job_id: Optional[str] = None,
+        step_id: Optional[str] = None,
+    ) -> PydanticStep:
+        new_step = self.build_step(
+            actor=actor,
+            agent_id=agent_id,
+            provider_name=provider_name,
+            provider_category=provider_category,
+            model=model,
+            model_endpoint=model_endpoint,
+            context_window_limit=context_window_limit,
+            usage=usage,
+            provider_id=provider_id,
+            job_id=job_id,
+            step_id=step_id,
+        )
         with db_registry.session() as session:
             if job_id:
                 self._verify_job_access(session, job_id, actor, access=["write"])
-            new_step = StepModel(**step_data)
             new_step.create(session)
             return new_step.to_pydantic()
 
@@ -116,30 +145,22 @@ class StepManager:
         job_id: Optional[str] = None,
         step_id: Optional[str] = None,
     ) -> PydanticStep:
-        step_data = {
-            "origin": None,
-            "organization_id": actor.organization_id,
-            "agent_id": agent_id,
-            "provider_id": provider_id,
-            "provider_name": provider_name,
-            "provider_category": provider_category,
-            "model": model,
-            "model_endpoint": model_endpoint,
-            "context_window_limit": context_window_limit,
-            "completion_tokens": usage.completion_tokens,
-            "prompt_tokens": usage.prompt_tokens,
-            "total_tokens": usage.total_tokens,
-            "job_id": job_id,
-            "tags": [],
-            "tid": None,
-            "trace_id": get_trace_id(),  # Get the current trace ID
-        }
-        if step_id:
-            step_data["id"] = step_id
+        new_step = self.build_step(
+            actor=actor,
+            agent_id=agent_id,
+            provider_name=provider_name,
+            provider_category=provider_category,
+            model=model,
+            model_endpoint=model_endpoint,
+            context_window_limit=context_window_limit,
+            usage=usage,
+            provider_id=provider_id,
+            job_id=job_id,
+            step_id=step_id,
+        )
         async with db_registry.async_session() as session:
             if job_id:
                 await self._verify_job_access_async(session, job_id, actor, access=["write"])
-            new_step = StepModel(**step_data)
             await new_step.create_async(session)
             return new_step.to_pydantic()
 
@@ -243,6 +264,22 @@ class NoopStepManager(StepManager):
     Will not allow for writes, but will still allow for reads.
     """
 
+    def build_step(
+        self,
+        actor: PydanticUser,
+        agent_id: str,
+        provider_name: str,
+        provider_category: str,
+        model: str,
+        model_endpoint: Optional[str],
+        context_window_limit: int,
+        usage: UsageStatistics,
+        provider_id: Optional[str] = None,
+        job_id: Optional[str] = None,
+        step_id: Optional[str] = None,
+    ) -> Optional[StepModel]:
+        return
+
     @enforce_types
     @trace_method
     def log_step(
@@ -39,7 +39,12 @@ class Summarizer:
 
     @trace_method
     def summarize(
-        self, in_context_messages: List[Message], new_letta_messages: List[Message], force: bool = False, clear: bool = False
+        self,
+        in_context_messages: List[Message],
+        new_letta_messages: List[Message],
+        force: bool = False,
+        clear: bool = False,
+        retain_count: Optional[int] = None,
     ) -> Tuple[List[Message], bool]:
         """
         Summarizes or trims in_context_messages according to the chosen mode,
@@ -49,6 +54,8 @@ class Summarizer:
             in_context_messages: The existing messages in the conversation's context.
             new_letta_messages: The newly added Letta messages (just appended).
             force: Force summarize even if the criteria is not met
+            clear: Evict every message except the system message
+            retain_count: Number of most recent messages to keep when evicting, overriding `message_buffer_min`
 
         Returns:
             (updated_messages, summary_message)
@@ -57,7 +64,9 @@ class Summarizer:
                              (could be appended to the conversation if desired)
         """
         if self.mode == SummarizationMode.STATIC_MESSAGE_BUFFER:
-            return self._static_buffer_summarization(in_context_messages, new_letta_messages, force=force, clear=clear)
+            return self._static_buffer_summarization(
+                in_context_messages, new_letta_messages, force=force, clear=clear, retain_count=retain_count
+            )
         else:
             # Fallback or future logic
             return in_context_messages, False
@@ -75,7 +84,12 @@ class Summarizer:
         return task
 
     def _static_buffer_summarization(
-        self, in_context_messages: List[Message], new_letta_messages: List[Message], force: bool = False, clear: bool = False
+        self,
+        in_context_messages: List[Message],
+        new_letta_messages: List[Message],
+        force: bool = False,
+        clear: bool = False,
+        retain_count: Optional[int] = None,
     ) -> Tuple[List[Message], bool]:
         all_in_context_messages = in_context_messages + new_letta_messages
 
@@ -85,7 +99,10 @@ class Summarizer:
             )
             return all_in_context_messages, False
 
-        retain_count = 0 if clear else self.message_buffer_min
+        if clear:
+            retain_count = 0
+        elif retain_count is None:
+            retain_count = self.message_buffer_min
 
         if not force:
             logger.info(f"Buffer length hit {self.message_buffer_limit}, evicting until we retain only {retain_count} messages.")
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from letta.helpers.json_helpers import json_dumps, json_loads
 from letta.helpers.singleton import singleton
 from letta.orm.provider_trace import ProviderTrace as ProviderTraceModel
@@ -6,6 +8,8 @@ from letta.schemas.provider_trace import ProviderTraceCreate
 from letta.schemas.step import Step as PydanticStep
 from letta.schemas.user import User as PydanticUser
 from letta.server.db import db_registry
+from letta.services.provider_trace_sink import ProviderTraceSink
+from letta.settings import settings
 from letta.utils import enforce_types
 
 
@@ -16,21 +20,36 @@ class TelemetryManager:
         step_id: str,
         actor: PydanticUser,
     ) -> PydanticProviderTrace:
+        # Traces of this process may still be waiting in the sink
+        await ProviderTraceSink().flush_async()
         async with db_registry.async_session() as session:
             provider_trace = await ProviderTraceModel.read_async(db_session=session, step_id=step_id, actor=actor)
             return provider_trace.to_pydantic()
 
+    def build_provider_trace(self, provider_trace_create: ProviderTraceCreate) -> Optional[ProviderTraceModel]:
+        """Build the (unsaved) trace row, e.g. for a `StepCommit` that writes it together with its step."""
+        provider_trace = ProviderTraceModel(**provider_trace_create.model_dump())
+        if provider_trace_create.request_json:
+            request_json_str = json_dumps(provider_trace_create.request_json)
+            provider_trace.request_json = json_loads(request_json_str)
+
+        if provider_trace_create.response_json:
+            response_json_str = json_dumps(provider_trace_create.response_json)
+            provider_trace.response_json = json_loads(response_json_str)
+        return provider_trace
+
+    @enforce_types
+    async def log_provider_trace_async(self, actor: PydanticUser, provider_trace_create: ProviderTraceCreate) -> None:
+        """Record the trace without waiting for it to be written (see `ProviderTraceSink`)."""
+        if settings.provider_trace_queue_size <= 0:
+            await self.create_provider_trace_async(actor=actor, provider_trace_create=provider_trace_create)
+        else:
+            ProviderTraceSink().submit(actor, provider_trace_create)
+
     @enforce_types
     async def create_provider_trace_async(self, actor: PydanticUser, provider_trace_create: ProviderTraceCreate) -> PydanticProviderTrace:
         async with db_registry.async_session() as session:
-            provider_trace = ProviderTraceModel(**provider_trace_create.model_dump())
-            if provider_trace_create.request_json:
-                request_json_str = json_dumps(provider_trace_create.request_json)
-                provider_trace.request_json = json_loads(request_json_str)
-
-            if provider_trace_create.response_json:
-                response_json_str = json_dumps(provider_trace_create.response_json)
-                provider_trace.response_json = json_loads(response_json_str)
+            provider_trace = self.build_provider_trace(provider_trace_create)
             await provider_trace.create_async(session, actor=actor)
             return provider_trace.to_pydantic()
 
@@ -55,6 +74,12 @@ class NoopTelemetryManager(TelemetryManager):
     Noop implementation of TelemetryManager.
     """
 
+    def build_provider_trace(self, provider_trace_create: ProviderTraceCreate) -> Optional[ProviderTraceModel]:
+        return
+
+    async def log_provider_trace_async(self, actor: PydanticUser, provider_trace_create: ProviderTraceCreate) -> None:
+        return
+
     async def create_provider_trace_async(self, actor: PydanticUser, provider_trace_create: ProviderTraceCreate) -> PydanticProviderTrace:
         return
 
@@ -9,6 +9,7 @@ from letta.constants import (
 )
 from letta.helpers.json_helpers import json_dumps
 from letta.schemas.agent import AgentState
+from letta.schemas.enums import MessageRole
 from letta.schemas.sandbox_config import SandboxConfig
 from letta.schemas.tool import Tool
 from letta.schemas.tool_execution_result import ToolExecutionResult
@@ -82,7 +83,7 @@ class LettaCoreToolExecutor(ToolExecutor):
 
     async def conversation_search(self, agent_state: AgentState, actor: User, query: str, page: Optional[int] = 0) -> Optional[str]:
         """
-        Search prior conversation history using case-insensitive string matching.
+        Search prior conversation history using full-text search, most relevant matches first.
 
         Args:
             query (str): String to search for.
@@ -99,11 +100,13 @@ class LettaCoreToolExecutor(ToolExecutor):
             raise ValueError(f"'page' argument must be an integer")
 
         count = RETRIEVAL_QUERY_DEFAULT_PAGE_SIZE
-        messages = await MessageManager().list_user_messages_for_agent_async(
+        messages = await MessageManager().search_messages_async(
             agent_id=agent_state.id,
             actor=actor,
             query_text=query,
+            roles=[MessageRole.user],
             limit=count,
+            offset=page * count,
         )
 
         total = len(messages)
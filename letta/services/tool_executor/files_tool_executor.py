@@ -13,12 +13,14 @@ from letta.services.agent_manager import AgentManager
 from letta.services.block_manager import BlockManager
 from letta.services.file_manager import FileManager
 from letta.services.file_processor.chunker.line_chunker import LineChunker
+from letta.services.file_processor.file_line_cache import FileLineCache, FileLines, required_literals
 from letta.services.files_agents_manager import FileAgentManager
 from letta.services.job_manager import JobManager
 from letta.services.message_manager import MessageManager
 from letta.services.passage_manager import PassageManager
 from letta.services.source_manager import SourceManager
 from letta.services.tool_executor.tool_executor_base import ToolExecutor
+from letta.settings import settings
 from letta.utils import get_friendly_error_msg
 
 
@@ -32,6 +34,7 @@ class LettaFileToolExecutor(ToolExecutor):
     MAX_MATCHES_PER_FILE = 20  # Limit matches per file
     MAX_TOTAL_MATCHES = 50  # Global match limit
     GREP_TIMEOUT_SECONDS = 30  # Max time for grep operation
+    GREP_FETCH_BATCH_SIZE = 16  # Files loaded per query while grepping
     MAX_CONTEXT_LINES = 1  # Lines of context around matches
 
     def __init__(
@@ -56,6 +59,7 @@ class LettaFileToolExecutor(ToolExecutor):
         self.files_agents_manager = FileAgentManager()
         self.file_manager = FileManager()
         self.source_manager = SourceManager()
+        self.file_line_cache = FileLineCache()
         self.logger = get_logger(__name__)
 
     async def execute(
@@ -161,45 +165,29 @@ class LettaFileToolExecutor(ToolExecutor):
 
     def _get_context_lines(
         self,
-        formatted_lines: List[str],
-        match_line_num: int,
+        file_lines: FileLines,
+        match_index: int,
         context_lines: int,
     ) -> List[str]:
-        """Get context lines around a match from already-chunked lines.
+        """Get context lines around a match, with the matching line marked.
 
         Args:
-            formatted_lines: Already chunked lines from LineChunker (format: "line_num: content")
-            match_line_num: The 1-based line number of the match
+            file_lines: Cached lines of the file
+            match_index: The 0-based index of the matching line
             context_lines: Number of context lines before and after
         """
-        if not formatted_lines or context_lines < 0:
-            return []
-
-        # Find the index of the matching line in the formatted_lines list
-        match_formatted_idx = None
-        for i, line in enumerate(formatted_lines):
-            if line and ":" in line:
-                try:
-                    line_num = int(line.split(":", 1)[0].strip())
-                    if line_num == match_line_num:
-                        match_formatted_idx = i
-                        break
-                except ValueError:
-                    continue
-
-        if match_formatted_idx is None:
+        if not file_lines.lines or context_lines < 0:
             return []
 
         # Calculate context range with bounds checking
-        start_idx = max(0, match_formatted_idx - context_lines)
-        end_idx = min(len(formatted_lines), match_formatted_idx + context_lines + 1)
+        start_idx = max(0, match_index - context_lines)
+        end_idx = min(len(file_lines.lines), match_index + context_lines + 1)
 
         # Extract context lines and add match indicator
         context_lines_with_indicator = []
         for i in range(start_idx, end_idx):
-            line = formatted_lines[i]
-            prefix = ">" if i == match_formatted_idx else " "
-            context_lines_with_indicator.append(f"{prefix} {line}")
+            prefix = ">" if i == match_index else " "
+            context_lines_with_indicator.append(f"{prefix} {file_lines.formatted_line(i)}")
 
         return context_lines_with_indicator
 
@@ -266,100 +254,92 @@ class LettaFileToolExecutor(ToolExecutor):
         files_skipped = 0
         files_with_matches = set()  # Track files that had matches for LRU policy
 
+        # Lines of every match contain these literals, so the trigram index can skip lines that don't
+        literals = required_literals(pattern)
+
         # Use asyncio timeout to prevent hanging
         async def _search_files():
             nonlocal results, total_matches, total_content_size, files_processed, files_skipped, files_with_matches
 
-            for file_agent in file_agents:
-                # Load file content
-                file = await self.file_manager.get_file_by_id(file_id=file_agent.file_id, actor=self.actor, include_content=True)
-
-                if not file or not file.content:
-                    files_skipped += 1
-                    self.logger.warning(f"Grep: Skipping file {file_agent.file_name} - no content available")
-                    continue
-
-                # Check individual file size
-                content_size = len(file.content.encode("utf-8"))
-                if content_size > self.MAX_FILE_SIZE_BYTES:
-                    files_skipped += 1
-                    self.logger.warning(
-                        f"Grep: Skipping file {file.file_name} - too large ({content_size:,} bytes > {self.MAX_FILE_SIZE_BYTES:,} limit)"
-                    )
-                    results.append(f"[SKIPPED] {file.file_name}: File too large ({content_size:,} bytes)")
-                    continue
-
-                # Check total content size across all files
-                total_content_size += content_size
-                if total_content_size > self.MAX_TOTAL_CONTENT_SIZE:
-                    files_skipped += 1
-                    self.logger.warning(
-                        f"Grep: Skipping file {file.file_name} - total content size limit exceeded ({total_content_size:,} bytes > {self.MAX_TOTAL_CONTENT_SIZE:,} limit)"
-                    )
-                    results.append(f"[SKIPPED] {file.file_name}: Total content size limit exceeded")
-                    break
-
-                files_processed += 1
-                file_matches = 0
-
-                # Use LineChunker to get all lines with proper formatting
-                chunker = LineChunker()
-                formatted_lines = chunker.chunk_text(file_metadata=file)
-
-                # Remove metadata header
-                if formatted_lines and formatted_lines[0].startswith("[Viewing"):
-                    formatted_lines = formatted_lines[1:]
-
-                # Convert 0-based line numbers to 1-based for grep compatibility
-                corrected_lines = []
-                for line in formatted_lines:
-                    if line and ":" in line:
-                        try:
-                            line_parts = line.split(":", 1)
-                            line_num = int(line_parts[0].strip())
-                            line_content = line_parts[1] if len(line_parts) > 1 else ""
-                            corrected_lines.append(f"{line_num + 1}:{line_content}")
-                        except (ValueError, IndexError):
-                            corrected_lines.append(line)
-                    else:
-                        corrected_lines.append(line)
-                formatted_lines = corrected_lines
-
-                # Search for matches in formatted lines
-                for formatted_line in formatted_lines:
-                    if total_matches >= self.MAX_TOTAL_MATCHES:
-                        results.append(f"[TRUNCATED] Maximum total matches ({self.MAX_TOTAL_MATCHES}) reached")
+            versions = await self.file_line_cache.get_versions_async([fa.file_id for fa in file_agents], actor=self.actor)
+
+            # Fetch the files in batches, so that no more files are loaded than the match limits let us search
+            for batch_start in range(0, len(file_agents), self.GREP_FETCH_BATCH_SIZE):
+                batch = file_agents[batch_start : batch_start + self.GREP_FETCH_BATCH_SIZE]
+                batch_versions = {}
+                for file_agent in batch:
+                    version = versions.get(file_agent.file_id)
+                    # A file's content is at least as many bytes as characters, so it can be skipped before loading
+                    if version is not None and version[-1] <= self.MAX_FILE_SIZE_BYTES:
+                        batch_versions[file_agent.file_id] = version
+                cached_files = await self.file_line_cache.get_many_async(batch_versions, actor=self.actor)
+
+                for file_agent in batch:
+                    version = versions.get(file_agent.file_id)
+                    file_lines = cached_files.get(file_agent.file_id)
+
+                    if version is None:
+                        files_skipped += 1
+                        self.logger.warning(f"Grep: Skipping file {file_agent.file_name} - no content available")
+                        continue
+
+                    # Check individual file size
+                    content_size = file_lines.size_bytes if file_lines else version[-1]
+                    if content_size > self.MAX_FILE_SIZE_BYTES:
+                        files_skipped += 1
+                        self.logger.warning(
+                            f"Grep: Skipping file {file_agent.file_name} - too large ({content_size:,} bytes > {self.MAX_FILE_SIZE_BYTES:,} limit)"
+                        )
+                        results.append(f"[SKIPPED] {file_agent.file_name}: File too large ({content_size:,} bytes)")
+                        continue
+
+                    if file_lines is None:
+                        # Deleted since the versions were read
+                        files_skipped += 1
+                        self.logger.warning(f"Grep: Skipping file {file_agent.file_name} - no content available")
+                        continue
+
+                    # Check total content size across all files
+                    total_content_size += content_size
+                    if total_content_size > self.MAX_TOTAL_CONTENT_SIZE:
+                        files_skipped += 1
+                        self.logger.warning(
+                            f"Grep: Skipping file {file_lines.file_name} - total content size limit exceeded ({total_content_size:,} bytes > {self.MAX_TOTAL_CONTENT_SIZE:,} limit)"
+                        )
+                        results.append(f"[SKIPPED] {file_lines.file_name}: Total content size limit exceeded")
                         return
 
-                    if file_matches >= self.MAX_MATCHES_PER_FILE:
-                        results.append(f"[TRUNCATED] {file.file_name}: Maximum matches per file ({self.MAX_MATCHES_PER_FILE}) reached")
-                        break
+                    files_processed += 1
+                    file_matches = 0
 
-                    # Extract line number and content from formatted line
-                    if ":" in formatted_line:
-                        try:
-                            line_parts = formatted_line.split(":", 1)
-                            line_num = int(line_parts[0].strip())
-                            line_content = line_parts[1].strip() if len(line_parts) > 1 else ""
-                        except (ValueError, IndexError):
-                            continue
+                    # Search the candidate lines for matches
+                    for line_idx in file_lines.candidate_lines(literals):
+                        if total_matches >= self.MAX_TOTAL_MATCHES:
+                            results.append(f"[TRUNCATED] Maximum total matches ({self.MAX_TOTAL_MATCHES}) reached")
+                            return
 
-                        if pattern_regex.search(line_content):
+                        if file_matches >= self.MAX_MATCHES_PER_FILE:
+                            results.append(
+                                f"[TRUNCATED] {file_lines.file_name}: Maximum matches per file ({self.MAX_MATCHES_PER_FILE}) reached"
+                            )
+                            break
+
+                        if pattern_regex.search(file_lines.lines[line_idx].strip()):
                             # Mark this file as having matches for LRU tracking
-                            files_with_matches.add(file.file_name)
-                            context = self._get_context_lines(formatted_lines, match_line_num=line_num, context_lines=context_lines or 0)
+                            files_with_matches.add(file_lines.file_name)
+                            context = self._get_context_lines(file_lines, match_index=line_idx, context_lines=context_lines or 0)
 
                             # Format the match result
-                            match_header = f"\n=== {file.file_name}:{line_num} ==="
+                            match_header = f"\n=== {file_lines.file_name}:{line_idx + 1} ==="
                             match_content = "\n".join(context)
                             results.append(f"{match_header}\n{match_content}")
 
                             file_matches += 1
                             total_matches += 1
 
-                # Break if global limits reached
-                if total_matches >= self.MAX_TOTAL_MATCHES:
-                    break
+                    # Stop once global limits are reached
+                    if total_matches >= self.MAX_TOTAL_MATCHES:
+                        return
 
         # Execute with timeout
         await asyncio.wait_for(_search_files(), timeout=self.GREP_TIMEOUT_SECONDS)
@@ -416,21 +396,19 @@ class LettaFileToolExecutor(ToolExecutor):
 
         self.logger.info(f"Semantic search started for agent {agent_state.id} with query '{query}' (limit: {limit})")
 
-        # Get semantic search results
-        passages = await self.agent_manager.list_source_passages_async(
+        # Get semantic search results, ranked and limited by the database / vector index
+        passages = await self.agent_manager.search_source_passages_async(
             actor=self.actor,
             agent_id=agent_state.id,
             query_text=query,
-            embed_query=True,
             embedding_config=agent_state.embedding_config,
+            limit=limit,
+            min_similarity=settings.file_search_min_similarity,
         )
 
         if not passages:
             return f"No semantic matches found for query: '{query}'"
 
-        # Limit results
-        passages = passages[:limit]
-
         # Group passages by file for better organization
         files_with_passages = {}
         for p in passages:
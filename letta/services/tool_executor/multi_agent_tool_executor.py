@@ -1,6 +1,8 @@
-import asyncio
+import math
 from typing import Any, Dict, List, Optional
 
+from letta.helpers.fan_out import SharedConcurrencyLimit, fan_out
+from letta.log import get_logger
 from letta.schemas.agent import AgentState
 from letta.schemas.enums import MessageRole
 from letta.schemas.letta_message import AssistantMessage
@@ -11,6 +13,12 @@ from letta.schemas.tool import Tool
 from letta.schemas.tool_execution_result import ToolExecutionResult
 from letta.schemas.user import User
 from letta.services.tool_executor.tool_executor_base import ToolExecutor
+from letta.settings import settings
+
+logger = get_logger(__name__)
+
+# Broadcast steps in flight per LLM provider, across all broadcasts in the process
+PROVIDER_SEND_LIMIT = SharedConcurrencyLimit(lambda: settings.multi_agent_concurrent_sends_per_provider)
 
 
 class LettaMultiAgentToolExecutor(ToolExecutor):
@@ -69,39 +77,64 @@ class LettaMultiAgentToolExecutor(ToolExecutor):
             f"{message}"
         )
 
-        tasks = [
-            asyncio.create_task(self._process_agent(agent_id=agent_state.id, message=augmented_message)) for agent_state in matching_agents
-        ]
-        results = await asyncio.gather(*tasks)
+        num_agents = len(matching_agents)
+        stop_after = settings.multi_agent_broadcast_min_responses
+        if settings.multi_agent_broadcast_quorum is not None:
+            quorum = math.ceil(settings.multi_agent_broadcast_quorum * num_agents)
+            stop_after = quorum if stop_after is None else min(stop_after, quorum)
+
+        results = []
+        async for result in fan_out(
+            matching_agents,
+            lambda matching_agent: self._step_agent(agent_id=matching_agent.id, message=augmented_message),
+            concurrency=settings.multi_agent_concurrent_sends,
+            timeout=settings.multi_agent_send_message_timeout,
+            shared_limit=PROVIDER_SEND_LIMIT,
+            shared_key=lambda matching_agent: matching_agent.llm_config.model_endpoint_type,
+            stop_after=stop_after,
+        ):
+            if result.ok:
+                results.append(result.value)
+            else:
+                logger.warning("Broadcast to agent %s failed: %r", result.item.id, result.error)
+                results.append(self._error_response(result.item.id, result.error))
+        if len(results) < num_agents:
+            logger.info("Broadcast returned after %d of %d agents responded", len(results), num_agents)
         return str(results)
 
     async def _process_agent(self, agent_id: str, message: str) -> Dict[str, Any]:
+        try:
+            return await self._step_agent(agent_id=agent_id, message=message)
+        except Exception as e:
+            return self._error_response(agent_id, e)
+
+    async def _step_agent(self, agent_id: str, message: str) -> Dict[str, Any]:
         from letta.agents.letta_agent import LettaAgent
 
-        try:
-            letta_agent = LettaAgent(
-                agent_id=agent_id,
-                message_manager=self.message_manager,
-                agent_manager=self.agent_manager,
-                block_manager=self.block_manager,
-                job_manager=self.job_manager,
-                passage_manager=self.passage_manager,
-                actor=self.actor,
-            )
-
-            letta_response = await letta_agent.step([MessageCreate(role=MessageRole.system, content=[TextContent(text=message)])])
-            messages = letta_response.messages
-
-            send_message_content = [message.content for message in messages if isinstance(message, AssistantMessage)]
-
-            return {
-                "agent_id": agent_id,
-                "response": send_message_content if send_message_content else ["<no response>"],
-            }
+        letta_agent = LettaAgent(
+            agent_id=agent_id,
+            message_manager=self.message_manager,
+            agent_manager=self.agent_manager,
+            block_manager=self.block_manager,
+            job_manager=self.job_manager,
+            passage_manager=self.passage_manager,
+            actor=self.actor,
+        )
 
-        except Exception as e:
-            return {
-                "agent_id": agent_id,
-                "error": str(e),
-                "type": type(e).__name__,
-            }
+        letta_response = await letta_agent.step([MessageCreate(role=MessageRole.system, content=[TextContent(text=message)])])
+        messages = letta_response.messages
+
+        send_message_content = [message.content for message in messages if isinstance(message, AssistantMessage)]
+
+        return {
+            "agent_id": agent_id,
+            "response": send_message_content if send_message_content else ["<no response>"],
+        }
+
+    @staticmethod
+    def _error_response(agent_id: str, error: BaseException) -> Dict[str, Any]:
+        return {
+            "agent_id": agent_id,
+            "error": str(error) or type(error).__name__,
+            "type": type(error).__name__,
+        }
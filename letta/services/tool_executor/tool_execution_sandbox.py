@@ -19,9 +19,12 @@ from letta.schemas.tool_execution_result import ToolExecutionResult
 from letta.schemas.user import User
 from letta.services.helpers.tool_execution_helper import (
     add_imports_and_pydantic_schemas_for_args,
+    compute_venv_fingerprint,
     create_venv_for_local_sandbox,
     find_python_executable,
     install_pip_requirements_for_sandbox,
+    record_venv_fingerprint,
+    venv_has_fingerprint,
 )
 from letta.services.helpers.tool_parser_helper import convert_param_to_str_value, parse_function_arguments
 from letta.services.organization_manager import OrganizationManager
@@ -186,9 +189,13 @@ class ToolExecutionSandbox:
             )
             log_event(name="finish create_venv_for_local_sandbox")
 
-        log_event(name="start install_pip_requirements_for_sandbox", attributes={"local_configs": local_configs.model_dump_json()})
-        install_pip_requirements_for_sandbox(local_configs, env=env)
-        log_event(name="finish install_pip_requirements_for_sandbox", attributes={"local_configs": local_configs.model_dump_json()})
+        # Skip pip entirely when this venv already has exactly these requirements installed
+        fingerprint = compute_venv_fingerprint(local_configs)
+        if self.force_recreate_venv or not venv_has_fingerprint(venv_path, fingerprint):
+            log_event(name="start install_pip_requirements_for_sandbox", attributes={"local_configs": local_configs.model_dump_json()})
+            install_pip_requirements_for_sandbox(local_configs, env=env)
+            log_event(name="finish install_pip_requirements_for_sandbox", attributes={"local_configs": local_configs.model_dump_json()})
+            record_venv_fingerprint(venv_path, fingerprint)
 
         # Ensure Python executable exists
         python_executable = find_python_executable(local_configs)
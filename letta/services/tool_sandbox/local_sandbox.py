@@ -4,30 +4,42 @@ import os
 import struct
 import sys
 import tempfile
+from collections import defaultdict
 from typing import Any, Dict, Optional
 
 from pydantic.config import JsonDict
 
+from letta.log import get_logger
 from letta.otel.tracing import log_event, trace_method
 from letta.schemas.agent import AgentState
 from letta.schemas.sandbox_config import SandboxConfig, SandboxType
 from letta.schemas.tool import Tool
 from letta.schemas.tool_execution_result import ToolExecutionResult
 from letta.services.helpers.tool_execution_helper import (
+    compute_venv_fingerprint,
     create_venv_for_local_sandbox,
     find_python_executable,
     install_pip_requirements_for_sandbox,
+    record_venv_fingerprint,
+    venv_has_fingerprint,
+    venv_name_for_tool,
 )
 from letta.services.helpers.tool_parser_helper import parse_stdout_best_effort
 from letta.services.tool_sandbox.base import AsyncToolSandboxBase
+from letta.services.tool_sandbox.worker_pool import SandboxWorkerPoolManager
 from letta.settings import tool_settings
 from letta.utils import get_friendly_error_msg, parse_stderr_error_msg
 
+logger = get_logger(__name__)
+
 
 class AsyncToolSandboxLocal(AsyncToolSandboxBase):
     METADATA_CONFIG_STATE_KEY = "config_state"
     REQUIREMENT_TXT_NAME = "requirements.txt"
 
+    # Serializes venv creation / pip installs per venv path so concurrent tool calls don't race
+    _venv_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
     def __init__(
         self,
         tool_name: str,
@@ -77,6 +89,8 @@ class AsyncToolSandboxLocal(AsyncToolSandboxBase):
             )
         local_configs = sbx_config.get_local_config()
         use_venv = local_configs.use_venv
+        if use_venv:
+            local_configs = local_configs.model_copy(update={"venv_name": venv_name_for_tool(local_configs, tool=self.tool)})
 
         # Prepare environment variables
         env = os.environ.copy()
@@ -138,6 +152,16 @@ class AsyncToolSandboxLocal(AsyncToolSandboxBase):
                 }
             )
 
+            if SandboxWorkerPoolManager().enabled:
+                return await self._execute_tool_in_worker(
+                    sbx_config=sbx_config,
+                    python_executable=python_executable,
+                    code=code,
+                    temp_file_path=temp_file_path,
+                    env=exec_env,
+                    cwd=sandbox_dir,
+                )
+
             # Execute in subprocess
             return await self._execute_tool_subprocess(
                 sbx_config=sbx_config,
@@ -161,24 +185,41 @@ class AsyncToolSandboxLocal(AsyncToolSandboxBase):
     async def _prepare_venv(self, local_configs, venv_path: str, env: Dict[str, str]):
         """
         Prepare virtual environment asynchronously (in a background thread).
+
+        A venv is only (re)built when the fingerprint of its requirements changes, so warm venvs add no latency.
         """
-        if self.force_recreate_venv or not os.path.isdir(venv_path):
-            sandbox_dir = os.path.expanduser(local_configs.sandbox_dir)
-            log_event(name="start create_venv_for_local_sandbox", attributes={"venv_path": venv_path})
+        fingerprint = compute_venv_fingerprint(local_configs, tool=self.tool)
+        if not self.force_recreate_venv and venv_has_fingerprint(venv_path, fingerprint):
+            return
+
+        async with self._venv_locks[venv_path]:
+            # Another tool call may have finished installing while we waited
+            if not self.force_recreate_venv and venv_has_fingerprint(venv_path, fingerprint):
+                return
+
+            if self.force_recreate_venv or not os.path.isdir(venv_path):
+                sandbox_dir = os.path.expanduser(local_configs.sandbox_dir)
+                log_event(name="start create_venv_for_local_sandbox", attributes={"venv_path": venv_path})
+                await asyncio.to_thread(
+                    create_venv_for_local_sandbox,
+                    sandbox_dir_path=sandbox_dir,
+                    venv_path=venv_path,
+                    env=env,
+                    force_recreate=self.force_recreate_venv,
+                )
+                log_event(name="finish create_venv_for_local_sandbox")
+
+            log_event(name="start install_pip_requirements_for_sandbox", attributes={"local_configs": local_configs.model_dump_json()})
             await asyncio.to_thread(
-                create_venv_for_local_sandbox,
-                sandbox_dir_path=sandbox_dir,
-                venv_path=venv_path,
-                env=env,
-                force_recreate=self.force_recreate_venv,
+                install_pip_requirements_for_sandbox, local_configs, upgrade=True, user_install_if_no_venv=False, env=env, tool=self.tool
             )
-            log_event(name="finish create_venv_for_local_sandbox")
+            log_event(name="finish install_pip_requirements_for_sandbox", attributes={"local_configs": local_configs.model_dump_json()})
+            record_venv_fingerprint(venv_path, fingerprint)
 
-        log_event(name="start install_pip_requirements_for_sandbox", attributes={"local_configs": local_configs.model_dump_json()})
-        await asyncio.to_thread(
-            install_pip_requirements_for_sandbox, local_configs, upgrade=True, user_install_if_no_venv=False, env=env, tool=self.tool
-        )
-        log_event(name="finish install_pip_requirements_for_sandbox", attributes={"local_configs": local_configs.model_dump_json()})
+            # Warm workers won't see newly installed packages
+            await SandboxWorkerPoolManager().discard_async(
+                find_python_executable(local_configs), os.path.expanduser(local_configs.sandbox_dir)
+            )
 
     @trace_method
     async def _execute_tool_subprocess(
@@ -209,29 +250,8 @@ class AsyncToolSandboxLocal(AsyncToolSandboxBase):
 
                 raise TimeoutError(f"Executing tool {self.tool_name} timed out after 60 seconds.")
 
-            stderr = stderr_bytes.decode("utf-8") if stderr_bytes else ""
             log_event(name="finish subprocess")
-
-            # Parse markers to isolate the function result
-            func_result_bytes, stdout_text = self.parse_out_function_results_markers(stdout_bytes)
-            func_return, agent_state = parse_stdout_best_effort(func_result_bytes)
-
-            if process.returncode != 0 and func_return is None:
-                exception_name, msg = parse_stderr_error_msg(stderr)
-                func_return = get_friendly_error_msg(
-                    function_name=self.tool_name,
-                    exception_name=exception_name,
-                    exception_message=msg,
-                )
-
-            return ToolExecutionResult(
-                func_return=func_return,
-                agent_state=agent_state,
-                stdout=[stdout_text] if stdout_text else [],
-                stderr=[stderr] if stderr else [],
-                status="success" if process.returncode == 0 else "error",
-                sandbox_config_fingerprint=sbx_config.fingerprint(),
-            )
+            return self._build_execution_result(sbx_config, stdout_bytes, stderr_bytes, process.returncode)
 
         except (TimeoutError, Exception) as e:
             # Distinguish between timeouts and other exceptions for clarity
@@ -241,20 +261,68 @@ class AsyncToolSandboxLocal(AsyncToolSandboxBase):
             print(f"Subprocess execution for tool {self.tool_name} encountered an error: {e}")
             print(e.__class__.__name__)
             print(e.__traceback__)
+            return self._build_error_result(sbx_config, e, stdout_text=stdout_text)
+
+    @trace_method
+    async def _execute_tool_in_worker(
+        self, sbx_config, python_executable: str, code: str, temp_file_path: str, env: Dict[str, str], cwd: str
+    ) -> ToolExecutionResult:
+        """
+        Execute the generated script in a warm worker from the sandbox worker pool. Each call runs in a fresh
+        `__main__` namespace with its own environment; output and exit status match a fresh subprocess.
+        """
+        log_event(name="start worker execution")
+        pool = SandboxWorkerPoolManager().get_pool(python_executable, cwd)
+        try:
+            result = await pool.execute(code, temp_file_path, env, timeout=tool_settings.tool_sandbox_timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Executing tool {self.tool_name} timed out after {tool_settings.tool_sandbox_timeout} seconds.")
+        except Exception as e:
+            # The worker failed to start, or its response couldn't be exchanged (e.g. a broken pipe or unpicklable data)
+            logger.exception(f"Worker execution for tool {self.tool_name} encountered an error: {e}")
+            return self._build_error_result(sbx_config, e)
+        log_event(name="finish worker execution")
+        return self._build_execution_result(sbx_config, result.stdout, result.stderr, result.returncode)
+
+    def _build_error_result(self, sbx_config, e: Exception, stdout_text: str = "") -> ToolExecutionResult:
+        func_return = get_friendly_error_msg(
+            function_name=self.tool_name,
+            exception_name=type(e).__name__,
+            exception_message=str(e),
+        )
+        return ToolExecutionResult(
+            func_return=func_return,
+            agent_state=None,
+            stdout=[stdout_text],
+            stderr=[str(e)],
+            status="error",
+            sandbox_config_fingerprint=sbx_config.fingerprint(),
+        )
+
+    def _build_execution_result(self, sbx_config, stdout_bytes: bytes, stderr_bytes: bytes, returncode: int) -> ToolExecutionResult:
+        stderr = stderr_bytes.decode("utf-8") if stderr_bytes else ""
+
+        # Parse markers to isolate the function result
+        func_result_bytes, stdout_text = self.parse_out_function_results_markers(stdout_bytes)
+        func_return, agent_state = parse_stdout_best_effort(func_result_bytes)
+
+        if returncode != 0 and func_return is None:
+            exception_name, msg = parse_stderr_error_msg(stderr)
             func_return = get_friendly_error_msg(
                 function_name=self.tool_name,
-                exception_name=type(e).__name__,
-                exception_message=str(e),
-            )
-            return ToolExecutionResult(
-                func_return=func_return,
-                agent_state=None,
-                stdout=[stdout_text],
-                stderr=[str(e)],
-                status="error",
-                sandbox_config_fingerprint=sbx_config.fingerprint(),
+                exception_name=exception_name,
+                exception_message=msg,
             )
 
+        return ToolExecutionResult(
+            func_return=func_return,
+            agent_state=agent_state,
+            stdout=[stdout_text] if stdout_text else [],
+            stderr=[stderr] if stderr else [],
+            status="success" if returncode == 0 else "error",
+            sandbox_config_fingerprint=sbx_config.fingerprint(),
+        )
+
     def parse_out_function_results_markers(self, data: bytes) -> tuple[bytes, str]:
         """
         Parse the function results out of the stdout using special markers.
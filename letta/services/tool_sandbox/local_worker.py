@@ -0,0 +1,97 @@
+"""
+Long-lived worker process for the local tool sandbox.
+
+This file is executed directly by the sandbox's Python interpreter (often a venv without letta installed),
+so it must only depend on the standard library. The parent sends length-prefixed pickled requests
+`{"code", "filename", "env", "cwd"}` on stdin and receives `{"stdout", "stderr", "returncode"}` on the
+original stdout, mirroring what running `python <filename>` as a fresh subprocess would have produced.
+"""
+
+import io
+import os
+import pickle
+import struct
+import sys
+import traceback
+
+_HEADER = struct.Struct(">I")
+
+
+def _read_frame(stream):
+    header = stream.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+    (length,) = _HEADER.unpack(header)
+    return pickle.loads(stream.read(length))
+
+
+def _write_frame(stream, obj) -> None:
+    data = pickle.dumps(obj)
+    stream.write(_HEADER.pack(len(data)) + data)
+    stream.flush()
+
+
+class _Capture(io.TextIOWrapper):
+    """Text stream backed by an in-memory buffer, exposing `.buffer` like `sys.stdout` does."""
+
+    def __init__(self):
+        super().__init__(io.BytesIO(), encoding="utf-8", errors="replace", write_through=True)
+
+    def getvalue(self) -> bytes:
+        self.flush()
+        return self.buffer.getvalue()
+
+
+def _run(request: dict) -> dict:
+    stdout, stderr = _Capture(), _Capture()
+    saved_env, saved_cwd, saved_path = dict(os.environ), os.getcwd(), list(sys.path)
+    saved_stdout, saved_stderr, saved_argv = sys.stdout, sys.stderr, sys.argv
+    returncode = 0
+    try:
+        os.environ.clear()
+        os.environ.update(request["env"])
+        os.chdir(request["cwd"])
+        sys.path.insert(0, os.path.dirname(request["filename"]))
+        sys.stdout, sys.stderr, sys.argv = stdout, stderr, [request["filename"]]
+
+        # Each call gets a fresh module namespace, as if the script were run as __main__
+        namespace = {"__name__": "__main__", "__file__": request["filename"], "__builtins__": __builtins__}
+        exec(compile(request["code"], request["filename"], "exec"), namespace)
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            returncode = e.code or 0
+        else:
+            print(e.code, file=stderr)
+            returncode = 1
+    except BaseException:
+        traceback.print_exc(file=stderr)
+        returncode = 1
+    finally:
+        sys.stdout, sys.stderr, sys.argv = saved_stdout, saved_stderr, saved_argv
+        sys.path[:] = saved_path
+        os.chdir(saved_cwd)
+        os.environ.clear()
+        os.environ.update(saved_env)
+
+    return {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "returncode": returncode}
+
+
+def main() -> None:
+    # Don't let this package's modules shadow tool imports
+    if sys.path and sys.path[0] == os.path.dirname(os.path.abspath(__file__)):
+        sys.path.pop(0)
+
+    requests = sys.stdin.buffer
+    # Keep the protocol channel private: anything written to fd 1 by tool code (e.g. child processes) goes to stderr
+    responses = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    while True:
+        request = _read_frame(requests)
+        if request is None:
+            return
+        _write_frame(responses, _run(request))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import asyncio
+import os
+import pickle
+import struct
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from letta.helpers.singleton import singleton
+from letta.log import get_logger
+from letta.settings import tool_settings
+
+logger = get_logger(__name__)
+
+WORKER_SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "local_worker.py")
+_HEADER = struct.Struct(">I")
+
+
+@dataclass
+class WorkerResult:
+    stdout: bytes
+    stderr: bytes
+    returncode: int
+
+
+class SandboxWorker:
+    """A long-lived interpreter that executes sandbox scripts sent over its stdin (see `local_worker.py`)."""
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.calls = 0
+
+    @classmethod
+    async def start(cls, python_executable: str, cwd: str) -> "SandboxWorker":
+        process = await asyncio.create_subprocess_exec(
+            python_executable,
+            WORKER_SCRIPT_PATH,
+            cwd=cwd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        return cls(process)
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+    async def execute(self, code: str, filename: str, env: Dict[str, str], cwd: str) -> WorkerResult:
+        self.calls += 1
+        data = pickle.dumps({"code": code, "filename": filename, "env": env, "cwd": cwd})
+        try:
+            self.process.stdin.write(_HEADER.pack(len(data)) + data)
+            await self.process.stdin.drain()
+            (length,) = _HEADER.unpack(await self.process.stdout.readexactly(_HEADER.size))
+            response = pickle.loads(await self.process.stdout.readexactly(length))
+        except (asyncio.IncompleteReadError, BrokenPipeError, ConnectionResetError):
+            # The tool took the interpreter down with it (e.g. os._exit or a segfault)
+            returncode = await self.process.wait()
+            return WorkerResult(stdout=b"", stderr=f"Sandbox worker exited with code {returncode}".encode(), returncode=returncode or 1)
+        return WorkerResult(stdout=response["stdout"], stderr=response["stderr"], returncode=response["returncode"])
+
+    def kill(self) -> None:
+        if self.alive:
+            self.process.kill()
+
+    async def stop(self) -> None:
+        self.kill()
+        await self.process.wait()
+
+
+class SandboxWorkerPool:
+    """Bounded pool of warm workers for a single (interpreter, sandbox directory) pair."""
+
+    def __init__(self, python_executable: str, cwd: str, size: int, max_calls_per_worker: int):
+        self.python_executable = python_executable
+        self.cwd = cwd
+        self.max_calls_per_worker = max_calls_per_worker
+        self._idle: List[SandboxWorker] = []
+        self._slots = asyncio.Semaphore(size)
+
+    async def execute(self, code: str, filename: str, env: Dict[str, str], timeout: float) -> WorkerResult:
+        async with self._slots:
+            worker = self._idle.pop() if self._idle else await SandboxWorker.start(self.python_executable, self.cwd)
+            try:
+                result = await asyncio.wait_for(worker.execute(code, filename, env, self.cwd), timeout=timeout)
+            except BaseException:
+                # Timed out, cancelled or failed mid-call (e.g. an unreadable response): the worker's state is unknown,
+                # so don't reuse it. Shielded so that the worker is still reaped if we are cancelled again meanwhile.
+                await asyncio.shield(worker.stop())
+                raise
+
+            if worker.alive and worker.calls < self.max_calls_per_worker:
+                self._idle.append(worker)
+            else:
+                await worker.stop()
+            return result
+
+    def close(self) -> None:
+        """Kill idle workers without waiting for them, for when their event loop is gone; prefer `close_async`."""
+        for worker in self._idle:
+            worker.kill()
+        self._idle.clear()
+
+    async def close_async(self) -> None:
+        """Stop idle workers and wait for them to exit."""
+        workers, self._idle = self._idle, []
+        await asyncio.gather(*[worker.stop() for worker in workers])
+
+
+@singleton
+class SandboxWorkerPoolManager:
+    """
+    Keeps one `SandboxWorkerPool` per sandbox interpreter and directory, so local tool calls reuse a warm
+    interpreter (with its imports already loaded) instead of spawning a fresh Python process each time.
+    """
+
+    def __init__(self):
+        self._pools: Dict[Tuple[str, str], SandboxWorkerPool] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def enabled(self) -> bool:
+        return tool_settings.local_sandbox_worker_pool_size > 0
+
+    def get_pool(self, python_executable: str, cwd: str) -> SandboxWorkerPool:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Worker pipes are bound to the event loop that created them
+            self.close()
+            self._loop = loop
+
+        key = (python_executable, cwd)
+        if key not in self._pools:
+            self._pools[key] = SandboxWorkerPool(
+                python_executable,
+                cwd,
+                size=tool_settings.local_sandbox_worker_pool_size,
+                max_calls_per_worker=tool_settings.local_sandbox_worker_max_calls,
+            )
+        return self._pools[key]
+
+    async def discard_async(self, python_executable: str, cwd: str) -> None:
+        """Stop the workers for an interpreter, e.g. after its venv was rebuilt."""
+        pool = self._pools.pop((python_executable, cwd), None)
+        if pool is not None:
+            await pool.close_async()
+
+    def close(self) -> None:
+        # Only called once the pools' event loop was replaced, so their workers can't be awaited any more
+        for pool in self._pools.values():
+            pool.close()
+        self._pools.clear()
@@ -0,0 +1,332 @@
+import asyncio
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Literal, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import and_, func, select
+
+from letta.helpers.singleton import singleton
+from letta.helpers.vector_index import VectorIndex, create_vector_index, load_vector_index
+from letta.log import get_logger
+from letta.orm.passage import AgentPassage, SourcePassage
+from letta.otel.tracing import trace_method
+from letta.schemas.passage import Passage as PydanticPassage
+from letta.schemas.user import User as PydanticUser
+from letta.server.db import db_registry
+from letta.settings import settings
+
+logger = get_logger(__name__)
+
+IndexScope = Literal["agent", "source"]
+
+# (scope, scope_id, passage_id, cosine_distance)
+VectorSearchHit = Tuple[IndexScope, str, str, float]
+
+
+@singleton
+class VectorIndexManager:
+    """
+    Maintains in-process ANN indexes over passage embeddings, one per agent (archival memory)
+    and one per source, for SQLite deployments where vector search would otherwise fall back
+    to the row-by-row `cosine_distance` UDF.
+
+    Indexes are loaded lazily on first search, kept up to date by `PassageManager` inserts/deletes,
+    and persisted under `LETTA_DIR`. Before each search an index is checked against the passages
+    table (row count and latest `updated_at`), and reconciled with it when they no longer match.
+    """
+
+    def __init__(self):
+        self._indexes: "OrderedDict[Tuple[IndexScope, str], VectorIndex]" = OrderedDict()
+        self._dirty: set = set()
+        self._locks: Dict[Tuple[IndexScope, str], asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.sqlite_vector_index) and not settings.letta_pg_uri_no_default
+
+    def _index_path(self, scope: IndexScope, scope_id: str) -> Path:
+        return Path(settings.letta_dir) / "vector_indexes" / f"{scope}-{scope_id}.npz"
+
+    def _new_index(self, dim: int) -> VectorIndex:
+        return create_vector_index(settings.sqlite_vector_index, dim, nprobe=settings.sqlite_vector_index_nprobe)
+
+    @staticmethod
+    def _model(scope: IndexScope):
+        return AgentPassage if scope == "agent" else SourcePassage
+
+    @staticmethod
+    def _scope_column(scope: IndexScope):
+        return AgentPassage.agent_id if scope == "agent" else SourcePassage.source_id
+
+    # ======================================================================================================================
+    # Search
+    # ======================================================================================================================
+    @trace_method
+    async def search_async(
+        self,
+        scopes: Sequence[Tuple[IndexScope, str]],
+        query_embedding: Sequence[float],
+        embedding_dim: int,
+        k: Optional[int],
+        actor: PydanticUser,
+    ) -> List[VectorSearchHit]:
+        """Return the `k` nearest passages across all `(scope, scope_id)` indexes, closest first. `k=None` ranks everything."""
+        hits: List[VectorSearchHit] = []
+        for scope, scope_id in scopes:
+            index = await self._get_index_async(scope, scope_id, embedding_dim, actor)
+            scope_k = len(index) if k is None else k
+            results = await asyncio.to_thread(index.search, query_embedding, scope_k)
+            hits.extend((scope, scope_id, passage_id, distance) for passage_id, distance in results)
+
+        hits.sort(key=lambda hit: hit[3])
+        return hits if k is None else hits[:k]
+
+    async def size_async(self, scopes: Sequence[Tuple[IndexScope, str]], embedding_dim: int, actor: PydanticUser) -> int:
+        total = 0
+        for scope, scope_id in scopes:
+            total += len(await self._get_index_async(scope, scope_id, embedding_dim, actor))
+        return total
+
+    # ======================================================================================================================
+    # Incremental maintenance
+    # ======================================================================================================================
+    @trace_method
+    def add_passages(self, passages: List[PydanticPassage]) -> None:
+        """Add newly persisted passages to any loaded index covering them."""
+        self._add_passages(passages)
+
+    async def add_passages_async(self, passages: List[PydanticPassage]) -> None:
+        added = await asyncio.to_thread(self._add_passages, passages)
+        await self._advance_versions_async(added)
+        self._schedule_flush()
+
+    def _add_passages(self, passages: List[PydanticPassage]) -> Dict[Tuple[IndexScope, str], Tuple[str, int]]:
+        """Returns, per loaded index touched, its organization and how many of the passages were new to it."""
+        if not self.enabled:
+            return {}
+
+        grouped: Dict[Tuple[IndexScope, str], List[PydanticPassage]] = defaultdict(list)
+        for passage in passages:
+            if passage.embedding is None:
+                continue
+            key = ("agent", passage.agent_id) if passage.agent_id else ("source", passage.source_id)
+            grouped[key].append(passage)
+
+        added = {}
+        for key, group in grouped.items():
+            index = self._indexes.get(key)
+            if index is None:
+                # Not loaded; the on-disk copy (if any) is reconciled against the DB on next load
+                continue
+            new_count = sum(1 for p in group if p.id not in index)
+            index.add([p.id for p in group], np.asarray([p.embedding for p in group], dtype=np.float32))
+            self._dirty.add(key)
+            added[key] = (group[0].organization_id, new_count)
+        self._schedule_flush()
+        return added
+
+    @trace_method
+    def remove_passages(self, passages: List[PydanticPassage]) -> None:
+        """Remove deleted passages from any loaded index covering them."""
+        self._remove_passages(passages)
+
+    async def remove_passages_async(self, passages: List[PydanticPassage]) -> None:
+        removed = await asyncio.to_thread(self._remove_passages, passages)
+        await self._advance_versions_async(removed)
+        self._schedule_flush()
+
+    def _remove_passages(self, passages: List[PydanticPassage]) -> Dict[Tuple[IndexScope, str], Tuple[str, int]]:
+        """Returns, per loaded index touched, its organization and (negated) how many of the passages it held."""
+        if not self.enabled:
+            return {}
+
+        grouped: Dict[Tuple[IndexScope, str], List[PydanticPassage]] = defaultdict(list)
+        for passage in passages:
+            key = ("agent", passage.agent_id) if passage.agent_id else ("source", passage.source_id)
+            grouped[key].append(passage)
+
+        removed = {}
+        for (scope, scope_id), group in grouped.items():
+            index = self._indexes.get((scope, scope_id))
+            if index is not None:
+                removed[(scope, scope_id)] = (group[0].organization_id, -sum(1 for p in group if p.id in index))
+            self.discard(scope, scope_id, [p.id for p in group])
+        return removed
+
+    async def _advance_versions_async(self, changes: Dict[Tuple[IndexScope, str], Tuple[str, int]]) -> None:
+        """
+        Tag indexes that were in sync before a write we just applied with the DB version after it, so the next search
+        doesn't reconcile them. The row count must have moved by exactly our own change; otherwise (e.g. a concurrent insert
+        or delete, or an index already missing some) the old version is kept and the index reconciled on next search.
+        """
+        for (scope, scope_id), (organization_id, count_change) in changes.items():
+            index = self._indexes.get((scope, scope_id))
+            if index is None or not index.version:
+                continue
+            synced_version = index.version
+            db_version = await self._db_version_async(scope, scope_id, organization_id)
+            synced_count = int(synced_version.partition("@")[0])
+            if int(db_version.partition("@")[0]) == synced_count + count_change and index.version == synced_version:
+                index.version = db_version
+
+    def discard(self, scope: IndexScope, scope_id: str, passage_ids: Sequence[str]) -> None:
+        """Drop ids from a loaded index, e.g. passages removed via a cascading delete."""
+        key = (scope, scope_id)
+        index = self._indexes.get(key)
+        if index is None or not passage_ids:
+            return
+        index.remove(passage_ids)
+        self._dirty.add(key)
+        self._schedule_flush()
+
+    def drop(self, scope: IndexScope, scope_id: str) -> None:
+        """Forget an index entirely (e.g. after its agent or source is deleted)."""
+        key = (scope, scope_id)
+        self._indexes.pop(key, None)
+        self._dirty.discard(key)
+        self._locks.pop(key, None)
+        self._index_path(scope, scope_id).unlink(missing_ok=True)
+
+    async def flush_async(self) -> None:
+        """Persist every index modified since it was last written to disk."""
+        for key in list(self._dirty):
+            index = self._indexes.get(key)
+            self._dirty.discard(key)
+            if index is not None:
+                await asyncio.to_thread(index.save, self._index_path(*key))
+
+    def _schedule_flush(self) -> None:
+        # Writes are batched: an index modified many times within the interval is saved once
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Called from a sync code path; persisted by the next async write or on eviction
+            return
+        if self._dirty and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = loop.create_task(self._flush_later_async())
+
+    async def _flush_later_async(self) -> None:
+        await asyncio.sleep(settings.sqlite_vector_index_flush_interval_seconds)
+        try:
+            await self.flush_async()
+        except Exception as e:
+            logger.warning("Failed to persist vector indexes: %s", e)
+
+    # ======================================================================================================================
+    # Loading
+    # ======================================================================================================================
+    async def _get_index_async(self, scope: IndexScope, scope_id: str, embedding_dim: int, actor: PydanticUser) -> VectorIndex:
+        key = (scope, scope_id)
+        index = self._indexes.get(key)
+        if index is not None and index.dim == embedding_dim:
+            # Passages may have been written by another process, or had their embeddings updated in place
+            if index.version == await self._db_version_async(scope, scope_id, actor.organization_id):
+                self._indexes.move_to_end(key)
+                return index
+
+        async with self._locks[key]:
+            index = self._indexes.get(key)
+            if index is None or index.dim != embedding_dim:
+                index = await self._load_index_async(scope, scope_id, embedding_dim, actor)
+                self._indexes[key] = index
+            elif await self._reconcile_async(index, scope, scope_id, actor):
+                self._dirty.add(key)
+                self._schedule_flush()
+            self._indexes.move_to_end(key)
+
+        await self._evict_async()
+        return index
+
+    async def _db_version_async(self, scope: IndexScope, scope_id: str, organization_id: str, session=None) -> str:
+        """Cheap tag for the passages of a scope: changes with every insert, delete and update."""
+        model, scope_column = self._model(scope), self._scope_column(scope)
+        query = select(func.count(model.id), func.max(model.updated_at)).where(
+            scope_column == scope_id, model.organization_id == organization_id
+        )
+        if session is None:
+            async with db_registry.async_session() as session:
+                count, last_updated_at = (await session.execute(query)).one()
+        else:
+            count, last_updated_at = (await session.execute(query)).one()
+        return f"{count}@{last_updated_at.isoformat() if last_updated_at else ''}"
+
+    async def _load_index_async(self, scope: IndexScope, scope_id: str, embedding_dim: int, actor: PydanticUser) -> VectorIndex:
+        """Load the persisted index (if any) and reconcile it with the passages currently in the DB."""
+        path = self._index_path(scope, scope_id)
+
+        index = None
+        if path.exists():
+            try:
+                index = await asyncio.to_thread(load_vector_index, path, nprobe=settings.sqlite_vector_index_nprobe)
+            except Exception as e:
+                logger.warning("Discarding unreadable vector index %s: %s", path, e)
+            if index is not None and (index.dim != embedding_dim or index.kind != settings.sqlite_vector_index or index.version is None):
+                index = None
+        if index is None:
+            index = self._new_index(embedding_dim)
+
+        if await self._reconcile_async(index, scope, scope_id, actor):
+            await asyncio.to_thread(index.save, path)
+        return index
+
+    async def _reconcile_async(self, index: VectorIndex, scope: IndexScope, scope_id: str, actor: PydanticUser) -> bool:
+        """
+        Bring the index in line with the passages currently in the DB: drop deleted passages and (re)load the embeddings of
+        passages added or updated since it was last reconciled. Returns whether the index changed.
+        """
+        model, scope_column = self._model(scope), self._scope_column(scope)
+        in_scope = and_(scope_column == scope_id, model.organization_id == actor.organization_id)
+        # Passages updated at or after the newest update already reflected in the index are loaded again
+        synced_until = index.version.partition("@")[2] if index.version else ""
+        since = datetime.fromisoformat(synced_until) if synced_until else None
+
+        async with db_registry.async_session() as session:
+            # Taken first, so that writes racing the reconciliation are picked up by the next one
+            db_version = await self._db_version_async(scope, scope_id, actor.organization_id, session=session)
+            if db_version == index.version:
+                return False
+
+            result = await session.execute(select(model.id).where(in_scope))
+            db_ids = set(result.scalars().all())
+
+            indexed_ids = set(index.ids)
+            stale_ids = indexed_ids - db_ids
+            missing_ids = db_ids - indexed_ids
+            if since is not None:
+                result = await session.execute(select(model.id).where(in_scope, model.updated_at >= since))
+                missing_ids.update(result.scalars().all())
+            missing_ids = list(missing_ids)
+            if stale_ids:
+                await asyncio.to_thread(index.remove, list(stale_ids))
+
+            # Fetch only the embeddings we don't already have, in bounded batches
+            batch_size = 1000
+            for i in range(0, len(missing_ids), batch_size):
+                batch = missing_ids[i : i + batch_size]
+                rows = (await session.execute(select(model.id, model.embedding).where(model.id.in_(batch)))).all()
+                cleared_ids = [passage_id for passage_id, embedding in rows if embedding is None]
+                if cleared_ids:
+                    await asyncio.to_thread(index.remove, cleared_ids)
+                rows = [(passage_id, embedding) for passage_id, embedding in rows if embedding is not None]
+                if rows:
+                    ids, embeddings = zip(*rows)
+                    # Stored embeddings are truncated to their true dimension; pad back up to a uniform width
+                    vectors = np.zeros((len(embeddings), index.dim), dtype=np.float32)
+                    for row, embedding in enumerate(embeddings):
+                        vectors[row, : min(len(embedding), index.dim)] = embedding[: index.dim]
+                    await asyncio.to_thread(index.add, list(ids), vectors)
+
+        index.version = db_version
+        if stale_ids or missing_ids:
+            logger.info("Reconciled %s vector index %s: +%d / -%d passages", scope, scope_id, len(missing_ids), len(stale_ids))
+        return True
+
+    async def _evict_async(self) -> None:
+        while len(self._indexes) > settings.sqlite_vector_index_cache_size:
+            key, index = self._indexes.popitem(last=False)
+            if key in self._dirty:
+                self._dirty.discard(key)
+                await asyncio.to_thread(index.save, self._index_path(*key))
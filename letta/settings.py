@@ -1,6 +1,6 @@
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import AliasChoices, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -26,6 +26,9 @@ class ToolSettings(BaseSettings):
     tool_sandbox_timeout: float = 180
     tool_exec_venv_name: Optional[str] = None
     tool_exec_autoreload_venv: bool = True
+    # run local tools in a pool of warm interpreters instead of a fresh subprocess per call (0 disables)
+    local_sandbox_worker_pool_size: int = 0
+    local_sandbox_worker_max_calls: int = 100  # recycle a worker after this many tool calls
 
     # MCP settings
     mcp_connect_to_server_timeout: float = 30.0
@@ -196,6 +199,71 @@ class Settings(BaseSettings):
     pool_use_lifo: bool = True
     disable_sqlalchemy_pooling: bool = False
 
+    # opt-in in-process ANN index ("flat" or "ivf") for vector search on SQLite; unset uses the cosine_distance UDF
+    sqlite_vector_index: Optional[Literal["flat", "ivf"]] = None
+    sqlite_vector_index_nprobe: int = 8  # IVF buckets scanned per query
+    sqlite_vector_index_cache_size: int = 64  # indexes held in memory
+    sqlite_vector_index_flush_interval_seconds: float = 30.0
+    # precision of embeddings stored in SQLite; float16 halves and int8 quarters the size at a small recall cost
+    sqlite_embedding_storage_dtype: Literal["float32", "float16", "int8"] = "float32"
+
+    # query embeddings for archival / source search: concurrent queries are batched and results cached
+    embedding_batch_window_ms: float = 5.0  # how long to wait for more queries before calling the provider
+    embedding_batch_max_size: int = 64
+    embedding_cache_size: int = 4096  # entries held in memory
+    embedding_cache_ttl_seconds: int = 3600  # also applies to the Redis cache, when configured
+
+    # process-local cache of hydrated agent states (0 disables); with several processes, configure Redis so writes
+    # made by one process invalidate the others' entries
+    agent_state_cache_size: int = 0
+
+    # message / archival counts are maintained incrementally; this job repairs any drift (requires the scheduler, Postgres only)
+    agent_counter_reconcile_interval_seconds: Optional[int] = None
+    agent_counter_reconcile_batch_size: int = 500
+
+    # async runs (POST /v1/agents/{agent_id}/messages/async): with a backend set, runs are queued and executed by
+    # `letta worker` processes instead of as background tasks of the API process
+    run_queue_backend: Optional[Literal["database", "redis"]] = None
+    run_queue_max_pending: Optional[int] = None  # new runs are rejected with a 429 while this many are waiting
+    run_worker_concurrency: int = 8  # runs executed at once per worker
+    run_worker_poll_interval_seconds: float = 1.0
+    run_worker_shutdown_grace_seconds: float = 30.0
+    run_lease_seconds: int = 60  # a run whose worker stops renewing its lease for this long is retried elsewhere
+    run_max_attempts: int = 3
+
+    # LLM provider SDK clients are reused across requests (0 disables); HTTP/2 is used when the `h2` package is installed
+    llm_client_cache_size: int = 64
+    llm_client_idle_seconds: int = 300
+    llm_client_http2: bool = True
+    # BYOK provider keys are cached per process; writes through this process invalidate immediately, others within the TTL
+    provider_key_cache_ttl_seconds: int = 60
+    # provider model listings are served from memory for the TTL (0 disables), then refreshed in the background while the
+    # stale listing is still served; past the max staleness, requests wait for the refresh
+    model_catalog_ttl_seconds: int = 300
+    model_catalog_max_stale_seconds: int = 3600
+    model_catalog_size: int = 256  # provider listings (and resolved handles) kept per process
+
+    # provider traces (`llm_api_logging`) are written in batches by a background task; traces submitted while the queue is
+    # full are dropped, and only a `provider_trace_sample_rate` fraction of traces is kept
+    provider_trace_queue_size: int = 1024  # traces waiting to be written per event loop (0 writes them inline)
+    provider_trace_batch_size: int = 64
+    provider_trace_flush_interval_seconds: float = 0.05  # how long a partial batch waits to fill up
+    provider_trace_sample_rate: float = Field(default=1.0, ge=0, le=1)
+
+    # tiktoken counting runs in a thread pool (tiktoken releases the GIL while encoding) and is memoized by content hash
+    token_counting_workers: Optional[int] = None  # defaults to the number of CPUs
+    token_counting_max_pending: int = 64  # counting calls handed to the pool at once per event loop
+    token_count_cache_size: int = 16384  # memoized counts held in memory (0 disables)
+
+    # bulk passage ingestion (file processing, archival inserts) sends rows in chunks of this size, with binary COPY on Postgres
+    bulk_insert_chunk_size: int = 1000
+
+    # semantic search over attached files (`search_files`) drops passages less similar than this to the query
+    file_search_min_similarity: Optional[float] = Field(default=None, ge=-1, le=1)
+    # `grep` keeps the chunked lines of recently searched files (0 disables), with a trigram index to prefilter lines
+    file_grep_cache_size: int = 256
+    file_grep_trigram_index: bool = True
+
     redis_host: Optional[str] = Field(default=None, description="Host for Redis instance")
     redis_port: Optional[int] = Field(default=6379, description="Port for Redis instance")
 
@@ -205,6 +273,16 @@ class Settings(BaseSettings):
     multi_agent_send_message_max_retries: int = 3
     multi_agent_send_message_timeout: int = 20 * 60
     multi_agent_concurrent_sends: int = 50
+    multi_agent_concurrent_sends_per_provider: int = 50  # shared by all broadcasts in the process
+    # broadcasts return once this many (or this fraction of) matching agents have responded, cancelling the rest
+    multi_agent_broadcast_min_responses: Optional[int] = None
+    multi_agent_broadcast_quorum: Optional[float] = Field(default=None, gt=0, le=1)
+
+    # sleeptime agents run one at a time per agent (turns arriving meanwhile are merged into one pending run)
+    sleeptime_max_concurrent_runs: int = 16  # sleeptime agent runs in progress at once per process
+
+    # with `parallel_tool_calls` in an agent's LLM config, the tool calls of one turn run concurrently, at most this many at once
+    parallel_tool_calls_max_concurrency: int = 4
 
     # telemetry logging
     otel_exporter_otlp_endpoint: Optional[str] = None  # otel default: "http://localhost:4317"
@@ -213,6 +291,7 @@ class Settings(BaseSettings):
     )
     disable_tracing: bool = False
     llm_api_logging: bool = True
+    track_db_queries: bool = False  # report SQL statements per request in the X-Letta-Query-Count response header
 
     # uvicorn settings
     uvicorn_workers: int = 1
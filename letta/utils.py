@@ -14,7 +14,7 @@ import sys
 import uuid
 from contextlib import contextmanager
 from datetime import datetime, timezone
-from functools import wraps
+from functools import lru_cache, wraps
 from logging import Logger
 from typing import Any, Coroutine, List, Union, _GenericAlias, get_args, get_origin, get_type_hints
 from urllib.parse import urljoin, urlparse
@@ -797,13 +797,18 @@ class OpenAIBackcompatUnpickler(pickle.Unpickler):
         return super().find_class(module, name)
 
 
-def count_tokens(s: str, model: str = "gpt-4") -> int:
+@lru_cache(maxsize=None)
+def get_tiktoken_encoding(model: str) -> tiktoken.Encoding:
+    """The tiktoken encoding for `model`, resolved once per model. Unknown models fall back to cl100k_base."""
     try:
-        encoding = tiktoken.encoding_for_model(model)
+        return tiktoken.encoding_for_model(model)
     except KeyError:
-        print("Falling back to cl100k base for token counting.")
-        encoding = tiktoken.get_encoding("cl100k_base")
-    return len(encoding.encode(s))
+        printd(f"Model {model} not known to tiktoken, falling back to cl100k base for token counting.")
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(s: str, model: str = "gpt-4") -> int:
+    return len(get_tiktoken_encoding(model).encode(s))
 
 
 def printd(*args, **kwargs):
@@ -0,0 +1,34 @@
+import json
+import time
+
+import pytest
+
+from letta.server.rest_api.json_parser import IncrementalJSONParser
+
+# --- Benchmark --- #
+
+
+def _feed(text: str, size: int) -> None:
+    parser = IncrementalJSONParser()
+    for i in range(0, len(text), size):
+        parser.feed(text[i : i + size])
+
+
+def _best_of(text: str, runs: int = 3) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        _feed(text, 4)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+@pytest.mark.parametrize("words", [10_000, 40_000, 160_000])
+def test_incremental_parser_scales_linearly(words):
+    """Streaming 4x the argument text should take roughly 4x the time, not 16x."""
+    small = json.dumps({"inner_thoughts": "hmm", "message": "word " * (words // 4)})
+    large = json.dumps({"inner_thoughts": "hmm", "message": "word " * words})
+    small_time, large_time = _best_of(small), _best_of(large)
+
+    print(f"\n{words // 4} -> {words} words: {small_time * 1000:.1f}ms -> {large_time * 1000:.1f}ms ({large_time / small_time:.1f}x)")
+    assert large_time / small_time < 8
@@ -0,0 +1,70 @@
+import time
+
+import numpy as np
+import pytest
+
+from letta.constants import MAX_EMBEDDING_DIM
+from letta.helpers.vector_index import create_vector_index
+from letta.orm.sqlite_functions import adapt_array, cosine_distance
+
+# --- Data --- #
+
+EMBEDDING_DIM = 1536
+NUM_CLUSTERS = 100
+NUM_QUERIES = 20
+TOP_K = 10
+
+
+def _embeddings(n: int, seed: int) -> np.ndarray:
+    """Synthetic, topic-clustered embeddings zero-padded the same way passages are stored."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((NUM_CLUSTERS, EMBEDDING_DIM))
+    vectors = centers[rng.integers(NUM_CLUSTERS, size=n)] + 0.5 * rng.standard_normal((n, EMBEDDING_DIM))
+    return np.pad(vectors, ((0, 0), (0, MAX_EMBEDDING_DIM - EMBEDDING_DIM))).astype(np.float32)
+
+
+def _brute_force_udf(rows: list, query: np.ndarray, k: int) -> list:
+    """What SQLite does today: decode every stored blob and call the `cosine_distance` UDF per row."""
+    query_blob = adapt_array(query)
+    distances = [(cosine_distance(blob, query_blob), i) for i, blob in enumerate(rows)]
+    return [i for _, i in sorted(distances)[:k]]
+
+
+# --- Benchmark --- #
+
+
+@pytest.mark.parametrize("num_passages", [1_000, 10_000])
+@pytest.mark.parametrize("kind", ["flat", "ivf"])
+def test_vector_index_recall_and_latency(kind, num_passages):
+    vectors = _embeddings(num_passages, seed=0)
+    stored_rows = [adapt_array(v) for v in vectors]
+    queries = vectors[np.random.default_rng(1).choice(num_passages, NUM_QUERIES)] + 0.1 * np.pad(
+        np.random.default_rng(2).standard_normal((NUM_QUERIES, EMBEDDING_DIM)), ((0, 0), (0, MAX_EMBEDDING_DIM - EMBEDDING_DIM))
+    ).astype(np.float32)
+
+    start = time.perf_counter()
+    index = create_vector_index(kind, EMBEDDING_DIM, min_train_size=1_000) if kind == "ivf" else create_vector_index(kind, EMBEDDING_DIM)
+    index.add([str(i) for i in range(num_passages)], vectors)
+    build_time = time.perf_counter() - start
+
+    udf_time, index_time, recalls = 0.0, 0.0, []
+    for query in queries:
+        start = time.perf_counter()
+        expected = _brute_force_udf(stored_rows, query, TOP_K)
+        udf_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        hits = index.search(query, TOP_K)
+        index_time += time.perf_counter() - start
+
+        recalls.append(len({str(i) for i in expected} & {passage_id for passage_id, _ in hits}) / TOP_K)
+
+    recall = float(np.mean(recalls))
+    print(
+        f"\n[{kind}] n={num_passages}: build={build_time * 1000:.1f}ms "
+        f"udf={udf_time / NUM_QUERIES * 1000:.2f}ms/query index={index_time / NUM_QUERIES * 1000:.2f}ms/query "
+        f"speedup={udf_time / index_time:.0f}x recall@{TOP_K}={recall:.3f}"
+    )
+
+    assert recall >= (1.0 if kind == "flat" else 0.9)
+    assert index_time < udf_time
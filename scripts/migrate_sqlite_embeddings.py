@@ -0,0 +1,28 @@
+"""
+Rewrite passage embeddings stored in the legacy base64 format into the compact binary format.
+
+Usage: python scripts/migrate_sqlite_embeddings.py [--dtype float32|float16|int8]
+"""
+
+import argparse
+import os
+import sqlite3
+
+from letta.config import LettaConfig
+from letta.orm.sqlite_functions import VECTOR_STORAGE_DTYPES, migrate_legacy_vectors
+from letta.settings import settings
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument("--dtype", choices=list(VECTOR_STORAGE_DTYPES), default=settings.sqlite_embedding_storage_dtype)
+parser.add_argument("--batch-size", type=int, default=1000)
+args = parser.parse_args()
+
+db_path = os.path.join(LettaConfig.load().recall_storage_path, "sqlite.db")
+connection = sqlite3.connect(db_path)
+try:
+    for table in ("agent_passages", "source_passages"):
+        migrated = migrate_legacy_vectors(connection, table, storage_dtype=args.dtype, batch_size=args.batch_size)
+        print(f"{table}: migrated {migrated} embeddings")
+    connection.execute("VACUUM")
+finally:
+    connection.close()
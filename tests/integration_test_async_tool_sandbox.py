@@ -684,6 +684,55 @@ async def test_local_sandbox_with_venv_pip_installs_with_update(disable_e2b_api_
     assert long_random_string in result.stdout[0]
 
 
+@pytest.mark.asyncio
+@pytest.mark.local_sandbox
+async def test_local_sandbox_warm_venv_skips_pip_install(disable_e2b_api_key, cowsay_tool, test_user, event_loop):
+    manager = SandboxConfigManager()
+    config_create = SandboxConfigCreate(
+        config=LocalSandboxConfig(use_venv=True, pip_requirements=[PipRequirement(name="cowsay")]).model_dump()
+    )
+    manager.create_or_update_sandbox_config(config_create, test_user)
+
+    sandbox = AsyncToolSandboxLocal(cowsay_tool.name, {}, user=test_user, force_recreate_venv=True)
+    result = await sandbox.run()
+    assert result.status == "success"
+
+    # Requirements are unchanged, so concurrent calls reuse the venv without touching pip
+    with patch("letta.services.tool_sandbox.local_sandbox.install_pip_requirements_for_sandbox") as mock_install:
+        results = await asyncio.gather(*[AsyncToolSandboxLocal(cowsay_tool.name, {}, user=test_user).run() for _ in range(3)])
+    mock_install.assert_not_called()
+    assert all(result.status == "success" for result in results)
+
+
+@pytest.mark.asyncio
+@pytest.mark.local_sandbox
+async def test_local_sandbox_tools_with_different_requirements_keep_their_venvs(
+    disable_e2b_api_key, cowsay_tool, tool_with_pip_requirements, test_user, event_loop
+):
+    manager = SandboxConfigManager()
+    config_create = SandboxConfigCreate(
+        config=LocalSandboxConfig(use_venv=True, pip_requirements=[PipRequirement(name="cowsay")]).model_dump()
+    )
+    manager.create_or_update_sandbox_config(config_create, test_user)
+
+    sandbox = AsyncToolSandboxLocal(cowsay_tool.name, {}, user=test_user, force_recreate_venv=True)
+    assert (await sandbox.run()).status == "success"
+    result = await AsyncToolSandboxLocal(
+        tool_with_pip_requirements.name, {}, user=test_user, tool_object=tool_with_pip_requirements, force_recreate_venv=True
+    ).run()
+    assert result.status == "success"
+
+    # Each requirement set has a ready venv of its own, so alternating between the tools doesn't touch pip
+    with patch("letta.services.tool_sandbox.local_sandbox.install_pip_requirements_for_sandbox") as mock_install:
+        for _ in range(2):
+            assert (await AsyncToolSandboxLocal(cowsay_tool.name, {}, user=test_user).run()).status == "success"
+            result = await AsyncToolSandboxLocal(
+                tool_with_pip_requirements.name, {}, user=test_user, tool_object=tool_with_pip_requirements
+            ).run()
+            assert result.status == "success"
+    mock_install.assert_not_called()
+
+
 # E2B sandbox tests
 
 
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from letta.schemas.embedding_config import EmbeddingConfig
+from letta.services.embedding_manager import EmbeddingManager
+from letta.settings import settings
+
+
+@pytest.fixture
+def embedding_manager(monkeypatch):
+    manager = EmbeddingManager()
+    manager._cache.clear()
+    calls = []
+
+    async def request_embeddings(embedding_config, texts):
+        calls.append(list(texts))
+        await asyncio.sleep(0)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    monkeypatch.setattr(manager, "_request_embeddings", request_embeddings)
+    monkeypatch.setattr(settings, "embedding_batch_window_ms", 20.0)
+    monkeypatch.setattr(manager, "calls", calls, raising=False)
+    yield manager
+    manager._cache.clear()
+
+
+@pytest.fixture
+def embedding_config():
+    return EmbeddingConfig.default_config(provider="openai")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_are_batched_and_deduplicated(embedding_manager, embedding_config):
+    texts = ["a", "bb", "ccc", "bb"]
+    results = await asyncio.gather(*[embedding_manager.embed_query_async(embedding_config, text) for text in texts])
+
+    assert results == [[1.0, 1.0], [2.0, 1.0], [3.0, 1.0], [2.0, 1.0]]
+    assert embedding_manager.calls == [["a", "bb", "ccc"]]
+
+
+@pytest.mark.asyncio
+async def test_repeated_query_is_served_from_cache(embedding_manager, embedding_config):
+    first = await embedding_manager.embed_query_async(embedding_config, "hello")
+    second = await embedding_manager.embed_query_async(embedding_config, "hello")
+
+    assert first == second
+    assert embedding_manager.calls == [["hello"]]
+
+
+@pytest.mark.asyncio
+async def test_batch_flushes_early_at_max_size(embedding_manager, embedding_config, monkeypatch):
+    monkeypatch.setattr(settings, "embedding_batch_max_size", 2)
+    await asyncio.gather(*[embedding_manager.embed_query_async(embedding_config, text) for text in ["a", "b", "c"]])
+
+    assert embedding_manager.calls == [["a", "b"], ["c"]]
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_propagates_and_is_not_cached(embedding_manager, embedding_config, monkeypatch):
+    async def failing(embedding_config, texts):
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr(embedding_manager, "_request_embeddings", failing)
+    with pytest.raises(RuntimeError, match="provider down"):
+        await embedding_manager.embed_query_async(embedding_config, "x")
+    assert not embedding_manager._cache
@@ -101,3 +101,29 @@ async def test_send_llm_batch_request_async_mismatched_keys(anthropic_client, mo
     mismatched_tools = {"agent-2": []}  # Different agent ID than in the messages mapping.
     with pytest.raises(ValueError, match="Agent mappings for messages and tools must use the same agent_ids."):
         await anthropic_client.send_llm_batch_request_async(mock_agent_messages, mismatched_tools, mock_agent_llm_config)
+
+
+@pytest.mark.asyncio
+async def test_llm_clients_are_pooled(monkeypatch):
+    from letta.llm_api.client_registry import LLMClientRegistry, get_anthropic_client, get_openai_client
+    from letta.settings import settings
+
+    LLMClientRegistry().clear()
+    client = get_openai_client(api_key="key-a", base_url="https://api.openai.com/v1")
+    assert get_openai_client(api_key="key-a", base_url="https://api.openai.com/v1") is client
+    assert get_openai_client(api_key="key-b", base_url="https://api.openai.com/v1") is not client
+    assert get_openai_client(api_key="key-a", base_url="https://example.test/v1") is not client
+    assert get_openai_client(api_key="key-a", base_url="https://api.openai.com/v1", max_retries=0) is not client
+    assert get_anthropic_client("key-a", max_retries=3) is get_anthropic_client("key-a", max_retries=3)
+
+    # Bounded size: the least recently used client is dropped
+    monkeypatch.setattr(settings, "llm_client_cache_size", 2)
+    get_openai_client(api_key="key-c", base_url=None)
+    get_openai_client(api_key="key-d", base_url=None)
+    assert get_openai_client(api_key="key-a", base_url="https://api.openai.com/v1") is not client
+
+    # Idle clients are dropped
+    client = get_openai_client(api_key="key-a", base_url="https://api.openai.com/v1")
+    monkeypatch.setattr(settings, "llm_client_idle_seconds", -1)
+    assert get_openai_client(api_key="key-a", base_url="https://api.openai.com/v1") is not client
+    LLMClientRegistry().clear()
@@ -17,7 +17,7 @@ from anthropic.types.beta import BetaMessage
 from anthropic.types.beta.messages import BetaMessageBatchIndividualResponse, BetaMessageBatchSucceededResult
 from openai.types.chat.chat_completion_message_tool_call import ChatCompletionMessageToolCall as OpenAIToolCall
 from openai.types.chat.chat_completion_message_tool_call import Function as OpenAIFunction
-from sqlalchemy import func, select
+from sqlalchemy import func, select, update
 from sqlalchemy.exc import IntegrityError, InvalidRequestError
 from sqlalchemy.orm.exc import StaleDataError
 
@@ -68,25 +68,37 @@ from letta.schemas.llm_batch_job import AgentStepState, LLMBatchItem
 from letta.schemas.llm_config import LLMConfig
 from letta.schemas.message import Message as PydanticMessage
 from letta.schemas.message import MessageCreate, MessageUpdate
-from letta.schemas.openai.chat_completion_response import UsageStatistics
+from letta.schemas.openai.chat_completion_response import FunctionCall, ToolCall, UsageStatistics
 from letta.schemas.organization import Organization
 from letta.schemas.organization import Organization as PydanticOrganization
 from letta.schemas.organization import OrganizationUpdate
 from letta.schemas.passage import Passage as PydanticPassage
+from letta.schemas.passage import PassageSearchResult
 from letta.schemas.pip_requirement import PipRequirement
+from letta.schemas.provider_trace import ProviderTraceCreate
 from letta.schemas.run import Run as PydanticRun
 from letta.schemas.sandbox_config import E2BSandboxConfig, LocalSandboxConfig, SandboxConfigCreate, SandboxConfigUpdate, SandboxType
 from letta.schemas.source import Source as PydanticSource
 from letta.schemas.source import SourceUpdate
 from letta.schemas.tool import Tool as PydanticTool
 from letta.schemas.tool import ToolCreate, ToolUpdate
+from letta.schemas.tool_execution_result import ToolExecutionResult
 from letta.schemas.tool_rule import InitToolRule
 from letta.schemas.user import User as PydanticUser
 from letta.schemas.user import UserUpdate
 from letta.server.db import db_registry
 from letta.server.server import SyncServer
 from letta.services.block_manager import BlockManager
-from letta.settings import tool_settings
+from letta.services.context_window_calculator.message_token_counts import (
+    count_message_tokens,
+    ensure_token_counts,
+    retain_count_for_budget,
+    tokenizer_family,
+)
+from letta.services.step_commit import StepCommit
+from letta.services.summarizer.enums import SummarizationMode
+from letta.services.summarizer.summarizer import Summarizer
+from letta.settings import settings, tool_settings
 from tests.helpers.utils import comprehensive_agent_checks, validate_context_window_overview
 from tests.utils import random_string
 
@@ -1114,6 +1126,343 @@ async def test_list_agents_ordering_and_pagination(server: SyncServer, default_u
     assert before_names_desc == ["gamma_agent", "beta_agent"]
 
 
+@pytest.mark.asyncio
+async def test_letta_agent_reuses_prefetched_agent_state(server: SyncServer, sarah_agent, default_user, monkeypatch, event_loop):
+    """The agent state loaded by the request handler is handed to the agent loop instead of being loaded again"""
+    from letta.agents.letta_agent import AGENT_LOOP_RELATIONSHIPS, LettaAgent
+    from letta.otel.query_counter import count_queries
+
+    monkeypatch.setattr(settings, "agent_state_cache_size", 0)
+
+    agent_state = await server.agent_manager.get_agent_by_id_async(
+        sarah_agent.id, default_user, include_relationships=["multi_agent_group", *AGENT_LOOP_RELATIONSHIPS]
+    )
+
+    def build_agent(prefetched):
+        return LettaAgent(
+            agent_id=sarah_agent.id,
+            message_manager=server.message_manager,
+            agent_manager=server.agent_manager,
+            block_manager=server.block_manager,
+            job_manager=server.job_manager,
+            passage_manager=server.passage_manager,
+            actor=default_user,
+            agent_state=prefetched,
+        )
+
+    agent = build_agent(agent_state)
+    with count_queries() as counter:
+        assert await agent._get_agent_state_async() is agent_state
+    assert counter.count == 0
+
+    # Without a handoff (or once it has been consumed) the loop loads the agent itself
+    with count_queries() as counter:
+        reloaded = await build_agent(None)._get_agent_state_async()
+    assert reloaded.id == sarah_agent.id
+    assert [t.id for t in reloaded.tools] == [t.id for t in agent_state.tools]
+    assert counter.count > 0
+
+
+@pytest.mark.asyncio
+async def test_letta_agent_skips_memory_rebuild_when_memory_unchanged(
+    server: SyncServer, sarah_agent, default_block, default_user, monkeypatch, event_loop
+):
+    """The system message is only recompiled and rewritten when the memory rendered into it has changed"""
+    from letta.agents.letta_agent import AGENT_LOOP_RELATIONSHIPS, LettaAgent
+    from letta.schemas.memory import Memory
+
+    await server.agent_manager.attach_block_async(agent_id=sarah_agent.id, block_id=default_block.id, actor=default_user)
+    agent_state = await server.agent_manager.get_agent_by_id_async(
+        sarah_agent.id, default_user, include_relationships=AGENT_LOOP_RELATIONSHIPS
+    )
+    agent = LettaAgent(
+        agent_id=sarah_agent.id,
+        message_manager=server.message_manager,
+        agent_manager=server.agent_manager,
+        block_manager=server.block_manager,
+        job_manager=server.job_manager,
+        passage_manager=server.passage_manager,
+        actor=default_user,
+    )
+    in_context_messages = await server.message_manager.get_messages_by_ids_async(message_ids=agent_state.message_ids, actor=default_user)
+
+    compiles, updates = 0, 0
+    original_compile = Memory.compile
+
+    def counting_compile(self, *args, **kwargs):
+        nonlocal compiles
+        compiles += 1
+        return original_compile(self, *args, **kwargs)
+
+    original_update = server.message_manager.update_message_by_id_async
+
+    async def counting_update(*args, **kwargs):
+        nonlocal updates
+        updates += 1
+        return await original_update(*args, **kwargs)
+
+    monkeypatch.setattr(Memory, "compile", counting_compile)
+    monkeypatch.setattr(server.message_manager, "update_message_by_id_async", counting_update)
+
+    # The first rebuild renders the memory, the second finds it unchanged
+    in_context_messages = await agent._rebuild_memory_async(in_context_messages, agent_state)
+    assert compiles == 1
+    updates = 0
+    assert await agent._rebuild_memory_async(in_context_messages, agent_state) == in_context_messages
+    assert (compiles, updates) == (1, 0)
+
+    # Editing a block renders the memory again
+    await server.block_manager.update_block_async(default_block.id, BlockUpdate(value="Default Block Content (edited)"), actor=default_user)
+    in_context_messages = await agent._rebuild_memory_async(in_context_messages, agent_state)
+    assert (compiles, updates) == (2, 1)
+    assert "(edited)" in in_context_messages[0].content[0].text
+
+
+@pytest.mark.asyncio
+async def test_letta_agent_runs_parallel_tool_calls(server: SyncServer, sarah_agent, default_user, monkeypatch, event_loop):
+    """The tool calls of one turn run concurrently and are persisted in call order, disallowed calls included"""
+    from letta.agents.letta_agent import AGENT_LOOP_RELATIONSHIPS, LettaAgent
+
+    agent_state = await server.agent_manager.get_agent_by_id_async(
+        sarah_agent.id, default_user, include_relationships=AGENT_LOOP_RELATIONSHIPS
+    )
+    agent = LettaAgent(
+        agent_id=sarah_agent.id,
+        message_manager=server.message_manager,
+        agent_manager=server.agent_manager,
+        block_manager=server.block_manager,
+        job_manager=server.job_manager,
+        passage_manager=server.passage_manager,
+        actor=default_user,
+    )
+
+    in_flight, max_in_flight = 0, 0
+
+    async def execute_tool(tool_name, tool_args, agent_state, agent_step_span=None, step_id=None):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.05 if tool_args["query"] == "slow" else 0.01)
+        in_flight -= 1
+        return ToolExecutionResult(status="success", func_return=f"results for {tool_args['query']}")
+
+    monkeypatch.setattr(agent, "_execute_tool", execute_tool)
+
+    tool_calls = [
+        ToolCall(id="call_1", function=FunctionCall(name="lookup", arguments='{"query": "slow", "request_heartbeat": false}')),
+        ToolCall(id="call_2", function=FunctionCall(name="lookup", arguments='{"query": "fast", "request_heartbeat": false}')),
+        ToolCall(id="call_3", function=FunctionCall(name="forbidden", arguments='{"query": "any", "request_heartbeat": false}')),
+    ]
+    persisted_messages, should_continue, _ = await agent._handle_ai_response(
+        tool_calls,
+        ["lookup"],
+        agent_state,
+        ToolRulesSolver([]),
+        UsageStatistics(completion_tokens=10, prompt_tokens=10, total_tokens=20),
+    )
+
+    assert max_in_flight == 2
+    assistant_message, *tool_messages, heartbeat_message = persisted_messages
+    assert [tool_call.id for tool_call in assistant_message.tool_calls] == ["call_1", "call_2", "call_3"]
+    assert [m.tool_call_id for m in tool_messages] == ["call_1", "call_2", "call_3"]
+    assert "results for slow" in tool_messages[0].content[0].text
+    assert "ToolConstraintError" in tool_messages[2].content[0].text
+
+    # The disallowed call makes the agent continue, with one heartbeat for the whole turn
+    assert should_continue
+    assert heartbeat_message.role == MessageRole.user
+
+
+@pytest.mark.asyncio
+async def test_letta_agent_enforces_tool_rules_within_parallel_tool_calls(
+    server: SyncServer, sarah_agent, default_user, monkeypatch, event_loop
+):
+    """The calls of one turn are checked against the tool rules as if they had been made one after another"""
+    from letta.agents.letta_agent import AGENT_LOOP_RELATIONSHIPS, LettaAgent
+    from letta.schemas.tool_rule import ChildToolRule, TerminalToolRule
+
+    agent_state = await server.agent_manager.get_agent_by_id_async(
+        sarah_agent.id, default_user, include_relationships=AGENT_LOOP_RELATIONSHIPS
+    )
+    agent = LettaAgent(
+        agent_id=sarah_agent.id,
+        message_manager=server.message_manager,
+        agent_manager=server.agent_manager,
+        block_manager=server.block_manager,
+        job_manager=server.job_manager,
+        passage_manager=server.passage_manager,
+        actor=default_user,
+    )
+
+    executed = []
+
+    async def execute_tool(tool_name, tool_args, agent_state, agent_step_span=None, step_id=None):
+        executed.append(tool_name)
+        return ToolExecutionResult(status="success", func_return="ok")
+
+    monkeypatch.setattr(agent, "_execute_tool", execute_tool)
+
+    def tool_call(call_id, name):
+        return ToolCall(id=call_id, function=FunctionCall(name=name, arguments='{"request_heartbeat": false}'))
+
+    async def handle(tool_calls, tool_rules):
+        executed.clear()
+        persisted_messages, should_continue, _ = await agent._handle_ai_response(
+            tool_calls,
+            ["lookup", "save", "finish"],
+            agent_state,
+            ToolRulesSolver(tool_rules),
+            UsageStatistics(completion_tokens=10, prompt_tokens=10, total_tokens=20),
+        )
+        violations = [
+            m.tool_call_id for m in persisted_messages if m.role == MessageRole.tool and "ToolConstraintError" in m.content[0].text
+        ]
+        return violations, should_continue
+
+    # Only the child of `lookup` may run after it, even within the same turn
+    violations, should_continue = await handle(
+        [tool_call("call_1", "lookup"), tool_call("call_2", "finish"), tool_call("call_3", "save")],
+        [ChildToolRule(tool_name="lookup", children=["save"])],
+    )
+    assert executed == ["lookup", "save"]
+    assert violations == ["call_2"]
+    assert should_continue
+
+    # Nothing runs alongside or after a terminal tool
+    violations, should_continue = await handle(
+        [tool_call("call_1", "finish"), tool_call("call_2", "lookup")],
+        [TerminalToolRule(tool_name="finish")],
+    )
+    assert executed == ["finish"]
+    assert violations == ["call_2"]
+
+
+@pytest.mark.asyncio
+async def test_sleeptime_stream_reports_run_ids_before_done(server: SyncServer, sarah_agent, default_user, monkeypatch, event_loop):
+    """The sleeptime runs started by a streamed turn are sent in the usage chunk, ahead of [DONE]"""
+    from letta.agents.base_agent import BaseAgent
+    from letta.groups.sleeptime_multi_agent_v2 import SleeptimeMultiAgentV2
+    from letta.schemas.group import Group
+    from letta.schemas.letta_stop_reason import LettaStopReason
+    from letta.schemas.usage import LettaUsageStatistics
+
+    group = Group(id="group-123", manager_type="sleeptime", agent_ids=["agent-sleeptime"], description="")
+    sleeptime_agent = SleeptimeMultiAgentV2(
+        agent_id=sarah_agent.id,
+        message_manager=server.message_manager,
+        agent_manager=server.agent_manager,
+        block_manager=server.block_manager,
+        passage_manager=server.passage_manager,
+        group_manager=server.group_manager,
+        job_manager=server.job_manager,
+        actor=default_user,
+        group=group,
+    )
+    usage = LettaUsageStatistics(completion_tokens=10, prompt_tokens=10, total_tokens=20, step_count=1)
+    events = []
+
+    class ForegroundAgent:
+        response_messages = ["message"]
+
+        async def step_stream_no_tokens(self, **kwargs):
+            yield 'data: {"message_type":"assistant_message"}\n\n'
+            for finish_chunk in BaseAgent.get_finish_chunks_for_stream(None, usage, LettaStopReason(stop_reason="end_turn")):
+                yield f"data: {finish_chunk}\n\n"
+
+    async def dispatch_sleeptime_agents(last_response_messages, use_assistant_message=True):
+        events.append("dispatch")
+        return ["run-1"]
+
+    monkeypatch.setattr(sleeptime_agent, "_load_foreground_agent", lambda: ForegroundAgent())
+    monkeypatch.setattr(sleeptime_agent, "_dispatch_sleeptime_agents", dispatch_sleeptime_agents)
+
+    async for chunk in sleeptime_agent.step_stream_no_tokens([MessageCreate(role="user", content="hi")]):
+        events.append(chunk)
+
+    assert events[0] == 'data: {"message_type":"assistant_message"}\n\n'
+    assert '"message_type":"stop_reason"' in events[1]
+    assert events[2] == "dispatch"
+    reported_usage = LettaUsageStatistics.model_validate_json(events[3][len("data: ") :])
+    assert reported_usage.run_ids == ["run-1"]
+    assert reported_usage.total_tokens == 20
+    assert events[4:] == ["data: [DONE]\n\n"]
+
+
+@pytest.mark.asyncio
+async def test_letta_agent_skips_token_budget_check_without_tokenizer(
+    server: SyncServer, sarah_agent, default_user, monkeypatch, event_loop
+):
+    """When the tokenizer can't be loaded (e.g. offline), the step goes ahead and relies on the context window retry"""
+    from letta.agents.letta_agent import AGENT_LOOP_RELATIONSHIPS, LettaAgent
+
+    def tokenizer_family(llm_config):
+        raise ConnectionError("tiktoken encodings are unreachable")
+
+    monkeypatch.setattr("letta.services.context_window_calculator.message_token_counts.tokenizer_family", tokenizer_family)
+
+    agent_state = await server.agent_manager.get_agent_by_id_async(
+        sarah_agent.id, default_user, include_relationships=AGENT_LOOP_RELATIONSHIPS
+    )
+    agent = LettaAgent(
+        agent_id=sarah_agent.id,
+        message_manager=server.message_manager,
+        agent_manager=server.agent_manager,
+        block_manager=server.block_manager,
+        job_manager=server.job_manager,
+        passage_manager=server.passage_manager,
+        actor=default_user,
+    )
+    in_context_messages = await server.message_manager.get_messages_by_ids_async(message_ids=agent_state.message_ids, actor=default_user)
+    assert await agent._fit_context_to_token_budget(in_context_messages, [], agent_state) == in_context_messages
+
+
+@pytest.mark.asyncio
+async def test_agent_state_cache(server: SyncServer, charles_agent, print_tool, default_user, monkeypatch, event_loop):
+    """Unchanged agents are served from memory; writes through any manager invalidate (or refresh) the cached state"""
+    from letta.otel.query_counter import count_queries
+    from letta.services.agent_state_cache import AgentStateCache
+
+    monkeypatch.setattr(settings, "agent_state_cache_size", 16)
+    cache = AgentStateCache()
+    cache.clear()
+
+    agent_state = await server.agent_manager.get_agent_by_id_async(charles_agent.id, default_user)
+    with count_queries() as counter:
+        cached = await server.agent_manager.get_agent_by_id_async(charles_agent.id, default_user)
+        narrowed = await server.agent_manager.get_agent_by_id_async(charles_agent.id, default_user, include_relationships=["memory"])
+    assert counter.count == 0
+    assert cached == agent_state and cached is not agent_state
+    assert narrowed.tools == [] and narrowed.memory.blocks == agent_state.memory.blocks
+
+    # Callers get private copies
+    cached.memory.blocks[0].value = "scribbled on"
+    assert (await server.agent_manager.get_agent_by_id_async(charles_agent.id, default_user)).memory.blocks[0].value != "scribbled on"
+
+    # Block edits invalidate the agents built from them
+    block = agent_state.memory.blocks[0]
+    await server.block_manager.update_block_async(block.id, BlockUpdate(value="fresh value"), actor=default_user)
+    reloaded = await server.agent_manager.get_agent_by_id_async(charles_agent.id, default_user)
+    assert reloaded.memory.get_block(block.label).value == "fresh value"
+
+    # So do pivot table writes from sync code paths
+    server.agent_manager.attach_tool(agent_id=charles_agent.id, tool_id=print_tool.id, actor=default_user)
+    reloaded = await server.agent_manager.get_agent_by_id_async(charles_agent.id, default_user)
+    assert print_tool.id in [t.id for t in reloaded.tools]
+
+    # Agent updates write the new state through, so the next read is still served from memory
+    await server.agent_manager.update_agent_async(charles_agent.id, UpdateAgent(description="updated"), actor=default_user)
+    with count_queries() as counter:
+        reloaded = await server.agent_manager.get_agent_by_id_async(charles_agent.id, default_user)
+    assert counter.count == 0
+    assert reloaded.description == "updated"
+
+    # Other organizations never see the cached state
+    other_org_user = default_user.model_copy(update={"organization_id": "org-11111111-1111-4111-8111-111111111111"})
+    assert await cache.get_async(charles_agent.id, actor=other_org_user) is None
+
+    cache.clear()
+
+
 # ======================================================================================================================
 # AgentManager Tests - Tools Relationship
 # ======================================================================================================================
@@ -2176,6 +2525,165 @@ async def test_agent_list_passages_vector_search(server, default_user, sarah_age
     assert agent_only_results[1].text == "blue shoes"
 
 
+@pytest.mark.asyncio
+async def test_agent_list_passages_vector_index(monkeypatch, server, default_user, sarah_agent, default_source, default_file, event_loop):
+    """Vector search on SQLite is served from the in-process ANN index and tracks inserts/deletes"""
+    from letta.orm import AgentPassage
+    from letta.services.vector_index_manager import VectorIndexManager
+
+    monkeypatch.setattr(settings, "sqlite_vector_index", "flat")
+    if not VectorIndexManager().enabled:
+        pytest.skip("vector index is only used with SQLite")
+
+    dim = DEFAULT_EMBEDDING_CONFIG.embedding_dim
+    query = [1.0] + [0.0] * (dim - 1)
+
+    async def embed_query_text_async(embedding_config, query_text):
+        return query
+
+    monkeypatch.setattr("letta.services.agent_manager.embed_query_text_async", embed_query_text_async)
+
+    def embedding(similarity: float):
+        return [similarity, (1 - similarity**2) ** 0.5] + [0.0] * (dim - 2)
+
+    await server.agent_manager.attach_source_async(agent_id=sarah_agent.id, source_id=default_source.id, actor=default_user)
+    agent_passages = await server.passage_manager.create_many_agent_passages_async(
+        [
+            PydanticPassage(
+                text=f"agent {s}",
+                organization_id=default_user.organization_id,
+                agent_id=sarah_agent.id,
+                embedding_config=DEFAULT_EMBEDDING_CONFIG,
+                embedding=embedding(s),
+            )
+            for s in (0.9, 0.5, 0.1)
+        ],
+        actor=default_user,
+    )
+    await server.passage_manager.create_many_source_passages_async(
+        [
+            PydanticPassage(
+                text=f"source {s}",
+                organization_id=default_user.organization_id,
+                source_id=default_source.id,
+                file_id=default_file.id,
+                embedding_config=DEFAULT_EMBEDDING_CONFIG,
+                embedding=embedding(s),
+            )
+            for s in (0.8, 0.3)
+        ],
+        file_metadata=default_file,
+        actor=default_user,
+    )
+
+    async def search(**kwargs):
+        results = await server.agent_manager.list_passages_async(
+            actor=default_user,
+            query_text="q",
+            embedding_config=DEFAULT_EMBEDDING_CONFIG,
+            embed_query=True,
+            **kwargs,
+        )
+        return [p.text for p in results]
+
+    assert await search(agent_id=sarah_agent.id) == ["agent 0.9", "source 0.8", "agent 0.5", "source 0.3", "agent 0.1"]
+    assert await search(agent_id=sarah_agent.id, agent_only=True, limit=2) == ["agent 0.9", "agent 0.5"]
+    assert await search(agent_id=sarah_agent.id, file_id=default_file.id) == ["source 0.8", "source 0.3"]
+
+    manager = VectorIndexManager()
+    reconciled = []
+    reconcile_async = manager._reconcile_async
+
+    async def counting_reconcile_async(index, scope, scope_id, actor):
+        reconciled.append((scope, scope_id))
+        return await reconcile_async(index, scope, scope_id, actor)
+
+    monkeypatch.setattr(manager, "_reconcile_async", counting_reconcile_async)
+
+    # Writes after the index is loaded are applied incrementally, leaving it in sync with the DB
+    await server.passage_manager.create_agent_passage_async(
+        PydanticPassage(
+            text="agent 1.0",
+            organization_id=default_user.organization_id,
+            agent_id=sarah_agent.id,
+            embedding_config=DEFAULT_EMBEDDING_CONFIG,
+            embedding=embedding(1.0),
+        ),
+        actor=default_user,
+    )
+    assert await search(agent_id=sarah_agent.id, agent_only=True) == ["agent 1.0", "agent 0.9", "agent 0.5", "agent 0.1"]
+    await server.passage_manager.delete_agent_passages_async(actor=default_user, passages=[agent_passages[0]])
+    assert await search(agent_id=sarah_agent.id, agent_only=True) == ["agent 1.0", "agent 0.5", "agent 0.1"]
+    assert reconciled == []
+
+    # Writes that bypass the index (e.g. from another process) are picked up, embeddings updated in place included
+    async with db_registry.async_session() as session:
+        await session.execute(
+            update(AgentPassage)
+            .where(AgentPassage.id == agent_passages[2].id)
+            .values(embedding=embedding(0.95), updated_at=datetime.now(timezone.utc))
+        )
+        await session.commit()
+    assert await search(agent_id=sarah_agent.id, agent_only=True) == ["agent 1.0", "agent 0.1", "agent 0.5"]
+    assert reconciled == [("agent", sarah_agent.id)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("use_vector_index", [True, False])
+async def test_search_source_passages(
+    monkeypatch, server, default_user, sarah_agent, default_source, default_file, use_vector_index, event_loop
+):
+    """Source passage search applies limit, offset and similarity threshold before materializing rows"""
+    from letta.settings import settings
+
+    if settings.letta_pg_uri_no_default and use_vector_index:
+        pytest.skip("vector index is only used with SQLite")
+    monkeypatch.setattr(settings, "sqlite_vector_index", "flat" if use_vector_index else None)
+
+    dim = DEFAULT_EMBEDDING_CONFIG.embedding_dim
+    query = [1.0] + [0.0] * (dim - 1)
+
+    async def embed_query_text_async(embedding_config, query_text):
+        return query
+
+    monkeypatch.setattr("letta.services.agent_manager.embed_query_text_async", embed_query_text_async)
+
+    def embedding(similarity: float):
+        return [similarity, (1 - similarity**2) ** 0.5] + [0.0] * (dim - 2)
+
+    await server.agent_manager.attach_source_async(agent_id=sarah_agent.id, source_id=default_source.id, actor=default_user)
+    await server.passage_manager.create_many_source_passages_async(
+        [
+            PydanticPassage(
+                text=f"source {s}",
+                organization_id=default_user.organization_id,
+                source_id=default_source.id,
+                file_id=default_file.id,
+                embedding_config=DEFAULT_EMBEDDING_CONFIG,
+                embedding=embedding(s),
+            )
+            for s in (0.2, 0.9, 0.5, 0.7)
+        ],
+        file_metadata=default_file,
+        actor=default_user,
+    )
+
+    async def search(**kwargs):
+        return await server.agent_manager.search_source_passages_async(
+            actor=default_user, agent_id=sarah_agent.id, query_text="q", embedding_config=DEFAULT_EMBEDDING_CONFIG, **kwargs
+        )
+
+    results = await search(limit=2)
+    assert all(isinstance(r, PassageSearchResult) for r in results)
+    assert [r.text for r in results] == ["source 0.9", "source 0.7"]
+    assert results[0].file_name == default_file.file_name
+    assert results[0].score == pytest.approx(0.9, abs=1e-4)
+
+    assert [r.text for r in await search(limit=2, offset=2)] == ["source 0.5", "source 0.2"]
+    assert [r.text for r in await search(limit=10, min_similarity=0.6)] == ["source 0.9", "source 0.7"]
+    assert [r.text for r in await search(limit=1, offset=1, file_id=default_file.id)] == ["source 0.7"]
+
+
 @pytest.mark.asyncio
 async def test_list_source_passages_only(server: SyncServer, default_user, default_source, agent_passages_setup, event_loop):
     """Test listing passages from a source without specifying an agent."""
@@ -2701,6 +3209,44 @@ async def test_create_many_source_passages_async(server: SyncServer, default_use
         assert passage.agent_id is None
 
 
+@pytest.mark.asyncio
+async def test_create_many_source_passages_bulk_inserts_in_chunks(
+    server: SyncServer, default_user, default_file, default_source, monkeypatch, event_loop
+):
+    """Bulk-inserted passages are returned as stored, without reading them back."""
+    from letta.otel.query_counter import count_queries
+
+    monkeypatch.setattr(settings, "bulk_insert_chunk_size", 2)
+    passages = [
+        PydanticPassage(
+            text=f"Bulk source passage {i}",
+            source_id=default_source.id,
+            file_id=default_file.id,
+            organization_id=default_user.organization_id,
+            embedding=[0.1 * (i + 1)],
+            embedding_config=DEFAULT_EMBEDDING_CONFIG,
+            metadata={"page": i},
+        )
+        for i in range(5)
+    ]
+
+    with count_queries(record_statements=True) as counter:
+        created_passages = await server.passage_manager.create_many_source_passages_async(
+            passages, file_metadata=default_file, actor=default_user
+        )
+    assert not any(statement.lstrip().upper().startswith("SELECT") for statement in counter.statements)
+
+    assert [p.id for p in created_passages] == [p.id for p in passages]
+    for created in created_passages:
+        stored = await server.passage_manager.get_source_passage_by_id_async(created.id, actor=default_user)
+        assert stored.text == created.text
+        assert stored.file_name == created.file_name == default_file.file_name
+        assert stored.metadata == created.metadata
+        assert stored.created_by_id == created.created_by_id == default_user.id
+        assert stored.embedding[:1] == pytest.approx(created.embedding[:1])
+        assert stored.embedding_config == created.embedding_config
+
+
 def test_agent_passage_size(server: SyncServer, default_user, sarah_agent):
     """Test counting agent passages using the new agent-specific size method."""
     initial_size = server.passage_manager.agent_passage_size(actor=default_user, agent_id=sarah_agent.id)
@@ -3332,6 +3878,49 @@ def test_message_update(server: SyncServer, hello_world_message_fixture, default
     assert retrieved.last_updated_by_id == other_user.id
 
 
+@pytest.mark.asyncio
+async def test_message_token_counts(server: SyncServer, hello_world_message_fixture, default_user, sarah_agent, event_loop):
+    """Token counts are cached per tokenizer family, persisted, and dropped when the message changes"""
+    message = hello_world_message_fixture
+    assert message.token_counts is None
+
+    family = tokenizer_family(sarah_agent.llm_config)
+    assert ensure_token_counts([message], family) == [message]
+    assert ensure_token_counts([message], family) == []
+    await server.message_manager.update_token_counts_async([message], actor=default_user)
+
+    retrieved = await server.message_manager.get_message_by_id_async(message.id, actor=default_user)
+    assert retrieved.token_counts == {family: count_message_tokens(message, family)}
+
+    updated = await server.message_manager.update_message_by_id_async(
+        message.id, MessageUpdate(content="A much longer message than the one we counted before"), actor=default_user
+    )
+    assert updated.token_counts is None
+
+
+def test_summarizer_retains_messages_within_token_budget():
+    """Evicting against a token budget keeps the newest messages that fit"""
+    family = "cl100k_base"
+    system_message = PydanticMessage(role="system", content=[TextContent(text="You are a helpful assistant.")])
+    history = [
+        PydanticMessage(role="user" if i % 2 == 0 else "assistant", content=[TextContent(text=f"Message {i} " + "word " * 50)])
+        for i in range(10)
+    ]
+    ensure_token_counts(history, family)
+    per_message = history[0].token_counts[family]
+
+    assert retain_count_for_budget(history, family, budget=per_message * 20) is None
+    retain_count = retain_count_for_budget(history, family, budget=per_message * 4 + 1)
+    assert retain_count == 4
+
+    summarizer = Summarizer(mode=SummarizationMode.STATIC_MESSAGE_BUFFER, message_buffer_limit=60, message_buffer_min=15)
+    trimmed, updated = summarizer.summarize([system_message] + history, [], force=True, retain_count=retain_count)
+    assert updated
+    assert trimmed[0] == system_message
+    assert trimmed[1:] == history[-4:]
+    assert sum(m.token_counts[family] for m in trimmed[1:]) <= per_message * 4 + 1
+
+
 def test_message_delete(server: SyncServer, hello_world_message_fixture, default_user):
     """Test deleting a message"""
     server.message_manager.delete_message_by_id(hello_world_message_fixture.id, actor=default_user)
@@ -3373,6 +3962,155 @@ def test_message_size(server: SyncServer, hello_world_message_fixture, default_u
     assert empty_count == 0
 
 
+@pytest.mark.asyncio
+async def test_agent_counters(server: SyncServer, sarah_agent, default_user, event_loop):
+    """Message and archival counts are maintained by writes and read without a COUNT(*)"""
+    from letta.orm import AgentCounters, AgentPassage
+    from letta.orm import Message as MessageModel
+    from letta.otel.query_counter import count_queries
+    from letta.services.agent_counter_manager import AgentCounterManager
+
+    async def count_rows(model):
+        async with db_registry.async_session() as session:
+            return await session.scalar(select(func.count()).select_from(model).where(model.agent_id == sarah_agent.id))
+
+    messages = await server.message_manager.create_many_messages_async(
+        [
+            PydanticMessage(agent_id=sarah_agent.id, role=MessageRole.user, content=[TextContent(text=f"Counted message {i}")])
+            for i in range(5)
+        ],
+        actor=default_user,
+    )
+    await server.message_manager.delete_messages_by_ids_async([messages[0].id, messages[1].id], actor=default_user)
+    server.message_manager.delete_message_by_id(messages[2].id, actor=default_user)
+    server.passage_manager.create_agent_passage(
+        PydanticPassage(
+            text="Counted passage",
+            agent_id=sarah_agent.id,
+            organization_id=default_user.organization_id,
+            embedding=[0.1],
+            embedding_config=DEFAULT_EMBEDDING_CONFIG,
+        ),
+        actor=default_user,
+    )
+
+    with count_queries(record_statements=True) as counter:
+        message_count = await server.message_manager.size_async(actor=default_user, agent_id=sarah_agent.id)
+        passage_count = await server.passage_manager.agent_passage_size_async(actor=default_user, agent_id=sarah_agent.id)
+    assert message_count == await count_rows(MessageModel)
+    assert passage_count == await count_rows(AgentPassage) == 1
+    assert counter.count == 2
+    assert not any("count(" in statement.lower() for statement in counter.statements)
+
+    # Bulk deletes are counted too
+    await server.message_manager.delete_all_messages_for_agent_async(sarah_agent.id, actor=default_user)
+    assert await server.message_manager.size_async(actor=default_user, agent_id=sarah_agent.id) == 0
+
+    # Unknown counts are recomputed on read, and the reconciler repairs drift
+    async with db_registry.async_session() as session:
+        await session.execute(update(AgentCounters).where(AgentCounters.agent_id == sarah_agent.id).values(message_count=None))
+        await session.execute(update(AgentCounters).where(AgentCounters.agent_id == sarah_agent.id).values(archival_passage_count=42))
+        await session.commit()
+    assert await server.message_manager.size_async(actor=default_user, agent_id=sarah_agent.id) == 0
+    await AgentCounterManager().reconcile_async()
+    assert await server.passage_manager.agent_passage_size_async(actor=default_user, agent_id=sarah_agent.id) == 1
+
+
+@pytest.mark.asyncio
+async def test_agent_counters_bulk_insert_counts_per_agent(server: SyncServer, sarah_agent, charles_agent, default_user, event_loop):
+    """Bulk inserts adjust the counts of the agents they write to, and leave the other agents' counts alone"""
+    from letta.orm import AgentCounters, AgentPassage
+
+    async def stored_counts():
+        async with db_registry.async_session() as session:
+            query = select(AgentCounters.agent_id, AgentCounters.archival_passage_count).where(
+                AgentCounters.agent_id.in_([sarah_agent.id, charles_agent.id])
+            )
+            return dict((await session.execute(query)).all())
+
+    def passages(agent_id, n):
+        return [
+            PydanticPassage(
+                text=f"Bulk counted passage {i}",
+                agent_id=agent_id,
+                organization_id=default_user.organization_id,
+                embedding=[0.1],
+                embedding_config=DEFAULT_EMBEDDING_CONFIG,
+            )
+            for i in range(n)
+        ]
+
+    await server.passage_manager.create_many_agent_passages_async(passages(charles_agent.id, 2), actor=default_user)
+    assert await stored_counts() == {sarah_agent.id: 0, charles_agent.id: 2}
+
+    await server.passage_manager.create_many_agent_passages_async(passages(sarah_agent.id, 3), actor=default_user)
+    assert await stored_counts() == {sarah_agent.id: 3, charles_agent.id: 2}
+
+    # Core multi-row VALUES are attributed as well
+    async with db_registry.async_session() as session:
+        rows = [
+            dict(
+                id=p.id,
+                text=p.text,
+                agent_id=p.agent_id,
+                organization_id=p.organization_id,
+                embedding_config=p.embedding_config,
+                metadata_={},
+            )
+            for p in passages(sarah_agent.id, 1) + passages(charles_agent.id, 1)
+        ]
+        await session.execute(AgentPassage.__table__.insert().values(rows))
+        await session.commit()
+    assert await stored_counts() == {sarah_agent.id: 4, charles_agent.id: 3}
+    assert await server.passage_manager.agent_passage_size_async(actor=default_user, agent_id=charles_agent.id) == 3
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_copy_path_updates_agent_counters(server: SyncServer, sarah_agent, default_user, monkeypatch, event_loop):
+    """Rows written with COPY are counted through the `on_bulk_copy` listeners, in the same transaction"""
+    import json
+
+    from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+    from letta.orm.sqlalchemy_base import SqlalchemyBase
+
+    copied = []
+
+    async def copy_rows(cls, connection, columns, rows):
+        # Stands in for asyncpg's COPY: written on the raw connection, invisible to session events
+        copied.append((columns, cls._copy_records(asyncpg_dialect(), columns, rows)))
+        await connection.execute(cls.__table__.insert(), rows)
+
+    monkeypatch.setattr(SqlalchemyBase, "_use_copy", staticmethod(lambda connection: True))
+    monkeypatch.setattr(SqlalchemyBase, "_copy_rows_async", classmethod(copy_rows))
+    monkeypatch.setattr(settings, "bulk_insert_chunk_size", 2)
+
+    before = await server.passage_manager.agent_passage_size_async(actor=default_user, agent_id=sarah_agent.id)
+    await server.passage_manager.create_many_agent_passages_async(
+        [
+            PydanticPassage(
+                text=f"Copied passage {i}",
+                agent_id=sarah_agent.id,
+                organization_id=default_user.organization_id,
+                embedding=[0.1],
+                embedding_config=DEFAULT_EMBEDDING_CONFIG,
+                metadata={"page": i},
+            )
+            for i in range(3)
+        ],
+        actor=default_user,
+    )
+    assert await server.passage_manager.agent_passage_size_async(actor=default_user, agent_id=sarah_agent.id) == before + 3
+
+    # Two chunks, with JSON columns serialized as SQLAlchemy would bind them
+    assert [len(records) for _, records in copied] == [2, 1]
+    columns, records = copied[1]
+    record = dict(zip(columns, records[0]))
+    assert record["agent_id"] == sarah_agent.id
+    assert json.loads(record["metadata_"]) == {"page": 2}
+    assert json.loads(record["embedding_config"])["embedding_model"] == DEFAULT_EMBEDDING_CONFIG.embedding_model
+
+
 def create_test_messages(server: SyncServer, base_message: PydanticMessage, default_user) -> list[PydanticMessage]:
     """Helper function to create test messages for all tests"""
     messages = [
@@ -3469,6 +4207,44 @@ def test_message_listing_text_search(server: SyncServer, hello_world_message_fix
     assert len(search_results) == 0
 
 
+@pytest.mark.asyncio
+async def test_search_messages_ranked(server: SyncServer, default_user, sarah_agent, event_loop):
+    """Full-text search ranks matches and follows message updates and deletes"""
+    texts = [
+        "We talked about the weather in Paris.",
+        "Paris, Paris, Paris! I can't stop thinking about Paris and its cafés.",
+        "My favourite food is pasta.",
+    ]
+    messages = await server.message_manager.create_many_messages_async(
+        [PydanticMessage(agent_id=sarah_agent.id, role="user", content=[TextContent(text=t)]) for t in texts], actor=default_user
+    )
+
+    results = await server.message_manager.search_messages_async(agent_id=sarah_agent.id, actor=default_user, query_text="paris")
+    assert [m.id for m in results] == [messages[1].id, messages[0].id]
+
+    # Every word must match, as a prefix
+    results = await server.message_manager.search_messages_async(agent_id=sarah_agent.id, actor=default_user, query_text="weath par")
+    assert [m.id for m in results] == [messages[0].id]
+
+    # Paging
+    results = await server.message_manager.search_messages_async(
+        agent_id=sarah_agent.id, actor=default_user, query_text="paris", limit=1, offset=1
+    )
+    assert [m.id for m in results] == [messages[0].id]
+
+    await server.message_manager.update_message_by_id_async(
+        messages[2].id, MessageUpdate(content="Actually I prefer the croissants in Paris."), actor=default_user
+    )
+    results = await server.message_manager.search_messages_async(agent_id=sarah_agent.id, actor=default_user, query_text="pasta")
+    assert results == []
+    results = await server.message_manager.search_messages_async(agent_id=sarah_agent.id, actor=default_user, query_text="croissant")
+    assert [m.id for m in results] == [messages[2].id]
+
+    await server.message_manager.delete_messages_by_ids_async([messages[1].id], actor=default_user)
+    results = await server.message_manager.search_messages_async(agent_id=sarah_agent.id, actor=default_user, query_text="paris")
+    assert {m.id for m in results} == {messages[0].id, messages[2].id}
+
+
 # ======================================================================================================================
 # Block Manager Tests - Basic
 # ======================================================================================================================
@@ -5622,6 +6398,92 @@ async def test_e2e_job_callback(monkeypatch, server: SyncServer, default_user):
     assert updated.callback_status_code == 202
 
 
+@pytest.mark.asyncio
+async def test_run_queue_claim_and_lease_expiry(server: SyncServer, default_user, event_loop):
+    """Queued runs are leased to one worker at a time and become claimable again when the lease lapses."""
+    from letta.orm.job import Job as JobModel
+
+    for _ in range(2):
+        await server.job_manager.create_job_async(
+            PydanticRun(status=JobStatus.pending, metadata={"agent_id": "agent-1"}), actor=default_user
+        )
+    # Runs executed in-process are never picked up
+    await server.job_manager.create_job_async(PydanticRun(status=JobStatus.created), actor=default_user)
+    assert await server.job_manager.count_queued_runs_async() == 2
+
+    claim_kwargs = dict(lease_seconds=60, max_attempts=2)
+    claimed = await server.job_manager.claim_queued_runs_async(worker_id="worker-a", limit=1, **claim_kwargs)
+    assert len(claimed) == 1
+    assert claimed[0].status == JobStatus.running
+    first = claimed[0]
+    claimed = await server.job_manager.claim_queued_runs_async(worker_id="worker-b", limit=5, **claim_kwargs)
+    assert len(claimed) == 1 and claimed[0].id != first.id
+    second = claimed[0]
+    assert await server.job_manager.claim_queued_runs_async(worker_id="worker-b", limit=5, **claim_kwargs) == []
+    assert await server.job_manager.count_queued_runs_async() == 0
+
+    async def expire_lease(run_id):
+        async with db_registry.async_session() as session:
+            await session.execute(update(JobModel).where(JobModel.id == run_id).values(lease_expires_at=datetime(2000, 1, 1)))
+            await session.commit()
+
+    # worker-a stops heartbeating; its run moves to worker-b
+    assert await server.job_manager.renew_run_leases_async("worker-b", [first.id, second.id], lease_seconds=60) == [first.id]
+    await expire_lease(first.id)
+    claimed = await server.job_manager.claim_queued_runs_async(worker_id="worker-b", limit=5, **claim_kwargs)
+    assert [run.id for run in claimed] == [first.id]
+    assert await server.job_manager.renew_run_leases_async("worker-a", [first.id], lease_seconds=60) == [first.id]
+
+    # Once out of attempts, an abandoned run fails instead of being retried
+    await expire_lease(first.id)
+    assert await server.job_manager.claim_queued_runs_async(worker_id="worker-c", limit=5, **claim_kwargs) == []
+    failed = await server.job_manager.get_job_by_id_async(first.id, actor=default_user)
+    assert failed.status == JobStatus.failed
+    assert failed.completed_at is not None
+    assert failed.metadata["agent_id"] == "agent-1"
+    assert "abandoned" in failed.metadata["error"]
+
+    # Finished runs give up their lease and are never claimed again
+    await server.job_manager.update_job_by_id_async(second.id, JobUpdate(status=JobStatus.completed), actor=default_user)
+    await server.job_manager.release_run_lease_async("worker-b", second.id)
+    await expire_lease(second.id)
+    assert await server.job_manager.claim_queued_runs_async(worker_id="worker-c", limit=5, **claim_kwargs) == []
+
+
+@pytest.mark.asyncio
+async def test_run_worker_executes_queued_run(monkeypatch, server: SyncServer, default_user, sarah_agent, event_loop):
+    from letta.jobs.run_queue import RUN_REQUEST_METADATA_KEY, DatabaseRunQueue
+    from letta.jobs.run_worker import RunWorker
+    from letta.server.rest_api.routers.v1 import agents as agents_router
+
+    executed = {}
+
+    async def fake_process_message_background(job_id, server, actor, agent_id, messages, **kwargs):
+        executed.update(job_id=job_id, actor_id=actor.id, agent_id=agent_id, messages=messages, **kwargs)
+        await server.job_manager.update_job_by_id_async(job_id, JobUpdate(status=JobStatus.completed), actor=actor)
+
+    monkeypatch.setattr(agents_router, "process_message_background", fake_process_message_background)
+
+    request = {"agent_id": sarah_agent.id, "messages": [{"role": "user", "content": "hi"}], "max_steps": 3}
+    run = await server.job_manager.create_job_async(
+        PydanticRun(status=JobStatus.pending, metadata={RUN_REQUEST_METADATA_KEY: request}, request_config=LettaRequestConfig()),
+        actor=default_user,
+    )
+
+    worker = RunWorker(server=server, queue=DatabaseRunQueue(), concurrency=2, worker_id="test-worker")
+    tasks = await worker.run_once()
+    assert len(tasks) == 1
+    await asyncio.gather(*tasks)
+
+    assert executed["job_id"] == run.id
+    assert executed["actor_id"] == default_user.id
+    assert executed["agent_id"] == sarah_agent.id
+    assert executed["max_steps"] == 3
+    assert executed["messages"][0].content == "hi"
+    assert (await server.job_manager.get_job_by_id_async(run.id, actor=default_user)).status == JobStatus.completed
+    assert await server.job_manager.renew_run_leases_async("test-worker", [run.id], lease_seconds=60) == [run.id]
+
+
 # ======================================================================================================================
 # JobManager Tests - Messages
 # ======================================================================================================================
@@ -6028,6 +6890,96 @@ async def test_job_usage_stats_add_and_get(server: SyncServer, sarah_agent, defa
     assert len(steps) == 1
 
 
+@pytest.mark.asyncio
+async def test_step_commit_writes_step_in_one_transaction(server: SyncServer, sarah_agent, default_run, default_user, event_loop):
+    """Test that a step commit persists the step, its messages, their run association and the provider trace together."""
+    step_commit = StepCommit(default_user, server.step_manager, server.message_manager, server.telemetry_manager)
+    step_id = step_commit.log_step(
+        agent_id=sarah_agent.id,
+        provider_name="openai",
+        provider_category="base",
+        model="gpt-4o-mini",
+        model_endpoint="https://api.openai.com/v1",
+        context_window_limit=8192,
+        usage=UsageStatistics(completion_tokens=100, prompt_tokens=50, total_tokens=150),
+        job_id=default_run.id,
+    )
+    messages = [
+        PydanticMessage(
+            agent_id=sarah_agent.id,
+            role=MessageRole.user,
+            content=[TextContent(text="Hello, Sarah!")],
+        ),
+        PydanticMessage(
+            agent_id=sarah_agent.id,
+            role=MessageRole.assistant,
+            content=[TextContent(text="Hello, user!")],
+            step_id=step_id,
+        ),
+    ]
+    step_commit.add_messages(messages, job_id=default_run.id)
+    step_commit.add_provider_trace(
+        ProviderTraceCreate(
+            request_json={"model": "gpt-4o-mini"},
+            response_json={"id": "response"},
+            step_id=step_id,
+            organization_id=default_user.organization_id,
+        )
+    )
+
+    persisted_messages = await step_commit.commit_async()
+
+    assert [m.id for m in persisted_messages] == [m.id for m in messages]
+    assert persisted_messages[1].step_id == step_id
+    assert all(m.created_at is not None and m.organization_id == default_user.organization_id for m in persisted_messages)
+
+    # The run usage comes from the step, and only the non-user message is associated with the run
+    usage_stats = server.job_manager.get_job_usage(job_id=default_run.id, actor=default_user)
+    assert usage_stats.total_tokens == 150
+    run_messages = server.job_manager.get_job_messages(job_id=default_run.id, actor=default_user)
+    assert [m.id for m in run_messages] == [messages[1].id]
+
+    provider_trace = await server.telemetry_manager.get_provider_trace_by_step_id_async(step_id=step_id, actor=default_user)
+    assert provider_trace.request_json == {"model": "gpt-4o-mini"}
+
+
+@pytest.mark.asyncio
+async def test_provider_trace_sink_writes_traces_in_background(server: SyncServer, default_user, monkeypatch, event_loop):
+    from letta.agents.helpers import generate_step_id
+    from letta.services.provider_trace_sink import ProviderTraceSink
+
+    sink = ProviderTraceSink()
+    monkeypatch.setattr(settings, "provider_trace_queue_size", 2)
+    written_before = sink.stats().written
+    dropped_before = sink.stats().dropped
+
+    step_ids = [generate_step_id() for _ in range(3)]
+    for step_id in step_ids:
+        await server.telemetry_manager.log_provider_trace_async(
+            actor=default_user,
+            provider_trace_create=ProviderTraceCreate(
+                request_json={"created_at": datetime.now(timezone.utc)},
+                response_json={"id": step_id},
+                step_id=step_id,
+                organization_id=default_user.organization_id,
+            ),
+        )
+
+    # Nothing is written inline, and the trace that didn't fit in the queue is dropped
+    assert sink.stats().queued == 2
+    assert sink.stats().dropped == dropped_before + 1
+
+    await sink.flush_async()
+    assert sink.stats().queued == 0
+    assert sink.stats().written == written_before + 2
+    for step_id in step_ids[:2]:
+        provider_trace = await server.telemetry_manager.get_provider_trace_by_step_id_async(step_id=step_id, actor=default_user)
+        assert provider_trace.response_json == {"id": step_id}
+        assert isinstance(provider_trace.request_json["created_at"], str)
+    with pytest.raises(NoResultFound):
+        await server.telemetry_manager.get_provider_trace_by_step_id_async(step_id=step_ids[2], actor=default_user)
+
+
 def test_job_usage_stats_get_no_stats(server: SyncServer, default_job, default_user):
     """Test getting usage statistics for a job with no stats."""
     job_manager = server.job_manager
@@ -6733,6 +7685,80 @@ async def test_count_batch_items(
     assert count == num_items, f"Expected {num_items} items, got {count}"
 
 
+# ======================================================================================================================
+# ProviderManager Tests
+# ======================================================================================================================
+
+
+@pytest.mark.asyncio
+async def test_provider_override_key_cache(server: SyncServer, default_user, event_loop):
+    from letta.otel.query_counter import count_queries
+    from letta.schemas.providers import ProviderCreate, ProviderUpdate
+
+    provider = await server.provider_manager.create_provider_async(
+        ProviderCreate(name="my-openai", provider_type=ProviderType.openai, api_key="sk-first"), actor=default_user
+    )
+    assert await server.provider_manager.get_override_key_async("my-openai", actor=default_user) == "sk-first"
+
+    with count_queries() as counter:
+        assert await server.provider_manager.get_override_key_async("my-openai", actor=default_user) == "sk-first"
+    assert counter.count == 0
+
+    # Writes through the manager invalidate the cached key right away
+    await server.provider_manager.update_provider_async(provider.id, ProviderUpdate(api_key="sk-second"), actor=default_user)
+    assert await server.provider_manager.get_override_key_async("my-openai", actor=default_user) == "sk-second"
+    await server.provider_manager.delete_provider_by_id_async(provider.id, actor=default_user)
+    assert await server.provider_manager.get_override_key_async("my-openai", actor=default_user) is None
+
+
+@pytest.mark.asyncio
+async def test_model_catalog_serves_cached_and_stale_listings(server: SyncServer, default_user, monkeypatch, event_loop):
+    from letta.schemas.providers import LettaProvider
+    from letta.services.model_catalog import ModelCatalog
+
+    fetches = []
+    failing = {"value": False}
+
+    class CountingProvider(LettaProvider):
+        async def list_llm_models_async(self):
+            fetches.append(self.name)
+            if failing["value"]:
+                raise RuntimeError("provider is down")
+            return await super().list_llm_models_async()
+
+    catalog = ModelCatalog()
+    catalog.clear()
+    monkeypatch.setattr(settings, "model_catalog_ttl_seconds", 60)
+    monkeypatch.setattr(settings, "model_catalog_max_stale_seconds", 3600)
+    provider = CountingProvider(name="counting", organization_id=default_user.organization_id)
+
+    models = await catalog.list_llm_models_async(provider)
+    assert [m.model for m in models] == ["letta-free"]
+    # Callers get copies, so adjusting a config doesn't leak into the cache
+    models[0].context_window = 1
+    models = await catalog.list_llm_models_async(provider)
+    assert models[0].context_window == 8192
+    assert len(fetches) == 1
+
+    # Past the TTL the stale listing is served right away and refreshed in the background
+    monkeypatch.setattr(settings, "model_catalog_ttl_seconds", 1e-6)
+    assert [m.model for m in await catalog.list_llm_models_async(provider)] == ["letta-free"]
+    await asyncio.sleep(0)
+    assert len(fetches) == 2
+
+    # Past the max staleness callers wait for the refresh, and fall back to the last listing if it fails
+    monkeypatch.setattr(settings, "model_catalog_max_stale_seconds", 1e-6)
+    failing["value"] = True
+    assert [m.model for m in await catalog.list_llm_models_async(provider)] == ["letta-free"]
+    assert len(fetches) == 3
+
+    # Without a listing to fall back to, the failure is raised
+    catalog.invalidate_organization(default_user.organization_id)
+    with pytest.raises(RuntimeError):
+        await catalog.list_llm_models_async(provider)
+    catalog.clear()
+
+
 # ======================================================================================================================
 # MCPManager Tests
 # ======================================================================================================================
@@ -7255,3 +8281,52 @@ async def test_last_accessed_at_updates_correctly(server, default_user, sarah_ag
 
     final_agent = await server.file_agent_manager.get_file_agent_by_id(agent_id=sarah_agent.id, file_id=file.id, actor=default_user)
     assert final_agent.last_accessed_at > prev_time, "mark_access should update timestamp"
+
+
+@pytest.mark.asyncio
+async def test_grep_attached_files_with_line_cache(server, default_user, sarah_agent, default_source, event_loop):
+    """grep searches cached, trigram-indexed file lines and picks up new content versions."""
+    from letta.services.file_processor.file_line_cache import FileLineCache, required_literals
+    from letta.services.tool_executor.files_tool_executor import LettaFileToolExecutor
+
+    assert required_literals(r"def\s+load_(config|state)\(") == ["def", "load_", "("]
+    assert required_literals(r"foo|bar") == []
+    assert required_literals(r"Colou?r") == ["colo", "r"]
+
+    files = []
+    for name, text in (("a.py", "alpha\nneedle one\nbeta\n"), ("b.py", "gamma\nNEEDLE two\nneedle three\nÜber needle\n")):
+        file = await server.file_manager.create_file(
+            file_metadata=PydanticFileMetadata(file_name=name, organization_id=default_user.organization_id, source_id=default_source.id),
+            actor=default_user,
+            text=text,
+        )
+        await server.file_agent_manager.attach_file(
+            agent_id=sarah_agent.id, file_id=file.id, file_name=file.file_name, actor=default_user, visible_content=text
+        )
+        files.append(file)
+
+    executor = LettaFileToolExecutor(
+        message_manager=server.message_manager,
+        agent_manager=server.agent_manager,
+        block_manager=server.block_manager,
+        job_manager=server.job_manager,
+        passage_manager=server.passage_manager,
+        actor=default_user,
+    )
+
+    result = await executor.grep(sarah_agent, pattern="needle", context_lines=0)
+    assert result.startswith("Found 4 matches in 2 files")
+    for header in ("a.py:2 ===", "b.py:2 ===", "b.py:3 ===", "b.py:4 ==="):
+        assert header in result
+    assert "> 2: needle one" in result
+
+    cached = await FileLineCache().get_many_async(
+        await FileLineCache().get_versions_async([files[0].id], actor=default_user), actor=default_user
+    )
+    assert list(cached[files[0].id].candidate_lines(["needle"])) == [1]
+
+    # Changing the content invalidates the cached lines
+    await server.file_manager.upsert_file_content(file_id=files[0].id, text="needle four\nneedle five\n", actor=default_user)
+    result = await executor.grep(sarah_agent, pattern="needle f", include="a.py", context_lines=1)
+    assert result.startswith("Found 2 matches in 1 files")
+    assert "> 1: needle four\n  2: needle five" in result
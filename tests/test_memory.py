@@ -56,3 +56,27 @@ def test_memory_jinja2_set_template(sample_memory: Memory):
     )
     with pytest.raises(ValueError):
         sample_memory.set_prompt_template(prompt_template=template_bad_memory_structure)
+
+
+def test_memory_compile_fingerprint(sample_memory: Memory):
+    """Compiled memory is keyed by a fingerprint of the rendered block fields, so edits are always picked up"""
+    fingerprint = sample_memory.fingerprint()
+    compiled = sample_memory.compile()
+    assert sample_memory.compile() == compiled
+
+    sample_memory.update_block_value(label="human", value="Someone else")
+    assert sample_memory.fingerprint() != fingerprint
+    assert "Someone else" in sample_memory.compile()
+
+    sample_memory.update_block_value(label="human", value="User")
+    assert sample_memory.fingerprint() == fingerprint
+    assert sample_memory.compile() == compiled
+
+
+def test_memory_fingerprint_custom_template(sample_memory: Memory):
+    """Templates reading fields outside the fingerprint are rendered every time"""
+    sample_memory.set_prompt_template("{% for block in blocks %}{{ block.label }}={{ block.metadata }}\n{% endfor %}")
+    assert sample_memory.fingerprint() is None
+
+    sample_memory.get_block("human").metadata = {"source": "signup"}
+    assert "signup" in sample_memory.compile()
@@ -3,7 +3,7 @@ from unittest.mock import patch
 
 import pytest
 
-from letta.server.rest_api.json_parser import OptimisticJSONParser
+from letta.server.rest_api.json_parser import IncrementalJSONParser, OptimisticJSONParser
 
 
 @pytest.fixture
@@ -278,3 +278,75 @@ def test_unescaped_control_characters_strict(strict_parser):
 
     with pytest.raises(json.JSONDecodeError, match="Invalid control character"):
         strict_parser.parse(input_str)
+
+
+def _feed_in_fragments(parser, text, size):
+    """Feed `text` to an IncrementalJSONParser `size` characters at a time, collecting the string deltas per key."""
+    deltas = {}
+    for i in range(0, len(text), size):
+        update = parser.feed(text[i : i + size])
+        for key, delta in update.string_deltas.items():
+            deltas.setdefault(key, []).append(delta)
+    return {key: "".join(chunks) for key, chunks in deltas.items()}
+
+
+@pytest.mark.parametrize("fragment_size", [1, 2, 3, 7, 1000])
+def test_incremental_parser_matches_json_loads(fragment_size):
+    """
+    Whatever the fragment boundaries (including inside escape sequences and surrogate pairs),
+    the incremental parser ends up with the same object as json.loads.
+    """
+    obj = {
+        "inner_thoughts": 'Quote " backslash \\ newline \n tab \t unicode é and 😀',
+        "message": "x" * 100,
+        "count": -12.5e3,
+        "flag": True,
+        "nothing": None,
+        "nested": {"list": [1, "]}", {"deep": "{"}], "empty": {}},
+    }
+    for text in (json.dumps(obj), json.dumps(obj, ensure_ascii=False, indent=2)):
+        parser = IncrementalJSONParser()
+        deltas = _feed_in_fragments(parser, text, fragment_size)
+        assert parser.done
+        assert parser.current == obj
+        assert parser.keys == list(obj)
+        assert deltas == {"inner_thoughts": obj["inner_thoughts"], "message": obj["message"]}
+
+
+def test_incremental_parser_partial_state():
+    parser = IncrementalJSONParser()
+    update = parser.feed('{"inner_thoughts": "thinking')
+    assert update.string_deltas == {"inner_thoughts": "thinking"}
+    assert update.completed == {}
+    assert parser.current == {"inner_thoughts": "thinking"}
+
+    update = parser.feed(' hard", "args": [1, 2')
+    assert update.string_deltas == {"inner_thoughts": " hard"}
+    assert update.completed == {"inner_thoughts": "thinking hard"}
+    # Non-string values only show up once they are complete
+    assert parser.current == {"inner_thoughts": "thinking hard", "args": None}
+
+    update = parser.feed("]}")
+    assert update.completed == {"args": [1, 2]}
+    assert parser.done
+
+
+def test_incremental_parser_scans_each_character_once():
+    """Each fragment is scanned on its own, never together with the text that came before it."""
+    scans = []
+    pattern = IncrementalJSONParser._STRING_SPECIAL
+
+    class ScanCountingPattern:
+        def search(self, string, pos=0):
+            match = pattern.search(string, pos)
+            scans.append((len(string), (match.end() if match else len(string)) - pos))
+            return match
+
+    text = json.dumps({"inner_thoughts": "hmm", "message": 'word "quoted" \\ ' * 10_000})
+    with patch.object(IncrementalJSONParser, "_STRING_SPECIAL", ScanCountingPattern()):
+        parser = IncrementalJSONParser()
+        deltas = _feed_in_fragments(parser, text, 4)
+
+    assert deltas["message"] == 'word "quoted" \\ ' * 10_000
+    assert max(length for length, _ in scans) <= 4
+    assert len(deltas["message"]) <= sum(scanned for _, scanned in scans) <= len(text)
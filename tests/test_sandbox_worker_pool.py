@@ -0,0 +1,111 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+from letta.services.tool_sandbox.worker_pool import SandboxWorker, SandboxWorkerPool
+
+
+@pytest.fixture
+async def pool(tmp_path):
+    pool = SandboxWorkerPool(sys.executable, str(tmp_path), size=2, max_calls_per_worker=3)
+    yield pool
+    await pool.close_async()
+
+
+async def _execute(pool, code, env=None, timeout=30):
+    return await pool.execute(code, os.path.join(pool.cwd, "tool.py"), env or {}, timeout=timeout)
+
+
+@pytest.mark.asyncio
+async def test_worker_captures_output_and_isolates_calls(pool):
+    result = await _execute(
+        pool, "import os, sys\nx = 1\nprint(os.environ['GREETING'])\nsys.stdout.buffer.write(b'raw')", {"GREETING": "hi"}
+    )
+    assert result.returncode == 0
+    assert result.stdout == b"hi\nraw"
+
+    # Globals and environment variables from the previous call don't leak into the next one
+    result = await _execute(pool, "import os\nprint('x' in globals(), os.environ.get('GREETING'))")
+    assert result.stdout == b"False None\n"
+    assert len(pool._idle) == 1
+
+
+@pytest.mark.asyncio
+async def test_worker_reports_errors_like_a_subprocess(pool):
+    result = await _execute(pool, "raise ValueError('bad input')")
+    assert result.returncode == 1
+    assert b"ValueError: bad input" in result.stderr
+
+    result = await _execute(pool, "import sys\nsys.exit(3)")
+    assert result.returncode == 3
+
+
+@pytest.mark.asyncio
+async def test_crashed_worker_is_replaced(pool):
+    result = await _execute(pool, "import os\nos._exit(5)")
+    assert result.returncode == 5
+    assert not pool._idle
+
+    result = await _execute(pool, "print('ok')")
+    assert result.stdout == b"ok\n"
+
+
+@pytest.mark.asyncio
+async def test_worker_recycled_after_max_calls(pool):
+    pids = [int((await _execute(pool, "import os\nprint(os.getpid())")).stdout) for _ in range(4)]
+    assert len(set(pids[:3])) == 1
+    assert pids[3] != pids[0]
+
+
+@pytest.mark.asyncio
+async def test_timed_out_worker_is_killed(pool):
+    with pytest.raises(asyncio.TimeoutError):
+        await _execute(pool, "import time\ntime.sleep(10)", timeout=0.5)
+    assert not pool._idle
+
+    result = await _execute(pool, "print('ok')")
+    assert result.stdout == b"ok\n"
+
+
+@pytest.mark.asyncio
+async def test_discarded_workers_are_reaped(pool, monkeypatch):
+    started = []
+    start = SandboxWorker.start
+
+    async def tracking_start(*args, **kwargs):
+        started.append(await start(*args, **kwargs))
+        return started[-1]
+
+    monkeypatch.setattr(SandboxWorker, "start", tracking_start)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await _execute(pool, "import time\ntime.sleep(10)", timeout=0.5)
+    for _ in range(3):
+        await _execute(pool, "print('ok')")
+
+    # The timed-out worker and the one retired after max_calls_per_worker have both exited
+    assert len(started) == 2
+    assert all(worker.process.returncode is not None for worker in started)
+
+
+@pytest.mark.asyncio
+async def test_worker_errors_become_tool_errors(tmp_path, monkeypatch):
+    from letta.schemas.sandbox_config import LocalSandboxConfig, SandboxConfig, SandboxType
+    from letta.schemas.tool import Tool
+    from letta.services.tool_sandbox.local_sandbox import AsyncToolSandboxLocal
+    from letta.settings import tool_settings
+
+    monkeypatch.setattr(tool_settings, "local_sandbox_worker_pool_size", 1)
+
+    tool = Tool(name="noop", source_code="def noop():\n    return None\n", json_schema={"name": "noop", "parameters": {}})
+    sandbox_config = SandboxConfig(type=SandboxType.LOCAL, config=LocalSandboxConfig(sandbox_dir=str(tmp_path)).model_dump())
+    sandbox = AsyncToolSandboxLocal("noop", {}, user=None, tool_object=tool, sandbox_config=sandbox_config)
+
+    # The sandbox interpreter can't be started
+    result = await sandbox._execute_tool_in_worker(
+        sandbox_config, str(tmp_path / "missing-python"), "print('ok')", str(tmp_path / "tool.py"), {}, str(tmp_path)
+    )
+    assert result.status == "error"
+    assert "FileNotFoundError" in result.func_return
@@ -395,3 +395,119 @@ def test_formatter():
     """
 
     assert UNUSED_AND_EMPRY_VAR_SOL == safe_format(UNUSED_AND_EMPRY_VAR, VARS_DICT)
+
+
+@pytest.mark.asyncio
+async def test_token_counting_service_matches_tiktoken():
+    """Offloaded counts match the synchronous helpers, and repeated counts are served from the memo cache"""
+    from letta.local_llm.utils import num_tokens_from_functions, num_tokens_from_messages
+    from letta.services.context_window_calculator.token_counting_service import INLINE_MAX_CHARS, TokenCountingService
+    from letta.utils import count_tokens, get_tiktoken_encoding
+
+    service = TokenCountingService()
+    model = "gpt-4o-mini"
+    texts = ["hello world", "bananas " * INLINE_MAX_CHARS, ""]
+    assert await service.count_texts_async(texts, model=model) == [count_tokens(text, model) for text in texts]
+
+    messages = [{"role": "system", "content": "You are a helpful assistant."}] + [
+        {"role": "user", "content": f"Message {i}: " + "lorem ipsum " * 300} for i in range(8)
+    ]
+    assert await service.count_messages_async(messages, model=model) == num_tokens_from_messages(messages, model=model)
+
+    functions = [{"name": "send_message", "description": "Sends a message", "parameters": {"type": "object", "properties": {}}}]
+    assert await service.count_functions_async(functions, model=model) == num_tokens_from_functions(functions, model=model)
+
+    # Encoders are resolved once per model, and memoized counts don't touch the encoder again
+    assert get_tiktoken_encoding(model) is get_tiktoken_encoding(model)
+    service._cache_put_many({service._cache_key("text", get_tiktoken_encoding(model).name, "memoized"): 12345})
+    assert await service.count_text_async("memoized", model=model) == 12345
+
+
+@pytest.mark.asyncio
+async def test_fan_out_bounds_concurrency_and_returns_early():
+    """fan_out caps in-flight calls, times out slow ones, shares named budgets and stops after enough successes"""
+    import asyncio
+
+    from letta.helpers.fan_out import SharedConcurrencyLimit, fan_out, gather_fan_out
+
+    in_flight, peak, per_key_peak = 0, 0, {}
+    per_key = {}
+    cancelled = []
+
+    async def call(item):
+        nonlocal in_flight, peak
+        key = item % 2
+        in_flight += 1
+        per_key[key] = per_key.get(key, 0) + 1
+        peak = max(peak, in_flight)
+        per_key_peak[key] = max(per_key_peak.get(key, 0), per_key[key])
+        try:
+            await asyncio.sleep(1 if item == 3 else 0.01)
+            return item * 10
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+        finally:
+            in_flight -= 1
+            per_key[key] -= 1
+
+    shared_limit = SharedConcurrencyLimit(lambda: 2)
+    results = await gather_fan_out(
+        list(range(12)), call, concurrency=5, timeout=0.5, shared_limit=shared_limit, shared_key=lambda item: item % 2
+    )
+    assert [r.index for r in results] == list(range(12))
+    assert [r.value for r in results if r.ok] == [i * 10 for i in range(12) if i != 3]
+    assert isinstance(results[3].error, asyncio.TimeoutError)
+    assert peak <= 4 and max(per_key_peak.values()) <= 2
+
+    # Early return cancels the calls that haven't finished
+    results = [r async for r in fan_out(list(range(6)), call, concurrency=6, stop_after=3)]
+    assert len(results) == 3 and all(r.ok for r in results)
+    assert cancelled[-1] == 3
+    assert in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_sleeptime_scheduler_coalesces_turns():
+    """Turns arriving while a sleeptime agent runs merge into one pending run, and agents never run twice at once"""
+    import asyncio
+
+    from letta.services.sleeptime_scheduler import SleeptimeScheduler, SleeptimeTrigger
+
+    scheduler = SleeptimeScheduler()
+    created, executed = [], []
+    running = {}
+    release = asyncio.Event()
+
+    def trigger(turn: int) -> SleeptimeTrigger:
+        return SleeptimeTrigger(last_processed_message_id=f"message-{turn}", response_messages=[f"response-{turn}"])
+
+    async def create_run() -> str:
+        created.append(f"run-{len(created)}")
+        return created[-1]
+
+    def execute_for(agent_id: str):
+        async def execute(run_id: str, trigger: SleeptimeTrigger) -> None:
+            assert not running.get(agent_id)
+            running[agent_id] = True
+            executed.append((agent_id, run_id, trigger))
+            await release.wait()
+            running[agent_id] = False
+
+        return execute
+
+    first = await scheduler.submit("agent-a", trigger(0), create_run, execute_for("agent-a"))
+    await asyncio.sleep(0)  # the first run starts
+    queued = [await scheduler.submit("agent-a", trigger(turn), create_run, execute_for("agent-a")) for turn in (1, 2, 3)]
+    other = await scheduler.submit("agent-b", trigger(0), create_run, execute_for("agent-b"))
+
+    assert first == "run-0" and queued == ["run-1"] * 3 and other == "run-2"
+    release.set()
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+    runs = {(agent_id, run_id): t for agent_id, run_id, t in executed}
+    assert set(runs) == {("agent-a", "run-0"), ("agent-a", "run-1"), ("agent-b", "run-2")}
+    coalesced = runs[("agent-a", "run-1")]
+    assert coalesced.num_turns == 3
+    assert coalesced.last_processed_message_id == "message-1" and coalesced.response_messages == ["response-3"]
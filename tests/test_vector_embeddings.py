@@ -1,7 +1,20 @@
+import base64
+import sqlite3
+
 import numpy as np
+import pytest
 
+from letta.constants import MAX_EMBEDDING_DIM
 from letta.orm.sqlalchemy_base import adapt_array
-from letta.orm.sqlite_functions import convert_array, verify_embedding_dimension
+from letta.orm.sqlite_functions import (
+    convert_array,
+    cosine_distance,
+    decode_vector,
+    encode_vector,
+    is_legacy_vector,
+    migrate_legacy_vectors,
+    verify_embedding_dimension,
+)
 
 
 def test_vector_conversions():
@@ -36,4 +49,61 @@ def test_vector_conversions():
     print("✓ None handling verified")
 
 
-# Run the tests
+def _legacy_encode(arr):
+    return base64.b64encode(np.asarray(arr, dtype=np.float32).tobytes())
+
+
+def test_compact_format_drops_padding_and_decodes_zero_copy():
+    embedding = np.random.random(1536).astype(np.float32)
+    padded = np.pad(embedding, (0, MAX_EMBEDDING_DIM - 1536))
+
+    encoded = encode_vector(padded)
+    decoded = decode_vector(encoded)
+
+    assert len(encoded) < 1536 * 4 + 32
+    assert len(encoded) < len(_legacy_encode(padded)) / 3
+    np.testing.assert_array_equal(decoded, embedding)
+    assert not decoded.flags.owndata
+
+
+def test_legacy_vectors_still_decode():
+    original = np.random.random(MAX_EMBEDDING_DIM).astype(np.float32)
+    legacy = _legacy_encode(original)
+
+    assert is_legacy_vector(legacy)
+    assert not is_legacy_vector(encode_vector(original))
+    np.testing.assert_array_equal(convert_array(legacy), original)
+
+
+@pytest.mark.parametrize("storage_dtype, tolerance", [("float16", 1e-3), ("int8", 1e-2)])
+def test_quantized_vectors_preserve_cosine_distance(storage_dtype, tolerance):
+    rng = np.random.default_rng(0)
+    a, b = rng.standard_normal(768).astype(np.float32), rng.standard_normal(768).astype(np.float32)
+
+    exact = cosine_distance(adapt_array(a), adapt_array(b))
+    quantized = cosine_distance(encode_vector(a, storage_dtype=storage_dtype), encode_vector(b, storage_dtype=storage_dtype))
+
+    assert len(encode_vector(a, storage_dtype=storage_dtype)) < len(encode_vector(a))
+    assert quantized == pytest.approx(exact, abs=tolerance)
+
+
+def test_cosine_distance_between_compact_and_padded_vectors():
+    embedding = np.random.random(1536).astype(np.float32)
+    padded = np.pad(embedding, (0, MAX_EMBEDDING_DIM - 1536))
+
+    assert cosine_distance(encode_vector(embedding), adapt_array(padded)) == pytest.approx(0.0, abs=1e-6)
+    assert cosine_distance(_legacy_encode(padded), encode_vector(embedding)) == pytest.approx(0.0, abs=1e-6)
+
+
+def test_migrate_legacy_vectors():
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE passages (id TEXT PRIMARY KEY, embedding BLOB)")
+    vectors = {f"p{i}": np.random.random(MAX_EMBEDDING_DIM).astype(np.float32) for i in range(5)}
+    connection.executemany("INSERT INTO passages VALUES (?, ?)", [(i, _legacy_encode(v)) for i, v in vectors.items()])
+    connection.execute("INSERT INTO passages VALUES ('empty', NULL)")
+
+    assert migrate_legacy_vectors(connection, "passages", batch_size=2) == 5
+    assert migrate_legacy_vectors(connection, "passages") == 0
+    for passage_id, data in connection.execute("SELECT id, embedding FROM passages WHERE embedding IS NOT NULL"):
+        assert not is_legacy_vector(data)
+        np.testing.assert_array_equal(decode_vector(data), vectors[passage_id])
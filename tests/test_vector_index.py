@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from letta.helpers.vector_index import FlatVectorIndex, IVFVectorIndex, create_vector_index, load_vector_index
+
+
+def _random_vectors(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+def _clustered_vectors(n: int, dim: int, clusters: int = 50, seed: int = 0) -> np.ndarray:
+    # Real embeddings are clustered by topic; isotropic noise is the worst case for IVF
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim))
+    return (centers[rng.integers(clusters, size=n)] + 0.5 * rng.standard_normal((n, dim))).astype(np.float32)
+
+
+def _brute_force(vectors: np.ndarray, query: np.ndarray, k: int) -> list:
+    normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return list(np.argsort(-(normed @ (query / np.linalg.norm(query))))[:k])
+
+
+@pytest.mark.parametrize("kind", ["flat", "ivf"])
+def test_search_matches_brute_force_below_training_threshold(kind):
+    vectors = _random_vectors(200, 32)
+    index = create_vector_index(kind, 32)
+    index.add([f"p{i}" for i in range(len(vectors))], vectors)
+
+    query = _random_vectors(1, 32, seed=1)[0]
+    hits = index.search(query, 10)
+
+    assert [passage_id for passage_id, _ in hits] == [f"p{i}" for i in _brute_force(vectors, query, 10)]
+    assert all(a[1] <= b[1] for a, b in zip(hits, hits[1:])), "results must be sorted by distance"
+
+
+def test_padded_vectors_are_truncated_to_index_dim():
+    index = FlatVectorIndex(dim=4)
+    index.add(["a", "b"], [[1, 0, 0, 0, 0, 0], [0, 1, 0, 0, 0, 0]])
+
+    (best_id, distance), _ = index.search([1, 0, 0, 0, 0, 0], 2)
+    assert best_id == "a"
+    assert distance == pytest.approx(0.0, abs=1e-6)
+
+
+def test_add_replaces_and_remove_deletes():
+    index = FlatVectorIndex(dim=2)
+    index.add(["a", "b", "c"], [[1, 0], [0, 1], [-1, 0]])
+    index.add(["c"], [[1, 0.01]])
+    index.remove(["a", "missing"])
+
+    assert len(index) == 2
+    assert "a" not in index
+    assert [passage_id for passage_id, _ in index.search([1, 0], 2)] == ["c", "b"]
+
+
+def test_ivf_trains_once_large_enough_and_keeps_recall():
+    dim = 64
+    vectors = _clustered_vectors(4000, dim)
+    index = IVFVectorIndex(dim, nprobe=16, min_train_size=1000)
+    index.add([f"p{i}" for i in range(2000)], vectors[:2000])
+    assert index.is_trained
+    index.add([f"p{i}" for i in range(2000, 4000)], vectors[2000:])
+
+    queries = vectors[::200] + 0.1 * _random_vectors(20, dim, seed=7)
+    recalls = []
+    for query in queries:
+        expected = {f"p{i}" for i in _brute_force(vectors, query, 10)}
+        found = {passage_id for passage_id, _ in index.search(query, 10)}
+        recalls.append(len(expected & found) / 10)
+    assert np.mean(recalls) >= 0.9
+
+
+@pytest.mark.parametrize("kind", ["flat", "ivf"])
+def test_save_and_load_round_trip(tmp_path, kind):
+    vectors = _random_vectors(300, 16)
+    index = create_vector_index(kind, 16, min_train_size=100) if kind == "ivf" else create_vector_index(kind, 16)
+    index.add([f"p{i}" for i in range(len(vectors))], vectors)
+    index.version = "300@2025-01-01T00:00:00"
+    index.save(tmp_path / "index.npz")
+
+    loaded = load_vector_index(tmp_path / "index.npz")
+    query = _random_vectors(1, 16, seed=3)[0]
+
+    assert loaded.kind == kind
+    assert loaded.version == index.version
+    assert loaded.ids == index.ids
+    assert loaded.search(query, 5) == index.search(query, 5)
+
+
+def test_unknown_index_kind():
+    with pytest.raises(ValueError):
+        create_vector_index("hnsw", 8)